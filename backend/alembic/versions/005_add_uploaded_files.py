@@ -0,0 +1,68 @@
+"""uploaded_files / upload_references: 内容寻址上传存储
+
+Revision ID: 005_add_uploaded_files
+Revises: 004_add_project_managers
+Create Date: 2026-10-19
+
+新增：
+- uploaded_files 表：按内容哈希去重的上传文件及图片元数据
+- upload_references 表：任务/文章对上传文件的引用索引（用于垃圾回收）
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "005_add_uploaded_files"
+down_revision = "004_add_project_managers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "uploaded_files" not in tables:
+        op.create_table(
+            "uploaded_files",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("content_hash", sa.String(64), nullable=False),
+            sa.Column("file_path", sa.String(500), nullable=False),
+            sa.Column("file_size", sa.Integer(), nullable=False),
+            sa.Column("mime_type", sa.String(100), nullable=False),
+            sa.Column("image_format", sa.String(20), nullable=True),
+            sa.Column("width", sa.Integer(), nullable=True),
+            sa.Column("height", sa.Integer(), nullable=True),
+            sa.Column("uploaded_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+            sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_uploaded_files_id", "uploaded_files", ["id"], unique=False)
+        op.create_index("ix_uploaded_files_content_hash", "uploaded_files", ["content_hash"], unique=True)
+
+    if "upload_references" not in tables:
+        op.create_table(
+            "upload_references",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("file_id", sa.Integer(), sa.ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("ref_type", sa.String(20), nullable=False),
+            sa.Column("ref_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("file_id", "ref_type", "ref_id", name="uq_upload_reference"),
+        )
+        op.create_index("ix_upload_references_id", "upload_references", ["id"], unique=False)
+        op.create_index("ix_upload_references_file_id", "upload_references", ["file_id"], unique=False)
+        op.create_index("ix_upload_references_ref", "upload_references", ["ref_type", "ref_id"], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+    if "upload_references" in tables:
+        op.drop_table("upload_references")
+    if "uploaded_files" in tables:
+        op.drop_table("uploaded_files")
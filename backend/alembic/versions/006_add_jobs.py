@@ -0,0 +1,56 @@
+"""jobs: 后台任务（异步导出）
+
+Revision ID: 006_add_jobs
+Revises: 005_add_uploaded_files
+Create Date: 2026-10-19
+
+新增：
+- jobs 表：后台任务的状态、进度、结果文件及有效期
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "006_add_jobs"
+down_revision = "005_add_uploaded_files"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "jobs" not in tables:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("job_type", sa.String(50), nullable=False),
+            sa.Column("params", sa.Text(), nullable=False),
+            sa.Column("params_hash", sa.String(64), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+            sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("result_path", sa.String(500), nullable=True),
+            sa.Column("result_filename", sa.String(255), nullable=True),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+            sa.Column("started_at", sa.TIMESTAMP(), nullable=True),
+            sa.Column("finished_at", sa.TIMESTAMP(), nullable=True),
+            sa.Column("expires_at", sa.TIMESTAMP(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_jobs_id", "jobs", ["id"], unique=False)
+        op.create_index("ix_jobs_status", "jobs", ["status"], unique=False)
+        op.create_index("ix_jobs_created_by", "jobs", ["created_by"], unique=False)
+        op.create_index("ix_jobs_params_hash_status", "jobs", ["params_hash", "status"], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+    if "jobs" in tables:
+        op.drop_table("jobs")
@@ -0,0 +1,66 @@
+"""workload_statistics: (user_id, project_id, period_start, period_end) 唯一约束
+
+Revision ID: 007_workload_statistic_unique_period
+Revises: 006_add_jobs
+Create Date: 2026-10-19
+
+变更：
+- 合并同一用户、项目、统计周期的重复记录（累加 total_man_days，保留最早一条）
+- 新增唯一约束 uq_workload_statistic_period，供批量 upsert 使用
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "007_workload_statistic_unique_period"
+down_revision = "006_add_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "workload_statistics" not in inspector.get_table_names():
+        return
+    existing = {uc["name"] for uc in inspector.get_unique_constraints("workload_statistics")}
+    if "uq_workload_statistic_period" in existing:
+        return
+
+    # 合并重复记录
+    rows = bind.execute(sa.text(
+        "SELECT id, user_id, project_id, period_start, period_end, total_man_days "
+        "FROM workload_statistics ORDER BY id"
+    )).fetchall()
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault((row.user_id, row.project_id, row.period_start, row.period_end), []).append(row)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        keep = group[0]
+        total = sum((r.total_man_days or 0) for r in group)
+        bind.execute(
+            sa.text("UPDATE workload_statistics SET total_man_days = :total WHERE id = :id"),
+            {"total": total, "id": keep.id},
+        )
+        for dup in group[1:]:
+            bind.execute(sa.text("DELETE FROM workload_statistics WHERE id = :id"), {"id": dup.id})
+
+    with op.batch_alter_table("workload_statistics") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_workload_statistic_period",
+            ["user_id", "project_id", "period_start", "period_end"],
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "workload_statistics" not in inspector.get_table_names():
+        return
+    existing = {uc["name"] for uc in inspector.get_unique_constraints("workload_statistics")}
+    if "uq_workload_statistic_period" in existing:
+        with op.batch_alter_table("workload_statistics") as batch_op:
+            batch_op.drop_constraint("uq_workload_statistic_period", type_="unique")
@@ -0,0 +1,106 @@
+"""article_tags / article_term_counts: 文章标签规范化与分类/标签计数
+
+Revision ID: 008_add_article_tags
+Revises: 007_workload_statistic_unique_period
+Create Date: 2026-10-19
+
+新增：
+- article_tags 表：articles.tags 拆分后的文章-标签关系
+- article_term_counts 表：已发布文章的分类/标签计数（随文章增删改增量维护）
+并根据现有文章回填上述两张表。
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "008_add_article_tags"
+down_revision = "007_workload_statistic_unique_period"
+branch_labels = None
+depends_on = None
+
+
+def _parse_tags(raw):
+    # 与 ArticleService.parse_tags 一致：不区分大小写去重
+    result = []
+    seen = set()
+    for item in (raw or "").split(","):
+        tag = item.strip()[:50]
+        if tag and tag.casefold() not in seen:
+            seen.add(tag.casefold())
+            result.append(tag)
+    return result
+
+
+def _count(counts, term_type, name):
+    # 按不区分大小写的名称合并计数（MySQL 默认排序规则下 uq_article_term_count 视为同一条），
+    # 保留首次出现的写法
+    key = (term_type, name.casefold())
+    display, count = counts.get(key, (name, 0))
+    counts[key] = (display, count + 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "article_tags" not in tables:
+        op.create_table(
+            "article_tags",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("article_id", sa.Integer(), sa.ForeignKey("articles.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("tag", sa.String(50), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("article_id", "tag", name="uq_article_tag"),
+        )
+        op.create_index("ix_article_tags_id", "article_tags", ["id"], unique=False)
+        op.create_index("ix_article_tags_article_id", "article_tags", ["article_id"], unique=False)
+        op.create_index("ix_article_tags_tag", "article_tags", ["tag"], unique=False)
+
+    if "article_term_counts" not in tables:
+        op.create_table(
+            "article_term_counts",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("term_type", sa.String(20), nullable=False),
+            sa.Column("name", sa.String(50), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("term_type", "name", name="uq_article_term_count"),
+        )
+        op.create_index("ix_article_term_counts_id", "article_term_counts", ["id"], unique=False)
+
+    if "articles" not in tables:
+        return
+
+    # 回填
+    if bind.execute(sa.text("SELECT COUNT(*) FROM article_tags")).scalar():
+        return
+    rows = bind.execute(sa.text("SELECT id, category, tags, is_published FROM articles")).fetchall()
+    tag_rows = []
+    counts: dict = {}
+    for row in rows:
+        tags = _parse_tags(row.tags)
+        tag_rows.extend({"article_id": row.id, "tag": tag} for tag in tags)
+        if row.is_published:
+            for tag in tags:
+                _count(counts, "tag", tag)
+            if row.category:
+                _count(counts, "category", row.category)
+    if tag_rows:
+        bind.execute(sa.text("INSERT INTO article_tags (article_id, tag) VALUES (:article_id, :tag)"), tag_rows)
+    if counts:
+        bind.execute(
+            sa.text("INSERT INTO article_term_counts (term_type, name, count) VALUES (:term_type, :name, :count)"),
+            [{"term_type": t, "name": n, "count": c} for (t, _), (n, c) in counts.items()],
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+    if "article_term_counts" in tables:
+        op.drop_table("article_term_counts")
+    if "article_tags" in tables:
+        op.drop_table("article_tags")
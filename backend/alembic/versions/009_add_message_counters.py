@@ -0,0 +1,49 @@
+"""message_counters: 用户消息未读数/总数计数
+
+Revision ID: 009_add_message_counters
+Revises: 008_add_article_tags
+Create Date: 2026-10-19
+
+新增：
+- message_counters 表：每个用户的未读消息数与消息总数（随消息变更增量维护）
+并根据现有消息回填。
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "009_add_message_counters"
+down_revision = "008_add_article_tags"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "message_counters" not in tables:
+        op.create_table(
+            "message_counters",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("total_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+        if "messages" in tables:
+            op.execute(
+                "INSERT INTO message_counters (user_id, unread_count, total_count) "
+                "SELECT user_id, SUM(CASE WHEN is_read THEN 0 ELSE 1 END), COUNT(*) "
+                "FROM messages GROUP BY user_id"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "message_counters" in inspector.get_table_names():
+        op.drop_table("message_counters")
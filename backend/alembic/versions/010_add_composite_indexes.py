@@ -0,0 +1,59 @@
+"""组合索引：高频查询的多列筛选
+
+Revision ID: 010_add_composite_indexes
+Revises: 009_add_message_counters
+Create Date: 2026-10-19
+
+新增：
+- tasks(assignee_id, status)：工作台/排期按认领人统计、查询进行中任务
+- tasks(project_id, status)：项目看板按项目统计各状态任务数
+- tasks(status, created_at)：任务列表按状态筛选并按创建时间倒序分页
+- task_collaborators(user_id, scheduled_start, scheduled_end)：按用户查询与日期区间重叠的配合排期
+- messages(user_id, is_read, created_at)：消息列表按已读状态筛选并按时间倒序分页
+- workload_statistics(user_id, period_start)：按用户查询统计周期区间
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision = "010_add_composite_indexes"
+down_revision = "009_add_message_counters"
+branch_labels = None
+depends_on = None
+
+
+# (索引名, 表名, 列)
+COMPOSITE_INDEXES = [
+    ("ix_tasks_assignee_status", "tasks", ["assignee_id", "status"]),
+    ("ix_tasks_project_status", "tasks", ["project_id", "status"]),
+    ("ix_tasks_status_created_at", "tasks", ["status", "created_at"]),
+    ("ix_task_collaborators_user_schedule", "task_collaborators", ["user_id", "scheduled_start", "scheduled_end"]),
+    ("ix_messages_user_read_created", "messages", ["user_id", "is_read", "created_at"]),
+    ("ix_workload_statistics_user_period", "workload_statistics", ["user_id", "period_start"]),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in COMPOSITE_INDEXES:
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    for name, table, _ in reversed(COMPOSITE_INDEXES):
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name in existing:
+            op.drop_index(name, table_name=table)
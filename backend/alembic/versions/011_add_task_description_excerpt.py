@@ -0,0 +1,81 @@
+"""tasks.description_excerpt: 任务描述摘要
+
+Revision ID: 011_add_task_description_excerpt
+Revises: 010_add_composite_indexes
+Create Date: 2026-10-19
+
+新增：
+- tasks.description_excerpt：描述的纯文本摘要（去掉图片/代码块/Markdown 标记，最长 200 字符），
+  供列表预览使用，列表接口可不再加载完整描述
+并根据现有任务描述回填。
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "011_add_task_description_excerpt"
+down_revision = "010_add_composite_indexes"
+branch_labels = None
+depends_on = None
+
+EXCERPT_LENGTH = 200
+_FENCED_CODE = re.compile(r"```.*?(```|$)", re.S)
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_LINE_PREFIX = re.compile(r"^\s{0,3}(#{1,6}\s+|>\s?|[-*+]\s+|\d+\.\s+)", re.M)
+_EMPHASIS = re.compile(r"(\*\*|__|~~|\*|`)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _make_excerpt(text):
+    if not text:
+        return None
+    plain = _FENCED_CODE.sub(" ", text)
+    plain = _IMAGE.sub(" ", plain)
+    plain = _HTML_TAG.sub(" ", plain)
+    plain = _LINK.sub(r"\1", plain)
+    plain = _LINE_PREFIX.sub("", plain)
+    plain = _EMPHASIS.sub("", plain)
+    plain = _WHITESPACE.sub(" ", plain).strip()
+    if not plain:
+        return None
+    if len(plain) > EXCERPT_LENGTH:
+        plain = plain[:EXCERPT_LENGTH - 1].rstrip() + "…"
+    return plain
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "tasks" not in inspector.get_table_names():
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("tasks")}
+    if "description_excerpt" not in columns:
+        op.add_column("tasks", sa.Column("description_excerpt", sa.String(200), nullable=True))
+
+    rows = bind.execute(
+        sa.text("SELECT id, description FROM tasks WHERE description IS NOT NULL AND description_excerpt IS NULL")
+    ).fetchall()
+    updates = [
+        {"id": row[0], "excerpt": excerpt}
+        for row in rows
+        if (excerpt := _make_excerpt(row[1])) is not None
+    ]
+    if updates:
+        bind.execute(sa.text("UPDATE tasks SET description_excerpt = :excerpt WHERE id = :id"), updates)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "tasks" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("tasks")}
+    if "description_excerpt" in columns:
+        with op.batch_alter_table("tasks") as batch_op:
+            batch_op.drop_column("description_excerpt")
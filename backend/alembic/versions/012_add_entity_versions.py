@@ -0,0 +1,44 @@
+"""tasks.version / projects.version: 实体版本号
+
+Revision ID: 012_add_entity_versions
+Revises: 011_add_task_description_excerpt
+Create Date: 2026-10-19
+
+新增：
+- tasks.version、projects.version：每次更新自增的版本号（现有数据从 1 开始），
+  详情接口据此生成 ETag，条件请求无需加载完整对象即可判断是否返回 304
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "012_add_entity_versions"
+down_revision = "011_add_task_description_excerpt"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ["tasks", "projects"]
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table in VERSIONED_TABLES:
+        if table not in tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "version" not in columns:
+            op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table in VERSIONED_TABLES:
+        if table not in tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "version" in columns:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.drop_column("version")
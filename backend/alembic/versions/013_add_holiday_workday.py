@@ -0,0 +1,56 @@
+"""holidays.is_workday: 调休上班日
+
+Revision ID: 013_add_holiday_workday
+Revises: 012_add_entity_versions
+Create Date: 2026-10-19
+
+新增：
+- holidays.is_workday：调休上班日（周末补班），该日按工作日排期
+并按日期回填原先未使用的 holidays.is_weekend（日期是否落在周六、周日）。
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "013_add_holiday_workday"
+down_revision = "012_add_entity_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "holidays" not in inspector.get_table_names():
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("holidays")}
+    if "is_workday" not in columns:
+        op.add_column(
+            "holidays",
+            sa.Column("is_workday", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+
+    rows = bind.execute(sa.text("SELECT id, date FROM holidays")).fetchall()
+    updates = []
+    for row in rows:
+        value = row[1]
+        if isinstance(value, str):
+            value = date.fromisoformat(value[:10])
+        updates.append({"id": row[0], "is_weekend": value.weekday() >= 5})
+    if updates:
+        bind.execute(sa.text("UPDATE holidays SET is_weekend = :is_weekend WHERE id = :id"), updates)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "holidays" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("holidays")}
+    if "is_workday" in columns:
+        with op.batch_alter_table("holidays") as batch_op:
+            batch_op.drop_column("is_workday")
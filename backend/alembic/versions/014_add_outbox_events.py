@@ -0,0 +1,52 @@
+"""outbox_events: 领域事件发件箱
+
+Revision ID: 014_add_outbox_events
+Revises: 013_add_holiday_workday
+Create Date: 2026-10-19
+
+新增：
+- outbox_events 表：任务状态变更事件与业务数据同一事务写入，由后台线程投递给排期、
+  工作量统计、项目产值等处理器（至少一次，已完成的处理器记录在 completed_handlers）
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "014_add_outbox_events"
+down_revision = "013_add_holiday_workday"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "outbox_events" not in tables:
+        op.create_table(
+            "outbox_events",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("event_type", sa.String(50), nullable=False),
+            sa.Column("aggregate_id", sa.Integer(), nullable=False),
+            sa.Column("payload", sa.Text(), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+            sa.Column("completed_handlers", sa.Text(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("available_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+            sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+            sa.Column("processed_at", sa.TIMESTAMP(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_outbox_events_id", "outbox_events", ["id"], unique=False)
+        op.create_index("ix_outbox_events_status_id", "outbox_events", ["status", "id"], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+    if "outbox_events" in tables:
+        op.drop_table("outbox_events")
@@ -0,0 +1,44 @@
+"""jobs.owner / jobs.heartbeat_at: 后台任务所属进程与心跳
+
+Revision ID: 015_add_job_heartbeat
+Revises: 014_add_outbox_events
+Create Date: 2026-10-19
+
+新增：
+- jobs.owner：执行任务的进程（主机名:进程号）
+- jobs.heartbeat_at：所属进程最近一次心跳时间
+多进程部署时，应用启动只将所属进程已退出或心跳过期的任务标记为失败，
+不影响其他进程正在执行的任务
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "015_add_job_heartbeat"
+down_revision = "014_add_outbox_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if "jobs" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("jobs")}
+    if "owner" not in columns:
+        op.add_column("jobs", sa.Column("owner", sa.String(100), nullable=True))
+    if "heartbeat_at" not in columns:
+        op.add_column("jobs", sa.Column("heartbeat_at", sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if "jobs" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("jobs")}
+    with op.batch_alter_table("jobs") as batch_op:
+        if "heartbeat_at" in columns:
+            batch_op.drop_column("heartbeat_at")
+        if "owner" in columns:
+            batch_op.drop_column("owner")
@@ -0,0 +1,37 @@
+"""outbox_events(aggregate_id, status, id): 按聚合判断是否有更早的未完成事件
+
+Revision ID: 016_add_outbox_aggregate_index
+Revises: 015_add_job_heartbeat
+Create Date: 2026-10-19
+
+投递时只取同一聚合中没有更早未完成（pending/failed）事件的到期事件，
+该索引供 NOT EXISTS 子查询按聚合查找更早的事件
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision = "016_add_outbox_aggregate_index"
+down_revision = "015_add_job_heartbeat"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_outbox_events_aggregate_status_id"
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if "outbox_events" not in inspector.get_table_names():
+        return
+    existing = {index["name"] for index in inspector.get_indexes("outbox_events")}
+    if INDEX_NAME not in existing:
+        op.create_index(INDEX_NAME, "outbox_events", ["aggregate_id", "status", "id"], unique=False)
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if "outbox_events" not in inspector.get_table_names():
+        return
+    existing = {index["name"] for index in inspector.get_indexes("outbox_events")}
+    if INDEX_NAME in existing:
+        op.drop_index(INDEX_NAME, table_name="outbox_events")
@@ -0,0 +1,48 @@
+"""uploaded_files.last_uploaded_at: 最近一次上传时间
+
+Revision ID: 017_add_upload_last_uploaded_at
+Revises: 016_add_outbox_aggregate_index
+Create Date: 2026-10-19
+
+新增：
+- uploaded_files.last_uploaded_at：重复上传同一内容时刷新，
+  无引用文件的回收保留期从最近一次上传起算（已有记录以 created_at 回填）
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "017_add_upload_last_uploaded_at"
+down_revision = "016_add_outbox_aggregate_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if "uploaded_files" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("uploaded_files")}
+    if "last_uploaded_at" in columns:
+        return
+    # 先以可空列加入并回填，再改为非空（SQLite 不支持以非常量默认值新增列）
+    op.add_column("uploaded_files", sa.Column("last_uploaded_at", sa.TIMESTAMP(), nullable=True))
+    op.execute("UPDATE uploaded_files SET last_uploaded_at = created_at")
+    with op.batch_alter_table("uploaded_files") as batch_op:
+        batch_op.alter_column(
+            "last_uploaded_at",
+            existing_type=sa.TIMESTAMP(),
+            nullable=False,
+            server_default=sa.func.now(),
+        )
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if "uploaded_files" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("uploaded_files")}
+    if "last_uploaded_at" in columns:
+        with op.batch_alter_table("uploaded_files") as batch_op:
+            batch_op.drop_column("last_uploaded_at")
@@ -1,5 +1,5 @@
 """依赖注入"""
-from fastapi import Depends, HTTPException, status, Security
+from fastapi import Depends, HTTPException, Query, status, Security
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
 from sqlalchemy.orm import Session
@@ -75,3 +75,19 @@ async def get_current_user_optional(
         return None
     
     return user
+
+
+async def get_current_user_for_stream(
+    token: Optional[str] = Query(None, description="访问令牌（EventSource 无法设置请求头时使用）"),
+    db: Session = Depends(get_db),
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(http_bearer)
+) -> User:
+    """获取当前用户依赖（推送连接使用：优先读取 Authorization 头，其次读取 token 查询参数）"""
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无法验证凭证",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(db=db, token=raw_token)
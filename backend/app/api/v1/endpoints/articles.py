@@ -177,7 +177,7 @@ async def get_article(
         
         # 增加浏览次数（仅已发布文章）
         if article.is_published:
-            article = ArticleService.increment_view_count(db, article_id)
+            article = ArticleService.record_view(article)
         
         # 填充作者信息
         if article.author:
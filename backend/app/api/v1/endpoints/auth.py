@@ -42,7 +42,7 @@ async def login(
     
     返回访问令牌
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
 
     if not user:
         logger.warning(
@@ -75,7 +75,7 @@ async def register(
     
     返回注册的用户信息
     """
-    user = create_user(
+    user = await create_user(
         db=db,
         username=user_data.username,
         email=user_data.email,
@@ -143,7 +143,7 @@ async def change_password_endpoint(
             detail="新密码必须包含至少1个特殊字符"
         )
     
-    user = change_password(
+    user = await change_password(
         db=db,
         user=current_user,
         old_password=password_data.old_password,
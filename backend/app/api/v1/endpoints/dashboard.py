@@ -1,5 +1,8 @@
 """仪表盘API端点"""
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
@@ -11,21 +14,37 @@ from app.schemas.dashboard import (
 )
 from app.services.dashboard_service import DashboardService
 from app.core.permissions import get_current_development_lead
+from app.utils.etag import conditional_response, make_etag
 
 router = APIRouter()
 
 
+def _dashboard_not_modified(
+    request: Request, response: Response, db: Session, kind: str, user_id: int
+) -> Optional[Response]:
+    """仪表盘条件请求：数据指纹未变化（且仍是同一天）时返回 304"""
+    etag = make_etag("dashboard", kind, user_id, date.today(), DashboardService.get_data_version(db))
+    return conditional_response(request, response, etag)
+
+
 @router.get("/developer", response_model=DeveloperDashboardResponse)
 async def get_developer_dashboard(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取开发人员工作台数据"""
+    not_modified = _dashboard_not_modified(request, response, db, "developer", current_user.id)
+    if not_modified:
+        return not_modified
     return DashboardService.get_developer_dashboard(db, current_user.id)
 
 
 @router.get("/project-manager", response_model=ProjectManagerDashboardResponse)
 async def get_project_manager_dashboard(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -34,14 +53,22 @@ async def get_project_manager_dashboard(
     if current_user.role not in ["project_manager", "system_admin"]:
         from app.core.exceptions import PermissionDeniedError
         raise PermissionDeniedError("只有项目经理可以访问项目仪表盘")
-    
+
+    not_modified = _dashboard_not_modified(request, response, db, "project-manager", current_user.id)
+    if not_modified:
+        return not_modified
     return DashboardService.get_project_manager_dashboard(db, current_user.id)
 
 
 @router.get("/team", response_model=TeamDashboardResponse)
 async def get_team_dashboard(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_development_lead)
 ):
     """获取开发组长团队仪表盘数据"""
+    not_modified = _dashboard_not_modified(request, response, db, "team", current_user.id)
+    if not_modified:
+        return not_modified
     return DashboardService.get_team_dashboard(db)
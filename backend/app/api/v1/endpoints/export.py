@@ -2,7 +2,7 @@
 from urllib.parse import quote
 
 from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date, datetime
@@ -12,7 +12,14 @@ from app.core.exceptions import AppException
 from app.models.task import TaskStatus
 from app.models.user import User
 from app.schemas.task import TaskFilterParams
-from app.services.export_service import ExportService
+from app.schemas.job import JobResponse
+from app.services.export_service import (
+    ExportService,
+    JOB_EXPORT_WORKLOAD_STATISTICS,
+    JOB_EXPORT_TASKS,
+    JOB_EXPORT_PERFORMANCE,
+)
+from app.services.job_service import JobService
 
 router = APIRouter()
 
@@ -26,6 +33,89 @@ def _attachment_headers(filename_utf8: str, filename_ascii_fallback: str) -> dic
     return {"Content-Disposition": disp}
 
 
+_XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _workload_export_scope(user_id: Optional[int], current_user: User) -> Optional[int]:
+    """工作量统计导出的用户范围：普通开发人员只能导出自己的数据"""
+    if current_user.role == "developer" and user_id and user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="无权限导出其他用户的数据")
+    return user_id if current_user.role != "developer" else current_user.id
+
+
+def _performance_export_scope(user_id: Optional[int], current_user: User) -> Optional[int]:
+    """绩效导出的用户范围：开发组长和系统管理员可以导出所有数据，其他用户只能导出自己的数据"""
+    if current_user.role == "developer":
+        if user_id and user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="无权限导出其他用户的绩效数据")
+        user_id = current_user.id
+    elif current_user.role == "project_manager":
+        # 项目经理只能导出自己负责的项目相关数据，这里简化处理，允许导出所有
+        pass
+    return user_id
+
+
+def _parse_csv_ints(value: Optional[str]) -> Optional[list[int]]:
+    if not value:
+        return None
+    result = []
+    for raw in value.split(","):
+        item = raw.strip()
+        if not item:
+            continue
+        try:
+            result.append(int(item))
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=f"非法ID: {item}") from exc
+    return result or None
+
+
+def _parse_csv_statuses(value: Optional[str]) -> Optional[list[TaskStatus]]:
+    if not value:
+        return None
+    allowed = {s.value: s for s in TaskStatus}
+    result = []
+    for raw in value.split(","):
+        item = raw.strip()
+        if not item:
+            continue
+        if item not in allowed:
+            raise HTTPException(status_code=422, detail=f"非法任务状态: {item}")
+        result.append(allowed[item])
+    return result or None
+
+
+def task_export_filters(
+    status: Optional[TaskStatus] = Query(None, description="任务状态"),
+    statuses: Optional[str] = Query(None, description="任务状态多选（逗号分隔）"),
+    project_id: Optional[int] = Query(None, description="项目ID"),
+    project_ids: Optional[str] = Query(None, description="项目ID多选（逗号分隔）"),
+    creator_id: Optional[int] = Query(None, description="创建者ID"),
+    creator_ids: Optional[str] = Query(None, description="创建者ID多选（逗号分隔）"),
+    assignee_id: Optional[int] = Query(None, description="认领者ID"),
+    assignee_ids: Optional[str] = Query(None, description="认领者ID多选（逗号分隔）"),
+    keyword: Optional[str] = Query(None, description="关键词搜索（标题或描述）"),
+    required_skills: Optional[str] = Query(None, description="所需技能（逗号分隔）"),
+    priority: Optional[str] = Query(None, description="优先级筛选：P0/P1/P2"),
+) -> TaskFilterParams:
+    """任务导出筛选条件（与 GET /tasks 一致）"""
+    return TaskFilterParams(
+        status=status,
+        statuses=_parse_csv_statuses(statuses),
+        project_id=project_id,
+        project_ids=_parse_csv_ints(project_ids),
+        creator_id=creator_id,
+        creator_ids=_parse_csv_ints(creator_ids),
+        assignee_id=assignee_id,
+        assignee_ids=_parse_csv_ints(assignee_ids),
+        keyword=keyword,
+        required_skills=required_skills,
+        priority=priority,
+        page=1,
+        page_size=100,
+    )
+
+
 @router.get("/workload-statistics")
 async def export_workload_statistics(
     user_id: Optional[int] = Query(None, description="用户ID"),
@@ -40,14 +130,12 @@ async def export_workload_statistics(
     
     权限：所有登录用户都可以导出自己的数据，项目经理和开发组长可以导出所有数据
     """
-    # 权限检查：普通开发人员只能导出自己的数据
-    if current_user.role == "developer" and user_id and user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="无权限导出其他用户的数据")
-    
+    scoped_user_id = _workload_export_scope(user_id, current_user)
+
     try:
         excel_file = ExportService.export_workload_statistics(
             db=db,
-            user_id=user_id if current_user.role != "developer" else current_user.id,
+            user_id=scoped_user_id,
             project_id=project_id,
             period_start=period_start,
             period_end=period_end
@@ -57,7 +145,7 @@ async def export_workload_statistics(
         filename = f"工作量统计_{ts}.xlsx"
         return StreamingResponse(
             excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            media_type=_XLSX_MEDIA_TYPE,
             headers=_attachment_headers(filename, f"workload_statistics_{ts}.xlsx"),
         )
     except Exception as e:
@@ -66,17 +154,7 @@ async def export_workload_statistics(
 
 @router.get("/tasks")
 async def export_tasks(
-    status: Optional[TaskStatus] = Query(None, description="任务状态"),
-    statuses: Optional[str] = Query(None, description="任务状态多选（逗号分隔）"),
-    project_id: Optional[int] = Query(None, description="项目ID"),
-    project_ids: Optional[str] = Query(None, description="项目ID多选（逗号分隔）"),
-    creator_id: Optional[int] = Query(None, description="创建者ID"),
-    creator_ids: Optional[str] = Query(None, description="创建者ID多选（逗号分隔）"),
-    assignee_id: Optional[int] = Query(None, description="认领者ID"),
-    assignee_ids: Optional[str] = Query(None, description="认领者ID多选（逗号分隔）"),
-    keyword: Optional[str] = Query(None, description="关键词搜索（标题或描述）"),
-    required_skills: Optional[str] = Query(None, description="所需技能（逗号分隔）"),
-    priority: Optional[str] = Query(None, description="优先级筛选：P0/P1/P2"),
+    filters: TaskFilterParams = Depends(task_export_filters),
     embed_images: bool = Query(False, description="是否嵌入问题图片到Excel，默认false"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -88,51 +166,6 @@ async def export_tasks(
     - 仅带 project_id 且不带 project_ids：与同项目 GET /projects/{project_id}/tasks 一致，
       避免页面看到整项目任务但导出却只有「列表级」数量的记录。
     """
-
-    def parse_csv_ints(value: Optional[str]) -> Optional[list[int]]:
-        if not value:
-            return None
-        result = []
-        for raw in value.split(","):
-            item = raw.strip()
-            if not item:
-                continue
-            try:
-                result.append(int(item))
-            except ValueError as exc:
-                raise HTTPException(status_code=422, detail=f"非法ID: {item}") from exc
-        return result or None
-
-    def parse_csv_statuses(value: Optional[str]) -> Optional[list[TaskStatus]]:
-        if not value:
-            return None
-        allowed = {s.value: s for s in TaskStatus}
-        result = []
-        for raw in value.split(","):
-            item = raw.strip()
-            if not item:
-                continue
-            if item not in allowed:
-                raise HTTPException(status_code=422, detail=f"非法任务状态: {item}")
-            result.append(allowed[item])
-        return result or None
-
-    filters = TaskFilterParams(
-        status=status,
-        statuses=parse_csv_statuses(statuses),
-        project_id=project_id,
-        project_ids=parse_csv_ints(project_ids),
-        creator_id=creator_id,
-        creator_ids=parse_csv_ints(creator_ids),
-        assignee_id=assignee_id,
-        assignee_ids=parse_csv_ints(assignee_ids),
-        keyword=keyword,
-        required_skills=required_skills,
-        priority=priority,
-        page=1,
-        page_size=100,
-    )
-
     try:
         excel_file = ExportService.export_tasks(
             db,
@@ -146,7 +179,7 @@ async def export_tasks(
         filename = f"任务列表_{ts}.xlsx"
         return StreamingResponse(
             excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            media_type=_XLSX_MEDIA_TYPE,
             headers=_attachment_headers(filename, f"tasks_{ts}.xlsx"),
         )
     except AppException:
@@ -170,15 +203,8 @@ async def export_performance_data(
     
     权限：开发组长和系统管理员可以导出所有数据，其他用户只能导出自己的数据
     """
-    # 权限检查
-    if current_user.role == "developer":
-        if user_id and user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="无权限导出其他用户的绩效数据")
-        user_id = current_user.id
-    elif current_user.role == "project_manager":
-        # 项目经理只能导出自己负责的项目相关数据，这里简化处理，允许导出所有
-        pass
-    
+    user_id = _performance_export_scope(user_id, current_user)
+
     try:
         excel_file = ExportService.export_performance_data(
             db=db,
@@ -191,8 +217,93 @@ async def export_performance_data(
         filename = f"绩效数据_{ts}.xlsx"
         return StreamingResponse(
             excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            media_type=_XLSX_MEDIA_TYPE,
             headers=_attachment_headers(filename, f"performance_{ts}.xlsx"),
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"导出失败: {str(e)}")
+
+
+# ----------------------------------------------------------------------
+# 后台导出：提交 -> 轮询 -> 下载
+# 大数据量导出不再占用请求线程；相同参数在结果有效期内直接复用已生成的文件
+# ----------------------------------------------------------------------
+
+@router.post("/workload-statistics/jobs", response_model=JobResponse, status_code=202)
+async def submit_workload_statistics_export(
+    user_id: Optional[int] = Query(None, description="用户ID"),
+    project_id: Optional[int] = Query(None, description="项目ID"),
+    period_start: Optional[date] = Query(None, description="统计周期开始日期"),
+    period_end: Optional[date] = Query(None, description="统计周期结束日期"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """提交工作量统计后台导出任务（权限同 GET /export/workload-statistics）"""
+    params = {
+        "user_id": _workload_export_scope(user_id, current_user),
+        "project_id": project_id,
+        "period_start": period_start.isoformat() if period_start else None,
+        "period_end": period_end.isoformat() if period_end else None,
+    }
+    return JobService.submit(db, JOB_EXPORT_WORKLOAD_STATISTICS, params, current_user.id)
+
+
+@router.post("/tasks/jobs", response_model=JobResponse, status_code=202)
+async def submit_tasks_export(
+    filters: TaskFilterParams = Depends(task_export_filters),
+    embed_images: bool = Query(False, description="是否嵌入问题图片到Excel，默认false"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """提交任务列表后台导出任务（筛选与权限同 GET /export/tasks）"""
+    ExportService.check_task_export_permission(db, filters, current_user.id, current_user.role)
+    params = {
+        "filters": filters.model_dump(mode="json"),
+        "current_user_id": current_user.id,
+        "current_user_role": current_user.role,
+        "embed_images": embed_images,
+    }
+    return JobService.submit(db, JOB_EXPORT_TASKS, params, current_user.id)
+
+
+@router.post("/performance/jobs", response_model=JobResponse, status_code=202)
+async def submit_performance_export(
+    user_id: Optional[int] = Query(None, description="用户ID"),
+    period_start: Optional[date] = Query(None, description="统计周期开始日期"),
+    period_end: Optional[date] = Query(None, description="统计周期结束日期"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """提交绩效数据后台导出任务（权限同 GET /export/performance）"""
+    params = {
+        "user_id": _performance_export_scope(user_id, current_user),
+        "period_start": period_start.isoformat() if period_start else None,
+        "period_end": period_end.isoformat() if period_end else None,
+    }
+    return JobService.submit(db, JOB_EXPORT_PERFORMANCE, params, current_user.id)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_export_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """查询后台导出任务状态与进度"""
+    return JobService.get_job(db, job_id, current_user.id, is_admin=current_user.has_role("system_admin"))
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """下载后台导出任务的结果文件"""
+    job = JobService.get_job(db, job_id, current_user.id, is_admin=current_user.has_role("system_admin"))
+    result_file = JobService.get_result_file(job)
+    return FileResponse(
+        result_file,
+        media_type=_XLSX_MEDIA_TYPE,
+        headers=_attachment_headers(job.result_filename, f"{job.job_type}_{job.id}.xlsx"),
+    )
@@ -0,0 +1,57 @@
+"""节假日API端点"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user
+from app.core.exceptions import ValidationError
+from app.core.permissions import get_current_admin
+from app.models.user import User
+from app.schemas.holiday import HolidayCalendarResponse, HolidayImportResponse, HolidayResponse
+from app.services.holiday_service import HolidayService
+
+router = APIRouter()
+
+# 导入文件大小上限
+MAX_IMPORT_FILE_SIZE = 1024 * 1024
+
+
+@router.get("", response_model=List[HolidayResponse])
+async def list_holidays(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="年份，不传返回全部"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """获取节假日与调休上班日列表（按日期排序）"""
+    return HolidayService.list_holidays(db, year)
+
+
+@router.get("/calendar/{year}", response_model=HolidayCalendarResponse)
+async def get_year_calendar(
+    year: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """年度工作日历：各月工作日数、工作日放假的节假日与调休上班日"""
+    if not 2000 <= year <= 2100:
+        raise ValidationError("年份超出范围")
+    return HolidayService.get_year_calendar(db, year)
+
+
+@router.post("/import", response_model=HolidayImportResponse)
+async def import_holidays(
+    file: UploadFile = File(..., description="CSV 或 JSON 文件"),
+    replace: bool = Query(False, description="覆盖导入：删除涉及年份中文件里没有的记录"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    批量导入节假日与调休上班日（一个事务内完成）。
+    导入后，排期覆盖变化日期的人员会在后台分批重算排期。
+    """
+    content = await file.read()
+    if len(content) > MAX_IMPORT_FILE_SIZE:
+        raise ValidationError("导入文件不能超过 1MB")
+    items = HolidayService.parse_import_file(content, file.filename)
+    return HolidayService.import_holidays(db, items, replace=replace)
@@ -1,16 +1,26 @@
 """消息通知API端点"""
-from fastapi import APIRouter, Depends, Query, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_current_user_for_stream
 from app.models.user import User
 from app.schemas.message import MessageResponse, MessageListResponse, MessageUnreadCountResponse
-from app.services.message_service import MessageService
+from app.services.message_service import MessageService, message_pubsub, EVENT_UNREAD_COUNT
 from app.core.exceptions import NotFoundError
 
 router = APIRouter()
 
+# 推送连接心跳间隔（秒），防止代理因空闲断开连接
+_STREAM_HEARTBEAT_SECONDS = 15
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 @router.get("/", response_model=MessageListResponse)
 async def get_messages(
@@ -18,6 +28,7 @@ async def get_messages(
     is_read: Optional[bool] = Query(None, description="是否已读"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    before_id: Optional[int] = Query(None, description="游标：返回ID小于该值的消息（传入时忽略 page）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -29,7 +40,8 @@ async def get_messages(
         message_type=type,
         is_read=is_read,
         skip=skip,
-        limit=page_size
+        limit=page_size,
+        before_id=before_id,
     )
 
     items = [MessageResponse.model_validate(msg) for msg in messages]
@@ -47,6 +59,44 @@ async def get_unread_count(
     return MessageUnreadCountResponse(unread_count=count)
 
 
+@router.get("/stream")
+async def stream_messages(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_for_stream)
+):
+    """
+    消息推送（Server-Sent Events）。
+
+    连接建立后先推送一次当前未读数，之后推送：
+    - message.created：新消息（含最新未读数）
+    - unread_count：未读数变化（已读、全部已读、删除）
+    """
+    user_id = current_user.id
+    unread_count = MessageService.get_unread_count(db, user_id)
+    # 长连接期间不占用数据库连接
+    db.close()
+    subscription = message_pubsub.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            yield _sse_event(EVENT_UNREAD_COUNT, {"unread_count": unread_count})
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=_STREAM_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                else:
+                    yield _sse_event(event["event"], event["data"])
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{message_id}/read")
 async def mark_message_as_read(
     message_id: int,
@@ -1,5 +1,5 @@
 """项目API端点"""
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from collections import defaultdict
 from typing import Optional, List
@@ -17,6 +17,8 @@ from app.schemas.project import (
 )
 from app.services.project_service import ProjectService
 from app.core.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.utils.etag import conditional_response, latest, make_etag
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -98,10 +100,26 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取项目详情"""
+    """获取项目详情（支持 If-None-Match / If-Modified-Since 条件请求）"""
+    version = ProjectService.get_project_version(db, project_id)
+    if not version:
+        raise NotFoundError("项目不存在")
+
+    etag = make_etag(
+        "project", project_id, version.version, version.updated_at,
+        version.creator_username, version.creator_full_name,
+    )
+    not_modified = conditional_response(
+        request, response, etag, latest(version.updated_at, version.creator_updated_at)
+    )
+    if not_modified:
+        return not_modified
+
     project = ProjectService.get_project(db, project_id)
     if not project:
         raise NotFoundError("项目不存在")
@@ -196,7 +214,6 @@ async def get_project_tasks(
 ):
     """获取项目任务执行视图数据"""
     from app.models.task import Task, TaskStatus
-    from app.models.task_schedule import TaskSchedule
     from sqlalchemy.orm import joinedload
     from sqlalchemy import or_
     
@@ -214,7 +231,8 @@ async def get_project_tasks(
     query = db.query(Task).options(
         joinedload(Task.creator),
         joinedload(Task.assignee),
-        joinedload(Task.project)
+        joinedload(Task.project),
+        joinedload(Task.task_schedule),
     ).filter(Task.project_id == project_id)
     
     # 状态筛选
@@ -238,7 +256,8 @@ async def get_project_tasks(
     # 获取所有任务
     tasks = query.order_by(Task.created_at.desc()).all()
     
-    # 构建响应数据
+    # 构建响应数据（Decimal / 日期由 FastJSONResponse 直接序列化）
+    from app.services.schedule_service import ScheduleService
     tasks_data = []
     for task in tasks:
         task_data = {
@@ -250,25 +269,24 @@ async def get_project_tasks(
             "creator_name": task.creator.full_name or task.creator.username if task.creator else None,
             "assignee_id": task.assignee_id,
             "assignee_name": task.assignee.full_name or task.assignee.username if task.assignee else None,
-            "estimated_man_days": float(task.estimated_man_days) if task.estimated_man_days else 0,
-            "actual_man_days": float(task.actual_man_days) if task.actual_man_days else None,
+            "estimated_man_days": task.estimated_man_days or 0,
+            "actual_man_days": task.actual_man_days or None,
             "required_skills": task.required_skills,
-            "deadline": task.deadline.isoformat() if task.deadline else None,
+            "deadline": task.deadline,
             "is_pinned": task.is_pinned,
-            "created_at": task.created_at.isoformat() if task.created_at else None,
-            "updated_at": task.updated_at.isoformat() if task.updated_at else None,
+            "created_at": task.created_at,
+            "updated_at": task.updated_at,
         }
         
-        # 获取排期信息
-        from app.services.schedule_service import ScheduleService
-        schedule = db.query(TaskSchedule).filter(TaskSchedule.task_id == task.id).first()
+        # 排期信息（随任务一次性加载）
+        schedule = task.task_schedule
         if schedule:
             work_days = 0
             if schedule.start_date and schedule.end_date:
                 work_days = ScheduleService.get_workdays_count(schedule.start_date, schedule.end_date, db)
             task_data["schedule"] = {
-                "start_date": schedule.start_date.isoformat() if schedule.start_date else None,
-                "end_date": schedule.end_date.isoformat() if schedule.end_date else None,
+                "start_date": schedule.start_date,
+                "end_date": schedule.end_date,
                 "work_days": work_days,
                 "is_pinned": schedule.is_pinned,
             }
@@ -283,13 +301,13 @@ async def get_project_tasks(
             status_summary[status] = 0
         status_summary[status] += 1
     
-    return {
+    return FastJSONResponse({
         "project_id": project_id,
         "project_name": project.name,
         "tasks": tasks_data,
         "status_summary": status_summary,
         "total": len(tasks_data)
-    }
+    })
 
 
 @router.get("/{project_id}/progress", response_model=dict)
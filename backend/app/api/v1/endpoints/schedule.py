@@ -0,0 +1,120 @@
+"""排期API端点"""
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user
+from app.core.exceptions import PermissionDeniedError, ValidationError
+from app.core.permissions import get_current_project_manager
+from app.models.user import User
+from app.schemas.schedule import (
+    FreeSlotResponse,
+    ScheduleSimulationRequest,
+    ScheduleSimulationResponse,
+)
+from app.services.forecast_service import ForecastService
+from app.services.occupancy_service import OccupancyService
+from app.services.schedule_engine import MAX_CONCURRENT_TASKS
+from app.services.schedule_service import ScheduleService
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.post("/simulate", response_model=ScheduleSimulationResponse)
+async def simulate_schedule(
+    body: ScheduleSimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_project_manager),
+):
+    """
+    排期推演：预览认领、修改优先级、置顶、设置/取消并发等操作对排期的影响，不修改任何数据。
+    规则与实际操作一致（串行队列、P0 插队、并发上限 3 个），多个方案可在一次请求中对比。
+    """
+    started = time.perf_counter()
+    scenarios = ScheduleService.simulate(
+        db,
+        [
+            {
+                "name": scenario.name,
+                "changes": [change.model_dump(exclude_none=True, mode="python") for change in scenario.changes],
+            }
+            for scenario in body.scenarios
+        ],
+    )
+    return ScheduleSimulationResponse(
+        scenarios=scenarios,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@router.get("/forecast", response_model=dict)
+async def get_schedule_forecast(
+    project_id: Optional[int] = Query(None, description="只返回该项目的任务与相关开发人员"),
+    include_tasks: bool = Query(True, description="是否返回任务明细"),
+    refresh: bool = Query(False, description="忽略缓存立即重新计算"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_project_manager),
+):
+    """
+    完成时间预测：按当前排期队列、节假日与并发上限，预测未完成任务及项目的完成日期。
+    未认领任务按优先级分配给最早可开工的开发人员（is_projected 标记推测的认领人/排期）。
+    结果定期在后台刷新，generated_at 为计算时间。
+    """
+    forecast = ForecastService.get_forecast(db, refresh=refresh)
+    projects = forecast["projects"]
+    developers = forecast["developers"]
+    tasks = forecast["tasks"]
+    if project_id is not None:
+        projects = [p for p in projects if p["project_id"] == project_id]
+        tasks = [t for t in tasks if t["project_id"] == project_id]
+        involved = {t["assignee_id"] for t in tasks}
+        developers = [d for d in developers if d["user_id"] in involved]
+    return FastJSONResponse({
+        "generated_at": forecast["generated_at"],
+        "today": forecast["today"],
+        "elapsed_ms": forecast["elapsed_ms"],
+        "projects": projects,
+        "developers": developers,
+        "tasks": tasks if include_tasks else [],
+    })
+
+
+@router.get("/free-slots", response_model=FreeSlotResponse)
+async def get_free_slots(
+    user_id: Optional[int] = Query(None, description="人员ID，默认当前用户"),
+    start_date: Optional[date] = Query(None, description="开始日期，默认今天"),
+    end_date: Optional[date] = Query(None, description="结束日期，默认开始日期后 90 天"),
+    max_load: int = Query(0, ge=0, lt=MAX_CONCURRENT_TASKS, description="允许的已有并发任务数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    查询人员在时间范围内的空闲时段：占用数不超过 max_load 的连续日期区间。
+    max_load=0 为完全空闲；max_load=2 为还能再承接一个并发任务的时段。开发人员只能查询自己。
+    """
+    user_id = user_id or current_user.id
+    if user_id != current_user.id and current_user.role not in ["project_manager", "development_lead", "system_admin"]:
+        raise PermissionDeniedError("只能查询自己的空闲时段")
+    start_date = start_date or date.today()
+    end_date = end_date or start_date + timedelta(days=90)
+    if end_date < start_date:
+        raise ValidationError("结束日期不能早于开始日期")
+    if (end_date - start_date).days > 366:
+        raise ValidationError("查询范围不能超过一年")
+
+    slots = OccupancyService.get_index(db).free_slots(user_id, start_date, end_date, max_load)
+    calendar = ScheduleService._load_calendar(db, start_date)
+    return FreeSlotResponse(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        max_load=max_load,
+        slots=[
+            {"start_date": s, "end_date": e, "workdays": calendar.workdays_count(s, e)}
+            for s, e in slots
+        ],
+    )
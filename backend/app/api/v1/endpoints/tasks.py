@@ -1,5 +1,6 @@
 """任务管理API端点"""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
@@ -26,6 +27,7 @@ from app.schemas.task import (
     CollaboratorAdd,
     CollaboratorUpdate,
     CollaboratorResponse,
+    DeveloperMatchResponse,
     SetConcurrentRequest,
     ConcurrentCheckResponse,
     ExceededUser,
@@ -34,18 +36,65 @@ from app.schemas.task import (
     UserScheduleItem,
     ProjectScheduleResponse,
     ProjectScheduleItem,
+    TaskOverviewResponse,
+    TaskBulkRequest,
+    TaskBulkResponse,
 )
 from app.schemas.task_comment import TaskCommentCreate, TaskCommentUpdate, TaskCommentResponse, TaskCommentListResponse
 from app.services.task_service import TaskService
+from app.services.matching_service import MatchingService
 from app.services.task_collaborator_service import TaskCollaboratorService
 from app.services.schedule_service import ScheduleService
 from app.services.task_comment_service import TaskCommentService
-from app.models.task import TaskStatus
+from app.models.task import Task, TaskStatus
 from app.schemas.schedule import TaskScheduleResponse
+from app.utils.etag import conditional_response, latest, make_etag
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter()
 
 
+def _user_display_name(user: Optional[User]) -> Optional[str]:
+    return user.full_name or user.username if user else None
+
+
+# 任务集市返回字段 -> 取值方式
+_MARKETPLACE_FIELDS = {
+    "id": lambda task: task.id,
+    "title": lambda task: task.title,
+    "description": lambda task: task.description,
+    "description_excerpt": lambda task: task.description_excerpt,
+    "status": lambda task: task.status,
+    "project_id": lambda task: task.project_id,
+    "project_name": lambda task: task.project.name if task.project else None,
+    "creator_id": lambda task: task.creator_id,
+    "creator_name": lambda task: _user_display_name(task.creator),
+    "estimated_man_days": lambda task: task.estimated_man_days or 0,
+    "required_skills": lambda task: task.required_skills,
+    "deadline": lambda task: task.deadline,
+    "created_at": lambda task: task.created_at,
+    "priority": lambda task: task.priority or "P2",
+    "priority_multiplier": lambda task: task.priority_multiplier or 1.0,
+}
+
+_task_list_items_adapter = TypeAdapter(list[TaskListItemResponse])
+
+
+def _parse_fields(value: Optional[str], allowed) -> Optional[set[str]]:
+    """解析 fields 参数（逗号分隔的返回字段）；不传返回 None（全部字段），id 始终返回"""
+    if not value:
+        return None
+    fields = {"id"}
+    for raw in value.split(","):
+        item = raw.strip()
+        if not item:
+            continue
+        if item not in allowed:
+            raise HTTPException(status_code=422, detail=f"非法返回字段: {item}")
+        fields.add(item)
+    return fields
+
+
 @router.post("/", response_model=TaskResponse, status_code=201)
 async def create_task(
     task_data: TaskCreate,
@@ -57,6 +106,25 @@ async def create_task(
     return task
 
 
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def bulk_operate_tasks(
+    body: TaskBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_project_manager)
+):
+    """
+    批量任务操作：发布、退回草稿、派发、收回、归档、修改优先级。
+    按顺序在一个事务内执行，任一项失败整体回滚（错误信息指明第几项）；
+    提交后每个受影响人员只重算一次排期，每个受影响项目只重算一次产值，通知批量登记。
+    """
+    return TaskService.bulk_operate(
+        db,
+        [op.model_dump(mode="json") for op in body.operations],
+        current_user.id,
+        current_user.role
+    )
+
+
 @router.get("/", response_model=TaskListResponse)
 async def get_tasks(
     status: Optional[TaskStatus] = Query(None, description="任务状态"),
@@ -72,10 +140,14 @@ async def get_tasks(
     priority: Optional[str] = Query(None, description="优先级筛选：P0/P1/P2"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    fields: Optional[str] = Query(
+        None,
+        description="返回字段（逗号分隔），如 id,title,status,description_excerpt；不传返回全部字段",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取任务列表"""
+    """获取任务列表（指定 fields 时只查询并返回这些字段）"""
     def parse_csv_ints(value: Optional[str]) -> Optional[list[int]]:
         if not value:
             return None
@@ -119,12 +191,33 @@ async def get_tasks(
         page=page,
         page_size=page_size
     )
+    field_set = _parse_fields(fields, TaskListItemResponse.model_fields)
     tasks, total = TaskService.get_tasks(
         db,
         filters,
         current_user_id=current_user.id,
-        current_user_role=current_user.role
+        current_user_role=current_user.role,
+        fields=field_set,
     )
+
+    if field_set is not None:
+        # 稀疏响应：只读取已加载的字段，整体序列化（类型格式与完整响应一致）
+        columns = [name for name in field_set if name in Task.__table__.columns]
+        rows = []
+        for task in tasks:
+            values = {name: getattr(task, name) for name in columns}
+            if "creator_name" in field_set:
+                values["creator_name"] = _user_display_name(task.creator)
+            if "assignee_name" in field_set:
+                values["assignee_name"] = _user_display_name(task.assignee)
+            if "project_name" in field_set:
+                values["project_name"] = task.project.name if task.project else None
+            rows.append(TaskListItemResponse.model_construct(**values))
+        return FastJSONResponse({
+            "total": total,
+            "items": _task_list_items_adapter.dump_python(rows, mode="json", include={"__all__": field_set}),
+        })
+
     items = []
     for task in tasks:
         item = TaskListItemResponse.model_validate(task)
@@ -148,10 +241,14 @@ async def get_marketplace_tasks(
     recommend: bool = Query(False, description="是否推荐（基于当前用户技能）"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    fields: Optional[str] = Query(
+        None,
+        description="返回字段（逗号分隔），如 id,title,description_excerpt；不传返回全部字段",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取任务集市数据（仅显示已发布的任务）"""
+    """获取任务集市数据（仅显示已发布的任务；指定 fields 时只查询并返回这些字段）"""
     from app.models.task import TaskStatus
     from app.models.skill import Skill
     
@@ -166,15 +263,22 @@ async def get_marketplace_tasks(
         page_size=page_size
     )
     
+    field_set = _parse_fields(fields, _MARKETPLACE_FIELDS)
+    recommending = recommend and current_user.role == "developer"
+    load_fields = field_set
+    if load_fields is not None and recommending:
+        # 推荐排序需要所需技能
+        load_fields = load_fields | {"required_skills"}
     tasks, total = TaskService.get_tasks(
         db,
         filters,
         current_user_id=current_user.id,
-        current_user_role=current_user.role
+        current_user_role=current_user.role,
+        fields=load_fields,
     )
     
     # 如果启用推荐，基于用户技能进行排序
-    if recommend and current_user.role == "developer":
+    if recommending:
         # 获取用户技能
         user_skills = db.query(Skill).filter(Skill.user_id == current_user.id).all()
         user_skill_names = {skill.name.lower() for skill in user_skills}
@@ -195,33 +299,19 @@ async def get_marketplace_tasks(
         task_scores.sort(key=lambda x: x[1], reverse=True)
         tasks = [task for task, _ in task_scores]
     
-    # 构建响应数据
-    tasks_data = []
-    for task in tasks:
-        task_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-            "project_id": task.project_id,
-            "project_name": task.project.name if task.project else None,
-            "creator_id": task.creator_id,
-            "creator_name": task.creator.full_name or task.creator.username if task.creator else None,
-            "estimated_man_days": float(task.estimated_man_days) if task.estimated_man_days else 0,
-            "required_skills": task.required_skills,
-            "deadline": task.deadline.isoformat() if task.deadline else None,
-            "created_at": task.created_at.isoformat() if task.created_at else None,
-            "priority": task.priority if hasattr(task, "priority") else "P2",
-            "priority_multiplier": float(task.priority_multiplier) if hasattr(task, "priority_multiplier") and task.priority_multiplier else 1.0,
-        }
-        tasks_data.append(task_data)
-    
-    return {
+    # 构建响应数据（Decimal / 日期由 FastJSONResponse 直接序列化）
+    getters = [
+        (name, getter) for name, getter in _MARKETPLACE_FIELDS.items()
+        if field_set is None or name in field_set
+    ]
+    tasks_data = [{name: getter(task) for name, getter in getters} for task in tasks]
+
+    return FastJSONResponse({
         "tasks": tasks_data,
         "total": total,
         "page": page,
         "page_size": page_size,
-    }
+    })
 
 
 # ============================================================
@@ -256,47 +346,132 @@ async def recalculate_my_schedule(
     return {"success": True, "message": f"排期重算完成，共更新 {task_count} 个任务的排期"}
 
 
+def _check_task_visible(
+    current_user: User,
+    status: str,
+    assignee_id: Optional[int],
+    creator_id: int,
+    is_collaborator: bool,
+) -> None:
+    """任务详情查看权限：管理员/项目经理/组长可查看所有任务；普通开发人员只能查看自己相关的任务"""
+    # 兼容新字段 role_codes 和旧字段 role
+    user_role_codes = [r.code for r in current_user.roles] if current_user.roles else []
+    privileged_roles = {"project_manager", "development_lead", "system_admin"}
+    has_privileged_role = (
+        current_user.role in privileged_roles or
+        bool(set(user_role_codes) & privileged_roles)
+    )
+    if has_privileged_role:
+        return
+    # 普通开发人员：只能查看已发布任务、自己认领/创建的任务，以及自己作为协助人的任务
+    is_related = (
+        status == TaskStatus.PUBLISHED.value or
+        assignee_id == current_user.id or
+        creator_id == current_user.id or
+        is_collaborator
+    )
+    if not is_related:
+        raise HTTPException(status_code=403, detail="无权限查看此任务")
+
+
+def _build_task_detail(task: Task) -> TaskDetailResponse:
+    """任务详情响应（补充创建者/认领人/项目名称）"""
+    detail = TaskDetailResponse.model_validate(task)
+    if task.creator:
+        detail.creator_name = task.creator.full_name or task.creator.username
+    if task.assignee:
+        detail.assignee_name = task.assignee.full_name or task.assignee.username
+    if task.project:
+        detail.project_name = task.project.name
+    return detail
+
+
 @router.get("/{task_id}", response_model=TaskDetailResponse)
 async def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取任务详情"""
+    """获取任务详情（支持 If-None-Match / If-Modified-Since 条件请求）"""
+    version = TaskService.get_task_version(db, task_id, current_user.id)
+    if not version:
+        raise HTTPException(status_code=404, detail="任务不存在")
+
+    _check_task_visible(
+        current_user, version.status, version.assignee_id, version.creator_id, bool(version.is_collaborator)
+    )
+
+    # 响应内容只取决于任务本身与创建者/认领人/项目的名称
+    etag = make_etag(
+        "task", task_id, version.version, version.updated_at,
+        version.creator_username, version.creator_full_name,
+        version.assignee_username, version.assignee_full_name,
+        version.project_name,
+    )
+    last_modified = latest(
+        version.updated_at, version.creator_updated_at,
+        version.assignee_updated_at, version.project_updated_at,
+    )
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
     task = TaskService.get_task(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="任务不存在")
+    return _build_task_detail(task)
 
-    # 权限检查：管理员/项目经理/组长可查看所有任务；普通开发人员只能查看自己相关的任务
-    # 兼容新字段 role_codes 和旧字段 role
-    user_role_codes = [r.code for r in current_user.roles] if current_user.roles else []
-    privileged_roles = {"project_manager", "development_lead", "system_admin"}
-    has_privileged_role = (
-        current_user.role in privileged_roles or
-        bool(set(user_role_codes) & privileged_roles)
+
+@router.get("/{task_id}/overview", response_model=TaskOverviewResponse)
+async def get_task_overview(
+    task_id: int,
+    comment_page: int = Query(1, ge=1),
+    comment_page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    任务详情页聚合接口：一次返回任务详情、排期、配合人与一页留言，
+    替代分别请求 /tasks/{id}、/schedule、/collaborators、/comments，查询次数与留言数量无关。
+    """
+    task = TaskService.get_task_with_relations(db, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="任务不存在")
+
+    collaborator_ids = [c.user_id for c in task.collaborators]
+    _check_task_visible(
+        current_user, task.status, task.assignee_id, task.creator_id, current_user.id in collaborator_ids
     )
-    if not has_privileged_role:
-        # 普通开发人员：只能查看已发布任务、自己认领/创建的任务，以及自己作为协助人的任务
-        collaborator_ids = {c.user_id for c in task.collaborators} if task.collaborators else set()
-        is_related = (
-            task.status == TaskStatus.PUBLISHED.value or
-            task.assignee_id == current_user.id or
-            task.creator_id == current_user.id or
-            current_user.id in collaborator_ids
-        )
-        if not is_related:
-            raise HTTPException(status_code=403, detail="无权限查看此任务")
 
-    # 构建响应
-    response = TaskDetailResponse.model_validate(task)
-    if task.creator:
-        response.creator_name = task.creator.full_name or task.creator.username
-    if task.assignee:
-        response.assignee_name = task.assignee.full_name or task.assignee.username
-    if task.project:
-        response.project_name = task.project.name
+    schedule = None
+    if task.task_schedule:
+        schedule = TaskScheduleResponse(
+            id=task.task_schedule.id,
+            task_id=task.task_schedule.task_id,
+            start_date=task.task_schedule.start_date,
+            end_date=task.task_schedule.end_date,
+            is_pinned=task.task_schedule.is_pinned,
+            work_days=ScheduleService.get_workdays_count(
+                task.task_schedule.start_date, task.task_schedule.end_date, db
+            ),
+        )
 
-    return response
+    # 留言仅任务参与者可见（与 /tasks/{id}/comments 一致）
+    comments = None
+    if TaskCommentService.is_participant(task, current_user.id, collaborator_ids):
+        total, items = TaskCommentService.get_comment_page(db, task_id, comment_page, comment_page_size)
+        comments = TaskCommentListResponse(total=total, items=items)
+
+    return TaskOverviewResponse(
+        task=_build_task_detail(task),
+        schedule=schedule,
+        collaborators=[TaskCollaboratorService.to_response(c) for c in task.collaborators],
+        comments=comments,
+        comment_page=comment_page,
+        comment_page_size=comment_page_size,
+    )
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
@@ -396,6 +571,20 @@ async def assign_task(
     return task
 
 
+@router.get("/{task_id}/candidates", response_model=DeveloperMatchResponse)
+async def get_task_candidates(
+    task_id: int,
+    limit: int = Query(20, ge=1, le=100, description="返回人数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    为任务推荐开发人员：已发布任务推荐派发对象（项目经理），已认领/进行中任务推荐配合人（认领人或项目经理）。
+    按技能匹配度、最早可开工日期（满足并发上限）与序列等级综合排序。
+    """
+    return MatchingService.rank_developers(db, task_id, current_user.id, current_user.role, limit)
+
+
 @router.post("/{task_id}/evaluate", response_model=TaskResponse)
 async def evaluate_task(
     task_id: int,
@@ -2,13 +2,19 @@
 import os
 import uuid
 from pathlib import Path
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
 from typing import List
+from datetime import timedelta
 
-from app.api.deps import get_current_user
+from app.api.deps import get_db, get_current_user
+from app.core.permissions import get_current_admin
 from app.models.user import User
+from app.models.uploaded_file import UploadedFile
 from app.core.exceptions import ValidationError
+from app.services.upload_storage_service import UploadStorageService
+from app.services.thumbnail_service import ThumbnailService
 from app.utils.paths import get_uploads_images_dir, get_uploads_attachments_dir
 
 router = APIRouter()
@@ -59,15 +65,34 @@ FILE_EXT_TO_TYPE = {
 }
 
 
+def _image_upload_result(record: UploadedFile, deduplicated: bool) -> dict:
+    """构建图片上传响应（可解码的位图会在后台生成缩略图）"""
+    thumbnails = {}
+    if record.width and record.height:
+        ThumbnailService.schedule(record.content_hash, record.file_path)
+        thumbnails = ThumbnailService.variant_urls(record.content_hash)
+    return {
+        "url": UploadStorageService.url_for(record),
+        "filename": record.file_path.rsplit("/", 1)[-1],
+        "size": record.file_size,
+        "width": record.width,
+        "height": record.height,
+        "thumbnails": thumbnails,
+        "deduplicated": deduplicated,
+    }
+
+
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     上传图片
     
     权限：所有登录用户都可以上传
+    相同内容的图片只保存一份，重复上传直接返回已有URL
     """
     # 验证文件类型
     if file.content_type not in ALLOWED_IMAGE_TYPES:
@@ -80,31 +105,25 @@ async def upload_image(
     if len(file_content) > MAX_FILE_SIZE:
         raise ValidationError(f"文件大小不能超过 {MAX_FILE_SIZE / 1024 / 1024}MB")
     
-    # 生成唯一文件名
-    file_ext = Path(file.filename).suffix or '.jpg'
-    filename = f"{uuid.uuid4().hex}{file_ext}"
-    file_path = UPLOAD_DIR / filename
-    
-    # 保存文件
+    # 按内容哈希保存（已存在则直接复用）
     try:
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        record, created = UploadStorageService.save_image(
+            db,
+            content=file_content,
+            original_filename=file.filename,
+            content_type=file.content_type,
+            uploaded_by=current_user.id,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件保存失败: {str(e)}")
     
-    # 返回文件URL（相对路径，前端会自动拼接baseURL）
-    file_url = f"/uploads/images/{filename}"
-    
-    return {
-        "url": file_url,
-        "filename": filename,
-        "size": len(file_content),
-    }
+    return _image_upload_result(record, deduplicated=not created)
 
 
 @router.post("/images")
 async def upload_images(
     files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -128,22 +147,15 @@ async def upload_images(
                 errors.append(f"{file.filename}: 文件大小超过限制")
                 continue
             
-            # 生成唯一文件名
-            file_ext = Path(file.filename).suffix or '.jpg'
-            filename = f"{uuid.uuid4().hex}{file_ext}"
-            file_path = UPLOAD_DIR / filename
-            
-            # 保存文件
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-            
-            # 返回文件URL
-            file_url = f"/uploads/images/{filename}"
-            results.append({
-                "url": file_url,
-                "filename": filename,
-                "size": len(file_content),
-            })
+            # 按内容哈希保存（已存在则直接复用）
+            record, created = UploadStorageService.save_image(
+                db,
+                content=file_content,
+                original_filename=file.filename,
+                content_type=file.content_type,
+                uploaded_by=current_user.id,
+            )
+            results.append(_image_upload_result(record, deduplicated=not created))
         except Exception as e:
             errors.append(f"{file.filename}: {str(e)}")
     
@@ -156,6 +168,21 @@ async def upload_images(
     }
 
 
+@router.post("/gc")
+async def collect_upload_garbage(
+    grace_hours: int = Query(24, ge=1, le=24 * 365, description="保留期（小时），最近一次上传早于此时间且无引用的文件会被回收"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    回收无引用的上传图片
+    
+    权限：仅系统管理员
+    """
+    removed = UploadStorageService.collect_garbage(db, grace_period=timedelta(hours=grace_hours))
+    return {"removed": removed}
+
+
 @router.post("/attachment")
 async def upload_attachment(
     file: UploadFile = File(...),
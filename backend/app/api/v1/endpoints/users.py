@@ -243,7 +243,7 @@ async def create_user_endpoint(
     
     使用默认密码创建用户，用户首次登录后应修改密码
     """
-    user = create_user_by_admin(db, user_data, current_user)
+    user = await create_user_by_admin(db, user_data, current_user)
     return UserResponse.from_user(user)
 
 
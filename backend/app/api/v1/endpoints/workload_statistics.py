@@ -15,6 +15,7 @@ from app.schemas.workload_statistic import (
 from app.services.workload_statistic_service import WorkloadStatisticService
 from app.services.project_service import ProjectService
 from app.core.exceptions import PermissionDeniedError
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -250,30 +251,29 @@ async def get_workload_timeline(
                     # 计算该周的开始日期（周一）
                     week_start = current_date - timedelta(days=iso_weekday - 1)
                     workload_by_week[week_key] = {
-                        "period_start": week_start.isoformat(),
-                        "period_end": week_start.isoformat(),
+                        "period_start": week_start,
+                        "period_end": week_start,
                         "total_man_days": Decimal("0"),
-                        "tasks": []
+                        "tasks": [],
+                        "task_ids": set(),
                     }
                 
                 # 累加工作量
                 workload_by_week[week_key]["total_man_days"] += Decimal(str(daily_workload))
                 
                 # 更新周期结束日期
-                if current_date > date.fromisoformat(workload_by_week[week_key]["period_end"]):
-                    workload_by_week[week_key]["period_end"] = current_date.isoformat()
+                if current_date > workload_by_week[week_key]["period_end"]:
+                    workload_by_week[week_key]["period_end"] = current_date
                 
                 # 添加任务信息（避免重复）
-                task_info = {
-                    "id": task.id,
-                    "title": task.title,
-                    "status": task.status,
-                    "estimated_man_days": estimated_man_days
-                }
-                # 检查任务是否已存在
-                task_exists = any(t["id"] == task.id for t in workload_by_week[week_key]["tasks"])
-                if not task_exists:
-                    workload_by_week[week_key]["tasks"].append(task_info)
+                if task.id not in workload_by_week[week_key]["task_ids"]:
+                    workload_by_week[week_key]["task_ids"].add(task.id)
+                    workload_by_week[week_key]["tasks"].append({
+                        "id": task.id,
+                        "title": task.title,
+                        "status": task.status,
+                        "estimated_man_days": estimated_man_days
+                    })
             
             current_date += timedelta(days=1)
     
@@ -283,14 +283,14 @@ async def get_workload_timeline(
         items.append({
             "period_start": period_data["period_start"],
             "period_end": period_data["period_end"],
-            "total_man_days": float(period_data["total_man_days"]),
+            "total_man_days": period_data["total_man_days"],
             "tasks": period_data["tasks"]
         })
     
-    return {
+    return FastJSONResponse({
         "total": len(items),
         "items": items
-    }
+    })
 
 
 @router.get("/trend", response_model=dict)
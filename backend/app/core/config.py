@@ -70,10 +70,47 @@ class Settings(BaseSettings):
     LOGIN_MAX_FAILED_ATTEMPTS: int = 5
     LOGIN_LOCK_MINUTES: int = 30
     LOGIN_FAILURE_WINDOW_MINUTES: int = 15
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # 登录失败计数存储：memory（进程内）/ redis（使用 REDIS_URL）
+    LOGIN_THROTTLE_REDIS_TIMEOUT_SECONDS: float = 0.5  # Redis 计数读写超时，超时/出错时临时改用进程内计数
+    PASSWORD_HASH_WORKERS: int = 4  # bcrypt 计算线程数（不在事件循环中执行）
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 排队+执行中的密码校验上限，超出直接返回 503
     
     # 用户默认密码（管理员创建用户时使用）
     DEFAULT_USER_PASSWORD: str = "12345678"
     
+    # 上传文件配置
+    THUMBNAIL_WORKERS: int = 2  # 缩略图生成线程数
+    UPLOADS_CACHE_MAX_AGE: int = 365 * 24 * 3600  # 内容寻址文件的浏览器缓存时长（秒）
+    
+    # 后台任务配置
+    JOB_WORKERS: int = 2  # 后台任务（导出等）执行线程数
+    JOB_RESULT_TTL_MINUTES: int = 30  # 结果文件有效期，有效期内相同参数直接复用
+    JOB_HEARTBEAT_SECONDS: float = 30.0  # 执行进程为排队/执行中任务刷新心跳的间隔（秒）
+    JOB_STALE_SECONDS: float = 120.0  # 心跳超过该时长未刷新的任务视为所属进程已退出，标记为失败
+    
+    # 知识分享配置
+    ARTICLE_VIEW_FLUSH_SECONDS: float = 10.0  # 浏览次数写回间隔（秒）
+    
+    # 消息通知配置
+    NOTIFICATION_COALESCE_SECONDS: float = 2.0  # 同一任务同一状态变更的通知合并窗口（秒）
+    
+    # 领域事件（发件箱）配置
+    OUTBOX_POLL_SECONDS: float = 5.0  # 后台线程轮询待处理事件的间隔（秒），本进程提交的事件会立即唤醒
+    OUTBOX_BATCH_SIZE: int = 100  # 每次读取的待处理事件数
+    OUTBOX_LEASE_SECONDS: float = 300.0  # 事件被取走后的租约（秒），处理进程异常退出时到期后重新投递
+    OUTBOX_MAX_ATTEMPTS: int = 10  # 处理失败的最大重试次数，超过后标记为 failed
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0  # 失败重试间隔（按次数指数退避，最长 1 小时）
+    
+    # 排期预测配置
+    FORECAST_REFRESH_SECONDS: float = 300.0  # 完成时间预测缓存的刷新间隔（秒）
+    HOLIDAY_RECOMPUTE_BATCH_SIZE: int = 20  # 节假日导入后每批重算排期的人数
+    HOLIDAY_RECOMPUTE_PAUSE_SECONDS: float = 1.0  # 两批重算之间的间隔（秒）
+    OCCUPANCY_INDEX_MAX_AGE_SECONDS: float = 60.0  # 人员排期占用索引全量重建间隔（秒），多进程部署时其他进程的写入最迟在此后可见
+    
+    # 响应压缩配置（gzip；安装 brotli 包后优先使用 br）
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024  # 小于该字节数的响应不压缩
+    
     # Redis配置（可选）
     REDIS_URL: Optional[str] = None
     
@@ -48,3 +48,23 @@ class ValidationError(AppException):
             code="VALIDATION_ERROR",
             status_code=status.HTTP_400_BAD_REQUEST
         )
+
+
+class ServiceBusyError(AppException):
+    """服务繁忙异常（并发处理能力已满，客户端应稍后重试）"""
+    def __init__(self, message: str = "服务繁忙，请稍后再试"):
+        super().__init__(
+            message=message,
+            code="SERVICE_BUSY",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class ConflictError(AppException):
+    """并发冲突异常（数据已被他人修改，客户端应刷新后重试）"""
+    def __init__(self, message: str = "数据已被修改，请刷新后重试"):
+        super().__init__(
+            message=message,
+            code="CONFLICT",
+            status_code=status.HTTP_409_CONFLICT
+        )
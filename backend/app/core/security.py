@@ -1,10 +1,24 @@
 """安全相关工具函数"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from jose import JWTError, jwt
 import bcrypt
 
 from app.core.config import settings
+from app.core.exceptions import ServiceBusyError
+
+T = TypeVar("T")
+
+# bcrypt 单次计算约 100-250ms，且计算期间释放 GIL：放到独立线程池执行，不阻塞事件循环
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+    thread_name_prefix="password-hash",
+)
+# 排队 + 执行中的计算数上限：登录洪峰时直接拒绝，避免请求无限排队
+_password_slots = threading.BoundedSemaphore(max(1, settings.PASSWORD_HASH_MAX_PENDING))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -25,6 +39,35 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+async def _run_password_task(func: Callable[..., T], *args) -> T:
+    """在密码哈希线程池中执行，超出并发上限时抛出 ServiceBusyError"""
+    if not _password_slots.acquire(blocking=False):
+        raise ServiceBusyError("登录请求过多，请稍后再试")
+    try:
+        future = _password_executor.submit(func, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # 在计算真正结束时释放名额（请求被取消时线程中的计算仍会继续执行）
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（异步，在线程池中执行）"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """生成密码哈希（异步，在线程池中执行）"""
+    return await _run_password_task(get_password_hash, password)
+
+
+def shutdown_password_hashing() -> None:
+    """关闭密码哈希线程池（应用退出时调用）"""
+    _password_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌"""
     to_encode = data.copy()
@@ -3,7 +3,6 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from jose import JWTError
 import logging
@@ -11,9 +10,20 @@ import json
 
 from app.core.config import settings
 from app.core.exceptions import AppException
+from app.core.security import shutdown_password_hashing
 from app.api.v1.router import api_router
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.encoding import EncodingMiddleware
+from app.db.session import SessionLocal
+from app.services.article_service import view_count_buffer
+from app.services.forecast_service import ForecastService
+from app.services.holiday_service import HolidayService
+from app.services.job_service import JobService
+from app.services.notification_service import NotificationService
+from app.services.outbox_service import OutboxService
+from app.services.thumbnail_service import ThumbnailService
 from app.utils.paths import get_uploads_dir, get_uploads_images_dir
+from app.utils.static_files import UploadsStaticFiles
 
 # 配置日志
 logging.basicConfig(
@@ -32,6 +42,10 @@ app = FastAPI(
 # 编码中间件（确保UTF-8编码）
 app.add_middleware(EncodingMiddleware)
 
+# 响应压缩（较大的 JSON/文本响应）
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE)
+
 # CORS配置：放通所有 IP/域名访问
 # 使用正则匹配任意 http/https 来源，以支持 allow_credentials=True
 app.add_middleware(
@@ -97,7 +111,7 @@ uploads_images_dir = get_uploads_images_dir()
 
 # 挂载静态文件服务
 try:
-    app.mount("/uploads", StaticFiles(directory=str(uploads_base_dir)), name="uploads")
+    app.mount("/uploads", UploadsStaticFiles(directory=str(uploads_base_dir)), name="uploads")
     logger.info(f"静态文件服务已挂载: {uploads_base_dir}")
 except Exception as e:
     logger.warning(f"静态文件服务挂载失败: {e}")
@@ -106,6 +120,39 @@ except Exception as e:
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.on_event("startup")
+def recover_background_jobs():
+    """应用启动时将已中断的后台任务（所属进程已退出或心跳过期）标记为失败，不影响其他工作进程正在执行的任务"""
+    db = SessionLocal()
+    try:
+        interrupted = JobService.fail_interrupted(db)
+        if interrupted:
+            logger.info(f"已标记 {interrupted} 个中断的后台任务")
+    except Exception as e:
+        logger.warning(f"恢复后台任务状态失败: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    """启动领域事件投递线程（继续处理上次退出时未完成的事件）"""
+    OutboxService.start()
+
+
+@app.on_event("shutdown")
+def shutdown_background_workers():
+    """应用退出时关闭后台线程池"""
+    ThumbnailService.shutdown()
+    JobService.shutdown()
+    NotificationService.shutdown()
+    OutboxService.shutdown()
+    ForecastService.shutdown()
+    HolidayService.shutdown()
+    view_count_buffer.shutdown()
+    shutdown_password_hashing()
+
+
 @app.get("/")
 async def root():
     """根路径"""
@@ -0,0 +1,159 @@
+"""响应压缩中间件
+
+对较大的 JSON/文本响应（任务列表、工作台统计等）按 Accept-Encoding 压缩：
+- 已安装 brotli 包且客户端支持时使用 br，否则使用 gzip
+- 只压缩白名单内的文本类型；导出文件（xlsx 本身已压缩）、图片、SSE 事件流原样透传
+- 流式响应逐块压缩并立即发送，不缓冲整个响应体
+"""
+import zlib
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # 可选依赖
+except ImportError:  # pragma: no cover - 未安装时只使用 gzip
+    brotli = None
+
+# 可压缩的响应类型
+COMPRESSIBLE_CONTENT_TYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "text/csv",
+})
+
+# 单块超过该大小时在线程中压缩，避免阻塞事件循环
+_THREAD_MINIMUM_SIZE = 256 * 1024
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """解析 Accept-Encoding，返回客户端接受的编码（忽略 q=0）"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if name and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name)
+    return accepted
+
+
+class _Compressor:
+    """单个响应的压缩流"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._brotli.process(body)
+            return data + (self._brotli.flush() if more_body else self._brotli.finish())
+        data = self._gzip.compress(body)
+        return data + self._gzip.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 压缩较大的文本响应（纯 ASGI 实现）"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _negotiate(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._negotiate(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+        compressor: Optional[_Compressor] = None
+
+        async def compress(body: bytes, more_body: bool) -> bytes:
+            if len(body) >= _THREAD_MINIMUM_SIZE:
+                return await anyio.to_thread.run_sync(compressor.compress, body, more_body)
+            return compressor.compress(body, more_body)
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough, compressor
+            message_type = message["type"]
+
+            if message_type == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or media_type not in COMPRESSIBLE_CONTENT_TYPES
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # 等第一块响应体确定是否压缩后再发送响应头
+                    start_message = message
+                return
+
+            if passthrough or message_type != "http.response.body":
+                if start_message is not None:
+                    # 如 http.response.pathsend：不压缩，先补发响应头
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = MutableHeaders(scope=start_message)
+                if compressor is None and not more_body and len(body) < self.minimum_size:
+                    # 小响应不压缩
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = await compress(body, more_body)
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    headers["content-length"] = str(len(body))
+                await send(start_message)
+                start_message = None
+            else:
+                body = await compress(body, more_body)
+
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,19 +1,29 @@
 """编码中间件"""
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class EncodingMiddleware(BaseHTTPMiddleware):
-    """确保所有响应使用UTF-8编码"""
-    
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # 确保JSON响应使用UTF-8编码
-        if isinstance(response, Response):
-            content_type = response.headers.get("content-type", "")
-            if "application/json" in content_type and "charset" not in content_type:
-                response.headers["content-type"] = "application/json; charset=utf-8"
-        
-        return response
+class EncodingMiddleware:
+    """
+    确保 JSON 响应声明 UTF-8 编码。
+    纯 ASGI 实现：只在 http.response.start 消息中修改响应头，不缓冲响应体，
+    流式响应（导出文件、SSE）原样透传。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_charset(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                content_type = headers.get("content-type", "")
+                if "application/json" in content_type and "charset" not in content_type:
+                    headers["content-type"] = "application/json; charset=utf-8"
+            await send(message)
+
+        await self.app(scope, receive, send_with_charset)
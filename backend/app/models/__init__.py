@@ -14,10 +14,14 @@ from app.models.project_output_value import ProjectOutputValue
 from app.models.workload_statistic import WorkloadStatistic
 from app.models.article import Article
 from app.models.article_attachment import ArticleAttachment
-from app.models.message import Message, MessageType
+from app.models.article_tag import ArticleTag, ArticleTermCount
+from app.models.message import Message, MessageType, MessageCounter
 from app.models.task_collaborator import TaskCollaborator
 from app.models.task_comment import TaskComment
 from app.models.announcement import Announcement, AnnouncementPriority
+from app.models.uploaded_file import UploadedFile, UploadReference
+from app.models.job import Job, JobStatus
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus
 
 __all__ = [
     "Base",
@@ -39,10 +43,19 @@ __all__ = [
     "WorkloadStatistic",
     "Article",
     "ArticleAttachment",
+    "ArticleTag",
+    "ArticleTermCount",
     "Message",
     "MessageType",
+    "MessageCounter",
     "TaskCollaborator",
     "TaskComment",
     "Announcement",
     "AnnouncementPriority",
+    "UploadedFile",
+    "UploadReference",
+    "Job",
+    "JobStatus",
+    "OutboxEvent",
+    "OutboxEventStatus",
 ]
\ No newline at end of file
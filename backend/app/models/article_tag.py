@@ -0,0 +1,42 @@
+"""文章标签及分类/标签计数模型"""
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.models.base import Base
+
+
+class ArticleTag(Base):
+    """文章标签模型（articles.tags 拆分后的规范化存储）"""
+    __tablename__ = "article_tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False, index=True)
+    tag = Column(String(50), nullable=False, index=True)  # 标签名
+
+    # 同一文章同一标签只记录一次
+    __table_args__ = (
+        UniqueConstraint("article_id", "tag", name="uq_article_tag"),
+    )
+
+    # 关系
+    article = relationship("Article", back_populates="tag_items")
+
+    def __repr__(self):
+        return f"<ArticleTag(article_id={self.article_id}, tag={self.tag})>"
+
+
+class ArticleTermCount(Base):
+    """已发布文章的分类/标签计数（随文章增删改增量维护）"""
+    __tablename__ = "article_term_counts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    term_type = Column(String(20), nullable=False)  # 计数类型：tag / category
+    name = Column(String(50), nullable=False)  # 标签名或分类名
+    count = Column(Integer, nullable=False, default=0)  # 已发布文章数
+
+    __table_args__ = (
+        UniqueConstraint("term_type", "name", name="uq_article_term_count"),
+    )
+
+    def __repr__(self):
+        return f"<ArticleTermCount(term_type={self.term_type}, name={self.name}, count={self.count})>"
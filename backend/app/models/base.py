@@ -1,7 +1,28 @@
 """基础模型"""
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import Column, Integer, event
+from sqlalchemy.orm import DeclarativeBase, object_session
 
 
 class Base(DeclarativeBase):
     """SQLAlchemy 2.0 基础模型类"""
     pass
+
+
+class VersionedMixin:
+    """
+    带版本号的模型：每次通过 ORM 更新列值时 version 自增（UPDATE ... SET version = version + 1）。
+    用于生成 ETag 等缓存校验值；只修改关联表（不改本表列）时需调用 bump_version。
+    """
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+def bump_version(instance) -> None:
+    """在下次 flush 时将版本号加一"""
+    instance.version = type(instance).version + 1
+
+
+@event.listens_for(VersionedMixin, "before_update", propagate=True)
+def _bump_version_on_update(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        bump_version(target)
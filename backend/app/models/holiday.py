@@ -1,19 +1,25 @@
 """节假日模型"""
 from sqlalchemy import Column, Integer, Date, String, Boolean, TIMESTAMP
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, false
 
 from app.models.base import Base
 
 
 class Holiday(Base):
-    """节假日模型"""
+    """节假日模型
+
+    一条记录表示一个非常规日期：
+    - is_workday=False：节假日（放假），即使是周一至周五也不排期
+    - is_workday=True：调休上班日（周末补班），即使是周六、周日也按工作日排期
+    """
     __tablename__ = "holidays"
 
     id = Column(Integer, primary_key=True, index=True)
     date = Column(Date, unique=True, nullable=False, index=True)
     description = Column(String(200))  # 节假日描述，如：春节、国庆节
-    is_weekend = Column(Boolean, nullable=False, default=False)  # 是否为周末
+    is_weekend = Column(Boolean, nullable=False, default=False)  # 是否为周末（按日期自动填写）
+    is_workday = Column(Boolean, nullable=False, default=False, server_default=false())  # 是否为调休上班日
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
     def __repr__(self):
-        return f"<Holiday(id={self.id}, date={self.date}, description={self.description})>"
+        return f"<Holiday(id={self.id}, date={self.date}, description={self.description}, is_workday={self.is_workday})>"
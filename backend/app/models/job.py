@@ -0,0 +1,48 @@
+"""后台任务（异步作业）模型"""
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.models.base import Base
+
+
+class JobStatus(str, enum.Enum):
+    """后台任务状态枚举"""
+    PENDING = "pending"      # 排队中
+    RUNNING = "running"      # 执行中
+    SUCCEEDED = "succeeded"  # 已完成
+    FAILED = "failed"        # 失败
+
+
+class Job(Base):
+    """后台任务模型
+
+    记录导出等耗时操作的执行状态与进度，结果文件在有效期内可重复下载，
+    相同参数的请求在有效期内直接复用已有结果。
+    排队/执行中的任务由所属进程（owner）定期刷新心跳，多进程部署时据此判断任务是否已中断。
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)  # 任务类型，如 export_tasks
+    params = Column(Text, nullable=False)  # 任务参数（JSON）
+    params_hash = Column(String(64), nullable=False)  # 任务类型 + 参数的哈希，用于复用结果
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING.value, index=True)
+    progress = Column(Integer, nullable=False, default=0)  # 进度（0-100）
+    result_path = Column(String(500))  # 结果文件路径（相对 job 结果目录）
+    result_filename = Column(String(255))  # 下载文件名
+    error_message = Column(Text)  # 失败原因
+    owner = Column(String(100))  # 执行进程（主机名:进程号）
+    heartbeat_at = Column(TIMESTAMP)  # 执行进程最近一次心跳时间
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+    expires_at = Column(TIMESTAMP)  # 结果过期时间
+
+    __table_args__ = (
+        Index("ix_jobs_params_hash_status", "params_hash", "status"),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, job_type={self.job_type}, status={self.status}, progress={self.progress})>"
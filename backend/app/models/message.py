@@ -1,5 +1,5 @@
 """消息通知模型"""
-from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -27,9 +27,27 @@ class Message(Base):
     related_task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"))
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), index=True)
 
+    # 消息列表：按用户 + 已读状态筛选，按创建时间倒序分页
+    __table_args__ = (
+        Index("ix_messages_user_read_created", "user_id", "is_read", "created_at"),
+    )
+
     # 关系
     user = relationship("User", back_populates="messages")
     related_task = relationship("Task", back_populates="related_messages")
 
     def __repr__(self):
         return f"<Message(id={self.id}, user_id={self.user_id}, title={self.title}, is_read={self.is_read})>"
+
+
+class MessageCounter(Base):
+    """用户消息计数（随消息增删、已读状态变化增量维护，避免每次 COUNT）"""
+    __tablename__ = "message_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)  # 未读消息数
+    total_count = Column(Integer, nullable=False, default=0)  # 消息总数
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<MessageCounter(user_id={self.user_id}, unread_count={self.unread_count}, total_count={self.total_count})>"
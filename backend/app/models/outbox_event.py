@@ -0,0 +1,45 @@
+"""领域事件发件箱模型"""
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.models.base import Base
+
+
+class OutboxEventStatus(str, enum.Enum):
+    """事件处理状态枚举"""
+    PENDING = "pending"  # 待处理（含失败后等待重试）
+    DONE = "done"        # 全部处理器已完成
+    FAILED = "failed"    # 超过最大重试次数，需人工处理（同一聚合的后续事件暂停投递）
+
+
+class OutboxEvent(Base):
+    """领域事件发件箱
+
+    任务状态变更时与业务数据在同一事务内写入一条事件，提交后由后台线程投递给各处理器
+    （排期重建、工作量统计、项目产值等）。事务回滚时事件一并消失，进程退出时未处理的
+    事件留在表中，重启后继续投递（至少一次）。completed_handlers 记录已完成的处理器，
+    重试时跳过。
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)  # 事件类型，如 task.confirmed
+    aggregate_id = Column(Integer, nullable=False)  # 聚合ID（任务ID），同一聚合的事件按顺序处理
+    payload = Column(Text, nullable=False)  # 事件数据（JSON）
+    status = Column(String(20), nullable=False, default=OutboxEventStatus.PENDING.value)
+    completed_handlers = Column(Text)  # 已完成的处理器名（JSON 数组）
+    attempts = Column(Integer, nullable=False, default=0)  # 失败次数
+    last_error = Column(Text)  # 最近一次失败原因
+    available_at = Column(TIMESTAMP, nullable=False, server_default=func.now())  # 失败后下次重试时间
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    processed_at = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index("ix_outbox_events_status_id", "status", "id"),
+        # 投递时按聚合查找更早的未完成事件
+        Index("ix_outbox_events_aggregate_status_id", "aggregate_id", "status", "id"),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type={self.event_type}, aggregate_id={self.aggregate_id}, status={self.status})>"
@@ -4,10 +4,10 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from decimal import Decimal
 
-from app.models.base import Base
+from app.models.base import Base, VersionedMixin
 
 
-class Project(Base):
+class Project(VersionedMixin, Base):
     """项目模型"""
     __tablename__ = "projects"
 
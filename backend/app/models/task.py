@@ -1,11 +1,11 @@
 """任务模型"""
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, Date, TIMESTAMP, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, Date, TIMESTAMP, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from decimal import Decimal
 import enum
 
-from app.models.base import Base
+from app.models.base import Base, VersionedMixin
 
 
 class TaskStatus(str, enum.Enum):
@@ -42,13 +42,14 @@ PRIORITY_ORDER = {
 }
 
 
-class Task(Base):
+class Task(VersionedMixin, Base):
     """任务模型"""
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text)
+    description_excerpt = Column(String(200))  # 描述纯文本摘要（列表预览用，随描述更新）
     status = Column(
         String(20),
         nullable=False,
@@ -70,6 +71,13 @@ class Task(Base):
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # 组合索引：按认领人/项目统计各状态任务数，按状态筛选并按创建时间倒序分页
+    __table_args__ = (
+        Index("ix_tasks_assignee_status", "assignee_id", "status"),
+        Index("ix_tasks_project_status", "project_id", "status"),
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+    )
+
     # 关系
     project = relationship("Project", back_populates="tasks")
     creator = relationship("User", foreign_keys=[creator_id], back_populates="created_tasks")
@@ -1,5 +1,5 @@
 """任务配合人模型"""
-from sqlalchemy import Column, Integer, Numeric, Date, TIMESTAMP, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Numeric, Date, TIMESTAMP, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from decimal import Decimal
@@ -30,6 +30,8 @@ class TaskCollaborator(Base):
     # 同一任务中同一用户只能作为一次配合人
     __table_args__ = (
         UniqueConstraint("task_id", "user_id", name="uq_task_collaborator"),
+        # 按用户查询与日期区间重叠的配合排期
+        Index("ix_task_collaborators_user_schedule", "user_id", "scheduled_start", "scheduled_end"),
     )
 
     # 关系
@@ -0,0 +1,61 @@
+"""上传文件（内容寻址存储）模型"""
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class UploadedFile(Base):
+    """上传文件模型
+
+    按内容 SHA-256 哈希存储，相同内容只保存一份。
+    上传时记录图片尺寸等元数据，导出时无需再次解码原图。
+    """
+    __tablename__ = "uploaded_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)  # 内容 SHA-256（十六进制）
+    file_path = Column(String(500), nullable=False)  # 相对 uploads 目录的存储路径，如 images/<hash>.png
+    file_size = Column(Integer, nullable=False)  # 文件大小（字节）
+    mime_type = Column(String(100), nullable=False)  # MIME类型
+    image_format = Column(String(20))  # 图片格式（PNG/JPEG/...），非位图为空
+    width = Column(Integer)  # 图片宽度（像素）
+    height = Column(Integer)  # 图片高度（像素）
+    uploaded_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)  # 首次上传人
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    # 最近一次上传时间（重复上传同一内容时刷新），无引用文件的保留期从此时起算
+    last_uploaded_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    # 关系
+    references = relationship("UploadReference", back_populates="file", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<UploadedFile(id={self.id}, content_hash={self.content_hash}, file_path={self.file_path})>"
+
+
+class UploadReference(Base):
+    """上传文件引用索引
+
+    记录哪些业务对象（任务描述、文章正文）引用了某个文件，
+    无任何引用的文件可被垃圾回收。
+    """
+    __tablename__ = "upload_references"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False, index=True)
+    ref_type = Column(String(20), nullable=False)  # 引用方类型：task / article
+    ref_id = Column(Integer, nullable=False)  # 引用方ID
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+
+    # 同一对象对同一文件只记录一次引用
+    __table_args__ = (
+        UniqueConstraint("file_id", "ref_type", "ref_id", name="uq_upload_reference"),
+        Index("ix_upload_references_ref", "ref_type", "ref_id"),
+    )
+
+    # 关系
+    file = relationship("UploadedFile", back_populates="references")
+
+    def __repr__(self):
+        return f"<UploadReference(file_id={self.file_id}, ref_type={self.ref_type}, ref_id={self.ref_id})>"
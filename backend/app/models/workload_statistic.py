@@ -1,5 +1,5 @@
 """工作量统计模型"""
-from sqlalchemy import Column, Integer, Numeric, Date, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, Numeric, Date, TIMESTAMP, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from decimal import Decimal
@@ -20,6 +20,13 @@ class WorkloadStatistic(Base):
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # 同一用户、项目、统计周期只有一条记录（批量累加时按该约束 upsert）
+    __table_args__ = (
+        UniqueConstraint("user_id", "project_id", "period_start", "period_end", name="uq_workload_statistic_period"),
+        # 按用户查询统计周期区间（不限定项目）
+        Index("ix_workload_statistics_user_period", "user_id", "period_start"),
+    )
+
     # 关系
     user = relationship("User", back_populates="workload_statistics")
     project = relationship("Project", back_populates="workload_statistics")
@@ -0,0 +1,52 @@
+"""节假日相关模式"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+
+
+class HolidayResponse(BaseModel):
+    """节假日响应"""
+    id: int
+    date: date
+    description: Optional[str] = None
+    is_weekend: bool
+    is_workday: bool = Field(..., description="是否为调休上班日")
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class HolidayImportItem(BaseModel):
+    """导入的一条节假日 / 调休上班日"""
+    date: date
+    description: Optional[str] = Field(None, max_length=200)
+    is_workday: bool = False
+
+
+class HolidayImportResponse(BaseModel):
+    """节假日导入结果"""
+    total: int = Field(..., description="文件中的记录数")
+    created: int
+    updated: int
+    deleted: int = Field(..., description="覆盖模式下删除的记录数")
+    unchanged: int
+    changed_dates: List[date] = Field(..., description="工作日/非工作日发生变化的日期")
+    affected_users: int = Field(..., description="排期覆盖变化日期、已安排后台重算的人数")
+
+
+class HolidayCalendarMonth(BaseModel):
+    """年度日历中的一个月"""
+    month: int
+    workdays: int
+    holidays: List[date]
+    make_up_workdays: List[date]
+
+
+class HolidayCalendarResponse(BaseModel):
+    """年度工作日历"""
+    year: int
+    workdays: int
+    holidays: int
+    make_up_workdays: int
+    months: List[HolidayCalendarMonth]
@@ -0,0 +1,21 @@
+"""后台任务相关模式"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    """后台任务响应（轮询状态与进度）"""
+    id: int
+    job_type: str
+    status: str
+    progress: int
+    result_filename: Optional[str]
+    error_message: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    expires_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,10 @@
 """排期相关模式"""
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
+from decimal import Decimal
+from typing import List, Literal, Optional
+
+from app.models.task import TaskPriority
 
 
 class TaskScheduleResponse(BaseModel):
@@ -14,3 +18,101 @@ class TaskScheduleResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ---- 空闲时段 ----
+
+class FreeSlot(BaseModel):
+    """空闲时段（自然日区间）"""
+    start_date: date
+    end_date: date
+    workdays: int  # 其中的工作日数量
+
+
+class FreeSlotResponse(BaseModel):
+    """人员空闲时段响应"""
+    user_id: int
+    start_date: date
+    end_date: date
+    max_load: int = Field(..., description="时段内允许的已有并发任务数（0 为完全空闲）")
+    slots: List[FreeSlot]
+
+
+# ---- 排期推演 ----
+
+ScheduleChangeOp = Literal[
+    "claim",             # 认领/派发（需 assignee_id）
+    "start",             # 开始
+    "submit",            # 提交（后续任务前移）
+    "set_priority",      # 修改优先级（需 priority）
+    "set_estimate",      # 修改拟投入人天（需 estimated_man_days）
+    "pin",               # 置顶/取消置顶（is_pinned，默认置顶）
+    "set_concurrent",    # 设为并发（需 concurrent_with）
+    "unset_concurrent",  # 取消并发
+]
+
+
+class ScheduleChange(BaseModel):
+    """假设的排期变更"""
+    op: ScheduleChangeOp
+    task_id: int
+    assignee_id: Optional[int] = None
+    priority: Optional[TaskPriority] = None
+    estimated_man_days: Optional[Decimal] = Field(None, gt=0)
+    is_pinned: Optional[bool] = None
+    concurrent_with: Optional[int] = None
+
+
+class ScheduleScenario(BaseModel):
+    """推演方案：按顺序累积执行的一组变更"""
+    name: Optional[str] = Field(None, max_length=100)
+    changes: List[ScheduleChange] = Field(..., min_length=1, max_length=200)
+
+
+class ScheduleSimulationRequest(BaseModel):
+    """排期推演请求（各方案互相独立，均基于当前排期）"""
+    scenarios: List[ScheduleScenario] = Field(..., min_length=1, max_length=20)
+
+
+class SimulationExceededUser(BaseModel):
+    """并发数超限人员"""
+    user_id: int
+    name: Optional[str] = None
+    current_concurrent: int
+    limit: int
+
+
+class SimulationChangeResult(BaseModel):
+    """单项变更的执行结果"""
+    index: int
+    op: str
+    task_id: int
+    applied: bool
+    error: Optional[str] = None
+    exceeded_users: List[SimulationExceededUser] = Field(default_factory=list)
+
+
+class SimulatedScheduleChange(BaseModel):
+    """推演后发生变化的排期（新增时 old_* 为空，移除时 new_* 为空）"""
+    task_id: int
+    task_title: str
+    user_id: int
+    role: str  # assignee / collaborator
+    old_start: Optional[date] = None
+    old_end: Optional[date] = None
+    new_start: Optional[date] = None
+    new_end: Optional[date] = None
+    is_concurrent: bool
+
+
+class ScheduleScenarioResult(BaseModel):
+    """单个方案的推演结果"""
+    name: Optional[str] = None
+    results: List[SimulationChangeResult]
+    schedule_changes: List[SimulatedScheduleChange]
+
+
+class ScheduleSimulationResponse(BaseModel):
+    """排期推演响应"""
+    scenarios: List[ScheduleScenarioResult]
+    elapsed_ms: float
@@ -1,9 +1,11 @@
 """任务相关模式"""
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import date, datetime
 from decimal import Decimal
 from app.models.task import TaskStatus, TaskPriority
+from app.schemas.schedule import TaskScheduleResponse
+from app.schemas.task_comment import TaskCommentListResponse
 
 
 class TaskBase(BaseModel):
@@ -129,6 +131,38 @@ class TaskResponse(BaseModel):
         from_attributes = True
 
 
+TaskBulkAction = Literal[
+    "publish",       # 发布（草稿 -> 已发布）
+    "revert_draft",  # 退回草稿（已发布 -> 草稿）
+    "assign",        # 派发（已发布 -> 待评估，需 assignee_id）
+    "return",        # 收回（已认领/进行中 -> 已发布，清除认领人、排期与配合人）
+    "archive",       # 归档（已确认 -> 已归档）
+    "set_priority",  # 修改优先级（草稿/已发布，需 priority）
+]
+
+
+class TaskBulkOperation(BaseModel):
+    """批量操作中的一项"""
+    action: TaskBulkAction
+    task_id: int
+    assignee_id: Optional[int] = Field(None, description="派发对象（assign 必填）")
+    priority: Optional[TaskPriority] = Field(None, description="优先级（set_priority 必填）")
+
+
+class TaskBulkRequest(BaseModel):
+    """批量任务操作请求（按顺序执行，全部成功才提交）"""
+    operations: List[TaskBulkOperation] = Field(..., min_length=1, max_length=200)
+
+
+class TaskBulkResponse(BaseModel):
+    """批量任务操作结果"""
+    total: int = Field(..., description="执行的操作数")
+    tasks: List[TaskResponse] = Field(..., description="涉及的任务（操作后）")
+    rescheduled_users: List[int] = Field(..., description="需重算排期的人员（由后台事件处理）")
+    recomputed_projects: List[int] = Field(..., description="需重算产值的项目（由后台事件处理）")
+    notifications: int = Field(..., description="登记的状态变更通知数（同一任务多次变更合并为一条）")
+
+
 class TaskDetailResponse(TaskResponse):
     """任务详情响应（包含关联信息）"""
     creator_name: Optional[str] = None
@@ -138,6 +172,7 @@ class TaskDetailResponse(TaskResponse):
 
 class TaskListItemResponse(TaskResponse):
     """任务列表项响应（包含关联信息）"""
+    description_excerpt: Optional[str] = None  # 描述纯文本摘要（列表预览用）
     creator_name: Optional[str] = None
     assignee_name: Optional[str] = None
     project_name: Optional[str] = None
@@ -270,3 +305,41 @@ class CollaboratorResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DeveloperCandidate(BaseModel):
+    """开发人员匹配结果"""
+    user_id: int
+    username: str
+    full_name: Optional[str] = None
+    sequence_level: Optional[str] = None
+    unit_price: Optional[Decimal] = None
+    matched_skills: List[str]
+    missing_skills: List[str]
+    skill_score: Decimal = Field(..., description="技能匹配度（0~1，按熟练度加权）")
+    feasible: bool = Field(..., description="并发数是否在上限内（配合模式）")
+    earliest_start: Optional[date] = Field(None, description="最早可开工日期")
+    earliest_end: Optional[date] = None
+    wait_workdays: int = Field(..., description="距最早可开工日期的工作日数")
+    concurrent_tasks: int = Field(..., description="该时段内已有的并发任务数")
+    displaced_tasks: int = Field(0, description="派发后顺延的队列任务数（派发模式）")
+    match_score: Decimal = Field(..., description="综合得分")
+
+
+class DeveloperMatchResponse(BaseModel):
+    """开发人员匹配响应"""
+    task_id: int
+    mode: str = Field(..., description="assign（派发）/ collaborator（配合）")
+    required_skills: List[str]
+    total: int
+    candidates: List[DeveloperCandidate]
+
+
+class TaskOverviewResponse(BaseModel):
+    """任务详情页聚合响应（任务、排期、配合人、一页留言）"""
+    task: TaskDetailResponse
+    schedule: Optional[TaskScheduleResponse] = None
+    collaborators: List[CollaboratorResponse]
+    comments: Optional[TaskCommentListResponse] = None  # 非任务参与者无权查看留言，为空
+    comment_page: int
+    comment_page_size: int
@@ -1,19 +1,128 @@
 """知识分享服务"""
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Tuple, Optional
 from datetime import datetime
 
 from app.models.article import Article
 from app.models.article_attachment import ArticleAttachment
+from app.models.article_tag import ArticleTag, ArticleTermCount
 from app.models.user import User
+from app.core.config import settings
 from app.core.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.db.session import SessionLocal
 from app.schemas.article import ArticleCreate, ArticleUpdate
+from app.services.upload_storage_service import UploadStorageService, REF_TYPE_ARTICLE
+from app.utils.ttl_cache import TTLCache
+from app.utils.write_behind import CounterBuffer
+
+# 分类/标签计数类型
+TERM_TYPE_TAG = "tag"
+TERM_TYPE_CATEGORY = "category"
+_TAG_MAX_LENGTH = 50
+
+# 侧边栏分类/标签列表缓存（文章变更后主动失效）
+_term_list_cache = TTLCache(ttl_seconds=60)
+
+
+def _flush_view_counts(increments: dict) -> None:
+    """把缓冲的浏览次数增量一次性写库（单条 UPDATE ... CASE）"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Article)
+            .where(Article.id.in_(increments.keys()))
+            .values(view_count=Article.view_count + case(increments, value=Article.id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+# 浏览次数写回缓冲（按文章聚合，定时批量写库）
+view_count_buffer = CounterBuffer(
+    "article-view-count",
+    _flush_view_counts,
+    interval_seconds=settings.ARTICLE_VIEW_FLUSH_SECONDS,
+)
 
 
 class ArticleService:
     """文章服务类"""
 
+    # ------------------------------------------------------------------
+    # 标签与分类/标签计数维护
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_tags(tags: Optional[str]) -> List[str]:
+        """
+        拆分逗号分隔的标签（去空白、去重，保持原顺序）。
+        去重不区分大小写（与 MySQL 默认排序规则下 uq_article_tag 的判断一致），保留首次出现的写法。
+        """
+        result: List[str] = []
+        seen: set[str] = set()
+        for item in (tags or "").split(","):
+            tag = item.strip()[:_TAG_MAX_LENGTH]
+            if tag and tag.casefold() not in seen:
+                seen.add(tag.casefold())
+                result.append(tag)
+        return result
+
+    @staticmethod
+    def _counted_terms(article: Article) -> set[Tuple[str, str]]:
+        """文章计入分类/标签计数的条目（仅已发布文章计数）"""
+        if not article.is_published:
+            return set()
+        terms = {(TERM_TYPE_TAG, tag) for tag in ArticleService.parse_tags(article.tags)}
+        if article.category:
+            terms.add((TERM_TYPE_CATEGORY, article.category))
+        return terms
+
+    @staticmethod
+    def _sync_article_tags(db: Session, article: Article) -> None:
+        """按 articles.tags 同步 article_tags 记录"""
+        wanted = {tag.casefold(): tag for tag in ArticleService.parse_tags(article.tags)}
+        current = {item.tag.casefold(): item for item in article.tag_items}
+        for key, item in current.items():
+            if key not in wanted:
+                article.tag_items.remove(item)
+            elif item.tag != wanted[key]:
+                # 仅大小写变化：原地更新，避免先插入后删除触发唯一约束
+                item.tag = wanted[key]
+        for key, tag in wanted.items():
+            if key not in current:
+                article.tag_items.append(ArticleTag(tag=tag))
+
+    @staticmethod
+    def _apply_term_deltas(
+        db: Session,
+        before: set[Tuple[str, str]],
+        after: set[Tuple[str, str]],
+    ) -> None:
+        """增量更新分类/标签计数（只处理发生变化的条目，不单独提交事务）"""
+        deltas = {term: -1 for term in before - after}
+        deltas.update({term: 1 for term in after - before})
+        for (term_type, name), delta in deltas.items():
+            updated = db.query(ArticleTermCount).filter(
+                ArticleTermCount.term_type == term_type,
+                ArticleTermCount.name == name,
+            ).update({ArticleTermCount.count: ArticleTermCount.count + delta}, synchronize_session=False)
+            if updated or delta < 0:
+                continue
+            try:
+                with db.begin_nested():
+                    db.add(ArticleTermCount(term_type=term_type, name=name, count=delta))
+            except IntegrityError:
+                # 并发创建同名计数：改为累加
+                db.query(ArticleTermCount).filter(
+                    ArticleTermCount.term_type == term_type,
+                    ArticleTermCount.name == name,
+                ).update({ArticleTermCount.count: ArticleTermCount.count + delta}, synchronize_session=False)
+
     @staticmethod
     def create_article(
         db: Session,
@@ -31,7 +140,12 @@ class ArticleService:
             view_count=0
         )
         db.add(article)
+        ArticleService._sync_article_tags(db, article)
+        db.flush()
+        UploadStorageService.sync_references(db, REF_TYPE_ARTICLE, article.id, article.content)
+        ArticleService._apply_term_deltas(db, set(), ArticleService._counted_terms(article))
         db.commit()
+        _term_list_cache.invalidate()
         db.refresh(article)
         return article
 
@@ -44,6 +158,7 @@ class ArticleService:
         ).filter(Article.id == article_id).first()
         if not article:
             raise NotFoundError("文章", str(article_id))
+        ArticleService._overlay_pending_views([article])
         return article
 
     @staticmethod
@@ -60,20 +175,26 @@ class ArticleService:
         if article.author_id != user_id:
             raise PermissionDeniedError("只有作者可以修改文章")
         
+        terms_before = ArticleService._counted_terms(article)
+
         # 更新字段
         if article_data.title is not None:
             article.title = article_data.title
         if article_data.content is not None:
             article.content = article_data.content
+            UploadStorageService.sync_references(db, REF_TYPE_ARTICLE, article.id, article.content)
         if article_data.category is not None:
             article.category = article_data.category
         if article_data.tags is not None:
             article.tags = article_data.tags
+            ArticleService._sync_article_tags(db, article)
         if article_data.is_published is not None:
             article.is_published = article_data.is_published
         
+        ArticleService._apply_term_deltas(db, terms_before, ArticleService._counted_terms(article))
         article.updated_at = datetime.now()
         db.commit()
+        _term_list_cache.invalidate()
         db.refresh(article)
         return article
 
@@ -90,8 +211,11 @@ class ArticleService:
         if article.author_id != user_id:
             raise PermissionDeniedError("只有作者可以删除文章")
         
+        UploadStorageService.clear_references(db, REF_TYPE_ARTICLE, article.id)
+        ArticleService._apply_term_deltas(db, ArticleService._counted_terms(article), set())
         db.delete(article)
         db.commit()
+        _term_list_cache.invalidate()
 
     @staticmethod
     def get_articles(
@@ -123,9 +247,8 @@ class ArticleService:
         
         # 标签筛选
         if tag:
-            # tags字段可能是逗号分隔的字符串，使用LIKE查询
-            tag_pattern = f"%{tag}%"
-            query = query.filter(Article.tags.like(tag_pattern))
+            # 按规范化的 article_tags 精确匹配（与标签计数口径一致）
+            query = query.filter(Article.tag_items.any(ArticleTag.tag == tag.strip()))
         
         # 作者筛选
         if author_id:
@@ -143,6 +266,8 @@ class ArticleService:
             joinedload(Article.author)
         ).order_by(Article.created_at.desc()).offset(skip).limit(limit).all()
         
+        ArticleService._overlay_pending_views(articles)
+
         # 填充作者信息
         for article in articles:
             if article.author:
@@ -152,53 +277,48 @@ class ArticleService:
         return articles, total
 
     @staticmethod
-    def increment_view_count(db: Session, article_id: int) -> Article:
-        """增加文章浏览次数"""
-        article = ArticleService.get_article(db, article_id)
-        article.view_count += 1
-        db.commit()
-        db.refresh(article)
+    def _overlay_pending_views(articles: List[Article]) -> None:
+        """在展示值上叠加尚未写库的浏览次数（不标记为修改，不会被提交）"""
+        for article in articles:
+            pending = view_count_buffer.pending(article.id)
+            if pending:
+                set_committed_value(article, "view_count", (article.view_count or 0) + pending)
+
+    @staticmethod
+    def record_view(article: Article) -> Article:
+        """记录一次浏览：写入内存缓冲，由后台定时批量写库"""
+        view_count_buffer.add(article.id)
+        set_committed_value(article, "view_count", (article.view_count or 0) + 1)
         return article
 
+    @staticmethod
+    def increment_view_count(db: Session, article_id: int) -> Article:
+        """增加文章浏览次数（写回缓冲，见 record_view）"""
+        return ArticleService.record_view(ArticleService.get_article(db, article_id))
+
+    @staticmethod
+    def _get_term_counts(db: Session, term_type: str) -> List[dict]:
+        rows = db.query(ArticleTermCount.name, ArticleTermCount.count).filter(
+            ArticleTermCount.term_type == term_type,
+            ArticleTermCount.count > 0,
+        ).order_by(ArticleTermCount.count.desc(), ArticleTermCount.name.asc()).all()
+        return [{"name": name, "count": count} for name, count in rows]
+
     @staticmethod
     def get_categories(db: Session) -> List[dict]:
-        """获取所有分类及其文章数量"""
-        categories = db.query(
-            Article.category,
-            func.count(Article.id).label('count')
-        ).filter(
-            Article.category.isnot(None),
-            Article.category != '',
-            Article.is_published == True
-        ).group_by(Article.category).all()
-        
-        return [
-            {"name": cat[0], "count": cat[1]}
-            for cat in categories
-        ]
+        """获取所有分类及其已发布文章数量（读取维护好的计数）"""
+        return _term_list_cache.get_or_set(
+            TERM_TYPE_CATEGORY,
+            lambda: ArticleService._get_term_counts(db, TERM_TYPE_CATEGORY),
+        )
 
     @staticmethod
     def get_tags(db: Session) -> List[dict]:
-        """获取所有标签及其文章数量"""
-        # 获取所有已发布文章的所有标签
-        articles = db.query(Article.tags).filter(
-            Article.tags.isnot(None),
-            Article.tags != '',
-            Article.is_published == True
-        ).all()
-        
-        # 统计标签
-        tag_count = {}
-        for article in articles:
-            if article.tags:
-                tags = [tag.strip() for tag in article.tags.split(',') if tag.strip()]
-                for tag in tags:
-                    tag_count[tag] = tag_count.get(tag, 0) + 1
-        
-        return [
-            {"name": tag, "count": count}
-            for tag, count in sorted(tag_count.items(), key=lambda x: x[1], reverse=True)
-        ]
+        """获取所有标签及其已发布文章数量（读取维护好的计数）"""
+        return _term_list_cache.get_or_set(
+            TERM_TYPE_TAG,
+            lambda: ArticleService._get_term_counts(db, TERM_TYPE_TAG),
+        )
 
     @staticmethod
     def get_user_articles(
@@ -2,22 +2,34 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
+import anyio.to_thread
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.models.user import User, UserRole
 from app.core.config import settings
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
 )
+from app.utils.throttle import create_throttle_store
 
 logger = logging.getLogger(__name__)
 
 # 用于不存在用户时的密码校验，避免明显的时序差异
 DUMMY_PASSWORD_HASH = "$2b$12$fhgjHmubsEcrcTJATjUztOwcBl3fFbqj32zgjQAoPw0gtjBLERTda"
 
+# 登录失败计数（滑动窗口），不再每次失败都写 users 表
+login_throttle = create_throttle_store(
+    settings.LOGIN_THROTTLE_BACKEND,
+    settings.REDIS_URL,
+    settings.LOGIN_THROTTLE_REDIS_TIMEOUT_SECONDS,
+)
+
+# 最近登录时间的记录精度：该时间内重复登录不再写库
+LAST_LOGIN_RESOLUTION = timedelta(minutes=5)
+
 
 def get_user_for_login_identifier(db: Session, identifier: str) -> Optional[User]:
     """按用户名或邮箱获取用户"""
@@ -33,53 +45,83 @@ def check_login_lock(user: User) -> None:
         )
 
 
-def record_failed_login(db: Session, user: Optional[User]) -> None:
-    """记录登录失败并在达到阈值时锁定账号"""
+def _login_failure_key(user: User) -> str:
+    return f"login-failure:user:{user.id}"
+
+
+async def record_failed_login(db: Session, user: Optional[User]) -> None:
+    """
+    记录登录失败并在达到阈值时锁定账号。
+    失败次数只记在计数存储中（滑动窗口），仅在触发锁定时写库。
+    计数存储可能访问 Redis（阻塞网络调用），在线程中执行，不阻塞事件循环。
+    """
     if not user:
         return
 
-    now = datetime.utcnow()
-    window_start = now - timedelta(minutes=settings.LOGIN_FAILURE_WINDOW_MINUTES)
-
-    if not user.last_failed_login_at or user.last_failed_login_at < window_start:
-        user.failed_login_attempts = 0
+    key = _login_failure_key(user)
+    failures = await anyio.to_thread.run_sync(
+        login_throttle.hit, key, settings.LOGIN_FAILURE_WINDOW_MINUTES * 60
+    )
+    if failures < settings.LOGIN_MAX_FAILED_ATTEMPTS:
+        return
 
-    user.failed_login_attempts += 1
+    now = datetime.utcnow()
+    user.failed_login_attempts = failures
     user.last_failed_login_at = now
-
-    if user.failed_login_attempts >= settings.LOGIN_MAX_FAILED_ATTEMPTS:
-        user.locked_until = now + timedelta(minutes=settings.LOGIN_LOCK_MINUTES)
-        logger.warning(
-            "用户登录失败达到阈值并锁定: user_id=%s username=%s lock_until=%s",
-            user.id,
-            user.username,
-            user.locked_until,
-        )
-
+    user.locked_until = now + timedelta(minutes=settings.LOGIN_LOCK_MINUTES)
     db.commit()
+    # 锁定期间不再校验密码，解锁后重新计数
+    await anyio.to_thread.run_sync(login_throttle.reset, key)
+    logger.warning(
+        "用户登录失败达到阈值并锁定: user_id=%s username=%s lock_until=%s",
+        user.id,
+        user.username,
+        user.locked_until,
+    )
 
 
-def clear_login_failures(db: Session, user: User) -> None:
-    """登录成功后清理失败计数和锁定状态"""
-    user.failed_login_attempts = 0
-    user.last_failed_login_at = None
-    user.locked_until = None
-    user.last_login_at = datetime.utcnow()
-    db.commit()
-
+async def clear_login_failures(db: Session, user: User) -> None:
+    """登录成功后清理失败计数；只有存在锁定记录或最近登录时间需要刷新时才写库"""
+    await anyio.to_thread.run_sync(login_throttle.reset, _login_failure_key(user))
 
-def authenticate_user(db: Session, identifier: str, password: str) -> Optional[User]:
-    """验证用户身份"""
+    now = datetime.utcnow()
+    dirty = False
+    if user.failed_login_attempts or user.last_failed_login_at or user.locked_until:
+        user.failed_login_attempts = 0
+        user.last_failed_login_at = None
+        user.locked_until = None
+        dirty = True
+    if not user.last_login_at or now - user.last_login_at >= LAST_LOGIN_RESOLUTION:
+        user.last_login_at = now
+        dirty = True
+    if dirty:
+        db.commit()
+
+
+def _release_connection(db: Session) -> None:
+    """
+    结束当前只读事务，把连接归还连接池。
+    在等待 bcrypt 计算之前调用：否则并发登录会各自占着连接等待线程池，
+    连接池耗尽后其他请求在事件循环中阻塞等待连接，造成整个进程卡死。
+    """
+    db.rollback()
+
+
+async def authenticate_user(db: Session, identifier: str, password: str) -> Optional[User]:
+    """验证用户身份（bcrypt 校验在线程池中执行，不阻塞事件循环）"""
     user = get_user_for_login_identifier(db, identifier)
 
     if not user:
-        verify_password(password, DUMMY_PASSWORD_HASH)
+        _release_connection(db)
+        await verify_password_async(password, DUMMY_PASSWORD_HASH)
         return None
 
     check_login_lock(user)
 
-    if not verify_password(password, user.password_hash):
-        record_failed_login(db, user)
+    password_hash = user.password_hash
+    _release_connection(db)
+    if not await verify_password_async(password, password_hash):
+        await record_failed_login(db, user)
         return None
 
     if not user.is_active:
@@ -88,11 +130,11 @@ def authenticate_user(db: Session, identifier: str, password: str) -> Optional[U
             detail="用户已被禁用"
         )
 
-    clear_login_failures(db, user)
+    await clear_login_failures(db, user)
     return user
 
 
-def create_user(
+async def create_user(
     db: Session,
     username: str,
     email: str,
@@ -116,7 +158,8 @@ def create_user(
         )
     
     # 创建用户
-    hashed_password = get_password_hash(password)
+    _release_connection(db)
+    hashed_password = await get_password_hash_async(password)
     user = User(
         username=username,
         email=email,
@@ -151,7 +194,7 @@ def generate_token_for_user(user: User) -> str:
     )
 
 
-def change_password(
+async def change_password(
     db: Session,
     user: User,
     old_password: str,
@@ -159,14 +202,16 @@ def change_password(
 ) -> User:
     """修改用户密码"""
     # 验证旧密码
-    if not verify_password(old_password, user.password_hash):
+    password_hash = user.password_hash
+    _release_connection(db)
+    if not await verify_password_async(old_password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="原密码错误"
         )
     
     # 更新密码
-    user.password_hash = get_password_hash(new_password)
+    user.password_hash = await get_password_hash_async(new_password)
     db.commit()
     db.refresh(user)
     return user
@@ -1,6 +1,6 @@
 """仪表盘服务"""
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, exists
+from sqlalchemy import func, and_, or_, exists, select
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 from decimal import Decimal
@@ -25,11 +25,49 @@ from app.schemas.dashboard import (
     TeamDashboardResponse
 )
 from app.services.workload_statistic_service import WorkloadStatisticService
+from app.services.occupancy_service import OccupancyService
 
 
 class DashboardService:
     """仪表盘服务类"""
 
+    @staticmethod
+    def get_data_version(db: Session) -> tuple:
+        """
+        仪表盘数据的版本指纹（一条聚合查询），用于 ETag 校验。
+        由各数据来源表的行数、版本号之和、最大ID/更新时间、金额合计组成，任一表增删改后指纹随之变化；
+        无版本号的表依赖秒级的 updated_at，同一秒内的连续修改可能在下次修改前被视为未变化。
+        """
+        from app.models.task_schedule import TaskSchedule
+
+        def scalar(*columns):
+            return [select(column).scalar_subquery() for column in columns]
+
+        row = db.query(
+            *scalar(func.count(Task.id), func.sum(Task.version), func.max(Task.updated_at)),
+            *scalar(
+                func.count(TaskCollaborator.id),
+                func.max(TaskCollaborator.id),
+                func.max(TaskCollaborator.updated_at),
+                func.sum(TaskCollaborator.allocated_man_days),
+            ),
+            *scalar(func.count(TaskSchedule.id), func.max(TaskSchedule.id), func.max(TaskSchedule.updated_at)),
+            *scalar(
+                func.count(WorkloadStatistic.id),
+                func.max(WorkloadStatistic.updated_at),
+                func.sum(WorkloadStatistic.total_man_days),
+            ),
+            *scalar(func.count(Project.id), func.sum(Project.version)),
+            *scalar(func.count(ProjectManager.id), func.max(ProjectManager.id)),
+            *scalar(
+                func.count(ProjectOutputValue.id),
+                func.sum(ProjectOutputValue.task_output_value),
+                func.sum(ProjectOutputValue.allocated_output_value),
+            ),
+            *scalar(func.count(User.id), func.max(User.updated_at)),
+        ).one()
+        return tuple(row)
+
     @staticmethod
     def get_developer_dashboard(db: Session, user_id: int) -> DeveloperDashboardResponse:
         """获取开发人员工作台数据"""
@@ -412,6 +450,7 @@ class DashboardService:
 
         total_members = len(developers)
         member_summaries: List[TeamMemberSummary] = []
+        occupancy_index = OccupancyService.get_index(db)
 
         # 计算总工作量和完成率
         total_workload = Decimal("0")
@@ -441,26 +480,19 @@ class DashboardService:
             total_workload += total_man_days
 
             # 计算负荷状态（基于实际工作量）
-            # 获取未来30天内的预计工作量（基于已认领任务的拟投入人天）
-            from app.models.task_schedule import TaskSchedule
-            
+            # 获取未来30天内的预计工作量（基于已认领任务的拟投入人天，取自排期占用索引）
             today = date.today()
             future_date = today + timedelta(days=30)
             
             # 计算未来30天内的预计工作量
-            future_workload = Decimal("0")
-            future_tasks = db.query(Task).join(
-                TaskSchedule, Task.id == TaskSchedule.task_id
-            ).filter(
-                Task.assignee_id == developer.id,
-                Task.status.in_([TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value]),
-                TaskSchedule.start_date <= future_date,
-                TaskSchedule.end_date >= today
-            ).all()
-            
-            for task in future_tasks:
-                if task.estimated_man_days:
-                    future_workload += task.estimated_man_days
+            future_workload = sum(
+                (
+                    occupancy.man_days
+                    for occupancy in occupancy_index.overlapping(developer.id, today, future_date)
+                    if occupancy.role == "assignee"
+                ),
+                Decimal("0"),
+            )
             
             # 负荷阈值：每月20个工作日，30天约等于22个工作日
             # overloaded: > 18人天（约80%负荷）
@@ -1,6 +1,8 @@
 """数据导出服务"""
 import io
 import re
+import threading
+from collections import OrderedDict
 from urllib.request import urlopen
 from urllib.parse import urlparse, unquote
 from datetime import datetime, date
@@ -20,12 +22,55 @@ from app.models.task import TaskStatus
 from app.models.workload_statistic import WorkloadStatistic
 from app.models.user import User
 from app.models.project import Project
+from app.models.uploaded_file import UploadedFile
+from app.services.upload_storage_service import UploadStorageService
+from app.services.thumbnail_service import ThumbnailService, THUMBNAIL_VARIANTS, EXPORT_VARIANT
+from app.services.job_service import JobService, ProgressCallback
 from app.utils.paths import get_uploads_dir
 
 
 _MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\(([^)]+)\)")
 _IMAGE_FETCH_TIMEOUT_SECONDS = 8
 _MAX_IMAGES_PER_TASK = 3
+# 后台导出任务类型
+JOB_EXPORT_WORKLOAD_STATISTICS = "export_workload_statistics"
+JOB_EXPORT_TASKS = "export_tasks"
+JOB_EXPORT_PERFORMANCE = "export_performance"
+# 站内图片内容不可变（内容寻址/随机文件名），读取结果可在进程内复用；按总字节数限制缓存大小
+_LOCAL_IMAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# 单个文件超过该大小时不缓存（避免少数原图挤掉全部缩略图）
+_LOCAL_IMAGE_CACHE_MAX_ITEM_BYTES = 4 * 1024 * 1024
+
+_local_image_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_local_image_cache_bytes = 0
+_local_image_cache_lock = threading.Lock()
+
+
+def _read_local_upload(relative_path: str) -> bytes:
+    """读取 uploads 目录下的文件内容（带按字节数淘汰的 LRU 缓存）；路径越界或文件不存在时抛出 FileNotFoundError"""
+    global _local_image_cache_bytes
+    with _local_image_cache_lock:
+        data = _local_image_cache.get(relative_path)
+        if data is not None:
+            _local_image_cache.move_to_end(relative_path)
+            return data
+
+    uploads_dir = get_uploads_dir().resolve()
+    local_path = (uploads_dir / relative_path).resolve()
+    if not local_path.is_file() or uploads_dir not in local_path.parents:
+        raise FileNotFoundError(relative_path)
+    data = local_path.read_bytes()
+    if len(data) > _LOCAL_IMAGE_CACHE_MAX_ITEM_BYTES:
+        return data
+
+    with _local_image_cache_lock:
+        if relative_path not in _local_image_cache:
+            _local_image_cache[relative_path] = data
+            _local_image_cache_bytes += len(data)
+            while _local_image_cache_bytes > _LOCAL_IMAGE_CACHE_MAX_BYTES:
+                _, evicted = _local_image_cache.popitem(last=False)
+                _local_image_cache_bytes -= len(evicted)
+    return data
 
 
 class ExportService:
@@ -53,17 +98,14 @@ class ExportService:
     def _fetch_image_bytes(url: str) -> Optional[io.BytesIO]:
         """下载图片并返回内存流；失败时返回 None，避免导出整体失败。"""
         parsed = urlparse(url)
-        uploads_dir = get_uploads_dir().resolve()
 
         # 站内图片优先直接读本地文件，避免经公网回环导致慢/超时
         if parsed.path and parsed.path.startswith("/uploads/"):
             try:
                 relative = parsed.path[len("/uploads/"):].lstrip("/")
-                local_path = (uploads_dir / unquote(relative)).resolve()
-                if local_path.is_file() and uploads_dir in local_path.parents:
-                    data = local_path.read_bytes()
-                    if data:
-                        return io.BytesIO(data)
+                data = _read_local_upload(unquote(relative))
+                if data:
+                    return io.BytesIO(data)
             except Exception:
                 pass
 
@@ -94,24 +136,45 @@ class ExportService:
         col_idx: int,
         image_urls: list[str],
         image_stream_refs: list[io.BytesIO],
+        image_meta: Optional[dict[str, UploadedFile]] = None,
     ) -> None:
         """
         在同一单元格内展示多图：先合成为一张竖向拼接图，再插入单元格。
         这样兼容性更高（WPS/Excel 都稳定），也能满足“同单元格多图”诉求。
+
+        image_meta 为上传时记录的图片元数据：已知无法解码的文件（如 SVG）直接跳过；
+        已预生成导出尺寸缩略图的直接使用缩略图，否则回退到原图（JPEG 借助 draft 模式按目标尺寸解码）
+        并补提交缩略图生成任务。
         """
         if not image_urls:
             return
+        image_meta = image_meta or {}
 
         images: list[PILImage.Image] = []
         gap_px = 8
-        max_width_px = 210
-        per_image_max_height_px = 120
+        max_width_px, per_image_max_height_px = THUMBNAIL_VARIANTS[EXPORT_VARIANT]
         for url in image_urls[:_MAX_IMAGES_PER_TASK]:
-            image_buffer = ExportService._fetch_image_bytes(url)
+            meta = image_meta.get(url)
+            if meta is not None and not (meta.width and meta.height):
+                continue
+            image_buffer = None
+            if meta is not None:
+                try:
+                    image_buffer = io.BytesIO(_read_local_upload(
+                        ThumbnailService.variant_relative_path(meta.content_hash, EXPORT_VARIANT)
+                    ))
+                except OSError:
+                    ThumbnailService.schedule(meta.content_hash, meta.file_path)
+            from_thumbnail = image_buffer is not None
+            if image_buffer is None:
+                image_buffer = ExportService._fetch_image_bytes(url)
             if not image_buffer:
                 continue
             try:
                 pil = PILImage.open(image_buffer)
+                if meta is not None and not from_thumbnail:
+                    scale = min(max_width_px / meta.width, per_image_max_height_px / meta.height, 1.0)
+                    pil.draft("RGB", (max(1, int(meta.width * scale)), max(1, int(meta.height * scale))))
                 pil.load()
                 pil = pil.convert("RGB")
                 width, height = pil.size
@@ -180,9 +243,10 @@ class ExportService:
         user_id: Optional[int] = None,
         project_id: Optional[int] = None,
         period_start: Optional[date] = None,
-        period_end: Optional[date] = None
+        period_end: Optional[date] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> io.BytesIO:
-        """导出工作量统计数据到Excel"""
+        """导出工作量统计数据到Excel（progress 为可选的进度回调，后台任务使用）"""
         wb = Workbook()
         ws = wb.active
         ws.title = "工作量统计"
@@ -208,7 +272,9 @@ class ExportService:
         statistics = query.order_by(WorkloadStatistic.period_start.desc()).all()
 
         # 填充数据
-        for stat in statistics:
+        for idx, stat in enumerate(statistics):
+            if progress:
+                progress(idx * 90 // len(statistics))
             user = db.query(User).filter(User.id == stat.user_id).first()
             project = db.query(Project).filter(Project.id == stat.project_id).first() if stat.project_id else None
 
@@ -238,19 +304,16 @@ class ExportService:
         return output
 
     @staticmethod
-    def export_tasks(
+    def check_task_export_permission(
         db: Session,
         filters: TaskFilterParams,
         current_user_id: int,
         current_user_role: str,
-        embed_images: bool = False,
-    ) -> io.BytesIO:
-        """导出任务数据到Excel（筛选条件与任务列表 API 一致，最多 10000 条）。"""
-        dumped = filters.model_dump()
-        dumped["page"] = 1
-        dumped["page_size"] = 10000
-        export_filters = TaskFilterParams.model_construct(**dumped)
-
+    ) -> bool:
+        """
+        校验任务导出权限（后台导出在提交时即校验）。
+        返回是否按单项目导出放开开发人员的可见范围限制。
+        """
         bypass_dev_for_project_export = False
         if filters.project_id and not filters.project_ids:
             # 与同项目任务执行视图一致：可先访问该接口再看全部任务时再导出整套数据
@@ -266,6 +329,26 @@ class ExportService:
 
                 raise PermissionDeniedError("无权限查看该项目的任务数据")
             bypass_dev_for_project_export = True
+        return bypass_dev_for_project_export
+
+    @staticmethod
+    def export_tasks(
+        db: Session,
+        filters: TaskFilterParams,
+        current_user_id: int,
+        current_user_role: str,
+        embed_images: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ) -> io.BytesIO:
+        """导出任务数据到Excel（筛选条件与任务列表 API 一致，最多 10000 条）。progress 为可选的进度回调。"""
+        dumped = filters.model_dump()
+        dumped["page"] = 1
+        dumped["page_size"] = 10000
+        export_filters = TaskFilterParams.model_construct(**dumped)
+
+        bypass_dev_for_project_export = ExportService.check_task_export_permission(
+            db, filters, current_user_id, current_user_role
+        )
 
         tasks, _ = TaskService.get_tasks(
             db,
@@ -288,8 +371,18 @@ class ExportService:
         ExportService._apply_header_style(ws, 1, len(headers))
         image_stream_refs: list[io.BytesIO] = []
 
+        # 预先批量解析描述与图片元数据，避免逐行查询
+        parsed_descriptions = [ExportService._description_for_excel(task.description) for task in tasks]
+        image_meta: dict[str, UploadedFile] = {}
+        if embed_images:
+            image_meta = UploadStorageService.get_files_by_urls(
+                db, [url for _, urls in parsed_descriptions for url in urls[:_MAX_IMAGES_PER_TASK]]
+            )
+
         # 填充数据
-        for row_idx, task in enumerate(tasks, start=2):
+        for row_idx, (task, (desc, image_urls)) in enumerate(zip(tasks, parsed_descriptions), start=2):
+            if progress:
+                progress((row_idx - 2) * 90 // len(tasks))
             # 使用已加载的关联对象
             creator = task.creator
             assignee = task.assignee
@@ -306,7 +399,6 @@ class ExportService:
                 TaskStatus.ARCHIVED.value: "已归档",
             }.get(task.status, task.status)
 
-            desc, image_urls = ExportService._description_for_excel(task.description)
             image_cell_value = "\n".join(image_urls) if image_urls else ""
             ws.append([
                 task.id,
@@ -335,6 +427,7 @@ class ExportService:
                     col_idx=4,
                     image_urls=image_urls,
                     image_stream_refs=image_stream_refs,
+                    image_meta=image_meta,
                 )
 
         # 调整列宽
@@ -353,9 +446,10 @@ class ExportService:
         db: Session,
         user_id: Optional[int] = None,
         period_start: Optional[date] = None,
-        period_end: Optional[date] = None
+        period_end: Optional[date] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> io.BytesIO:
-        """导出绩效数据到Excel"""
+        """导出绩效数据到Excel（progress 为可选的进度回调，后台任务使用）"""
         wb = Workbook()
         ws = wb.active
         ws.title = "绩效数据"
@@ -380,7 +474,9 @@ class ExportService:
         statistics = query.order_by(WorkloadStatistic.period_start.desc()).all()
 
         # 填充数据
-        for stat in statistics:
+        for idx, stat in enumerate(statistics):
+            if progress:
+                progress(idx * 90 // len(statistics))
             user = db.query(User).filter(User.id == stat.user_id).first()
             if not user:
                 continue
@@ -422,3 +518,51 @@ class ExportService:
         wb.save(output)
         output.seek(0)
         return output
+
+
+# ----------------------------------------------------------------------
+# 后台导出任务（参数为 JSON 可序列化的 dict，由导出接口在提交前完成权限收敛）
+# ----------------------------------------------------------------------
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def _run_export_workload_statistics(db: Session, params: dict, progress: ProgressCallback) -> tuple[io.BytesIO, str]:
+    output = ExportService.export_workload_statistics(
+        db=db,
+        user_id=params.get("user_id"),
+        project_id=params.get("project_id"),
+        period_start=_parse_date(params.get("period_start")),
+        period_end=_parse_date(params.get("period_end")),
+        progress=progress,
+    )
+    return output, f"工作量统计_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+
+def _run_export_tasks(db: Session, params: dict, progress: ProgressCallback) -> tuple[io.BytesIO, str]:
+    output = ExportService.export_tasks(
+        db,
+        filters=TaskFilterParams(**params["filters"]),
+        current_user_id=params["current_user_id"],
+        current_user_role=params["current_user_role"],
+        embed_images=params.get("embed_images", False),
+        progress=progress,
+    )
+    return output, f"任务列表_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+
+def _run_export_performance(db: Session, params: dict, progress: ProgressCallback) -> tuple[io.BytesIO, str]:
+    output = ExportService.export_performance_data(
+        db=db,
+        user_id=params.get("user_id"),
+        period_start=_parse_date(params.get("period_start")),
+        period_end=_parse_date(params.get("period_end")),
+        progress=progress,
+    )
+    return output, f"绩效数据_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+
+JobService.register_handler(JOB_EXPORT_WORKLOAD_STATISTICS, _run_export_workload_statistics)
+JobService.register_handler(JOB_EXPORT_TASKS, _run_export_tasks)
+JobService.register_handler(JOB_EXPORT_PERFORMANCE, _run_export_performance)
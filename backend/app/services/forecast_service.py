@@ -0,0 +1,345 @@
+"""完成时间预测服务
+
+按当前排期队列、节假日与并发上限，预测所有未完成任务及项目的完成日期：
+1. 固定次数的批量查询加载未完成任务（含排期）、配合人、开发人员、节假日与项目名称
+2. 日期换算为工作日序号（WorkdayIndex），每个任务的结束日期只需一次整数加法
+3. 每个开发人员的串行队列按优先级 → 创建时间排序：进行中任务保持原排期（已逾期的按今天完成计），
+   其余任务依次排在其后；待评估任务视为已被派发对象认领
+4. 并发任务对齐基准任务的预测排期，配合人的占用与任务排期一致
+5. 未认领的已发布任务按优先级依次分配给最早可开工的开发人员（排在其现有队列之后），
+   开工日须满足该人员同一时段并发任务数不超过 MAX_CONCURRENT_TASKS
+6. 项目完成日期为其未完成任务预测结束日期的最大值
+
+计算结果缓存在进程内，由后台线程每 FORECAST_REFRESH_SECONDS 秒刷新一次；
+缓存过期或显式要求刷新时在请求内重新计算。
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.project import Project
+from app.models.task import Task, TaskStatus, PRIORITY_ORDER
+from app.models.task_collaborator import TaskCollaborator
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.services.schedule_engine import ACTIVE_STATUSES, MAX_CONCURRENT_TASKS, WorkdayIndex
+from app.services.schedule_service import ScheduleService
+
+logger = logging.getLogger(__name__)
+
+# 参与预测的任务状态（草稿只计数，不排期）
+FORECAST_STATUSES = (
+    TaskStatus.DRAFT.value,
+    TaskStatus.PUBLISHED.value,
+    TaskStatus.PENDING_EVAL.value,
+    TaskStatus.CLAIMED.value,
+    TaskStatus.IN_PROGRESS.value,
+)
+
+# 缓存：(计算时的 monotonic 时间, 预测结果)
+_cache: Optional[tuple[float, dict]] = None
+_compute_lock = threading.Lock()
+_stop = threading.Event()
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+
+def _queue_key(task: dict) -> tuple:
+    return (PRIORITY_ORDER.get(task["priority"], 2), task["created_at"], task["task_id"])
+
+
+def _project_entry(project_id: int, project_name: Optional[str]) -> dict:
+    return {
+        "project_id": project_id,
+        "project_name": project_name,
+        "open_tasks": 0,
+        "unassigned_tasks": 0,
+        "unscheduled_tasks": 0,
+        "late_tasks": 0,
+        "draft_tasks": 0,
+        "forecast_end": None,
+    }
+
+
+def _feasible_start(intervals: list[tuple[int, int]], start: int, span: int) -> int:
+    """在已有占用区间（工作日序号）下，最早满足并发上限的开工序号（不早于 start）"""
+    while True:
+        end = start + span - 1
+        overlapping = [e for s, e in intervals if s <= end and e >= start]
+        if len(overlapping) < MAX_CONCURRENT_TASKS:
+            return start
+        start = min(overlapping) + 1
+
+
+class ForecastService:
+    """完成时间预测服务类"""
+
+    @staticmethod
+    def compute(db: Session, today: Optional[date] = None) -> dict:
+        """计算全部未完成任务、开发人员与项目的预测结果（查询次数固定，与任务数无关）"""
+        started = time.perf_counter()
+        today = today or date.today()
+
+        rows = (
+            db.query(
+                Task.id, Task.title, Task.status, Task.priority, Task.created_at,
+                Task.estimated_man_days, Task.assignee_id, Task.project_id, Task.deadline,
+                TaskSchedule.start_date, TaskSchedule.end_date,
+                TaskSchedule.is_concurrent, TaskSchedule.concurrent_with,
+            )
+            .outerjoin(TaskSchedule, TaskSchedule.task_id == Task.id)
+            .filter(Task.status.in_(FORECAST_STATUSES))
+            .all()
+        )
+        collaborator_rows = (
+            db.query(TaskCollaborator.task_id, TaskCollaborator.user_id)
+            .join(Task, Task.id == TaskCollaborator.task_id)
+            .filter(Task.status.in_(ACTIVE_STATUSES))
+            .all()
+        )
+        involved_user_ids = {row.assignee_id for row in rows if row.assignee_id}
+        involved_user_ids.update(row.user_id for row in collaborator_rows)
+        user_filter = (User.role == "developer") & (User.is_active == True)
+        if involved_user_ids:
+            user_filter = or_(user_filter, User.id.in_(involved_user_ids))
+        users = db.query(User.id, User.username, User.full_name, User.role, User.is_active).filter(user_filter).all()
+        project_ids = {row.project_id for row in rows if row.project_id}
+        project_names = dict(
+            db.query(Project.id, Project.name).filter(Project.id.in_(project_ids)).all()
+        ) if project_ids else {}
+        workdays = WorkdayIndex(ScheduleService._load_calendar(db, today), today)
+
+        tasks: dict[int, dict] = {}
+        queues: dict[int, list[dict]] = defaultdict(list)
+        concurrent: list[dict] = []
+        unassigned: list[dict] = []
+        draft_counts: dict[int, int] = defaultdict(int)
+        for row in rows:
+            if row.status == TaskStatus.DRAFT.value:
+                if row.project_id:
+                    draft_counts[row.project_id] += 1
+                continue
+            task = {
+                "task_id": row.id,
+                "title": row.title,
+                "status": row.status,
+                "priority": row.priority,
+                "created_at": row.created_at,
+                "project_id": row.project_id,
+                "assignee_id": row.assignee_id,
+                "is_projected": row.status not in ACTIVE_STATUSES,
+                "deadline": row.deadline,
+                "span": WorkdayIndex.span(row.estimated_man_days),
+                "schedule": (row.start_date, row.end_date) if row.start_date else None,
+                "concurrent_with": row.concurrent_with if row.is_concurrent else None,
+                "start": None,  # 预测开工日期
+                "end": None,  # 预测完工的工作日序号
+            }
+            tasks[row.id] = task
+            if not row.assignee_id:
+                if row.status == TaskStatus.PUBLISHED.value:
+                    unassigned.append(task)
+            elif row.status in ACTIVE_STATUSES and row.is_concurrent:
+                concurrent.append(task)
+            else:
+                queues[row.assignee_id].append(task)
+
+        # 串行队列
+        free_from: dict[int, int] = {}
+        for assignee_id, queue in queues.items():
+            queue.sort(key=_queue_key)
+            cursor = 0
+            for task in queue:
+                if task["status"] != TaskStatus.IN_PROGRESS.value:
+                    continue
+                if task["schedule"]:
+                    task["start"] = task["schedule"][0]
+                    task["end"] = workdays.index_on_or_before(task["schedule"][1])
+                else:
+                    task["start"] = today
+                    task["end"] = task["span"] - 1
+                cursor = max(cursor, task["end"] + 1)
+            for task in queue:
+                if task["status"] == TaskStatus.IN_PROGRESS.value:
+                    continue
+                task["start"] = workdays.date_at(cursor)
+                task["end"] = cursor + task["span"] - 1
+                cursor = task["end"] + 1
+            free_from[assignee_id] = cursor
+
+        # 并发任务对齐基准任务；基准任务已完成时保留原排期
+        for task in concurrent:
+            base = tasks.get(task["concurrent_with"])
+            if base is not None and base["end"] is not None:
+                task["start"], task["end"] = base["start"], base["end"]
+            elif task["schedule"]:
+                task["start"] = task["schedule"][0]
+                task["end"] = workdays.index_on_or_before(task["schedule"][1])
+            else:
+                task["start"] = today
+                task["end"] = task["span"] - 1
+
+        # 串行队列之外的占用（并发任务、配合的任务），用于并发上限校验
+        occupied: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for task in concurrent:
+            occupied[task["assignee_id"]].append((workdays.index_of(task["start"]), task["end"]))
+        for row in collaborator_rows:
+            task = tasks.get(row.task_id)
+            if task is not None and task["end"] is not None:
+                occupied[row.user_id].append((workdays.index_of(task["start"]), task["end"]))
+
+        # 未认领任务依次分配给最早可开工的开发人员
+        developers = [u for u in users if u.role == "developer" and u.is_active]
+        heap = [(free_from.get(u.id, 0), u.id) for u in developers]
+        heapq.heapify(heap)
+        projected_counts: dict[int, int] = defaultdict(int)
+        if heap:
+            unassigned.sort(key=_queue_key)
+            for task in unassigned:
+                while True:
+                    key, user_id = heapq.heappop(heap)
+                    start = _feasible_start(occupied.get(user_id, ()), key, task["span"])
+                    if start == key:
+                        break
+                    heapq.heappush(heap, (start, user_id))
+                task["assignee_id"] = user_id
+                task["start"] = workdays.date_at(start)
+                task["end"] = start + task["span"] - 1
+                heapq.heappush(heap, (task["end"] + 1, user_id))
+                free_from[user_id] = task["end"] + 1
+                projected_counts[user_id] += 1
+
+        # 汇总
+        task_items = []
+        projects: dict[int, dict] = {}
+        for task in tasks.values():
+            end = workdays.date_at(task["end"]) if task["end"] is not None else None
+            is_late = bool(end and task["deadline"] and end > task["deadline"])
+            task_items.append({
+                "task_id": task["task_id"],
+                "title": task["title"],
+                "status": task["status"],
+                "priority": task["priority"],
+                "project_id": task["project_id"],
+                "assignee_id": task["assignee_id"],
+                "is_projected": task["is_projected"],
+                "deadline": task["deadline"],
+                "forecast_start": task["start"],
+                "forecast_end": end,
+                "is_late": is_late,
+            })
+            project_id = task["project_id"]
+            if not project_id:
+                continue
+            project = projects.get(project_id)
+            if project is None:
+                project = projects[project_id] = _project_entry(project_id, project_names.get(project_id))
+            project["open_tasks"] += 1
+            if task["status"] == TaskStatus.PUBLISHED.value:
+                project["unassigned_tasks"] += 1
+            if end is None:
+                project["unscheduled_tasks"] += 1
+            elif project["forecast_end"] is None or end > project["forecast_end"]:
+                project["forecast_end"] = end
+            if is_late:
+                project["late_tasks"] += 1
+        for project_id, count in draft_counts.items():
+            project = projects.get(project_id)
+            if project is None:
+                project = projects[project_id] = _project_entry(project_id, project_names.get(project_id))
+            project["draft_tasks"] = count
+
+        developer_items = [
+            {
+                "user_id": u.id,
+                "username": u.username,
+                "full_name": u.full_name,
+                "queued_tasks": len(queues.get(u.id, ())),
+                "projected_tasks": projected_counts.get(u.id, 0),
+                "free_from": workdays.date_at(free_from.get(u.id, 0)),
+            }
+            for u in users
+            if (u.role == "developer" and u.is_active) or u.id in queues
+        ]
+
+        task_items.sort(key=lambda item: (item["forecast_end"] or date.max, item["task_id"]))
+        return {
+            "generated_at": datetime.now(),
+            "today": today,
+            "projects": sorted(projects.values(), key=lambda p: p["project_id"]),
+            "developers": sorted(developer_items, key=lambda d: d["user_id"]),
+            "tasks": task_items,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    @staticmethod
+    def get_forecast(db: Session, refresh: bool = False) -> dict:
+        """
+        获取预测结果：缓存未过期时直接返回，否则在当前会话中重新计算。
+        首次调用时启动后台刷新线程。
+        """
+        global _cache
+        ForecastService._ensure_worker()
+        if not refresh:
+            cached = ForecastService._fresh_cache()
+            if cached is not None:
+                return cached
+        with _compute_lock:
+            if not refresh:
+                # 等锁期间可能已被其他请求或后台线程刷新
+                cached = ForecastService._fresh_cache()
+                if cached is not None:
+                    return cached
+            result = ForecastService.compute(db)
+            _cache = (time.monotonic(), result)
+            return result
+
+    @staticmethod
+    def _fresh_cache() -> Optional[dict]:
+        cached = _cache
+        if cached is not None and time.monotonic() - cached[0] < settings.FORECAST_REFRESH_SECONDS:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def refresh() -> None:
+        """在独立会话中重新计算并更新缓存（后台线程调用）"""
+        global _cache
+        db = SessionLocal()
+        try:
+            with _compute_lock:
+                _cache = (time.monotonic(), ForecastService.compute(db))
+        except Exception as e:
+            logger.warning(f"完成时间预测刷新失败: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _ensure_worker() -> None:
+        global _worker
+        with _worker_lock:
+            if _worker is None and not _stop.is_set():
+                _worker = threading.Thread(target=ForecastService._run, name="forecast-refresher", daemon=True)
+                _worker.start()
+
+    @staticmethod
+    def _run() -> None:
+        while not _stop.wait(settings.FORECAST_REFRESH_SECONDS):
+            ForecastService.refresh()
+
+    @staticmethod
+    def shutdown() -> None:
+        """停止后台刷新线程（应用退出时调用）"""
+        _stop.set()
+        worker = _worker
+        if worker is not None:
+            worker.join(timeout=5)
@@ -0,0 +1,359 @@
+"""节假日服务
+
+- 批量导入：CSV / JSON 文件中的节假日与调休上班日在一个事务内写入（按日期新增或更新）；
+  覆盖模式下，导入涉及年份中文件里没有的记录一并删除
+- 年度日历：按月汇总工作日数、节假日与调休上班日
+- 导入提交后，找出排期队列（今天或最早排期起、最晚排期止）覆盖「工作日/非工作日发生变化的日期」
+  的人员，交给后台线程分批重算其排期（每批之间暂停，避免集中写库）
+
+CSV 表头：date,description,type（也可用 日期,描述,类型）；
+JSON：[{"date": "2027-01-01", "description": "元旦", "type": "holiday"}, ...]，
+或 {"items": [...]}。type 为 holiday / workday（或 放假 / 上班），也可用布尔字段 is_workday。
+"""
+import csv
+import io
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.db.session import SessionLocal
+from app.models.holiday import Holiday
+from app.models.task import Task
+from app.models.task_schedule import TaskSchedule
+from app.schemas.holiday import HolidayImportItem
+from app.services.schedule_engine import ACTIVE_STATUSES
+from app.services.schedule_service import ScheduleService
+
+logger = logging.getLogger(__name__)
+
+# 单次导入的最大记录数
+MAX_IMPORT_ROWS = 2000
+
+# 类型取值 -> 是否为调休上班日
+DAY_TYPES = {
+    "holiday": False,
+    "off": False,
+    "放假": False,
+    "休": False,
+    "workday": True,
+    "work": True,
+    "上班": True,
+    "班": True,
+}
+
+# CSV 表头别名
+CSV_HEADERS = {
+    "date": "date",
+    "日期": "date",
+    "description": "description",
+    "name": "description",
+    "描述": "description",
+    "名称": "description",
+    "type": "type",
+    "类型": "type",
+    "is_workday": "is_workday",
+}
+
+# 待重算排期的人员
+_pending_users: set[int] = set()
+_condition = threading.Condition()
+_worker: Optional[threading.Thread] = None
+_stopping = False
+
+
+def _default_is_workday(day: date) -> bool:
+    return day.weekday() < 5
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "是")
+
+
+def _to_item(record: dict, position: str) -> HolidayImportItem:
+    """把一条原始记录转换为导入项（position 用于错误提示）"""
+    data = {
+        "date": record.get("date"),
+        "description": (record.get("description") or "").strip() or None,
+    }
+    day_type = record.get("type")
+    if day_type not in (None, ""):
+        key = str(day_type).strip().lower()
+        if key not in DAY_TYPES:
+            raise ValidationError(f"{position}：类型 '{day_type}' 无效，应为 holiday 或 workday")
+        data["is_workday"] = DAY_TYPES[key]
+    elif record.get("is_workday") not in (None, ""):
+        data["is_workday"] = _parse_bool(record["is_workday"])
+    try:
+        item = HolidayImportItem(**data)
+    except PydanticValidationError as e:
+        raise ValidationError(f"{position}：{e.errors()[0].get('msg', '格式错误')}")
+    if item.is_workday and item.date.weekday() < 5:
+        raise ValidationError(f"{position}：调休上班日 {item.date} 不是周末")
+    return item
+
+
+class HolidayService:
+    """节假日服务类"""
+
+    @staticmethod
+    def list_holidays(db: Session, year: Optional[int] = None) -> List[Holiday]:
+        query = db.query(Holiday)
+        if year is not None:
+            query = query.filter(Holiday.date >= date(year, 1, 1), Holiday.date <= date(year, 12, 31))
+        return query.order_by(Holiday.date).all()
+
+    @staticmethod
+    def parse_import_file(content: bytes, filename: Optional[str] = None) -> List[HolidayImportItem]:
+        """解析导入文件（按扩展名或内容判断 CSV / JSON）"""
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValidationError("文件需为 UTF-8 编码")
+        stripped = text.lstrip()
+        is_json = (filename or "").lower().endswith(".json") or stripped.startswith(("[", "{"))
+
+        if is_json:
+            try:
+                data = json.loads(text)
+            except ValueError as e:
+                raise ValidationError(f"JSON 格式错误：{e}")
+            if isinstance(data, dict):
+                data = data.get("items", data.get("holidays"))
+            if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+                raise ValidationError("JSON 应为记录数组，或包含 items 数组的对象")
+            records = [(f"第 {i} 条", r) for i, r in enumerate(data, start=1)]
+        else:
+            reader = csv.reader(io.StringIO(text))
+            header = next(reader, None)
+            if not header:
+                raise ValidationError("CSV 文件为空")
+            columns = [CSV_HEADERS.get(h.strip().lower(), CSV_HEADERS.get(h.strip())) for h in header]
+            if "date" not in columns:
+                raise ValidationError("CSV 缺少 date（日期）列")
+            records = [
+                (f"第 {line} 行", {c: v.strip() for c, v in zip(columns, row) if c})
+                for line, row in enumerate(reader, start=2)
+                if any(cell.strip() for cell in row)
+            ]
+
+        if not records:
+            raise ValidationError("文件中没有记录")
+        if len(records) > MAX_IMPORT_ROWS:
+            raise ValidationError(f"单次最多导入 {MAX_IMPORT_ROWS} 条记录")
+
+        items = []
+        seen: set[date] = set()
+        for position, record in records:
+            item = _to_item(record, position)
+            if item.date in seen:
+                raise ValidationError(f"{position}：日期 {item.date} 重复")
+            seen.add(item.date)
+            items.append(item)
+        return items
+
+    @staticmethod
+    def import_holidays(db: Session, items: List[HolidayImportItem], replace: bool = False) -> dict:
+        """
+        在一个事务内导入节假日 / 调休上班日（按日期新增或更新）。
+        replace=True 时删除导入涉及年份中文件里没有的记录。
+        提交后安排后台重算受影响人员的排期。
+        """
+        imported = {item.date: item for item in items}
+        years = {d.year for d in imported}
+        query = db.query(Holiday)
+        if replace:
+            query = query.filter(Holiday.date >= date(min(years), 1, 1), Holiday.date <= date(max(years), 12, 31))
+        else:
+            query = query.filter(Holiday.date.in_(imported.keys()))
+        existing = {h.date: h for h in query.all() if h.date in imported or h.date.year in years}
+
+        created = updated = deleted = unchanged = 0
+        changed_dates: set[date] = set()
+        try:
+            for day, item in imported.items():
+                record = existing.get(day)
+                before = record.is_workday if record is not None else _default_is_workday(day)
+                if before != item.is_workday:
+                    changed_dates.add(day)
+                if record is None:
+                    db.add(Holiday(
+                        date=day,
+                        description=item.description,
+                        is_weekend=day.weekday() >= 5,
+                        is_workday=item.is_workday,
+                    ))
+                    created += 1
+                elif record.description != item.description or record.is_workday != item.is_workday:
+                    record.description = item.description
+                    record.is_workday = item.is_workday
+                    record.is_weekend = day.weekday() >= 5
+                    updated += 1
+                else:
+                    unchanged += 1
+            if replace:
+                for day, record in existing.items():
+                    if day in imported:
+                        continue
+                    if record.is_workday != _default_is_workday(day):
+                        changed_dates.add(day)
+                    db.delete(record)
+                    deleted += 1
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        user_ids = HolidayService.find_affected_users(db, changed_dates)
+        HolidayService.enqueue_schedule_recompute(user_ids)
+        return {
+            "total": len(items),
+            "created": created,
+            "updated": updated,
+            "deleted": deleted,
+            "unchanged": unchanged,
+            "changed_dates": sorted(changed_dates),
+            "affected_users": len(user_ids),
+        }
+
+    @staticmethod
+    def find_affected_users(db: Session, changed_dates: Iterable[date]) -> set[int]:
+        """
+        排期队列覆盖任一变化日期的认领人。
+        按人员的整体队列区间判断（今天或最早排期开始日中较早者，到最晚排期结束日），
+        而不是逐条排期：串行任务之间的间隙（如周五结束、下周一开始，其间周六改为上班）
+        或今天到第一条排期之间的日期变化同样会使后续任务整体前移/后移。
+        """
+        changed = sorted(set(changed_dates))
+        if not changed:
+            return set()
+        today = date.today()
+        rows = (
+            db.query(
+                Task.assignee_id,
+                func.min(TaskSchedule.start_date).label("first_start"),
+                func.max(TaskSchedule.end_date).label("last_end"),
+            )
+            .join(TaskSchedule, TaskSchedule.task_id == Task.id)
+            .filter(
+                Task.assignee_id.isnot(None),
+                Task.status.in_(list(ACTIVE_STATUSES)),
+            )
+            .group_by(Task.assignee_id)
+            .having(func.max(TaskSchedule.end_date) >= changed[0])
+            .all()
+        )
+        users = set()
+        for row in rows:
+            i = bisect_left(changed, min(row.first_start, today))
+            if i < len(changed) and changed[i] <= row.last_end:
+                users.add(row.assignee_id)
+        return users
+
+    @staticmethod
+    def get_year_calendar(db: Session, year: int) -> dict:
+        """年度工作日历：各月工作日数、节假日与调休上班日"""
+        calendar = ScheduleService._load_calendar(db, date(year, 1, 1), date(year, 12, 31))
+        months = []
+        for month in range(1, 13):
+            first = date(year, month, 1)
+            last = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+            months.append({
+                "month": month,
+                "workdays": calendar.workdays_count(first, last),
+                "holidays": sorted(d for d in calendar.holidays if d.month == month and d.weekday() < 5),
+                "make_up_workdays": sorted(d for d in calendar.extra_workdays if d.month == month),
+            })
+        return {
+            "year": year,
+            "workdays": sum(m["workdays"] for m in months),
+            "holidays": sum(len(m["holidays"]) for m in months),
+            "make_up_workdays": len(calendar.extra_workdays),
+            "months": months,
+        }
+
+    # ------------------------------------------------------------------
+    # 后台排期重算
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def enqueue_schedule_recompute(user_ids: Iterable[int]) -> None:
+        """登记需要重算排期的人员（重复登记合并），由后台线程分批处理"""
+        global _worker
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        with _condition:
+            if _stopping:
+                return
+            _pending_users.update(user_ids)
+            if _worker is None or not _worker.is_alive():
+                _worker = threading.Thread(
+                    target=HolidayService._run, name="holiday-schedule-recompute", daemon=True
+                )
+                _worker.start()
+            _condition.notify()
+
+    @staticmethod
+    def _recompute(user_ids: List[int]) -> int:
+        """在独立会话中重算一批人员的排期，返回成功的人数"""
+        done = 0
+        db = SessionLocal()
+        try:
+            for user_id in user_ids:
+                try:
+                    ScheduleService.recalculate_user_schedules(db, user_id)
+                    done += 1
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"节假日变更后重算排期失败: user_id={user_id}: {e}")
+        finally:
+            db.close()
+        return done
+
+    @staticmethod
+    def _run() -> None:
+        while True:
+            with _condition:
+                while not _pending_users and not _stopping:
+                    _condition.wait()
+                if _stopping:
+                    if _pending_users:
+                        logger.info(f"应用退出，{len(_pending_users)} 人的排期未重算")
+                    return
+                batch = sorted(_pending_users)[:settings.HOLIDAY_RECOMPUTE_BATCH_SIZE]
+                _pending_users.difference_update(batch)
+            HolidayService._recompute(batch)
+            with _condition:
+                # 批次之间暂停（新登记不打断暂停），退出时立即唤醒
+                resume_at = time.monotonic() + settings.HOLIDAY_RECOMPUTE_PAUSE_SECONDS
+                while _pending_users and not _stopping and time.monotonic() < resume_at:
+                    _condition.wait(timeout=resume_at - time.monotonic())
+
+    @staticmethod
+    def pending_recompute_count() -> int:
+        """尚未重算排期的人数"""
+        with _condition:
+            return len(_pending_users)
+
+    @staticmethod
+    def shutdown(timeout: float = 5.0) -> None:
+        """停止重算线程（应用退出时调用；未处理的人员在下次排期变更时重算）"""
+        global _stopping
+        with _condition:
+            _stopping = True
+            _condition.notify_all()
+            worker = _worker
+        if worker is not None:
+            worker.join(timeout=timeout)
@@ -0,0 +1,401 @@
+"""后台任务服务
+
+导出等耗时操作不再在请求内同步执行：
+1. 提交：写入 jobs 表并交给后台线程池执行，立即返回任务ID
+2. 轮询：查询状态与进度（0-100）
+3. 下载：任务完成后下载结果文件
+
+相同类型、相同参数的任务在结果有效期内直接复用已有结果，执行中的任务不重复提交。
+
+多进程部署时，任务记录所属进程（主机名:进程号），所属进程定期刷新排队/执行中任务的心跳；
+只有所属进程已退出（同一主机上进程不存在）或心跳过期的任务才会被判定为中断。
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.db.session import SessionLocal
+from app.models.job import Job, JobStatus
+from app.utils.paths import get_job_results_dir
+
+logger = logging.getLogger(__name__)
+
+# 进度回调：接收 0-100 的进度值
+ProgressCallback = Callable[[int], None]
+# 任务处理函数：(数据库会话, 参数, 进度回调) -> (结果文件内容, 下载文件名)
+JobHandler = Callable[[Session, dict, ProgressCallback], Tuple[io.BytesIO, str]]
+
+_handlers: dict[str, JobHandler] = {}
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.JOB_WORKERS),
+    thread_name_prefix="job",
+)
+
+# 进度至少变化该值才写库，避免频繁提交
+_PROGRESS_STEP = 5
+
+_ACTIVE_STATUSES = [JobStatus.PENDING.value, JobStatus.RUNNING.value]
+
+# 心跳线程
+_heartbeat_thread: Optional[threading.Thread] = None
+_heartbeat_stop = threading.Event()
+_heartbeat_lock = threading.Lock()
+
+
+def _current_owner() -> str:
+    """当前进程标识（每次调用时取进程号，兼容 fork 出的工作进程）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: str) -> bool:
+    """判断任务所属进程是否仍在运行；其他主机的进程无法判断，视为存活（由心跳判断）"""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class _ProgressReporter:
+    """进度回调（使用独立会话更新，不影响任务处理函数自身的会话）"""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.last = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, progress: int) -> None:
+        progress = max(0, min(99, int(progress)))
+        with self._lock:
+            if progress - self.last < _PROGRESS_STEP:
+                return
+            self.last = progress
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == self.job_id).update(
+                {Job.progress: progress, Job.heartbeat_at: datetime.now()}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"更新后台任务进度失败: job_id={self.job_id}: {e}")
+        finally:
+            db.close()
+
+
+class JobService:
+    """后台任务服务类"""
+
+    @staticmethod
+    def register_handler(job_type: str, handler: JobHandler) -> None:
+        """注册任务处理函数"""
+        _handlers[job_type] = handler
+
+    @staticmethod
+    def compute_params_hash(job_type: str, params: dict[str, Any]) -> str:
+        """任务类型 + 参数的哈希（参数按键排序，保证相同参数得到相同哈希）"""
+        payload = json.dumps(
+            {"job_type": job_type, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _result_file(job: Job) -> Optional[Path]:
+        if not job.result_path:
+            return None
+        return get_job_results_dir() / job.result_path
+
+    # ------------------------------------------------------------------
+    # 提交 / 查询
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def submit(db: Session, job_type: str, params: dict[str, Any], user_id: int) -> Job:
+        """
+        提交后台任务。
+        - 有效期内已有相同参数的成功结果：直接返回（其他用户的结果复制为自己的任务记录）
+        - 当前用户已有相同参数的排队/执行中任务：返回该任务
+        - 否则新建任务并提交到线程池
+        """
+        if job_type not in _handlers:
+            raise ValidationError(f"不支持的任务类型: {job_type}")
+
+        JobService.purge_expired(db)
+
+        params_hash = JobService.compute_params_hash(job_type, params)
+        now = datetime.now()
+
+        finished = db.query(Job).filter(
+            Job.params_hash == params_hash,
+            Job.status == JobStatus.SUCCEEDED.value,
+            Job.expires_at > now,
+        ).order_by(Job.id.desc()).first()
+        if finished:
+            result_file = JobService._result_file(finished)
+            if result_file and result_file.is_file():
+                if finished.created_by == user_id:
+                    return finished
+                job = Job(
+                    job_type=job_type,
+                    params=finished.params,
+                    params_hash=params_hash,
+                    status=JobStatus.SUCCEEDED.value,
+                    progress=100,
+                    result_path=finished.result_path,
+                    result_filename=finished.result_filename,
+                    created_by=user_id,
+                    started_at=now,
+                    finished_at=now,
+                    expires_at=finished.expires_at,
+                )
+                db.add(job)
+                db.commit()
+                db.refresh(job)
+                return job
+
+        in_flight = db.query(Job).filter(
+            Job.params_hash == params_hash,
+            Job.created_by == user_id,
+            Job.status.in_(_ACTIVE_STATUSES),
+        ).order_by(Job.id.desc()).first()
+        if in_flight:
+            return in_flight
+
+        job = Job(
+            job_type=job_type,
+            params=json.dumps(params, ensure_ascii=False, default=str),
+            params_hash=params_hash,
+            status=JobStatus.PENDING.value,
+            progress=0,
+            created_by=user_id,
+            owner=_current_owner(),
+            heartbeat_at=now,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        JobService._ensure_heartbeat()
+
+        try:
+            _executor.submit(JobService._run, job.id)
+        except RuntimeError:
+            # 线程池已关闭（进程退出中）
+            job.status = JobStatus.FAILED.value
+            job.error_message = "服务正在停止，请稍后重试"
+            job.finished_at = datetime.now()
+            db.commit()
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: int, user_id: int, is_admin: bool = False) -> Job:
+        """获取任务（仅创建者或系统管理员可查看）"""
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise NotFoundError("后台任务", str(job_id))
+        if job.created_by != user_id and not is_admin:
+            raise PermissionDeniedError("无权限查看该后台任务")
+        return job
+
+    @staticmethod
+    def get_result_file(job: Job) -> Path:
+        """获取已完成任务的结果文件"""
+        if job.status != JobStatus.SUCCEEDED.value:
+            raise ValidationError("任务尚未完成")
+        if job.expires_at and job.expires_at <= datetime.now():
+            raise ValidationError("结果文件已过期，请重新导出")
+        result_file = JobService._result_file(job)
+        if not result_file or not result_file.is_file():
+            raise ValidationError("结果文件已过期，请重新导出")
+        return result_file
+
+    # ------------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _run(job_id: int) -> None:
+        """在线程池中执行任务（使用独立数据库会话）"""
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job or job.status != JobStatus.PENDING.value:
+                return
+            job.status = JobStatus.RUNNING.value
+            job.started_at = datetime.now()
+            job.owner = _current_owner()
+            job.heartbeat_at = job.started_at
+            db.commit()
+
+            handler = _handlers[job.job_type]
+            output, filename = handler(db, json.loads(job.params), _ProgressReporter(job_id))
+
+            suffix = Path(filename).suffix or ".bin"
+            result_name = f"{job.id}_{job.params_hash[:16]}{suffix}"
+            target = get_job_results_dir() / result_name
+            tmp_path = target.with_name(f".{result_name}.tmp")
+            tmp_path.write_bytes(output.getvalue())
+            os.replace(tmp_path, target)
+
+            finished_at = datetime.now()
+            job.status = JobStatus.SUCCEEDED.value
+            job.progress = 100
+            job.result_path = result_name
+            job.result_filename = filename
+            job.finished_at = finished_at
+            job.expires_at = finished_at + timedelta(minutes=settings.JOB_RESULT_TTL_MINUTES)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"后台任务执行失败: job_id={job_id}: {e}", exc_info=True)
+            db.rollback()
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if job:
+                job.status = JobStatus.FAILED.value
+                job.error_message = str(e)[:2000]
+                job.finished_at = datetime.now()
+                db.commit()
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # 清理
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """删除已过期的结果文件及任务记录，返回清理的记录数"""
+        now = datetime.now()
+        expired = db.query(Job).filter(
+            or_(
+                Job.expires_at <= now,
+                # 失败任务只保留一个有效期，便于前端查看失败原因
+                (Job.status == JobStatus.FAILED.value)
+                & (Job.finished_at <= now - timedelta(minutes=settings.JOB_RESULT_TTL_MINUTES)),
+            )
+        ).all()
+        if not expired:
+            return 0
+
+        results_dir = get_job_results_dir()
+        for path in {job.result_path for job in expired if job.result_path}:
+            try:
+                (results_dir / path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"删除后台任务结果文件失败: {path}: {e}")
+        for job in expired:
+            db.delete(job)
+        db.commit()
+        return len(expired)
+
+    @staticmethod
+    def fail_interrupted(db: Session) -> int:
+        """
+        将已中断的排队/执行中任务标记为失败（应用启动时及心跳线程中调用）。
+        中断：所属进程在本机且已退出，或心跳超过 JOB_STALE_SECONDS 未刷新（含未记录心跳的旧任务）；
+        本进程及其他存活进程的任务不受影响。
+        """
+        now = datetime.now()
+        stale_before = now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        current = _current_owner()
+        candidates = db.query(Job.id, Job.owner, Job.heartbeat_at).filter(
+            Job.status.in_(_ACTIVE_STATUSES)
+        ).all()
+        dead_ids = []
+        stale_ids = []
+        for job_id, owner, heartbeat_at in candidates:
+            if owner == current:
+                continue
+            if owner and not _owner_alive(owner):
+                dead_ids.append(job_id)
+            elif heartbeat_at is None or heartbeat_at < stale_before:
+                stale_ids.append(job_id)
+        if not dead_ids and not stale_ids:
+            return 0
+
+        conditions = []
+        if dead_ids:
+            conditions.append(Job.id.in_(dead_ids))
+        if stale_ids:
+            # 条件更新：判定后心跳又被刷新的任务不受影响
+            conditions.append(
+                Job.id.in_(stale_ids) & or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale_before)
+            )
+        count = db.query(Job).filter(
+            Job.status.in_(_ACTIVE_STATUSES),
+            or_(*conditions),
+        ).update(
+            {
+                Job.status: JobStatus.FAILED.value,
+                Job.error_message: "服务重启，任务已中断，请重新提交",
+                Job.finished_at: now,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return count
+
+    # ------------------------------------------------------------------
+    # 心跳
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ensure_heartbeat() -> None:
+        """启动心跳线程（首次提交任务时）"""
+        global _heartbeat_thread
+        with _heartbeat_lock:
+            if _heartbeat_stop.is_set():
+                return
+            if _heartbeat_thread is None or not _heartbeat_thread.is_alive():
+                _heartbeat_thread = threading.Thread(
+                    target=JobService._heartbeat_loop, name="job-heartbeat", daemon=True
+                )
+                _heartbeat_thread.start()
+
+    @staticmethod
+    def heartbeat() -> None:
+        """刷新本进程排队/执行中任务的心跳，并回收其他进程已中断的任务"""
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(
+                Job.owner == _current_owner(),
+                Job.status.in_(_ACTIVE_STATUSES),
+            ).update({Job.heartbeat_at: datetime.now()}, synchronize_session=False)
+            db.commit()
+            JobService.fail_interrupted(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"刷新后台任务心跳失败: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _heartbeat_loop() -> None:
+        while not _heartbeat_stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            JobService.heartbeat()
+
+    @staticmethod
+    def shutdown() -> None:
+        """关闭线程池与心跳线程（应用退出时调用），不等待未开始的任务"""
+        _heartbeat_stop.set()
+        _executor.shutdown(wait=False, cancel_futures=True)
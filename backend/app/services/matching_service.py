@@ -0,0 +1,204 @@
+"""开发人员匹配服务
+
+为任务推荐合适的开发人员（派发对象或配合人），综合三项因素排序：
+- 技能匹配度：任务所需技能与人员技能的重合度，按熟练度加权
+- 序列等级：人员当前序列的单价（相对候选人中的最高单价）
+- 可开工时间：基于进程内全员排期占用索引计算的最早可开工日期（满足并发上限）
+
+两种模式：
+- 派发（任务已发布）：任务按优先级插入候选人串行队列，从队列位置起找满足并发上限的最早开工日
+- 配合（任务已认领/进行中）：排期固定为任务排期，判断加入后并发数是否超限
+
+数据一次批量加载（查询次数固定，与人员数、任务数无关）。
+"""
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.models.skill import Skill, Proficiency
+from app.models.task import Task, TaskStatus
+from app.models.task_collaborator import TaskCollaborator
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.models.user_sequence import UserSequence
+from app.services.occupancy_service import OccupancyService
+from app.services.schedule_engine import ACTIVE_STATUSES, MAX_CONCURRENT_TASKS, queue_key
+from app.services.schedule_service import ScheduleService
+
+# 熟练度权重
+PROFICIENCY_WEIGHTS = {
+    Proficiency.FAMILIAR.value: Decimal("0.6"),
+    Proficiency.PROFICIENT.value: Decimal("0.8"),
+    Proficiency.EXPERT.value: Decimal("1.0"),
+}
+
+# 综合得分权重：技能、可开工时间、序列等级
+SKILL_WEIGHT = Decimal("0.6")
+AVAILABILITY_WEIGHT = Decimal("0.3")
+LEVEL_WEIGHT = Decimal("0.1")
+
+# 每等待该数量的工作日，可开工得分减半
+AVAILABILITY_HALF_LIFE_WORKDAYS = 5
+
+
+def parse_required_skills(required_skills: Optional[str]) -> list[str]:
+    """解析任务所需技能（JSON 数组或逗号分隔），返回去重后的小写技能名"""
+    if not required_skills:
+        return []
+    names = None
+    text = required_skills.strip()
+    if text.startswith("["):
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, list):
+                names = [str(item) for item in parsed]
+        except ValueError:
+            names = None
+    if names is None:
+        names = text.split(",")
+    result = []
+    for name in names:
+        name = name.strip().lower()
+        if name and name not in result:
+            result.append(name)
+    return result
+
+
+class MatchingService:
+    """开发人员匹配服务类"""
+
+    @staticmethod
+    def rank_developers(
+        db: Session,
+        task_id: int,
+        current_user_id: int,
+        current_user_role: str,
+        limit: int = 20,
+    ) -> dict:
+        """为任务推荐开发人员，按综合得分从高到低返回前 limit 名"""
+        task = db.query(Task).filter(Task.id == task_id).first()
+        if not task:
+            raise NotFoundError("任务", str(task_id))
+
+        is_manager = current_user_role in ["project_manager", "system_admin"]
+        if task.status == TaskStatus.PUBLISHED.value:
+            mode = "assign"
+            if not is_manager:
+                raise PermissionDeniedError("只有项目经理可以为任务匹配派发对象")
+        elif task.status in ACTIVE_STATUSES:
+            mode = "collaborator"
+            if not is_manager and task.assignee_id != current_user_id:
+                raise PermissionDeniedError("只有任务认领人或项目经理可以为任务匹配配合人")
+        else:
+            raise ValidationError("只有已发布（派发）或已认领/进行中（配合）的任务可以匹配开发人员")
+
+        developers = db.query(User.id, User.username, User.full_name).filter(
+            User.role == "developer",
+            User.is_active == True,
+        ).all()
+        developer_ids = [d.id for d in developers]
+        skills: dict[int, dict[str, str]] = {}
+        for row in db.query(Skill.user_id, Skill.name, Skill.proficiency).filter(Skill.user_id.in_(developer_ids)):
+            skills.setdefault(row.user_id, {})[row.name.strip().lower()] = row.proficiency
+        # 每人取最新的序列记录（与能力洞察一致）
+        sequences: dict[int, tuple] = {}
+        for row in db.query(
+            UserSequence.user_id, UserSequence.level, UserSequence.unit_price, UserSequence.created_at
+        ).filter(UserSequence.user_id.in_(developer_ids)):
+            current = sequences.get(row.user_id)
+            if current is None or row.created_at > current[2]:
+                sequences[row.user_id] = (row.level, row.unit_price, row.created_at)
+
+        index = OccupancyService.get_index(db)
+        today = date.today()
+        calendar = ScheduleService._load_calendar(db, today)
+
+        excluded: set[int] = set()
+        schedule = None
+        if mode == "collaborator":
+            schedule = db.query(TaskSchedule).filter(TaskSchedule.task_id == task_id).first()
+            excluded.add(task.assignee_id)
+            excluded.update(row[0] for row in db.query(TaskCollaborator.user_id).filter(
+                TaskCollaborator.task_id == task_id
+            ))
+
+        required = parse_required_skills(task.required_skills)
+        key = queue_key(TaskStatus.CLAIMED.value, task.priority, task.created_at, task.id)
+        max_price = max((seq[1] for seq in sequences.values()), default=Decimal("0"))
+
+        candidates = []
+        for developer in developers:
+            if developer.id in excluded:
+                continue
+            user_skills = skills.get(developer.id, {})
+            matched = [name for name in required if name in user_skills]
+            skill_score = (
+                sum((PROFICIENCY_WEIGHTS.get(user_skills[name], Decimal("0.6")) for name in matched), Decimal("0")) / len(required)
+                if required else Decimal("0")
+            )
+            level, unit_price, _ = sequences.get(developer.id, (None, None, None))
+            level_score = unit_price / max_price if unit_price and max_price else Decimal("0")
+
+            displaced = 0
+            feasible = True
+            if mode == "assign":
+                queue_start, displaced = index.queue_start(developer.id, key, calendar, today)
+                start, end = index.earliest_feasible_start(
+                    developer.id, calendar, queue_start, task.estimated_man_days, exclude_task_id=task.id
+                )
+                concurrent = index.overlap_count(developer.id, start, end, exclude_task_id=task.id)
+            elif schedule is not None:
+                start, end = schedule.start_date, schedule.end_date
+                concurrent = index.overlap_count(developer.id, start, end, exclude_task_id=task.id)
+                feasible = concurrent < MAX_CONCURRENT_TASKS
+            else:
+                start = end = None
+                concurrent = 0
+
+            if start is None or start <= today:
+                wait_workdays = 0
+            else:
+                wait_workdays = calendar.workdays_count(today, start) - 1
+            availability_score = (
+                Decimal(0.5 ** (wait_workdays / AVAILABILITY_HALF_LIFE_WORKDAYS)) if feasible else Decimal("0")
+            )
+            match_score = (
+                SKILL_WEIGHT * skill_score
+                + AVAILABILITY_WEIGHT * availability_score
+                + LEVEL_WEIGHT * level_score
+            )
+            candidates.append({
+                "user_id": developer.id,
+                "username": developer.username,
+                "full_name": developer.full_name,
+                "sequence_level": level,
+                "unit_price": unit_price,
+                "matched_skills": matched,
+                "missing_skills": [name for name in required if name not in user_skills],
+                "skill_score": round(skill_score, 3),
+                "feasible": feasible,
+                "earliest_start": start,
+                "earliest_end": end,
+                "wait_workdays": wait_workdays,
+                "concurrent_tasks": concurrent,
+                "displaced_tasks": displaced,
+                "match_score": round(match_score, 3),
+            })
+
+        candidates.sort(key=lambda c: (
+            not c["feasible"],
+            -c["match_score"],
+            c["earliest_start"] or date.max,
+            c["user_id"],
+        ))
+        return {
+            "task_id": task.id,
+            "mode": mode,
+            "required_skills": required,
+            "total": len(candidates),
+            "candidates": candidates[:limit],
+        }
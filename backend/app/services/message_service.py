@@ -1,16 +1,124 @@
 """消息通知服务"""
+import logging
+from sqlalchemy import case, func, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional, Tuple
 from datetime import datetime
 
-from app.models.message import Message, MessageType
+from app.models.message import Message, MessageType, MessageCounter
 from app.models.task import Task, TaskStatus
 from app.core.exceptions import NotFoundError, PermissionDeniedError
+from app.utils.pubsub import PubSub
+
+logger = logging.getLogger(__name__)
+
+# 消息推送事件（主题为用户ID）
+EVENT_MESSAGE_CREATED = "message.created"
+EVENT_UNREAD_COUNT = "unread_count"
+
+message_pubsub = PubSub()
+
+# 批量创建消息时每条 INSERT 语句的最大行数
+_BULK_INSERT_CHUNK = 500
 
 
 class MessageService:
     """消息通知服务类"""
 
+    # ------------------------------------------------------------------
+    # 未读数/总数计数维护（在消息变更 flush 之后、提交之前调用）
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _count_from_messages(db: Session, user_id: int) -> Tuple[int, int]:
+        """按消息表重新统计 (未读数, 总数)"""
+        unread, total = db.query(
+            func.sum(case((Message.is_read == False, 1), else_=0)),
+            func.count(Message.id),
+        ).filter(Message.user_id == user_id).one()
+        return int(unread or 0), int(total or 0)
+
+    @staticmethod
+    def _adjust_counter(db: Session, user_id: int, unread_delta: int = 0, total_delta: int = 0) -> None:
+        """
+        增量调整用户计数。
+        计数记录不存在时按消息表（已包含本次变更）初始化，不再叠加增量。
+        """
+        if not unread_delta and not total_delta:
+            return
+        updated = db.query(MessageCounter).filter(MessageCounter.user_id == user_id).update(
+            {
+                MessageCounter.unread_count: MessageCounter.unread_count + unread_delta,
+                MessageCounter.total_count: MessageCounter.total_count + total_delta,
+            },
+            synchronize_session=False,
+        )
+        if updated:
+            return
+        unread, total = MessageService._count_from_messages(db, user_id)
+        try:
+            with db.begin_nested():
+                db.add(MessageCounter(user_id=user_id, unread_count=unread, total_count=total))
+        except IntegrityError:
+            # 并发初始化：其他事务已创建计数（不含本事务未提交的变更），改为叠加增量
+            db.query(MessageCounter).filter(MessageCounter.user_id == user_id).update(
+                {
+                    MessageCounter.unread_count: MessageCounter.unread_count + unread_delta,
+                    MessageCounter.total_count: MessageCounter.total_count + total_delta,
+                },
+                synchronize_session=False,
+            )
+
+    @staticmethod
+    def _get_counter(db: Session, user_id: int) -> MessageCounter:
+        """获取用户计数（不存在时按消息表初始化）"""
+        counter = db.query(MessageCounter).filter(MessageCounter.user_id == user_id).first()
+        if counter:
+            return counter
+        unread, total = MessageService._count_from_messages(db, user_id)
+        counter = MessageCounter(user_id=user_id, unread_count=unread, total_count=total)
+        db.add(counter)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            counter = db.query(MessageCounter).filter(MessageCounter.user_id == user_id).first()
+        return counter
+
+    # ------------------------------------------------------------------
+    # 推送
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _publish(user_id: int, event: str, data: dict) -> None:
+        """向该用户的推送连接发布事件（无订阅时直接跳过）"""
+        if not message_pubsub.has_subscribers(user_id):
+            return
+        try:
+            message_pubsub.publish(user_id, {"event": event, "data": data})
+        except Exception as e:
+            logger.warning(f"消息推送失败: user_id={user_id}: {e}")
+
+    @staticmethod
+    def _publish_unread_count(db: Session, user_id: int) -> None:
+        if not message_pubsub.has_subscribers(user_id):
+            return
+        MessageService._publish(
+            user_id, EVENT_UNREAD_COUNT, {"unread_count": MessageService.get_unread_count(db, user_id)}
+        )
+
+    @staticmethod
+    def _publish_created(db: Session, message: Message) -> None:
+        if not message_pubsub.has_subscribers(message.user_id):
+            return
+        from app.schemas.message import MessageResponse
+
+        MessageService._publish(message.user_id, EVENT_MESSAGE_CREATED, {
+            "message": MessageResponse.model_validate(message).model_dump(mode="json"),
+            "unread_count": MessageService.get_unread_count(db, message.user_id),
+        })
+
     @staticmethod
     def create_message(
         db: Session,
@@ -30,98 +138,206 @@ class MessageService:
             is_read=False
         )
         db.add(message)
+        db.flush()
+        MessageService._adjust_counter(db, user_id, unread_delta=1, total_delta=1)
         db.commit()
         db.refresh(message)
+        MessageService._publish_created(db, message)
         return message
 
     @staticmethod
-    def create_task_status_change_message(
+    def create_messages_bulk(
         db: Session,
-        task: Task,
-        old_status: Optional[str] = None,
-        new_status: str = None
-    ) -> Optional[Message]:
-        """创建任务状态变更消息"""
-        if not task:
-            return None
+        user_ids: List[int],
+        title: str,
+        content: Optional[str] = None,
+        message_type: str = MessageType.TASK_STATUS_CHANGE.value,
+        related_task_id: Optional[int] = None
+    ) -> int:
+        """
+        向多个用户批量创建同一条消息（批量 INSERT + 批量更新计数，一次提交）。
+        返回创建的消息数。
+        """
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid))
+        if not user_ids:
+            return 0
+
+        for start in range(0, len(user_ids), _BULK_INSERT_CHUNK):
+            chunk = user_ids[start:start + _BULK_INSERT_CHUNK]
+            db.execute(insert(Message), [
+                {
+                    "user_id": uid,
+                    "title": title,
+                    "content": content,
+                    "type": message_type,
+                    "related_task_id": related_task_id,
+                    "is_read": False,
+                }
+                for uid in chunk
+            ])
 
-        # 确定接收消息的用户
-        recipient_id = None
+            counted = {
+                row[0]
+                for row in db.query(MessageCounter.user_id).filter(MessageCounter.user_id.in_(chunk)).all()
+            }
+            if counted:
+                db.query(MessageCounter).filter(MessageCounter.user_id.in_(counted)).update(
+                    {
+                        MessageCounter.unread_count: MessageCounter.unread_count + 1,
+                        MessageCounter.total_count: MessageCounter.total_count + 1,
+                    },
+                    synchronize_session=False,
+                )
+            missing = [uid for uid in chunk if uid not in counted]
+            if missing:
+                # 计数不存在时按消息表（已包含本次插入）批量初始化
+                counts = db.query(
+                    Message.user_id,
+                    func.sum(case((Message.is_read == False, 1), else_=0)),
+                    func.count(Message.id),
+                ).filter(Message.user_id.in_(missing)).group_by(Message.user_id).all()
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(MessageCounter), [
+                            {"user_id": uid, "unread_count": int(unread or 0), "total_count": int(total or 0)}
+                            for uid, unread, total in counts
+                        ])
+                except IntegrityError:
+                    # 并发初始化：逐个用户处理
+                    for uid in missing:
+                        MessageService._adjust_counter(db, uid, unread_delta=1, total_delta=1)
+
+        db.commit()
+
+        for uid in user_ids:
+            if message_pubsub.has_subscribers(uid):
+                MessageService._publish(uid, EVENT_MESSAGE_CREATED, {
+                    "message": {
+                        "title": title,
+                        "content": content,
+                        "type": message_type,
+                        "related_task_id": related_task_id,
+                    },
+                    "unread_count": MessageService.get_unread_count(db, uid),
+                })
+        return len(user_ids)
+
+    @staticmethod
+    def _build_task_status_change(
+        db: Session,
+        task: Task,
+        old_status: Optional[str],
+        new_status: Optional[str]
+    ) -> Tuple[List[int], str, str]:
+        """确定任务状态变更消息的接收人、标题与内容；无需通知时接收人为空"""
+        recipient_ids: List[int] = []
         title = ""
         content = ""
 
         if new_status == TaskStatus.PUBLISHED.value:
-            # 任务发布：通知所有开发人员（这里简化处理，实际可以通知所有开发人员）
-            # 暂时不创建消息，因为不知道具体通知谁
-            return None
+            # 任务发布/重新开放：通知所有在职开发人员（创建者除外）
+            from app.models.user import User
+            from app.models.role import Role, RoleType
+
+            recipient_ids = [
+                row[0]
+                for row in db.query(User.id).filter(
+                    User.is_active == True,
+                    User.id != task.creator_id,
+                    User.roles.any(Role.code == RoleType.DEVELOPER.value),
+                ).all()
+            ]
+            if old_status in (None, TaskStatus.DRAFT.value):
+                title = "新任务发布"
+                content = f"任务《{task.title}》已发布，欢迎认领。"
+            else:
+                title = "任务重新开放认领"
+                content = f"任务《{task.title}》已重新开放，欢迎认领。"
 
         elif new_status == TaskStatus.PENDING_EVAL.value:
             # 任务派发给开发人员：通知被派发的开发人员
             if task.assignee_id:
-                recipient_id = task.assignee_id
+                recipient_ids = [task.assignee_id]
                 title = "新任务待评估"
                 content = f"任务《{task.title}》已派发给您，请及时评估。"
-            else:
-                return None
 
         elif new_status == TaskStatus.CLAIMED.value:
             # 任务被认领：通知项目经理
             if task.creator_id:
-                recipient_id = task.creator_id
+                recipient_ids = [task.creator_id]
                 assignee_name = task.assignee.full_name or task.assignee.username if task.assignee else "未知"
                 title = "任务已被认领"
                 content = f"任务《{task.title}》已被 {assignee_name} 认领。"
-            else:
-                return None
 
         elif new_status == TaskStatus.IN_PROGRESS.value:
             # 任务开始：通知项目经理
             if task.creator_id:
-                recipient_id = task.creator_id
+                recipient_ids = [task.creator_id]
                 assignee_name = task.assignee.full_name or task.assignee.username if task.assignee else "未知"
                 title = "任务已开始"
                 content = f"任务《{task.title}》已由 {assignee_name} 开始执行。"
-            else:
-                return None
 
         elif new_status == TaskStatus.SUBMITTED.value:
             # 任务提交：通知项目经理
             if task.creator_id:
-                recipient_id = task.creator_id
+                recipient_ids = [task.creator_id]
                 assignee_name = task.assignee.full_name or task.assignee.username if task.assignee else "未知"
                 title = "任务已提交，等待确认"
                 content = f"任务《{task.title}》已由 {assignee_name} 提交，请及时确认。"
-            else:
-                return None
 
         elif new_status == TaskStatus.CONFIRMED.value:
             # 任务确认：通知开发人员
             if task.assignee_id:
-                recipient_id = task.assignee_id
+                recipient_ids = [task.assignee_id]
                 title = "任务已确认"
                 content = f"您提交的任务《{task.title}》已被确认。"
-            else:
-                return None
 
         elif new_status == TaskStatus.ARCHIVED.value:
             # 任务归档：通知相关用户（创建者和认领者）
             # 这里简化处理，只通知创建者
             if task.creator_id:
-                recipient_id = task.creator_id
+                recipient_ids = [task.creator_id]
                 title = "任务已归档"
                 content = f"任务《{task.title}》已被归档。"
-            else:
-                return None
-
-        if recipient_id:
-            return MessageService.create_message(
-                db=db,
-                user_id=recipient_id,
-                title=title,
-                content=content,
-                message_type=MessageType.TASK_STATUS_CHANGE.value,
-                related_task_id=task.id
-            )
+
+        return recipient_ids, title, content
+
+    @staticmethod
+    def deliver_task_status_change(
+        db: Session,
+        task: Task,
+        old_status: Optional[str] = None,
+        new_status: str = None
+    ) -> int:
+        """同步创建任务状态变更消息（由通知分发线程调用），返回创建的消息数"""
+        if not task:
+            return 0
+        recipient_ids, title, content = MessageService._build_task_status_change(db, task, old_status, new_status)
+        return MessageService.create_messages_bulk(
+            db,
+            recipient_ids,
+            title=title,
+            content=content,
+            message_type=MessageType.TASK_STATUS_CHANGE.value,
+            related_task_id=task.id
+        )
+
+    @staticmethod
+    def create_task_status_change_message(
+        db: Session,
+        task: Task,
+        old_status: Optional[str] = None,
+        new_status: str = None
+    ) -> None:
+        """
+        创建任务状态变更消息。
+        消息在后台通知分发线程中批量写入，短时间内同一任务的同一状态变更会被合并。
+        """
+        if not task:
+            return None
+        from app.services.notification_service import NotificationService
+
+        NotificationService.enqueue_task_status_change(task.id, old_status, new_status)
         return None
 
     @staticmethod
@@ -149,9 +365,13 @@ class MessageService:
         message_type: Optional[str] = None,
         is_read: Optional[bool] = None,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        before_id: Optional[int] = None,
     ) -> Tuple[List[Message], int]:
-        """获取用户消息列表"""
+        """
+        获取用户消息列表。
+        未按类型筛选时总数直接取自计数表；传入 before_id 时按消息ID游标翻页，避免大 OFFSET。
+        """
         query = db.query(Message).filter(Message.user_id == user_id)
 
         if message_type:
@@ -160,33 +380,56 @@ class MessageService:
         if is_read is not None:
             query = query.filter(Message.is_read == is_read)
 
-        total = query.count()
-        messages = query.order_by(Message.created_at.desc()).offset(skip).limit(limit).all()
+        if message_type:
+            total = query.count()
+        else:
+            counter = MessageService._get_counter(db, user_id)
+            if is_read is None:
+                total = counter.total_count
+            elif is_read:
+                total = counter.total_count - counter.unread_count
+            else:
+                total = counter.unread_count
+
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+            skip = 0
+        messages = query.order_by(Message.created_at.desc(), Message.id.desc()).offset(skip).limit(limit).all()
 
         return messages, total
 
     @staticmethod
     def get_unread_count(db: Session, user_id: int) -> int:
-        """获取用户未读消息数量"""
-        return db.query(Message).filter(
-            Message.user_id == user_id,
-            Message.is_read == False
-        ).count()
+        """获取用户未读消息数量（读取维护好的计数）"""
+        return MessageService._get_counter(db, user_id).unread_count
 
     @staticmethod
     def mark_as_read(db: Session, message_id: int, user_id: int) -> Message:
-        """标记消息为已读"""
+        """
+        标记消息为已读。
+        以 is_read == False 为条件更新，只有真正完成"未读→已读"转换的请求才扣减未读计数，
+        避免并发重复标记把计数扣成负数。
+        """
+        updated = db.query(Message).filter(
+            Message.id == message_id,
+            Message.user_id == user_id,
+            Message.is_read == False
+        ).update({Message.is_read: True}, synchronize_session=False)
+
+        if updated == 1:
+            MessageService._adjust_counter(db, user_id, unread_delta=-1)
+            db.commit()
+
         message = db.query(Message).filter(
             Message.id == message_id,
             Message.user_id == user_id
-        ).first()
+        ).populate_existing().first()
 
         if not message:
             raise NotFoundError("消息", str(message_id))
 
-        message.is_read = True
-        db.commit()
-        db.refresh(message)
+        if updated == 1:
+            MessageService._publish_unread_count(db, user_id)
         return message
 
     @staticmethod
@@ -200,20 +443,31 @@ class MessageService:
         if message_type:
             query = query.filter(Message.type == message_type)
 
-        count = query.update({"is_read": True})
+        count = query.update({"is_read": True}, synchronize_session=False)
+        if count:
+            MessageService._adjust_counter(db, user_id, unread_delta=-count)
         db.commit()
+        if count:
+            MessageService._publish_unread_count(db, user_id)
         return count
 
     @staticmethod
     def delete_message(db: Session, message_id: int, user_id: int) -> None:
-        """删除消息"""
-        message = db.query(Message).filter(
+        """
+        删除消息。
+        先按未读条件删除，据实际删除的行判断是否扣减未读计数，
+        避免与并发的标记已读/删除请求重复扣减。
+        """
+        base = db.query(Message).filter(
             Message.id == message_id,
             Message.user_id == user_id
-        ).first()
-
-        if not message:
+        )
+        was_unread = base.filter(Message.is_read == False).delete(synchronize_session=False) == 1
+        if not was_unread and base.delete(synchronize_session=False) != 1:
+            db.rollback()
             raise NotFoundError("消息", str(message_id))
 
-        db.delete(message)
+        MessageService._adjust_counter(db, user_id, unread_delta=-1 if was_unread else 0, total_delta=-1)
         db.commit()
+        if was_unread:
+            MessageService._publish_unread_count(db, user_id)
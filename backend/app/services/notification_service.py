@@ -0,0 +1,126 @@
+"""通知分发服务
+
+任务状态变更通知不在请求内写库，而是交给后台分发线程：
+1. 请求只把 (任务ID, 新状态) 放入待发送队列，立即返回
+2. 同一任务的同一状态变更在合并窗口内只发送一次（如反复退回/发布），内容按发送时的任务数据生成
+3. 分发线程使用独立会话，按接收人批量插入消息
+
+因此「任务发布通知所有开发人员」这类大范围通知也不会拖慢请求。
+"""
+import logging
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 待发送通知：(任务ID, 新状态) -> {"due": 发送时间, "old_status": 窗口内第一次变更前的状态}
+_pending: dict[Tuple[int, Optional[str]], dict] = {}
+_condition = threading.Condition()
+_worker: Optional[threading.Thread] = None
+_stopping = False
+
+
+class NotificationService:
+    """通知分发服务类"""
+
+    @staticmethod
+    def enqueue_task_status_change(task_id: int, old_status: Optional[str], new_status: Optional[str]) -> None:
+        """登记任务状态变更通知（合并窗口内重复登记只保留一条）"""
+        NotificationService.enqueue_task_status_changes([(task_id, old_status, new_status)])
+
+    @staticmethod
+    def enqueue_task_status_changes(changes: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> None:
+        """批量登记任务状态变更通知 (任务ID, 原状态, 新状态)，一次加锁、一次唤醒分发线程"""
+        global _worker
+        changes = list(changes)
+        if not changes:
+            return
+        with _condition:
+            if _stopping:
+                return
+            due = time.monotonic() + settings.NOTIFICATION_COALESCE_SECONDS
+            for task_id, old_status, new_status in changes:
+                key = (task_id, new_status)
+                if key not in _pending:
+                    _pending[key] = {"due": due, "old_status": old_status}
+            if _worker is None or not _worker.is_alive():
+                _worker = threading.Thread(
+                    target=NotificationService._run, name="notification-dispatcher", daemon=True
+                )
+                _worker.start()
+            _condition.notify()
+
+    @staticmethod
+    def _take_due(now: float, force: bool = False) -> list[Tuple[Tuple[int, Optional[str]], dict]]:
+        """取出已到发送时间的通知（调用方需持有锁）"""
+        due = [(key, item) for key, item in _pending.items() if force or item["due"] <= now]
+        for key, _ in due:
+            del _pending[key]
+        return due
+
+    @staticmethod
+    def _deliver(batch: list[Tuple[Tuple[int, Optional[str]], dict]]) -> int:
+        """在独立会话中发送一批通知，返回创建的消息数"""
+        if not batch:
+            return 0
+        from app.models.task import Task
+        from app.services.message_service import MessageService
+
+        created = 0
+        db = SessionLocal()
+        try:
+            task_ids = {task_id for (task_id, _), _ in batch}
+            tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(task_ids)).all()}
+            for (task_id, new_status), item in batch:
+                task = tasks.get(task_id)
+                # 任务已删除或状态已再次变化时，该通知已过时
+                if not task or task.status != new_status:
+                    continue
+                try:
+                    created += MessageService.deliver_task_status_change(
+                        db, task, item["old_status"], new_status
+                    )
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"任务状态变更通知发送失败: task_id={task_id}, status={new_status}: {e}")
+        finally:
+            db.close()
+        return created
+
+    @staticmethod
+    def _run() -> None:
+        while True:
+            with _condition:
+                while not _pending and not _stopping:
+                    _condition.wait()
+                if _stopping and not _pending:
+                    return
+                now = time.monotonic()
+                batch = NotificationService._take_due(now, force=_stopping)
+                if not batch:
+                    next_due = min(item["due"] for item in _pending.values())
+                    _condition.wait(timeout=max(0.0, next_due - now))
+                    continue
+            NotificationService._deliver(batch)
+
+    @staticmethod
+    def flush() -> int:
+        """立即发送全部待发送通知（不等待合并窗口），返回创建的消息数"""
+        with _condition:
+            batch = NotificationService._take_due(time.monotonic(), force=True)
+        return NotificationService._deliver(batch)
+
+    @staticmethod
+    def shutdown(timeout: float = 5.0) -> None:
+        """停止分发线程（应用退出时调用），尽量发送完已登记的通知"""
+        global _stopping
+        with _condition:
+            _stopping = True
+            _condition.notify_all()
+            worker = _worker
+        if worker is not None:
+            worker.join(timeout=timeout)
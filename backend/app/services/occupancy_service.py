@@ -0,0 +1,158 @@
+"""人员排期占用索引服务
+
+并发数校验、团队负荷等需要按用户查询「某时段内的排期占用」，原先每次都对 task_schedules /
+task_collaborators 做区间查询。这里在进程内维护一份全员占用索引（OccupancyIndex）：
+1. 首次使用时两次查询加载全部进行中排期（认领人 + 配合人）
+2. 会话 flush 时记录排期相关变更涉及的任务（TaskSchedule / TaskCollaborator 增删改，
+   任务状态、认领人、优先级、人天变化），事务提交后这些任务标记为待更新，回滚则丢弃
+3. 下次读取索引时只重新加载待更新任务的占用并整体替换（增量更新）
+4. 超过 OCCUPANCY_INDEX_MAX_AGE_SECONDS 时全量重建，使多进程部署下其他进程的写入最终可见
+
+当前会话存在尚未提交的排期变更时，索引不能反映这些变更，此时返回按该会话现查的临时索引。
+"""
+import threading
+import time
+from decimal import Decimal
+from itertools import chain
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.task import Task
+from app.models.task_collaborator import TaskCollaborator
+from app.models.task_schedule import TaskSchedule
+from app.services.schedule_engine import ACTIVE_STATUSES, Occupancy, OccupancyIndex, queue_key
+
+# 会话中已 flush、未提交的排期相关任务ID
+_SESSION_KEY = "occupancy_changed_task_ids"
+
+# 影响占用的任务字段
+_TRACKED_TASK_ATTRS = ("status", "assignee_id", "priority", "estimated_man_days")
+
+_index: Optional[OccupancyIndex] = None
+_loaded_at = 0.0
+_index_lock = threading.Lock()
+_stale_task_ids: set[int] = set()
+_stale_lock = threading.Lock()
+
+
+class OccupancyService:
+    """人员排期占用索引服务类"""
+
+    @staticmethod
+    def load_entries(db: Session, task_ids: Optional[Iterable[int]] = None) -> list[tuple[int, Occupancy]]:
+        """加载进行中任务的排期占用（认领人 + 配合人，两次查询）；指定 task_ids 时只加载这些任务"""
+        active = list(ACTIVE_STATUSES)
+        assignee_query = (
+            db.query(
+                Task.id, Task.assignee_id, Task.status, Task.priority, Task.created_at, Task.estimated_man_days,
+                TaskSchedule.start_date, TaskSchedule.end_date, TaskSchedule.is_concurrent,
+            )
+            .join(TaskSchedule, TaskSchedule.task_id == Task.id)
+            .filter(Task.assignee_id.isnot(None), Task.status.in_(active))
+        )
+        collaborator_query = (
+            db.query(
+                TaskCollaborator.task_id, TaskCollaborator.user_id,
+                TaskCollaborator.scheduled_start, TaskCollaborator.scheduled_end,
+            )
+            .join(Task, Task.id == TaskCollaborator.task_id)
+            .filter(TaskCollaborator.scheduled_start.isnot(None), Task.status.in_(active))
+        )
+        if task_ids is not None:
+            task_ids = set(task_ids)
+            if not task_ids:
+                return []
+            assignee_query = assignee_query.filter(Task.id.in_(task_ids))
+            collaborator_query = collaborator_query.filter(TaskCollaborator.task_id.in_(task_ids))
+
+        entries = [
+            (row.assignee_id, Occupancy(
+                task_id=row.id,
+                start=row.start_date,
+                end=row.end_date,
+                role="assignee",
+                queue_key=None if row.is_concurrent else queue_key(row.status, row.priority, row.created_at, row.id),
+                man_days=row.estimated_man_days or Decimal("0"),
+            ))
+            for row in assignee_query.all()
+        ]
+        entries.extend(
+            (row.user_id, Occupancy(
+                task_id=row.task_id,
+                start=row.scheduled_start,
+                end=row.scheduled_end,
+                role="collaborator",
+            ))
+            for row in collaborator_query.all()
+        )
+        return entries
+
+    @staticmethod
+    def get_index(db: Session) -> OccupancyIndex:
+        """获取全员占用索引（必要时增量更新或全量重建）"""
+        global _index, _loaded_at
+        if db.info.get(_SESSION_KEY):
+            # 本会话有未提交的排期变更：现查，不写入共享索引
+            return OccupancyIndex(OccupancyService.load_entries(db))
+
+        with _index_lock:
+            with _stale_lock:
+                stale = set(_stale_task_ids)
+                _stale_task_ids.clear()
+            if _index is None or time.monotonic() - _loaded_at > settings.OCCUPANCY_INDEX_MAX_AGE_SECONDS:
+                _index = OccupancyIndex(OccupancyService.load_entries(db))
+                _loaded_at = time.monotonic()
+            elif stale:
+                try:
+                    _index.replace_tasks(stale, OccupancyService.load_entries(db, stale))
+                except Exception:
+                    # 加载失败时保留待更新标记，下次重试
+                    with _stale_lock:
+                        _stale_task_ids.update(stale)
+                    raise
+            return _index
+
+    @staticmethod
+    def mark_changed(db: Session, task_ids: Iterable[int]) -> None:
+        """登记排期占用发生变化的任务（批量 UPDATE/DELETE 等绕过 ORM 的写入需手动调用）"""
+        db.info.setdefault(_SESSION_KEY, set()).update(task_ids)
+
+    @staticmethod
+    def invalidate() -> None:
+        """丢弃索引，下次使用时全量重建"""
+        global _index
+        with _index_lock:
+            _index = None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tasks(session: Session, flush_context) -> None:
+    changed = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        state = inspect(obj)
+        if isinstance(obj, (TaskSchedule, TaskCollaborator)):
+            # 只读取已加载的值（已删除对象不能再触发加载）
+            changed.update(state.attrs.task_id.history.deleted)
+            changed.add(state.dict.get("task_id"))
+        elif isinstance(obj, Task) and obj not in session.new:
+            if obj in session.deleted or any(state.attrs[attr].history.has_changes() for attr in _TRACKED_TASK_ATTRS):
+                changed.add(state.identity[0] if state.identity else None)
+    changed.discard(None)
+    if changed:
+        session.info.setdefault(_SESSION_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_tasks(session: Session) -> None:
+    changed = session.info.pop(_SESSION_KEY, None)
+    if changed:
+        with _stale_lock:
+            _stale_task_ids.update(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tasks(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,322 @@
+"""领域事件服务（事务性发件箱）
+
+任务状态变更的耗时副作用（排期重建、配合人排期同步、工作量统计、项目产值）不在请求内执行：
+1. 业务代码在提交前调用 OutboxService.publish，事件与状态变更写入同一事务，
+   回滚时一并消失，提交后一定存在
+2. 提交后唤醒后台投递线程；线程按事件ID顺序取出到期事件，依次调用订阅的处理器，
+   同一任务的事件严格按顺序处理：只取出同一任务中没有更早未完成事件的事件，
+   前一条等待重试、正被处理或已失败时，后一条不会被取出，也不占用批次名额
+3. 取出事件时以条件更新占用租约，多进程部署时同一事件不会被并发处理；
+   处理进程异常退出时租约到期后重新投递（至少一次）
+4. 每个处理器完成后记入 completed_handlers，且完成标记与处理器的写入在同一次提交中，
+   重试时已完成的处理器不会重复执行；处理器须只提交一次（或本身可重复执行）
+5. 失败按指数退避重试，超过 OUTBOX_MAX_ATTEMPTS 次标记为 failed；
+   failed 事件之后同一任务的事件暂停投递（如“重新打开”不会回滚从未汇入的工作量），
+   排除故障后调用 OutboxService.retry 重新投递
+
+消息通知仍由 NotificationService 合并发送（只在内存中登记，不影响请求耗时）。
+"""
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import event, exists
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus
+
+logger = logging.getLogger(__name__)
+
+# 事件类型
+TASK_CLAIMED = "task.claimed"      # 任务已认领（主动认领或接受派发）：生成排期
+TASK_SUBMITTED = "task.submitted"  # 任务已提交：退出串行队列，后续任务前移
+TASK_REJECTED = "task.rejected"    # 已提交任务被退回：重新进入串行队列
+TASK_CONFIRMED = "task.confirmed"  # 任务已确认：汇入工作量统计，更新项目产值
+TASK_REOPENED = "task.reopened"    # 已确认任务重新打开：回滚工作量统计，更新项目产值
+TASK_RETURNED = "task.returned"    # 已认领任务被收回：原认领人后续任务前移，更新项目产值
+TASK_ASSIGNED = "task.assigned"    # 任务已派发（待评估）：更新项目产值
+TASK_ARCHIVED = "task.archived"    # 任务已归档：更新项目产值
+
+# 会话中有尚未提交的事件
+_SESSION_KEY = "outbox_published"
+
+# 事件类型 -> [(处理器名, 处理器)]
+_handlers: dict[str, list[tuple[str, Callable[[Session, dict], None]]]] = {}
+
+_condition = threading.Condition()
+_worker: Optional[threading.Thread] = None
+_signaled = False
+_stopping = False
+
+
+class OutboxService:
+    """领域事件服务类"""
+
+    @staticmethod
+    def subscribe(event_type: str, name: str, handler: Callable[[Session, dict], None]) -> None:
+        """订阅事件（name 在同一事件类型内唯一，用于记录完成情况）"""
+        _handlers.setdefault(event_type, []).append((name, handler))
+
+    @staticmethod
+    def publish(db: Session, event_type: str, aggregate_id: int, payload: dict) -> OutboxEvent:
+        """在当前事务中登记事件（随调用方的 commit 一起提交）"""
+        outbox_event = OutboxEvent(
+            event_type=event_type,
+            aggregate_id=aggregate_id,
+            payload=json.dumps(payload, ensure_ascii=False, default=str),
+            status=OutboxEventStatus.PENDING.value,
+            attempts=0,
+            available_at=datetime.now(),
+        )
+        db.add(outbox_event)
+        db.info[_SESSION_KEY] = True
+        return outbox_event
+
+    # ------------------------------------------------------------------
+    # 投递
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _dispatch(db: Session, outbox_event: OutboxEvent, now: datetime) -> bool:
+        """取得租约并执行事件的全部处理器，返回事件是否已处理完成"""
+        leased = db.query(OutboxEvent).filter(
+            OutboxEvent.id == outbox_event.id,
+            OutboxEvent.status == OutboxEventStatus.PENDING.value,
+            OutboxEvent.available_at <= now,
+        ).update(
+            {OutboxEvent.available_at: now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)},
+            synchronize_session=False,
+        )
+        db.commit()
+        if not leased:
+            # 已被其他进程取走
+            return False
+
+        payload = json.loads(outbox_event.payload)
+        completed = json.loads(outbox_event.completed_handlers or "[]")
+        for name, handler in _handlers.get(outbox_event.event_type, []):
+            if name in completed:
+                continue
+            try:
+                # 完成标记与处理器的写入一起提交
+                outbox_event.completed_handlers = json.dumps(completed + [name])
+                handler(db, payload)
+                db.commit()
+                completed.append(name)
+            except Exception as e:
+                db.rollback()
+                attempts = outbox_event.attempts + 1
+                outbox_event.attempts = attempts
+                outbox_event.last_error = f"{name}: {e}"[:2000]
+                if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    outbox_event.status = OutboxEventStatus.FAILED.value
+                else:
+                    delay = min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600)
+                    outbox_event.available_at = datetime.now() + timedelta(seconds=delay)
+                db.commit()
+                logger.warning(
+                    f"领域事件处理失败: id={outbox_event.id}, type={outbox_event.event_type}, "
+                    f"handler={name}, attempts={attempts}: {e}"
+                )
+                return False
+
+        outbox_event.status = OutboxEventStatus.DONE.value
+        outbox_event.processed_at = datetime.now()
+        db.commit()
+        return True
+
+    @staticmethod
+    def process_pending() -> int:
+        """
+        处理一批到期的待处理事件（独立会话），返回处理完成的事件数。
+        只取同一任务中没有更早未完成（待处理/已失败）事件的事件：每个任务每批最多一条，
+        等待重试或被租约占用的事件不会挤占批次，其他任务的新事件照常投递。
+        """
+        processed = 0
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            earlier = aliased(OutboxEvent)
+            has_unfinished_earlier = exists().where(
+                earlier.aggregate_id == OutboxEvent.aggregate_id,
+                earlier.status.in_([OutboxEventStatus.PENDING.value, OutboxEventStatus.FAILED.value]),
+                earlier.id < OutboxEvent.id,
+            )
+            events = (
+                db.query(OutboxEvent)
+                .filter(
+                    OutboxEvent.status == OutboxEventStatus.PENDING.value,
+                    OutboxEvent.available_at <= now,
+                    ~has_unfinished_earlier,
+                )
+                .order_by(OutboxEvent.id)
+                .limit(settings.OUTBOX_BATCH_SIZE)
+                .all()
+            )
+            for outbox_event in events:
+                if OutboxService._dispatch(db, outbox_event, now):
+                    processed += 1
+        finally:
+            db.close()
+        return processed
+
+    @staticmethod
+    def retry(db: Session, event_id: int) -> bool:
+        """
+        将已失败的事件重新置为待处理（排除故障后调用），之后同一任务的后续事件随之继续投递。
+        返回是否重新置为待处理。
+        """
+        updated = db.query(OutboxEvent).filter(
+            OutboxEvent.id == event_id,
+            OutboxEvent.status == OutboxEventStatus.FAILED.value,
+        ).update(
+            {
+                OutboxEvent.status: OutboxEventStatus.PENDING.value,
+                OutboxEvent.attempts: 0,
+                OutboxEvent.available_at: datetime.now(),
+            },
+            synchronize_session=False,
+        )
+        if updated:
+            # 提交后唤醒投递线程
+            db.info[_SESSION_KEY] = True
+        db.commit()
+        return bool(updated)
+
+    @staticmethod
+    def flush() -> int:
+        """立即处理全部到期事件，返回处理完成的事件数"""
+        total = 0
+        while True:
+            processed = OutboxService.process_pending()
+            if not processed:
+                return total
+            total += processed
+
+    # ------------------------------------------------------------------
+    # 后台线程
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def start() -> None:
+        """启动投递线程（应用启动时调用，继续处理上次退出时未完成的事件）"""
+        global _worker, _signaled
+        with _condition:
+            if _stopping:
+                return
+            _signaled = True
+            if _worker is None or not _worker.is_alive():
+                _worker = threading.Thread(target=OutboxService._run, name="outbox-dispatcher", daemon=True)
+                _worker.start()
+            _condition.notify()
+
+    @staticmethod
+    def _run() -> None:
+        global _signaled
+        while True:
+            with _condition:
+                if not _signaled and not _stopping:
+                    _condition.wait(timeout=settings.OUTBOX_POLL_SECONDS)
+                if _stopping:
+                    return
+                _signaled = False
+            try:
+                OutboxService.flush()
+            except Exception as e:
+                logger.warning(f"领域事件投递失败: {e}")
+
+    @staticmethod
+    def shutdown(timeout: float = 5.0) -> None:
+        """停止投递线程（应用退出时调用；未处理的事件保留在表中，下次启动后继续投递）"""
+        global _stopping
+        with _condition:
+            _stopping = True
+            _condition.notify_all()
+            worker = _worker
+        if worker is not None:
+            worker.join(timeout=timeout)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    if session.info.pop(_SESSION_KEY, False):
+        OutboxService.start()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_published(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+# ----------------------------------------------------------------------
+# 任务事件处理器
+# ----------------------------------------------------------------------
+
+def _load_task(db: Session, task_id: int):
+    from app.models.task import Task
+
+    return db.query(Task).filter(Task.id == task_id).first()
+
+
+def _generate_schedule(db: Session, payload: dict) -> None:
+    """认领后生成排期（重建认领人的串行队列）；任务已被收回或转给他人时跳过"""
+    from app.models.task import TaskStatus
+    from app.services.schedule_service import ScheduleService
+
+    task = _load_task(db, payload["task_id"])
+    if not task or task.assignee_id != payload["assignee_id"]:
+        return
+    if task.status not in (TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value):
+        return
+    ScheduleService.calculate_schedule(db, task.id, task.estimated_man_days, task.assignee_id)
+
+
+def _recalculate_assignee_schedules(db: Session, payload: dict) -> None:
+    """重算认领人串行队列排期（含配合人排期同步），可重复执行；未携带认领人时跳过"""
+    from app.services.schedule_service import ScheduleService
+
+    if payload.get("assignee_id"):
+        ScheduleService.recalculate_user_schedules(db, payload["assignee_id"])
+
+
+def _apply_workload(db: Session, payload: dict) -> None:
+    """确认后汇入工作量统计（累加，依赖完成标记保证只执行一次）"""
+    from app.services.workload_statistic_service import WorkloadStatisticService
+
+    task = _load_task(db, payload["task_id"])
+    if task:
+        WorkloadStatisticService.apply_task_confirmation(db, task)
+
+
+def _revert_workload(db: Session, payload: dict) -> None:
+    """重新打开后回滚工作量统计（扣减，依赖完成标记保证只执行一次）"""
+    from app.services.workload_statistic_service import WorkloadStatisticService
+
+    task = _load_task(db, payload["task_id"])
+    if task:
+        WorkloadStatisticService.revert_task_confirmation(db, task)
+
+
+def _update_output_value(db: Session, payload: dict) -> None:
+    """按当前数据重算项目产值，可重复执行"""
+    from app.services.project_output_value_service import ProjectOutputValueService
+
+    if payload.get("project_id"):
+        ProjectOutputValueService.update_project_output_value(db, payload["project_id"])
+
+
+OutboxService.subscribe(TASK_CLAIMED, "schedule", _generate_schedule)
+OutboxService.subscribe(TASK_SUBMITTED, "schedule", _recalculate_assignee_schedules)
+OutboxService.subscribe(TASK_REJECTED, "schedule", _recalculate_assignee_schedules)
+OutboxService.subscribe(TASK_CONFIRMED, "workload", _apply_workload)
+OutboxService.subscribe(TASK_CONFIRMED, "output_value", _update_output_value)
+OutboxService.subscribe(TASK_REOPENED, "workload", _revert_workload)
+OutboxService.subscribe(TASK_REOPENED, "output_value", _update_output_value)
+OutboxService.subscribe(TASK_RETURNED, "schedule", _recalculate_assignee_schedules)
+OutboxService.subscribe(TASK_RETURNED, "output_value", _update_output_value)
+OutboxService.subscribe(TASK_ASSIGNED, "output_value", _update_output_value)
+OutboxService.subscribe(TASK_ARCHIVED, "output_value", _update_output_value)
@@ -45,8 +45,8 @@ class ProjectOutputValueService:
             multiplier = getattr(task, "priority_multiplier", None) or Decimal("1.00")
 
             # 根据任务状态计算产值（公式：人天 × 单价 × 优先级溢价系数）
-            if task.status == TaskStatus.CONFIRMED.value:
-                # 已确认任务：使用实际投入人天
+            if task.status in (TaskStatus.CONFIRMED.value, TaskStatus.ARCHIVED.value):
+                # 已确认（含已归档）任务：使用实际投入人天
                 if task.actual_man_days:
                     task_value = task.actual_man_days * user_sequence.unit_price * multiplier
                     task_output_value += task_value
@@ -5,6 +5,7 @@ from sqlalchemy.orm import joinedload
 from typing import Optional, List, Tuple
 from decimal import Decimal
 
+from app.models.base import bump_version
 from app.models.project import Project
 from app.models.project_manager import ProjectManager
 from app.models.user import User
@@ -95,6 +96,8 @@ class ProjectService:
         db.query(ProjectManager).filter(ProjectManager.project_id == project_id).delete(synchronize_session=False)
         for uid in uid_set:
             db.add(ProjectManager(project_id=project_id, user_id=uid))
+        # 协办经理列表属于项目详情，变更后使项目 ETag 失效
+        bump_version(project)
         db.commit()
 
     @staticmethod
@@ -121,6 +124,17 @@ class ProjectService:
         """获取项目"""
         return db.query(Project).options(joinedload(Project.creator)).filter(Project.id == project_id).first()
 
+    @staticmethod
+    def get_project_version(db: Session, project_id: int):
+        """项目详情的版本信息（版本号、更新时间、创建者名称及更新时间），用于 ETag 校验；项目不存在返回 None"""
+        return db.query(
+            Project.version,
+            Project.updated_at,
+            User.username.label("creator_username"),
+            User.full_name.label("creator_full_name"),
+            User.updated_at.label("creator_updated_at"),
+        ).outerjoin(User, User.id == Project.created_by).filter(Project.id == project_id).first()
+
     @staticmethod
     def get_projects(
         db: Session,
@@ -0,0 +1,641 @@
+"""内存排期引擎
+
+在普通数据结构上复现 ScheduleService 的排期规则，不访问数据库，用于排期推演（what-if）：
+- 串行队列：优先级 → 创建时间排序，进行中任务不打断，其余任务依次排在其后（P0 因此插到队首）
+- 并发任务不占串行队列位置，排期对齐基准任务；设置并发时校验相关人员并发数不超过 MAX_CONCURRENT_TASKS
+- 配合人排期与任务排期同步
+- 排期跳过周末与节假日（调休上班日照常排期）
+
+规则与 ScheduleService 中对应方法保持一致，修改排期规则时两处需同步修改。
+"""
+import copy
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from app.core.exceptions import ValidationError
+from app.models.task import TaskStatus, PRIORITY_ORDER
+
+# 每人同一时段内最多并发任务数
+MAX_CONCURRENT_TASKS = 3
+
+# 占用排期的任务状态
+ACTIVE_STATUSES = frozenset({TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value})
+# 已完成/终态的任务状态（排期记录会被清理）
+INACTIVE_STATUSES = frozenset({
+    TaskStatus.SUBMITTED.value,
+    TaskStatus.CONFIRMED.value,
+    TaskStatus.ARCHIVED.value,
+})
+
+
+class WorkCalendar:
+    """工作日历：调休上班日，或非周末且不在节假日集合中的日期为工作日"""
+
+    def __init__(self, holidays: Iterable[date] = (), extra_workdays: Iterable[date] = ()):
+        self.holidays = frozenset(holidays)
+        self.extra_workdays = frozenset(extra_workdays)
+
+    def is_workday(self, check_date: date) -> bool:
+        if check_date in self.extra_workdays:
+            return True
+        return check_date.weekday() < 5 and check_date not in self.holidays
+
+    def next_workday(self, from_date: date) -> date:
+        """从 from_date 开始（含），找到下一个工作日"""
+        d = from_date
+        while not self.is_workday(d):
+            d += timedelta(days=1)
+        return d
+
+    def calc_end_date(self, start_date: date, man_days: Decimal) -> date:
+        """从 start_date 开始，计算经过 man_days 个工作日后的结束日期（人天向下取整，至少 1 天）"""
+        workdays_needed = max(1, int(man_days))
+        end_date = start_date
+        workdays_count = 0
+        while workdays_count < workdays_needed:
+            if self.is_workday(end_date):
+                workdays_count += 1
+            if workdays_count < workdays_needed:
+                end_date += timedelta(days=1)
+        return end_date
+
+    def workdays_count(self, start_date: date, end_date: date) -> int:
+        """两个日期之间的工作日数量（含首尾）"""
+        count = 0
+        d = start_date
+        while d <= end_date:
+            if self.is_workday(d):
+                count += 1
+            d += timedelta(days=1)
+        return count
+
+
+class WorkdayIndex:
+    """
+    工作日序号表：把 origin 起的工作日依次编号（origin 当天或之后的第一个工作日为 0）。
+    排期推算转为整数运算：任务结束序号 = 开始序号 + 人天 - 1，无需逐日判断。
+    查询超出已生成范围时按年向后扩展。
+    """
+
+    _CHUNK_DAYS = 366
+
+    def __init__(self, calendar: WorkCalendar, origin: date):
+        self.calendar = calendar
+        self.origin = origin
+        self._ordinals: list[int] = []  # 各工作日的 date.toordinal()
+        self._next = origin  # 下一个待生成的日期
+        self._extend(origin + timedelta(days=self._CHUNK_DAYS))
+
+    def _extend(self, until: date) -> None:
+        d = self._next
+        while d <= until:
+            if self.calendar.is_workday(d):
+                self._ordinals.append(d.toordinal())
+            d += timedelta(days=1)
+        self._next = d
+
+    def index_of(self, check_date: date) -> int:
+        """check_date 当天或之后第一个工作日的序号（早于 origin 的日期视为 origin）"""
+        ordinal = check_date.toordinal()
+        while not self._ordinals or self._ordinals[-1] < ordinal:
+            self._extend(max(check_date, self._next) + timedelta(days=self._CHUNK_DAYS))
+        return bisect_left(self._ordinals, ordinal)
+
+    def index_on_or_before(self, check_date: date) -> int:
+        """check_date 当天或之前最后一个工作日的序号（早于 origin 的日期视为 0）"""
+        self.index_of(check_date)
+        return max(0, bisect_right(self._ordinals, check_date.toordinal()) - 1)
+
+    def date_at(self, index: int) -> date:
+        """序号对应的工作日"""
+        while index >= len(self._ordinals):
+            self._extend(self._next + timedelta(days=self._CHUNK_DAYS))
+        return date.fromordinal(self._ordinals[index])
+
+    @staticmethod
+    def span(man_days: Decimal) -> int:
+        """任务占用的工作日数（与 calc_end_date 一致：人天向下取整，至少 1 天）"""
+        return max(1, int(man_days or 0))
+
+
+@dataclass
+class SimSchedule:
+    """任务排期（对应 TaskSchedule）"""
+    start_date: date
+    end_date: date
+    is_pinned: bool = False
+    is_concurrent: bool = False
+    concurrent_with: Optional[int] = None
+
+
+@dataclass
+class SimTask:
+    """任务（只包含排期需要的字段）"""
+    id: int
+    title: str
+    status: str
+    priority: str
+    created_at: object  # datetime，仅用于排序
+    estimated_man_days: Decimal
+    assignee_id: Optional[int] = None
+    is_pinned: bool = False
+    schedule: Optional[SimSchedule] = None
+
+
+@dataclass
+class SimCollaborator:
+    """配合人排期（对应 TaskCollaborator）"""
+    task_id: int
+    user_id: int
+    scheduled_start: Optional[date] = None
+    scheduled_end: Optional[date] = None
+
+
+@dataclass
+class ScheduleState:
+    """
+    排期状态快照。
+    loaded_assignees 为已完整加载串行队列的认领人，只有这些人的队列可以重建。
+    """
+    calendar: WorkCalendar
+    today: date
+    tasks: dict[int, SimTask] = field(default_factory=dict)
+    collaborators: list[SimCollaborator] = field(default_factory=list)
+    loaded_assignees: set[int] = field(default_factory=set)
+
+    def copy(self) -> "ScheduleState":
+        """深拷贝（日历共享），用于在同一快照上推演多个方案"""
+        return copy.deepcopy(self, memo={id(self.calendar): self.calendar})
+
+    def get_task(self, task_id: int) -> SimTask:
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise ValidationError(f"任务 {task_id} 不存在")
+        return task
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def serial_queue(self, assignee_id: int) -> list[SimTask]:
+        """串行队列（排除并发任务），按优先级、创建时间、任务ID排序"""
+        queue = [
+            t for t in self.tasks.values()
+            if t.assignee_id == assignee_id
+            and t.status in ACTIVE_STATUSES
+            and not (t.schedule and t.schedule.is_concurrent)
+        ]
+        queue.sort(key=lambda t: (PRIORITY_ORDER.get(t.priority, 2), t.created_at, t.id))
+        return queue
+
+    def concurrent_count(
+        self,
+        user_id: int,
+        start: date,
+        end: date,
+        exclude_task_id: Optional[int] = None,
+    ) -> int:
+        """用户在 [start, end] 内的并发任务数（认领的任务排期 + 配合的任务排期）"""
+        count = 0
+        for t in self.tasks.values():
+            if (
+                t.assignee_id == user_id
+                and t.status in ACTIVE_STATUSES
+                and t.schedule is not None
+                and t.id != exclude_task_id
+                and t.schedule.start_date <= end
+                and t.schedule.end_date >= start
+            ):
+                count += 1
+        for c in self.collaborators:
+            task = self.tasks.get(c.task_id)
+            if (
+                c.user_id == user_id
+                and c.scheduled_start is not None
+                and c.task_id != exclude_task_id
+                and task is not None
+                and task.status in ACTIVE_STATUSES
+                and c.scheduled_start <= end
+                and c.scheduled_end >= start
+            ):
+                count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # 排期计算（对应 ScheduleService 的同名逻辑）
+    # ------------------------------------------------------------------
+
+    def rebuild_serial(self, assignee_id: int, start_from: Optional[date] = None) -> None:
+        """重建串行队列排期（对应 ScheduleService._rebuild_serial_schedules）"""
+        if assignee_id not in self.loaded_assignees:
+            raise ValidationError(f"用户 {assignee_id} 的排期未加载")
+
+        # 清理已完成任务的残留排期
+        for t in self.tasks.values():
+            if t.assignee_id == assignee_id and t.status in INACTIVE_STATUSES:
+                t.schedule = None
+
+        queue = self.serial_queue(assignee_id)
+        if not queue:
+            return
+
+        in_progress = next((t for t in queue if t.status == TaskStatus.IN_PROGRESS.value), None)
+        if in_progress:
+            if in_progress.schedule:
+                next_start = self.calendar.next_workday(in_progress.schedule.end_date + timedelta(days=1))
+            else:
+                next_start = self.calendar.next_workday(self.today)
+        else:
+            next_start = self.calendar.next_workday(start_from or self.today)
+
+        for t in queue:
+            if t.status == TaskStatus.IN_PROGRESS.value:
+                continue
+            end_date = self.calendar.calc_end_date(next_start, t.estimated_man_days)
+            if t.schedule:
+                t.schedule.start_date = next_start
+                t.schedule.end_date = end_date
+            else:
+                t.schedule = SimSchedule(start_date=next_start, end_date=end_date)
+            next_start = self.calendar.next_workday(end_date + timedelta(days=1))
+
+    def sync_collaborators(self, task_id: int) -> None:
+        """配合人排期与任务排期保持一致（对应 ScheduleService.sync_collaborator_schedules）"""
+        task = self.tasks.get(task_id)
+        if task is None or task.schedule is None:
+            return
+        for c in self.collaborators:
+            if c.task_id == task_id:
+                c.scheduled_start = task.schedule.start_date
+                c.scheduled_end = task.schedule.end_date
+
+    def recalculate_user(self, user_id: int) -> None:
+        """重算用户排期并同步配合人（对应 ScheduleService.recalculate_user_schedules）"""
+        queue = self.serial_queue(user_id)
+        if not queue:
+            return
+        concurrent_ids = [
+            t.id for t in self.tasks.values()
+            if t.assignee_id == user_id
+            and t.status in ACTIVE_STATUSES
+            and t.schedule is not None
+            and t.schedule.is_concurrent
+        ]
+        self.rebuild_serial(user_id)
+        for task_id in {t.id for t in queue} | set(concurrent_ids):
+            self.sync_collaborators(task_id)
+
+    def exceeded_users(self, task: SimTask, start: date, end: date) -> list[dict]:
+        """任务排期改为 [start, end] 时并发数超限的人员（对应 check_concurrent_feasibility）"""
+        user_ids = []
+        if task.assignee_id:
+            user_ids.append(task.assignee_id)
+        user_ids.extend(c.user_id for c in self.collaborators if c.task_id == task.id)
+
+        exceeded = []
+        for user_id in user_ids:
+            count = self.concurrent_count(user_id, start, end, exclude_task_id=task.id)
+            if count >= MAX_CONCURRENT_TASKS:
+                exceeded.append({
+                    "user_id": user_id,
+                    "current_concurrent": count,
+                    "limit": MAX_CONCURRENT_TASKS,
+                })
+        return exceeded
+
+    # ------------------------------------------------------------------
+    # 变更操作（对应 TaskService / ScheduleService 的写操作及其排期副作用）
+    # ------------------------------------------------------------------
+
+    def _require_active(self, task: SimTask, action: str) -> None:
+        if task.status not in ACTIVE_STATUSES:
+            raise ValidationError(f"只有已认领或进行中的任务可以{action}")
+
+    def claim(self, task_id: int, assignee_id: int) -> None:
+        """认领/派发任务并生成排期"""
+        task = self.get_task(task_id)
+        if task.status not in (TaskStatus.PUBLISHED.value, TaskStatus.PENDING_EVAL.value):
+            raise ValidationError("只有已发布或待评估状态的任务可以认领")
+        task.status = TaskStatus.CLAIMED.value
+        task.assignee_id = assignee_id
+        self.rebuild_serial(assignee_id)
+
+    def start(self, task_id: int) -> None:
+        """开始任务（不触发重排）"""
+        task = self.get_task(task_id)
+        if task.status != TaskStatus.CLAIMED.value:
+            raise ValidationError("只有已认领状态的任务可以开始")
+        task.status = TaskStatus.IN_PROGRESS.value
+
+    def submit(self, task_id: int) -> None:
+        """提交任务，后续任务前移"""
+        task = self.get_task(task_id)
+        self._require_active(task, "提交")
+        task.status = TaskStatus.SUBMITTED.value
+        self.recalculate_user(task.assignee_id)
+
+    def set_priority(self, task_id: int, priority: str) -> None:
+        """修改优先级并重排（推演允许修改已认领任务的优先级）"""
+        task = self.get_task(task_id)
+        task.priority = priority
+        if task.assignee_id and task.status in ACTIVE_STATUSES:
+            self.recalculate_user(task.assignee_id)
+
+    def set_estimate(self, task_id: int, man_days: Decimal) -> None:
+        """修改拟投入人天并重排"""
+        task = self.get_task(task_id)
+        task.estimated_man_days = man_days
+        if task.assignee_id and task.status in ACTIVE_STATUSES:
+            self.recalculate_user(task.assignee_id)
+
+    def pin(self, task_id: int, is_pinned: bool) -> None:
+        """置顶/取消置顶（对应 pin_task_and_reschedule）"""
+        task = self.get_task(task_id)
+        self._require_active(task, "置顶")
+        task.is_pinned = is_pinned
+        self.rebuild_serial(task.assignee_id)
+        if task.schedule:
+            task.schedule.is_pinned = is_pinned
+
+    def set_concurrent(self, task_id: int, concurrent_with: int) -> None:
+        """设为与基准任务并发（对应 ScheduleService.set_concurrent）"""
+        task = self.get_task(task_id)
+        self._require_active(task, "设置并发")
+        if task.schedule and task.schedule.is_concurrent:
+            raise ValidationError("该任务已经是并发任务，请先取消并发再重新设置")
+        base = self.tasks.get(concurrent_with)
+        if base is None or base.schedule is None:
+            raise ValidationError("基准任务尚无排期，无法设为并发")
+
+        start, end = base.schedule.start_date, base.schedule.end_date
+        exceeded = self.exceeded_users(task, start, end)
+        if exceeded:
+            raise ConcurrencyLimitExceeded(exceeded)
+
+        if task.schedule:
+            task.schedule.start_date = start
+            task.schedule.end_date = end
+            task.schedule.is_concurrent = True
+            task.schedule.concurrent_with = concurrent_with
+        else:
+            task.schedule = SimSchedule(
+                start_date=start, end_date=end, is_concurrent=True, concurrent_with=concurrent_with
+            )
+        self.rebuild_serial(task.assignee_id)
+        self.sync_collaborators(task_id)
+
+    def unset_concurrent(self, task_id: int) -> None:
+        """取消并发，重新进入串行队列（对应 ScheduleService.unset_concurrent）"""
+        task = self.get_task(task_id)
+        if not task.schedule or not task.schedule.is_concurrent:
+            raise ValidationError("该任务当前不是并发任务")
+        task.schedule.is_concurrent = False
+        task.schedule.concurrent_with = None
+        self.rebuild_serial(task.assignee_id)
+        self.sync_collaborators(task_id)
+
+    # ------------------------------------------------------------------
+    # 推演
+    # ------------------------------------------------------------------
+
+    def apply(
+        self,
+        op: str,
+        task_id: int,
+        *,
+        assignee_id: Optional[int] = None,
+        priority: Optional[str] = None,
+        estimated_man_days: Optional[Decimal] = None,
+        is_pinned: Optional[bool] = None,
+        concurrent_with: Optional[int] = None,
+    ) -> None:
+        """按操作名执行一项变更，参数缺失或规则不允许时抛出 ValidationError"""
+        if op == "claim":
+            if assignee_id is None:
+                raise ValidationError("认领需指定 assignee_id")
+            self.claim(task_id, assignee_id)
+        elif op == "start":
+            self.start(task_id)
+        elif op == "submit":
+            self.submit(task_id)
+        elif op == "set_priority":
+            if priority is None:
+                raise ValidationError("修改优先级需指定 priority")
+            self.set_priority(task_id, priority)
+        elif op == "set_estimate":
+            if estimated_man_days is None:
+                raise ValidationError("修改人天需指定 estimated_man_days")
+            self.set_estimate(task_id, estimated_man_days)
+        elif op == "pin":
+            self.pin(task_id, True if is_pinned is None else is_pinned)
+        elif op == "set_concurrent":
+            if concurrent_with is None:
+                raise ValidationError("设置并发需指定 concurrent_with")
+            self.set_concurrent(task_id, concurrent_with)
+        elif op == "unset_concurrent":
+            self.unset_concurrent(task_id)
+        else:
+            raise ValidationError(f"不支持的操作: {op}")
+
+    def snapshot(self) -> dict[tuple[int, int, str], tuple]:
+        """当前排期：(任务ID, 用户ID, 角色) -> (开始日期, 结束日期, 是否并发)"""
+        rows = {}
+        for t in self.tasks.values():
+            if t.schedule is not None and t.assignee_id:
+                rows[(t.id, t.assignee_id, "assignee")] = (
+                    t.schedule.start_date, t.schedule.end_date, t.schedule.is_concurrent
+                )
+        for c in self.collaborators:
+            if c.scheduled_start is not None:
+                rows[(c.task_id, c.user_id, "collaborator")] = (c.scheduled_start, c.scheduled_end, True)
+        return rows
+
+
+def diff_snapshots(
+    before: dict[tuple[int, int, str], tuple],
+    after: dict[tuple[int, int, str], tuple],
+) -> list[dict]:
+    """比较两份排期快照，返回发生变化的排期（新增/删除/日期或并发状态变化）"""
+    changes = []
+    for key in sorted(before.keys() | after.keys()):
+        old, new = before.get(key), after.get(key)
+        if old == new:
+            continue
+        task_id, user_id, role = key
+        changes.append({
+            "task_id": task_id,
+            "user_id": user_id,
+            "role": role,
+            "old_start": old[0] if old else None,
+            "old_end": old[1] if old else None,
+            "new_start": new[0] if new else None,
+            "new_end": new[1] if new else None,
+            "is_concurrent": new[2] if new else old[2],
+        })
+    return changes
+
+
+class ConcurrencyLimitExceeded(ValidationError):
+    """推演中设置并发导致人员并发数超限"""
+
+    def __init__(self, exceeded_users: list[dict]):
+        self.exceeded_users = exceeded_users
+        ids = "、".join(str(u["user_id"]) for u in exceeded_users)
+        super().__init__(f"以下人员的并发任务数将超出上限（{MAX_CONCURRENT_TASKS}个）：{ids}")
+
+
+@dataclass(frozen=True)
+class Occupancy:
+    """人员的一段排期占用"""
+    task_id: int
+    start: date
+    end: date
+    role: str  # assignee（认领人）/ collaborator（配合人）
+    # 串行队列排序键（仅认领人的串行任务）：进行中任务为 (-1,)，其余为 (优先级, 创建时间, 任务ID)
+    queue_key: Optional[tuple] = None
+    man_days: Decimal = Decimal("0")  # 任务拟投入人天（仅认领人）
+
+
+def _occupancy_order(occupancy: Occupancy) -> tuple:
+    return (occupancy.start, occupancy.task_id)
+
+
+def queue_key(status: str, priority: str, created_at, task_id: int) -> tuple:
+    """串行队列排序键：进行中任务不被打断，始终排在最前"""
+    if status == TaskStatus.IN_PROGRESS.value:
+        return (-1,)
+    return (PRIORITY_ORDER.get(priority, 2), created_at, task_id)
+
+
+class OccupancyIndex:
+    """
+    人员占用区间索引：按用户分组、按开始日期排序的排期占用（认领任务 + 配合任务）。
+    并发数、空闲时段与可开工日期在内存中计算，不再逐人逐任务查询数据库。
+    支持按任务整体替换占用记录（排期变更后增量更新）。
+    """
+
+    def __init__(self, entries: Iterable[tuple[int, Occupancy]] = ()):
+        self._by_user: dict[int, list[Occupancy]] = {}
+        self._users_by_task: dict[int, set[int]] = {}
+        for user_id, occupancy in entries:
+            self._by_user.setdefault(user_id, []).append(occupancy)
+            self._users_by_task.setdefault(occupancy.task_id, set()).add(user_id)
+        for items in self._by_user.values():
+            items.sort(key=_occupancy_order)
+
+    def intervals(self, user_id: int) -> list[Occupancy]:
+        return self._by_user.get(user_id, [])
+
+    def replace_tasks(self, task_ids: Iterable[int], entries: Iterable[tuple[int, Occupancy]]) -> None:
+        """删除指定任务的全部占用，再插入其最新占用（entries 只应包含这些任务）"""
+        # 受影响用户的列表整体替换而非原地修改，正在读取旧列表的调用方不受影响
+        task_ids = set(task_ids)
+        added: dict[int, list[Occupancy]] = {}
+        for user_id, occupancy in entries:
+            added.setdefault(user_id, []).append(occupancy)
+        affected = set(added)
+        for task_id in task_ids:
+            affected.update(self._users_by_task.pop(task_id, ()))
+        for user_id in affected:
+            items = [o for o in self._by_user.get(user_id, []) if o.task_id not in task_ids]
+            items.extend(added.get(user_id, ()))
+            if items:
+                items.sort(key=_occupancy_order)
+                self._by_user[user_id] = items
+            else:
+                self._by_user.pop(user_id, None)
+        for user_id, occupancies in added.items():
+            for occupancy in occupancies:
+                self._users_by_task.setdefault(occupancy.task_id, set()).add(user_id)
+
+    def free_slots(self, user_id: int, start: date, end: date, max_load: int = 0) -> list[tuple[date, date]]:
+        """
+        [start, end] 内占用数不超过 max_load 的连续时段（按自然日）。
+        max_load=0 为完全空闲时段；max_load=MAX_CONCURRENT_TASKS-1 为还能再承接一个任务的时段。
+        """
+        # 扫描线：每个占用在开始日 +1、结束次日 -1
+        deltas: dict[date, int] = {}
+        for o in self.overlapping(user_id, start, end):
+            deltas[max(o.start, start)] = deltas.get(max(o.start, start), 0) + 1
+            if o.end < end:
+                deltas[o.end + timedelta(days=1)] = deltas.get(o.end + timedelta(days=1), 0) - 1
+
+        slots: list[tuple[date, date]] = []
+        load = 0
+        slot_start: Optional[date] = start
+        for day in sorted(deltas):
+            before = load
+            load += deltas[day]
+            if before <= max_load < load and slot_start is not None:
+                if day > slot_start:
+                    slots.append((slot_start, day - timedelta(days=1)))
+                slot_start = None
+            elif load <= max_load < before:
+                slot_start = day
+        if slot_start is not None:
+            slots.append((slot_start, end))
+        return slots
+
+    def overlapping(
+        self,
+        user_id: int,
+        start: date,
+        end: date,
+        exclude_task_id: Optional[int] = None,
+    ) -> list[Occupancy]:
+        """用户在 [start, end] 内的占用（对应 ScheduleService.get_concurrent_count 统计的记录）"""
+        items = self._by_user.get(user_id, [])
+        # 按开始日期排序：开始晚于 end 的占用不可能重叠
+        stop = bisect_right(items, (end, float("inf")), key=_occupancy_order)
+        return [o for o in items[:stop] if o.end >= start and o.task_id != exclude_task_id]
+
+    def overlap_count(
+        self,
+        user_id: int,
+        start: date,
+        end: date,
+        exclude_task_id: Optional[int] = None,
+    ) -> int:
+        return len(self.overlapping(user_id, start, end, exclude_task_id))
+
+    def queue_start(self, user_id: int, key: tuple, calendar: WorkCalendar, today: date) -> tuple[date, int]:
+        """
+        按排序键插入用户串行队列时的开工日期，以及因此顺延的队列任务数。
+        排在前面的任务（含进行中任务）结束后的下一个工作日开工，不早于今天。
+        """
+        last_end: Optional[date] = None
+        displaced = 0
+        for o in self._by_user.get(user_id, []):
+            if o.queue_key is None:
+                continue
+            if o.queue_key < key:
+                if last_end is None or o.end > last_end:
+                    last_end = o.end
+            else:
+                displaced += 1
+        start = today if last_end is None else max(today, last_end + timedelta(days=1))
+        return calendar.next_workday(start), displaced
+
+    def earliest_feasible_start(
+        self,
+        user_id: int,
+        calendar: WorkCalendar,
+        from_date: date,
+        man_days: Decimal,
+        exclude_task_id: Optional[int] = None,
+        limit: int = MAX_CONCURRENT_TASKS,
+    ) -> tuple[date, date]:
+        """
+        不早于 from_date、且整个工期内并发数低于 limit 的最早开工日期，返回 (开工日期, 结束日期)。
+        并发数达到上限时跳到最早结束的重叠任务之后重试。
+        """
+        start = calendar.next_workday(from_date)
+        while True:
+            end = calendar.calc_end_date(start, man_days)
+            overlapping = self.overlapping(user_id, start, end, exclude_task_id)
+            if len(overlapping) < limit:
+                return start, end
+            start = calendar.next_workday(min(o.end for o in overlapping) + timedelta(days=1))
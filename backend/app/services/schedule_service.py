@@ -9,7 +9,7 @@
 """
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, case
-from typing import Optional, List, Tuple
+from typing import Iterable, Optional, List, Tuple
 from datetime import date, timedelta
 from decimal import Decimal
 
@@ -18,9 +18,16 @@ from app.models.task_schedule import TaskSchedule
 from app.models.task_collaborator import TaskCollaborator
 from app.models.holiday import Holiday
 from app.core.exceptions import NotFoundError, ValidationError
-
-# 每人同一时段内最多并发任务数
-MAX_CONCURRENT_TASKS = 3
+from app.services.occupancy_service import OccupancyService
+from app.services.schedule_engine import (
+    MAX_CONCURRENT_TASKS,
+    ScheduleState,
+    SimCollaborator,
+    SimSchedule,
+    SimTask,
+    WorkCalendar,
+    diff_snapshots,
+)
 
 
 class ScheduleService:
@@ -32,22 +39,20 @@ class ScheduleService:
 
     @staticmethod
     def is_workday(check_date: date, db: Session) -> bool:
-        """判断指定日期是否为工作日（非周末且非法定节假日）"""
-        if check_date.weekday() >= 5:
-            return False
+        """判断指定日期是否为工作日（调休上班日，或非周末且非法定节假日）"""
         holiday = db.query(Holiday).filter(Holiday.date == check_date).first()
-        return holiday is None
+        if holiday is not None:
+            return holiday.is_workday
+        return check_date.weekday() < 5
 
     @staticmethod
     def get_workdays_count(start_date: date, end_date: date, db: Session) -> int:
         """计算两个日期之间的工作日数量（含首尾）"""
-        count = 0
-        current_date = start_date
-        while current_date <= end_date:
-            if ScheduleService.is_workday(current_date, db):
-                count += 1
-            current_date += timedelta(days=1)
-        return count
+        if end_date < start_date:
+            return 0
+        # 一次取出区间内的节假日与调休上班日，不逐日查询
+        calendar = ScheduleService._load_calendar(db, start_date, end_date)
+        return calendar.workdays_count(start_date, end_date)
 
     @staticmethod
     def _next_workday(from_date: date, db: Session) -> date:
@@ -83,49 +88,12 @@ class ScheduleService:
         exclude_task_id: Optional[int] = None
     ) -> int:
         """
-        查询指定用户在 [start, end] 时间段内的并发任务数。
+        查询指定用户在 [start, end] 时间段内的并发任务数（基于进程内占用索引，不逐次查库）。
         同时统计：
           - 该用户作为认领人的任务（task_schedules）
           - 该用户作为配合人的任务（task_collaborators.scheduled_start/end）
         """
-        # 认领人维度：排期与 [start, end] 有重叠的任务
-        assignee_query = (
-            db.query(TaskSchedule)
-            .join(Task, Task.id == TaskSchedule.task_id)
-            .filter(
-                Task.assignee_id == user_id,
-                Task.status.in_([
-                    TaskStatus.CLAIMED.value,
-                    TaskStatus.IN_PROGRESS.value,
-                ]),
-                TaskSchedule.start_date <= end,
-                TaskSchedule.end_date >= start,
-            )
-        )
-        if exclude_task_id:
-            assignee_query = assignee_query.filter(Task.id != exclude_task_id)
-        assignee_count = assignee_query.count()
-
-        # 配合人维度：配合人排期与 [start, end] 有重叠
-        collab_query = (
-            db.query(TaskCollaborator)
-            .join(Task, Task.id == TaskCollaborator.task_id)
-            .filter(
-                TaskCollaborator.user_id == user_id,
-                TaskCollaborator.scheduled_start.isnot(None),
-                TaskCollaborator.scheduled_start <= end,
-                TaskCollaborator.scheduled_end >= start,
-                Task.status.in_([
-                    TaskStatus.CLAIMED.value,
-                    TaskStatus.IN_PROGRESS.value,
-                ]),
-            )
-        )
-        if exclude_task_id:
-            collab_query = collab_query.filter(Task.id != exclude_task_id)
-        collab_count = collab_query.count()
-
-        return assignee_count + collab_count
+        return OccupancyService.get_index(db).overlap_count(user_id, start, end, exclude_task_id)
 
     # ------------------------------------------------------------------
     # 串行排期计算（核心）
@@ -139,7 +107,7 @@ class ScheduleService:
     ) -> List[Task]:
         """
         获取开发人员串行队列中的任务列表（排除并发任务）。
-        排序规则：优先级 DESC，同优先级按认领时间 ASC。
+        排序规则：优先级 DESC，同优先级按认领时间 ASC（时间相同按任务ID，保证顺序稳定）。
         """
         priority_order = case(
             PRIORITY_ORDER,
@@ -158,7 +126,7 @@ class ScheduleService:
                     TaskSchedule.is_concurrent == False
                 ),
             )
-            .order_by(priority_order, Task.created_at.asc())
+            .order_by(priority_order, Task.created_at.asc(), Task.id.asc())
         )
         if exclude_task_id:
             query = query.filter(Task.id != exclude_task_id)
@@ -183,7 +151,7 @@ class ScheduleService:
                 Task.assignee_id == assignee_id,
                 Task.status.in_(ScheduleService._INACTIVE_STATUSES),
             )
-            .subquery()
+            .scalar_subquery()
         )
         deleted = (
             db.query(TaskSchedule)
@@ -193,12 +161,26 @@ class ScheduleService:
         db.flush()
         return deleted
 
+    @staticmethod
+    def _load_calendar(db: Session, from_date: Optional[date] = None, to_date: Optional[date] = None) -> WorkCalendar:
+        """加载 [from_date, to_date] 内的节假日与调休上班日为工作日历（一次查询，后续逐日判断不再访问数据库）"""
+        query = db.query(Holiday.date, Holiday.is_workday)
+        if from_date is not None:
+            query = query.filter(Holiday.date >= from_date)
+        if to_date is not None:
+            query = query.filter(Holiday.date <= to_date)
+        rows = query.all()
+        return WorkCalendar(
+            holidays=(row.date for row in rows if not row.is_workday),
+            extra_workdays=(row.date for row in rows if row.is_workday),
+        )
+
     @staticmethod
     def _rebuild_serial_schedules(
         db: Session,
         assignee_id: int,
         start_from: Optional[date] = None
-    ) -> None:
+    ) -> int:
         """
         重建某开发人员串行队列中所有任务的排期。
         规则：
@@ -206,6 +188,9 @@ class ScheduleService:
         - 若有进行中任务，不中断，从其结束日期之后继续排队
         - P0 任务排在进行中任务之后（不打断当前任务）
         - 其余按优先级+认领时间排序
+        增量更新：队列与排期记录一次查出，日期在内存中按工作日历推算；
+        从第一个与推算结果不一致的位置起才会产生写入，且日期未变化的记录不写库，
+        因此队尾任务的变化只会更新一条记录。返回写入（新增/修改）的排期记录数。
         """
         today = date.today()
         start_date = start_from or today
@@ -216,52 +201,64 @@ class ScheduleService:
         # 获取串行队列
         queue = ScheduleService._get_serial_queue(db, assignee_id)
         if not queue:
-            return  # 清理已在上方完成，无活跃任务则直接结束
+            return 0  # 清理已在上方完成，无活跃任务则直接结束
+
+        schedules = {
+            s.task_id: s
+            for s in db.query(TaskSchedule).filter(
+                TaskSchedule.task_id.in_([t.id for t in queue])
+            ).all()
+        }
 
         # 找到当前进行中的任务（最多1个），保留其排期不变
         in_progress_task = next(
             (t for t in queue if t.status == TaskStatus.IN_PROGRESS.value), None
         )
+        in_progress_schedule = schedules.get(in_progress_task.id) if in_progress_task else None
+
+        calendar_from = min(today, start_date)
+        if in_progress_schedule:
+            calendar_from = min(calendar_from, in_progress_schedule.end_date)
+        calendar = ScheduleService._load_calendar(db, calendar_from)
 
         if in_progress_task:
-            in_progress_schedule = db.query(TaskSchedule).filter(
-                TaskSchedule.task_id == in_progress_task.id
-            ).first()
             if in_progress_schedule:
                 # 进行中任务的排期不变，后续从其结束日期次日起排
-                next_start = ScheduleService._next_workday(
-                    in_progress_schedule.end_date + timedelta(days=1), db
-                )
+                next_start = calendar.next_workday(in_progress_schedule.end_date + timedelta(days=1))
             else:
                 # 进行中任务没有排期记录，从今天起
-                next_start = ScheduleService._next_workday(today, db)
+                next_start = calendar.next_workday(today)
         else:
-            next_start = ScheduleService._next_workday(start_date, db)
+            next_start = calendar.next_workday(start_date)
 
-        # 按队列顺序逐一排期（跳过进行中任务）
+        # 按队列顺序逐一排期（跳过进行中任务），只写入日期发生变化的记录
+        written = 0
         for task in queue:
             if task.status == TaskStatus.IN_PROGRESS.value:
                 continue  # 进行中任务排期保持不变
 
-            end_date = ScheduleService._calc_end_date(next_start, task.estimated_man_days, db)
+            end_date = calendar.calc_end_date(next_start, task.estimated_man_days)
 
-            schedule = db.query(TaskSchedule).filter(TaskSchedule.task_id == task.id).first()
-            if schedule:
-                schedule.start_date = next_start
-                schedule.end_date = end_date
-            else:
-                schedule = TaskSchedule(
+            schedule = schedules.get(task.id)
+            if schedule is None:
+                db.add(TaskSchedule(
                     task_id=task.id,
                     start_date=next_start,
                     end_date=end_date,
                     is_pinned=False,
                     is_concurrent=False,
-                )
-                db.add(schedule)
+                ))
+                written += 1
+            elif schedule.start_date != next_start or schedule.end_date != end_date:
+                schedule.start_date = next_start
+                schedule.end_date = end_date
+                written += 1
 
-            next_start = ScheduleService._next_workday(end_date + timedelta(days=1), db)
+            next_start = calendar.next_workday(end_date + timedelta(days=1))
 
-        db.flush()
+        if written:
+            db.flush()
+        return written
 
     @staticmethod
     def calculate_schedule(
@@ -380,12 +377,163 @@ class ScheduleService:
 
         # 同步所有配合人排期（串行 + 并发任务）
         all_task_ids = [t.id for t in queue] + [r[0] for r in concurrent_task_ids]
-        for tid in set(all_task_ids):
-            ScheduleService.sync_collaborator_schedules(db, tid)
+        ScheduleService.sync_collaborator_schedules_bulk(db, set(all_task_ids))
 
         db.commit()
         return task_count
 
+    # ------------------------------------------------------------------
+    # 排期推演
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def load_schedule_state(
+        db: Session,
+        task_ids: Iterable[int],
+        user_ids: Iterable[int] = (),
+    ) -> ScheduleState:
+        """
+        加载排期推演所需的数据快照（批量查询，查询次数与任务数无关）：
+        指定任务、其认领人/配合人及 user_ids 的全部进行中排期、相关配合人记录与节假日。
+        """
+        task_ids = set(task_ids)
+        user_ids = set(user_ids)
+
+        def to_sim(task: Task, schedule: Optional[TaskSchedule]) -> SimTask:
+            return SimTask(
+                id=task.id,
+                title=task.title,
+                status=task.status,
+                priority=task.priority,
+                created_at=task.created_at,
+                estimated_man_days=task.estimated_man_days,
+                assignee_id=task.assignee_id,
+                is_pinned=task.is_pinned,
+                schedule=SimSchedule(
+                    start_date=schedule.start_date,
+                    end_date=schedule.end_date,
+                    is_pinned=schedule.is_pinned,
+                    is_concurrent=schedule.is_concurrent,
+                    concurrent_with=schedule.concurrent_with,
+                ) if schedule else None,
+            )
+
+        def load_tasks(*criteria) -> dict[int, SimTask]:
+            rows = (
+                db.query(Task, TaskSchedule)
+                .outerjoin(TaskSchedule, TaskSchedule.task_id == Task.id)
+                .filter(*criteria)
+                .all()
+            )
+            return {task.id: to_sim(task, schedule) for task, schedule in rows}
+
+        tasks: dict[int, SimTask] = {}
+        if task_ids:
+            tasks = load_tasks(Task.id.in_(task_ids))
+            user_ids.update(t.assignee_id for t in tasks.values() if t.assignee_id)
+            user_ids.update(
+                row[0] for row in db.query(TaskCollaborator.user_id).filter(
+                    TaskCollaborator.task_id.in_(task_ids)
+                ).all()
+            )
+
+        # 相关人员的全部进行中任务（完整串行队列）
+        if user_ids:
+            tasks.update(load_tasks(
+                Task.assignee_id.in_(user_ids),
+                Task.status.in_([TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value]),
+            ))
+
+        # 配合人记录：已加载任务的配合人 + 相关人员配合的其他任务
+        collaborator_rows = []
+        if tasks or user_ids:
+            collaborator_rows = db.query(TaskCollaborator).filter(
+                or_(
+                    TaskCollaborator.task_id.in_(set(tasks)),
+                    TaskCollaborator.user_id.in_(user_ids),
+                )
+            ).all()
+        missing = {c.task_id for c in collaborator_rows} - set(tasks)
+        if missing:
+            tasks.update(load_tasks(Task.id.in_(missing)))
+
+        return ScheduleState(
+            calendar=ScheduleService._load_calendar(db),
+            today=date.today(),
+            tasks=tasks,
+            collaborators=[
+                SimCollaborator(
+                    task_id=c.task_id,
+                    user_id=c.user_id,
+                    scheduled_start=c.scheduled_start,
+                    scheduled_end=c.scheduled_end,
+                )
+                for c in collaborator_rows
+            ],
+            loaded_assignees=user_ids,
+        )
+
+    @staticmethod
+    def simulate(db: Session, scenarios: List[dict]) -> List[dict]:
+        """
+        排期推演（不写库）：加载一次数据快照，各方案在快照副本上依次执行自己的变更。
+        scenarios: [{"name": 方案名, "changes": [{"op": 操作, "task_id": 任务ID, ...参数}]}]
+        单项变更不满足规则（如并发超限）时记录原因并跳过，继续执行后续变更。
+        返回每个方案的逐项执行结果及相对当前排期的变化。
+        """
+        task_ids: set[int] = set()
+        user_ids: set[int] = set()
+        for scenario in scenarios:
+            for change in scenario["changes"]:
+                task_ids.add(change["task_id"])
+                if change.get("concurrent_with"):
+                    task_ids.add(change["concurrent_with"])
+                if change.get("assignee_id"):
+                    user_ids.add(change["assignee_id"])
+
+        base = ScheduleService.load_schedule_state(db, task_ids, user_ids)
+        before = base.snapshot()
+
+        results = []
+        for scenario in scenarios:
+            state = base.copy()
+            change_results = []
+            for index, change in enumerate(scenario["changes"]):
+                params = {k: v for k, v in change.items() if k not in ("op", "task_id")}
+                try:
+                    state.apply(change["op"], change["task_id"], **params)
+                    change_results.append({
+                        "index": index, "op": change["op"], "task_id": change["task_id"],
+                        "applied": True, "error": None, "exceeded_users": [],
+                    })
+                except ValidationError as e:
+                    change_results.append({
+                        "index": index, "op": change["op"], "task_id": change["task_id"],
+                        "applied": False, "error": e.message,
+                        "exceeded_users": getattr(e, "exceeded_users", []),
+                    })
+
+            schedule_changes = diff_snapshots(before, state.snapshot())
+            for item in schedule_changes:
+                item["task_title"] = state.tasks[item["task_id"]].title
+            results.append({
+                "name": scenario.get("name"),
+                "results": change_results,
+                "schedule_changes": schedule_changes,
+            })
+
+        # 超限人员补充姓名（一次查询）
+        exceeded = [u for r in results for c in r["results"] for u in c["exceeded_users"]]
+        if exceeded:
+            from app.models.user import User
+            users = db.query(User.id, User.username, User.full_name).filter(
+                User.id.in_({u["user_id"] for u in exceeded})
+            ).all()
+            names = {row.id: row.full_name or row.username for row in users}
+            for u in exceeded:
+                u["name"] = names.get(u["user_id"], str(u["user_id"]))
+        return results
+
     # ------------------------------------------------------------------
     # 用户排期查询
     # ------------------------------------------------------------------
@@ -500,6 +648,34 @@ class ScheduleService:
 
         db.flush()
 
+    @staticmethod
+    def sync_collaborator_schedules_bulk(db: Session, task_ids: Iterable[int]) -> int:
+        """批量同步多个任务的配合人排期（两次查询），只修改日期不一致的记录，返回修改的记录数"""
+        task_ids = set(task_ids)
+        if not task_ids:
+            return 0
+        schedules = {
+            s.task_id: s
+            for s in db.query(TaskSchedule).filter(TaskSchedule.task_id.in_(task_ids)).all()
+        }
+        if not schedules:
+            return 0
+
+        updated = 0
+        collaborators = db.query(TaskCollaborator).filter(
+            TaskCollaborator.task_id.in_(set(schedules))
+        ).all()
+        for collab in collaborators:
+            schedule = schedules[collab.task_id]
+            if collab.scheduled_start != schedule.start_date or collab.scheduled_end != schedule.end_date:
+                collab.scheduled_start = schedule.start_date
+                collab.scheduled_end = schedule.end_date
+                updated += 1
+
+        if updated:
+            db.flush()
+        return updated
+
     # ------------------------------------------------------------------
     # 并发任务设置
     # ------------------------------------------------------------------
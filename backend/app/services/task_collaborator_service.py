@@ -1,6 +1,7 @@
 """任务配合人服务"""
 from sqlalchemy.orm import Session, joinedload
 from typing import List
+from datetime import date
 from decimal import Decimal
 
 from app.models.task_collaborator import TaskCollaborator
@@ -56,20 +57,22 @@ class TaskCollaboratorService:
             .filter(TaskCollaborator.task_id == task_id)
             .all()
         )
-        result = []
-        for r in records:
-            result.append(CollaboratorResponse(
-                id=r.id,
-                task_id=r.task_id,
-                user_id=r.user_id,
-                user_name=r.user.username if r.user else None,
-                user_full_name=r.user.full_name if r.user else None,
-                allocated_man_days=r.allocated_man_days,
-                scheduled_start=r.scheduled_start,
-                scheduled_end=r.scheduled_end,
-                created_at=r.created_at,
-            ))
-        return result
+        return [TaskCollaboratorService.to_response(r) for r in records]
+
+    @staticmethod
+    def to_response(record: TaskCollaborator) -> CollaboratorResponse:
+        """配合人记录转响应（record.user 应已预加载）"""
+        return CollaboratorResponse(
+            id=record.id,
+            task_id=record.task_id,
+            user_id=record.user_id,
+            user_name=record.user.username if record.user else None,
+            user_full_name=record.user.full_name if record.user else None,
+            allocated_man_days=record.allocated_man_days,
+            scheduled_start=record.scheduled_start,
+            scheduled_end=record.scheduled_end,
+            created_at=record.created_at,
+        )
 
     # ------------------------------------------------------------------
     # 添加配合人
@@ -221,53 +224,45 @@ class TaskCollaboratorService:
     # 任务确认时汇入工作量统计（由 TaskService.confirm_task 调用）
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _collaborator_workload_entries(db: Session, task: Task) -> list:
+        collaborators = db.query(TaskCollaborator.user_id, TaskCollaborator.allocated_man_days).filter(
+            TaskCollaborator.task_id == task.id
+        ).all()
+        return [(user_id, task.project_id, man_days) for user_id, man_days in collaborators]
+
     @staticmethod
     def update_collaborators_workload_on_confirmation(db: Session, task: Task) -> None:
         """
-        任务确认后，将各配合人的分配人天汇入其工作量统计。
-        复用 WorkloadStatisticService 的统计逻辑。
+        任务确认后，将各配合人的分配人天汇入其工作量统计（批量 upsert）。
+        TaskService.confirm_task 已通过 WorkloadStatisticService.apply_task_confirmation
+        连同主认领人一并写入，此方法供单独汇入配合人统计的场景使用。
         """
         from app.services.workload_statistic_service import WorkloadStatisticService
 
-        collaborators = db.query(TaskCollaborator).filter(
-            TaskCollaborator.task_id == task.id
-        ).all()
-
-        for collab in collaborators:
-            if collab.allocated_man_days and collab.allocated_man_days > 0:
-                try:
-                    WorkloadStatisticService.update_statistic_for_user(
-                        db=db,
-                        user_id=collab.user_id,
-                        project_id=task.project_id,
-                        man_days=collab.allocated_man_days,
-                        ref_date=task.updated_at.date() if task.updated_at else None,
-                    )
-                except Exception:
-                    # 配合人统计失败不影响任务确认主流程
-                    pass
+        ref = task.updated_at.date() if task.updated_at else date.today()
+        period_start, period_end = WorkloadStatisticService.month_period(ref)
+        try:
+            WorkloadStatisticService.bulk_accumulate(
+                db, TaskCollaboratorService._collaborator_workload_entries(db, task), period_start, period_end
+            )
+        except Exception:
+            # 配合人统计失败不影响任务确认主流程
+            db.rollback()
 
     @staticmethod
     def rollback_collaborators_workload_on_reopen(db: Session, task: Task) -> None:
         """
-        任务从已确认重新打开时，回滚配合人工作量统计。
+        任务从已确认重新打开时，回滚配合人工作量统计（批量）。
         """
         from app.services.workload_statistic_service import WorkloadStatisticService
 
-        collaborators = db.query(TaskCollaborator).filter(
-            TaskCollaborator.task_id == task.id
-        ).all()
-
-        for collab in collaborators:
-            if collab.allocated_man_days and collab.allocated_man_days > 0:
-                try:
-                    WorkloadStatisticService.rollback_statistic_for_user(
-                        db=db,
-                        user_id=collab.user_id,
-                        project_id=task.project_id,
-                        man_days=collab.allocated_man_days,
-                        ref_date=task.updated_at.date() if task.updated_at else None,
-                    )
-                except Exception:
-                    # 回滚失败不影响任务主流程
-                    pass
+        ref = task.updated_at.date() if task.updated_at else date.today()
+        period_start, period_end = WorkloadStatisticService.month_period(ref)
+        try:
+            WorkloadStatisticService.bulk_rollback(
+                db, TaskCollaboratorService._collaborator_workload_entries(db, task), period_start, period_end
+            )
+        except Exception:
+            # 回滚失败不影响任务主流程
+            db.rollback()
@@ -1,6 +1,7 @@
 """任务留言服务"""
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, selectinload
+from typing import Iterable, List, Tuple
 
 from app.models.task import Task
 from app.models.task_comment import TaskComment
@@ -22,16 +23,40 @@ class TaskCommentService:
         # 任务发布人、认领人、协助人均可留言
         is_creator = task.creator_id == user_id
         is_assignee = task.assignee_id == user_id
-        is_collaborator = db.query(TaskCollaborator).filter(
-            TaskCollaborator.task_id == task_id,
-            TaskCollaborator.user_id == user_id
-        ).first() is not None
+        is_collaborator = db.query(
+            exists().where(
+                TaskCollaborator.task_id == task_id,
+                TaskCollaborator.user_id == user_id,
+            )
+        ).scalar()
 
         if not (is_creator or is_assignee or is_collaborator):
             raise PermissionDeniedError("您不是该任务的参与者，无法留言")
 
         return task
 
+    @staticmethod
+    def is_participant(task: Task, user_id: int, collaborator_user_ids: Iterable[int]) -> bool:
+        """用户是否为任务参与者（发布人/认领人/协助人），用于已加载配合人的场景"""
+        return (
+            task.creator_id == user_id
+            or task.assignee_id == user_id
+            or user_id in set(collaborator_user_ids)
+        )
+
+    @staticmethod
+    def _to_response(comment: TaskComment) -> TaskCommentResponse:
+        return TaskCommentResponse(
+            id=comment.id,
+            task_id=comment.task_id,
+            user_id=comment.user_id,
+            user_name=comment.user.username if comment.user else "未知",
+            user_full_name=comment.user.full_name if comment.user else None,
+            content=comment.content,
+            created_at=comment.created_at,
+            updated_at=comment.updated_at,
+        )
+
     @staticmethod
     def get_comments(db: Session, task_id: int, user_id: int) -> List[TaskCommentResponse]:
         """获取任务留言列表（任务参与者可查看）"""
@@ -39,24 +64,34 @@ class TaskCommentService:
 
         comments = (
             db.query(TaskComment)
+            .options(selectinload(TaskComment.user))
             .filter(TaskComment.task_id == task_id)
             .order_by(TaskComment.created_at.desc())
             .all()
         )
+        return [TaskCommentService._to_response(c) for c in comments]
 
-        return [
-            TaskCommentResponse(
-                id=c.id,
-                task_id=c.task_id,
-                user_id=c.user_id,
-                user_name=c.user.username if c.user else "未知",
-                user_full_name=c.user.full_name if c.user else None,
-                content=c.content,
-                created_at=c.created_at,
-                updated_at=c.updated_at,
-            )
-            for c in comments
-        ]
+    @staticmethod
+    def get_comment_page(
+        db: Session,
+        task_id: int,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Tuple[int, List[TaskCommentResponse]]:
+        """
+        分页获取任务留言（按时间倒序），返回 (总数, 当前页留言)。
+        不做权限校验，调用方需先确认用户为任务参与者；查询次数固定（计数、留言、留言人各一次）。
+        """
+        query = db.query(TaskComment).filter(TaskComment.task_id == task_id)
+        total = query.count()
+        comments = (
+            query.options(selectinload(TaskComment.user))
+            .order_by(TaskComment.created_at.desc(), TaskComment.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+        return total, [TaskCommentService._to_response(c) for c in comments]
 
     @staticmethod
     def create_comment(
@@ -77,16 +112,7 @@ class TaskCommentService:
         db.commit()
         db.refresh(comment)
 
-        return TaskCommentResponse(
-            id=comment.id,
-            task_id=comment.task_id,
-            user_id=comment.user_id,
-            user_name=comment.user.username if comment.user else "未知",
-            user_full_name=comment.user.full_name if comment.user else None,
-            content=comment.content,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at,
-        )
+        return TaskCommentService._to_response(comment)
 
     @staticmethod
     def update_comment(
@@ -106,16 +132,7 @@ class TaskCommentService:
         db.commit()
         db.refresh(comment)
 
-        return TaskCommentResponse(
-            id=comment.id,
-            task_id=comment.task_id,
-            user_id=comment.user_id,
-            user_name=comment.user.username if comment.user else "未知",
-            user_full_name=comment.user.full_name if comment.user else None,
-            content=comment.content,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at,
-        )
+        return TaskCommentService._to_response(comment)
 
     @staticmethod
     def delete_comment(db: Session, comment_id: int, user_id: int) -> None:
@@ -1,6 +1,6 @@
 """任务服务"""
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import func, or_, and_
 from typing import Optional, List, Tuple
 from datetime import date
 from decimal import Decimal
@@ -8,11 +8,31 @@ from decimal import Decimal
 from app.models.task import Task, TaskStatus, TaskPriority, PRIORITY_MULTIPLIER
 from app.models.user import User
 from app.models.project import Project
-from app.core.exceptions import NotFoundError, PermissionDeniedError, ValidationError
+from app.core.exceptions import ConflictError, NotFoundError, PermissionDeniedError, ValidationError
 from app.schemas.task import TaskCreate, TaskUpdate, TaskFilterParams
+from app.services.occupancy_service import OccupancyService
+from app.services.outbox_service import (
+    OutboxService,
+    TASK_ARCHIVED,
+    TASK_ASSIGNED,
+    TASK_CLAIMED,
+    TASK_CONFIRMED,
+    TASK_REJECTED,
+    TASK_REOPENED,
+    TASK_RETURNED,
+    TASK_SUBMITTED,
+)
 from app.services.schedule_service import ScheduleService
-from app.services.workload_statistic_service import WorkloadStatisticService
-from app.services.project_output_value_service import ProjectOutputValueService
+from app.services.upload_storage_service import UploadStorageService, REF_TYPE_TASK
+from app.utils.markdown import make_excerpt
+
+
+# 列表投影字段 -> 需要预加载的关联对象
+_LIST_RELATION_FIELDS = {
+    "creator_name": Task.creator,
+    "assignee_name": Task.assignee,
+    "project_name": Task.project,
+}
 
 
 class TaskService:
@@ -26,6 +46,7 @@ class TaskService:
         task = Task(
             title=task_data.title,
             description=task_data.description,
+            description_excerpt=make_excerpt(task_data.description),
             project_id=task_data.project_id,
             creator_id=creator_id,
             estimated_man_days=task_data.estimated_man_days,
@@ -36,6 +57,8 @@ class TaskService:
             priority_multiplier=multiplier,
         )
         db.add(task)
+        db.flush()
+        UploadStorageService.sync_references(db, REF_TYPE_TASK, task.id, task.description)
         db.commit()
         db.refresh(task)
         return task
@@ -45,6 +68,78 @@ class TaskService:
         """获取任务"""
         return db.query(Task).filter(Task.id == task_id).first()
 
+    @staticmethod
+    def get_task_with_relations(db: Session, task_id: int) -> Optional[Task]:
+        """
+        获取任务及详情页用到的关联对象：创建者、认领人、项目、排期（联表加载），
+        配合人及其用户（selectinload），查询次数固定为 3 次。
+        """
+        from sqlalchemy.orm import joinedload, selectinload
+        from app.models.task_collaborator import TaskCollaborator
+
+        return db.query(Task).options(
+            joinedload(Task.creator),
+            joinedload(Task.assignee),
+            joinedload(Task.project),
+            joinedload(Task.task_schedule),
+            selectinload(Task.collaborators).selectinload(TaskCollaborator.user),
+        ).filter(Task.id == task_id).first()
+
+    @staticmethod
+    def get_task_version(db: Session, task_id: int, user_id: int):
+        """
+        任务详情的版本信息（一条查询，不加载 ORM 对象），用于 ETag 校验与权限判断。
+        返回行包含任务版本号/更新时间/状态/认领人/创建者、创建者/认领人/项目的名称及更新时间、
+        当前用户是否为协助人；任务不存在返回 None。
+        """
+        from sqlalchemy import exists
+        from sqlalchemy.orm import aliased
+        from app.models.task_collaborator import TaskCollaborator
+
+        creator = aliased(User)
+        assignee = aliased(User)
+        is_collaborator = exists().where(
+            TaskCollaborator.task_id == Task.id,
+            TaskCollaborator.user_id == user_id,
+        )
+        return db.query(
+            Task.version,
+            Task.updated_at,
+            Task.status,
+            Task.assignee_id,
+            Task.creator_id,
+            creator.username.label("creator_username"),
+            creator.full_name.label("creator_full_name"),
+            creator.updated_at.label("creator_updated_at"),
+            assignee.username.label("assignee_username"),
+            assignee.full_name.label("assignee_full_name"),
+            assignee.updated_at.label("assignee_updated_at"),
+            Project.name.label("project_name"),
+            Project.updated_at.label("project_updated_at"),
+            is_collaborator.label("is_collaborator"),
+        ).outerjoin(
+            creator, creator.id == Task.creator_id
+        ).outerjoin(
+            assignee, assignee.id == Task.assignee_id
+        ).outerjoin(
+            Project, Project.id == Task.project_id
+        ).filter(Task.id == task_id).first()
+
+    @staticmethod
+    def _list_load_options(fields: Optional[set[str]]) -> list:
+        """列表查询的加载选项：指定返回字段时只加载用到的列和关联对象"""
+        from sqlalchemy.orm import joinedload, load_only
+
+        if fields is None:
+            return [joinedload(Task.creator), joinedload(Task.assignee), joinedload(Task.project)]
+
+        columns = {"id"} | {name for name in fields if name in Task.__table__.columns}
+        options = [load_only(*(getattr(Task, name) for name in sorted(columns)))]
+        for name, relation in _LIST_RELATION_FIELDS.items():
+            if name in fields:
+                options.append(joinedload(relation))
+        return options
+
     @staticmethod
     def get_tasks(
         db: Session,
@@ -53,15 +148,13 @@ class TaskService:
         current_user_role: Optional[str] = None,
         *,
         bypass_developer_visibility_for_single_project_export: bool = False,
+        fields: Optional[set[str]] = None,
     ) -> Tuple[List[Task], int]:
-        """获取任务列表（支持筛选）"""
-        from sqlalchemy.orm import joinedload
-        
-        query = db.query(Task).options(
-            joinedload(Task.creator),
-            joinedload(Task.assignee),
-            joinedload(Task.project)
-        )
+        """
+        获取任务列表（支持筛选）。
+        fields 为返回字段集合（列表字段投影）：只加载这些字段对应的列和关联对象，不传则加载全部。
+        """
+        query = db.query(Task).options(*TaskService._list_load_options(fields))
 
         # 权限过滤：开发人员只能看到自己相关的任务或已发布的任务
         # 特例：按单项目导出已与 GET /projects/{id}/tasks 访问规则对齐时，不按该条收窄（导出与页面一致）
@@ -126,8 +219,8 @@ class TaskService:
         if filters.priority:
             query = query.filter(Task.priority == filters.priority)
 
-        # 总数
-        total = query.count()
+        # 总数（只统计主键，不把 description 等大字段带进计数子查询）
+        total = query.with_entities(func.count(Task.id)).scalar()
 
         # 分页
         offset = (filters.page - 1) * filters.page_size
@@ -161,6 +254,8 @@ class TaskService:
             task.title = task_data.title
         if task_data.description is not None:
             task.description = task_data.description
+            task.description_excerpt = make_excerpt(task.description)
+            UploadStorageService.sync_references(db, REF_TYPE_TASK, task.id, task.description)
         if task_data.project_id is not None:
             task.project_id = task_data.project_id
         if task_data.estimated_man_days is not None:
@@ -314,6 +409,47 @@ class TaskService:
 
         return task
 
+    @staticmethod
+    def _take_published_task(
+        db: Session,
+        task: Task,
+        new_status: str,
+        assignee_id: int,
+        commit: bool = True
+    ) -> None:
+        """
+        乐观并发：以条件更新把已发布任务交给 assignee_id
+        （UPDATE ... WHERE status='published' AND assignee_id IS NULL AND version=读取时的版本）。
+        多人同时认领/派发同一任务时只有一人更新成功，其余请求立即以 ConflictError 返回，
+        不等待行锁后覆盖他人结果，也不触发排期重建。
+        commit=False 时不提交（由调用方在同一事务内继续处理）。
+        """
+        # 先写入本会话中该任务尚未 flush 的修改，条件更新以数据库中的版本为准
+        db.flush()
+        updated = db.query(Task).filter(
+            Task.id == task.id,
+            Task.status == TaskStatus.PUBLISHED.value,
+            Task.assignee_id.is_(None),
+            Task.version == task.version,
+        ).update(
+            {
+                Task.status: new_status,
+                Task.assignee_id: assignee_id,
+                Task.version: Task.version + 1,
+            },
+            synchronize_session=False,
+        )
+        if not updated:
+            db.rollback()
+            raise ConflictError("任务已被认领或已变更，请刷新后重试")
+        # 批量更新不经过 ORM flush，需手动登记排期占用变化
+        OccupancyService.mark_changed(db, [task.id])
+        if commit:
+            db.commit()
+            db.refresh(task)
+        else:
+            db.expire(task)
+
     @staticmethod
     def claim_task(
         db: Session,
@@ -334,22 +470,9 @@ class TaskService:
             raise ValidationError("任务已被认领")
 
         old_status = task.status
-        task.status = TaskStatus.CLAIMED.value
-        task.assignee_id = current_user_id
-        db.commit()
-        db.refresh(task)
-
-        # 自动生成排期
-        try:
-            ScheduleService.calculate_schedule(
-                db,
-                task.id,
-                task.estimated_man_days,
-                current_user_id
-            )
-        except Exception as e:
-            # 排期生成失败不影响任务认领
-            pass
+        # 排期由后台事件处理器生成（与认领同一事务登记事件，认领失败时事件一并回滚）
+        OutboxService.publish(db, TASK_CLAIMED, task.id, {"task_id": task.id, "assignee_id": current_user_id})
+        TaskService._take_published_task(db, task, TaskStatus.CLAIMED.value, current_user_id)
 
         # 创建消息通知
         try:
@@ -390,11 +513,8 @@ class TaskService:
             raise ValidationError("只能派发给开发人员")
 
         old_status = task.status
-        task.status = TaskStatus.PENDING_EVAL.value
-        task.assignee_id = assignee_id
-        db.commit()
-        db.refresh(task)
-        
+        TaskService._take_published_task(db, task, TaskStatus.PENDING_EVAL.value, assignee_id)
+
         # 创建消息通知
         try:
             from app.services.message_service import MessageService
@@ -427,22 +547,11 @@ class TaskService:
 
         old_status = task.status
         if accept:
-            # 接受：状态变为已认领
+            # 接受：状态变为已认领，排期由后台事件处理器生成
             task.status = TaskStatus.CLAIMED.value
+            OutboxService.publish(db, TASK_CLAIMED, task.id, {"task_id": task.id, "assignee_id": task.assignee_id})
             db.commit()
             db.refresh(task)
-
-            # 自动生成排期
-            try:
-                ScheduleService.calculate_schedule(
-                    db,
-                    task.id,
-                    task.estimated_man_days,
-                    task.assignee_id
-                )
-            except Exception as e:
-                # 排期生成失败不影响任务接受
-                pass
             
             # 创建消息通知
             try:
@@ -542,15 +651,11 @@ class TaskService:
         old_status = task.status
         task.status = TaskStatus.SUBMITTED.value
         task.actual_man_days = actual_man_days
+        # 任务提交后，该任务退出串行队列，由后台事件处理器前移后续任务排期
+        OutboxService.publish(db, TASK_SUBMITTED, task.id, {"task_id": task.id, "assignee_id": assignee_id})
         db.commit()
         db.refresh(task)
 
-        # 任务提交后，该任务退出串行队列，自动前移后续任务排期
-        try:
-            ScheduleService.recalculate_user_schedules(db, assignee_id)
-        except Exception:
-            pass
-
         # 创建消息通知
         try:
             from app.services.message_service import MessageService
@@ -586,6 +691,8 @@ class TaskService:
         # 更新任务状态
         old_status = task.status
         task.status = TaskStatus.CONFIRMED.value
+        # 工作量统计与项目产值由后台事件处理器更新
+        OutboxService.publish(db, TASK_CONFIRMED, task.id, {"task_id": task.id, "project_id": task.project_id})
         db.commit()
         db.refresh(task)
 
@@ -597,26 +704,6 @@ class TaskService:
             # 消息创建失败不影响任务确认
             pass
 
-        # 任务确认后，自动更新主认领人工作量统计
-        try:
-            WorkloadStatisticService.update_statistic_on_task_confirmation(db, task)
-        except Exception as e:
-            pass
-
-        # 任务确认后，将配合人的分配人天汇入各自工作量统计
-        try:
-            from app.services.task_collaborator_service import TaskCollaboratorService
-            TaskCollaboratorService.update_collaborators_workload_on_confirmation(db, task)
-        except Exception:
-            pass
-
-        # 任务确认后，更新项目产值统计
-        if task.project_id:
-            try:
-                ProjectOutputValueService.update_project_output_value(db, task.project_id)
-            except Exception as e:
-                pass
-
         return task
 
     @staticmethod
@@ -648,16 +735,12 @@ class TaskService:
         old_status = task.status
         task.status = TaskStatus.IN_PROGRESS.value
         task.rejection_reason = reason
+        # 任务退回后重新进入串行队列，由后台事件处理器重算排期（含后续任务）
+        OutboxService.publish(db, TASK_REJECTED, task.id, {"task_id": task.id, "assignee_id": assignee_id})
 
         db.commit()
         db.refresh(task)
 
-        # 任务退回后重新进入串行队列，需重算排期（含后续任务）
-        try:
-            ScheduleService.recalculate_user_schedules(db, assignee_id)
-        except Exception:
-            pass
-
         # 消息通知
         try:
             from app.services.message_service import MessageService
@@ -691,38 +774,12 @@ class TaskService:
 
         old_status = task.status
         task.status = TaskStatus.IN_PROGRESS.value
+        # 工作量统计回滚（已确认时曾累加）与项目产值由后台事件处理器在确认事件之后处理
+        OutboxService.publish(db, TASK_REOPENED, task.id, {"task_id": task.id, "project_id": task.project_id})
 
-        # 先提交状态变更，再执行统计回滚
         db.commit()
         db.refresh(task)
 
-        # 回滚主认领人的工作量统计（已确认时曾累加）
-        try:
-            if task.assignee_id and task.actual_man_days:
-                WorkloadStatisticService.rollback_statistic_for_user(
-                    db=db,
-                    user_id=task.assignee_id,
-                    project_id=task.project_id,
-                    man_days=task.actual_man_days,
-                    ref_date=task.updated_at.date() if task.updated_at else None,
-                )
-        except Exception:
-            pass
-
-        # 回滚配合人的工作量统计
-        try:
-            from app.services.task_collaborator_service import TaskCollaboratorService
-            TaskCollaboratorService.rollback_collaborators_workload_on_reopen(db, task)
-        except Exception:
-            pass
-
-        # 重新打开后，更新项目产值统计
-        if task.project_id:
-            try:
-                ProjectOutputValueService.update_project_output_value(db, task.project_id)
-            except Exception:
-                pass
-
         # 消息通知
         try:
             from app.services.message_service import MessageService
@@ -783,6 +840,136 @@ class TaskService:
         if task.status != TaskStatus.DRAFT.value:
             raise ValidationError("只有草稿状态的任务可以删除")
 
+        UploadStorageService.clear_references(db, REF_TYPE_TASK, task.id)
         db.delete(task)
         db.commit()
         return True
+
+    @staticmethod
+    def bulk_operate(
+        db: Session,
+        operations: List[dict],
+        current_user_id: int,
+        current_user_role: str
+    ) -> dict:
+        """
+        批量任务操作：按顺序执行发布、退回草稿、派发、收回、归档、修改优先级，
+        全部在一个事务内完成，任一项失败则整体回滚。
+        排期重算、项目产值重算以领域事件在同一事务内登记，由后台投递：
+        同一批次内每个受影响人员/项目只在第一条事件中携带，各只重算一次。
+        状态变更通知一次性登记（同一任务多次变更只通知最终状态）。
+        """
+        from app.models.task_collaborator import TaskCollaborator
+        from app.models.task_schedule import TaskSchedule
+        from app.services.notification_service import NotificationService
+
+        if current_user_role not in ["project_manager", "system_admin"]:
+            raise PermissionDeniedError("只有项目经理可以批量操作任务")
+
+        task_ids = {op["task_id"] for op in operations}
+        tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(task_ids)).all()}
+        assignee_ids = {op["assignee_id"] for op in operations if op.get("assignee_id")}
+        developer_ids = {
+            row[0] for row in db.query(User.id).filter(User.id.in_(assignee_ids), User.role == "developer").all()
+        } if assignee_ids else set()
+
+        original_status = {task_id: task.status for task_id, task in tasks.items()}
+        returned_ids: set[int] = set()
+        reschedule_users: set[int] = set()
+        project_ids: set[int] = set()
+
+        def publish(event_type: str, task: Task, assignee_id: Optional[int] = None) -> None:
+            """登记事件；人员/项目已由本批次其他事件携带时不再重复携带"""
+            payload = {"task_id": task.id}
+            if assignee_id and assignee_id not in reschedule_users:
+                reschedule_users.add(assignee_id)
+                payload["assignee_id"] = assignee_id
+            if task.project_id and task.project_id not in project_ids:
+                project_ids.add(task.project_id)
+                payload["project_id"] = task.project_id
+            OutboxService.publish(db, event_type, task.id, payload)
+
+        try:
+            for index, op in enumerate(operations, start=1):
+                task_id = op["task_id"]
+                task = tasks.get(task_id)
+                try:
+                    if task is None:
+                        raise NotFoundError("任务", str(task_id))
+                    action = op["action"]
+                    if action == "publish":
+                        if task.status != TaskStatus.DRAFT.value:
+                            raise ValidationError("只有草稿状态的任务可以发布")
+                        task.status = TaskStatus.PUBLISHED.value
+                    elif action == "revert_draft":
+                        if task.status != TaskStatus.PUBLISHED.value:
+                            raise ValidationError("只有已发布状态的任务可以退回草稿")
+                        task.status = TaskStatus.DRAFT.value
+                    elif action == "assign":
+                        assignee_id = op.get("assignee_id")
+                        if not assignee_id:
+                            raise ValidationError("派发需指定 assignee_id")
+                        if assignee_id not in developer_ids:
+                            raise ValidationError(f"只能派发给开发人员（用户 {assignee_id}）")
+                        if task.status != TaskStatus.PUBLISHED.value:
+                            raise ValidationError("只有已发布状态的任务可以派发")
+                        TaskService._take_published_task(
+                            db, task, TaskStatus.PENDING_EVAL.value, assignee_id, commit=False
+                        )
+                        publish(TASK_ASSIGNED, task)
+                    elif action == "return":
+                        if task.status not in [TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value]:
+                            raise ValidationError("只有已认领或进行中的任务可以收回")
+                        # 收回后原认领人的后续任务前移
+                        publish(TASK_RETURNED, task, task.assignee_id)
+                        task.status = TaskStatus.PUBLISHED.value
+                        task.assignee_id = None
+                        task.is_pinned = False
+                        returned_ids.add(task.id)
+                    elif action == "archive":
+                        if task.status != TaskStatus.CONFIRMED.value:
+                            raise ValidationError("只有已确认状态的任务可以归档")
+                        task.status = TaskStatus.ARCHIVED.value
+                        publish(TASK_ARCHIVED, task)
+                    elif action == "set_priority":
+                        priority = op.get("priority")
+                        if not priority:
+                            raise ValidationError("修改优先级需指定 priority")
+                        if task.status not in [TaskStatus.DRAFT.value, TaskStatus.PUBLISHED.value]:
+                            raise ValidationError("任务认领后优先级不可修改")
+                        task.priority = priority
+                        task.priority_multiplier = PRIORITY_MULTIPLIER.get(priority, Decimal("1.00"))
+                    else:
+                        raise ValidationError(f"不支持的操作: {action}")
+                except (NotFoundError, ValidationError, ConflictError) as e:
+                    e.message = f"第 {index} 项（任务 {task_id}）：{e.message}"
+                    raise
+
+            if returned_ids:
+                # 收回的任务删除排期与配合人（需重新认领后重新生成）
+                db.query(TaskSchedule).filter(TaskSchedule.task_id.in_(returned_ids)).delete(synchronize_session=False)
+                db.query(TaskCollaborator).filter(
+                    TaskCollaborator.task_id.in_(returned_ids)
+                ).delete(synchronize_session=False)
+                OccupancyService.mark_changed(db, returned_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        ordered_ids = list(dict.fromkeys(op["task_id"] for op in operations))
+        result_tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(ordered_ids)).all()}
+        changes = [
+            (task_id, original_status[task_id], result_tasks[task_id].status)
+            for task_id in ordered_ids
+            if result_tasks[task_id].status != original_status[task_id]
+        ]
+        NotificationService.enqueue_task_status_changes(changes)
+
+        return {
+            "total": len(operations),
+            "tasks": [result_tasks[task_id] for task_id in ordered_ids],
+            "rescheduled_users": sorted(reschedule_users),
+            "recomputed_projects": sorted(project_ids),
+            "notifications": len(changes),
+        }
@@ -0,0 +1,138 @@
+"""图片缩略图服务
+
+上传完成后在后台线程池中一次性生成固定尺寸的缩略图：
+- export：导出 Excel 时嵌入单元格的尺寸
+- preview：列表预览尺寸
+
+缩略图路径可由内容哈希直接推导：/uploads/thumbs/<variant>/<hash>.png
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.utils.paths import get_uploads_dir, get_uploads_thumbs_dir
+
+logger = logging.getLogger(__name__)
+
+EXPORT_VARIANT = "export"
+PREVIEW_VARIANT = "preview"
+
+# 各缩略图的最大尺寸（宽, 高），按比例缩放，不放大
+THUMBNAIL_VARIANTS = {
+    EXPORT_VARIANT: (210, 120),
+    PREVIEW_VARIANT: (320, 240),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.THUMBNAIL_WORKERS),
+    thread_name_prefix="thumbnail",
+)
+# 正在生成中的哈希，避免重复上传同一图片时重复提交任务
+_pending: set[str] = set()
+_pending_lock = threading.Lock()
+
+
+class ThumbnailService:
+    """缩略图服务类"""
+
+    @staticmethod
+    def variant_relative_path(content_hash: str, variant: str) -> str:
+        """缩略图相对 uploads 目录的路径"""
+        return f"thumbs/{variant}/{content_hash}.png"
+
+    @staticmethod
+    def variant_url(content_hash: str, variant: str) -> str:
+        """缩略图访问 URL"""
+        return f"/uploads/{ThumbnailService.variant_relative_path(content_hash, variant)}"
+
+    @staticmethod
+    def variant_urls(content_hash: str) -> dict[str, str]:
+        """全部缩略图 URL"""
+        return {v: ThumbnailService.variant_url(content_hash, v) for v in THUMBNAIL_VARIANTS}
+
+    @staticmethod
+    def has_all_variants(content_hash: str) -> bool:
+        """是否已生成全部缩略图"""
+        uploads_dir = get_uploads_dir()
+        return all(
+            (uploads_dir / ThumbnailService.variant_relative_path(content_hash, v)).is_file()
+            for v in THUMBNAIL_VARIANTS
+        )
+
+    @staticmethod
+    def generate_variants(content_hash: str, source_relative_path: str) -> int:
+        """
+        同步生成缺失的缩略图（原图只解码一次）。
+        返回本次生成的缩略图数量。
+        """
+        from PIL import Image as PILImage
+
+        missing = [
+            v for v in THUMBNAIL_VARIANTS
+            if not (get_uploads_thumbs_dir(v) / f"{content_hash}.png").is_file()
+        ]
+        if not missing:
+            return 0
+
+        source_path = get_uploads_dir() / source_relative_path
+        with PILImage.open(source_path) as original:
+            original.load()
+            has_alpha = "A" in original.getbands() or "transparency" in original.info
+            base = original.convert("RGBA" if has_alpha else "RGB")
+
+        for variant in missing:
+            img = base.copy()
+            img.thumbnail(THUMBNAIL_VARIANTS[variant], PILImage.Resampling.LANCZOS)
+            if variant == EXPORT_VARIANT and img.mode != "RGB":
+                # 导出时统一为白底 RGB，与 Excel 拼接画布一致
+                canvas = PILImage.new("RGB", img.size, (255, 255, 255))
+                canvas.paste(img, mask=img.getchannel("A"))
+                img = canvas
+
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG", optimize=True)
+            target = get_uploads_thumbs_dir(variant) / f"{content_hash}.png"
+            tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(buffer.getvalue())
+            os.replace(tmp_path, target)
+
+        return len(missing)
+
+    @staticmethod
+    def _run(content_hash: str, source_relative_path: str) -> None:
+        try:
+            ThumbnailService.generate_variants(content_hash, source_relative_path)
+        except Exception as e:
+            logger.warning(f"缩略图生成失败: {source_relative_path}: {e}")
+        finally:
+            with _pending_lock:
+                _pending.discard(content_hash)
+
+    @staticmethod
+    def schedule(content_hash: str, source_relative_path: str) -> bool:
+        """
+        提交后台生成任务（不阻塞请求）。
+        已全部生成或正在生成时不重复提交；返回是否提交了新任务。
+        """
+        if ThumbnailService.has_all_variants(content_hash):
+            return False
+        with _pending_lock:
+            if content_hash in _pending:
+                return False
+            _pending.add(content_hash)
+        try:
+            _executor.submit(ThumbnailService._run, content_hash, source_relative_path)
+        except RuntimeError:
+            # 线程池已关闭（进程退出中）
+            with _pending_lock:
+                _pending.discard(content_hash)
+            return False
+        return True
+
+    @staticmethod
+    def shutdown() -> None:
+        """关闭线程池（应用退出时调用），不等待未开始的任务"""
+        _executor.shutdown(wait=False, cancel_futures=True)
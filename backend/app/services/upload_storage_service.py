@@ -0,0 +1,282 @@
+"""上传文件存储服务（内容寻址、去重）
+
+存储规则：
+1. 文件按内容 SHA-256 命名：uploads/images/<hash><ext>，相同内容只存一份
+2. 重复上传直接返回已有文件的 URL，不再写盘
+3. 上传时记录图片尺寸/格式，供导出等场景直接使用
+4. upload_references 记录任务描述、文章正文对文件的引用，无引用的文件可被回收
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy import exists, func
+
+from app.models.uploaded_file import UploadedFile, UploadReference
+from app.services.thumbnail_service import ThumbnailService, THUMBNAIL_VARIANTS
+from app.utils.paths import get_uploads_dir, get_uploads_images_dir
+
+logger = logging.getLogger(__name__)
+
+# 引用方类型
+REF_TYPE_TASK = "task"
+REF_TYPE_ARTICLE = "article"
+
+# 内容寻址图片 URL：/uploads/images/<64位十六进制哈希>.<ext>
+_CONTENT_ADDRESSED_URL = re.compile(r"/uploads/images/([0-9a-f]{64})\.[A-Za-z0-9]+")
+
+# MIME 类型到扩展名的映射（优先于原始文件名后缀，保证同内容同扩展名）
+_MIME_TO_EXT = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+}
+
+# 无引用文件的默认保留时长（上传后尚未保存任务/文章的图片需要保留一段时间）
+DEFAULT_GC_GRACE_PERIOD = timedelta(hours=24)
+
+
+class UploadStorageService:
+    """上传文件存储服务类"""
+
+    # ------------------------------------------------------------------
+    # 工具方法
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compute_hash(content: bytes) -> str:
+        """计算文件内容哈希"""
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def url_for(record: UploadedFile) -> str:
+        """文件访问 URL（相对路径，前端会自动拼接baseURL）"""
+        return f"/uploads/{record.file_path}"
+
+    @staticmethod
+    def _probe_image(content: bytes) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+        """读取图片格式与尺寸（仅解析文件头，不解码像素）；非位图或解析失败返回空值"""
+        try:
+            from PIL import Image as PILImage
+
+            with PILImage.open(io.BytesIO(content)) as img:
+                width, height = img.size
+                return img.format, int(width), int(height)
+        except Exception:
+            return None, None, None
+
+    @staticmethod
+    def _write_blob(target: Path, content: bytes) -> None:
+        """写入文件（先写临时文件再原子替换，避免并发上传读到半截文件）"""
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, target)
+
+    @staticmethod
+    def extract_content_hashes(*texts: Optional[str]) -> set[str]:
+        """从 Markdown 文本中提取内容寻址图片的哈希"""
+        hashes: set[str] = set()
+        for text in texts:
+            if text:
+                hashes.update(_CONTENT_ADDRESSED_URL.findall(text))
+        return hashes
+
+    # ------------------------------------------------------------------
+    # 上传
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def save_image(
+        db: Session,
+        content: bytes,
+        original_filename: Optional[str],
+        content_type: Optional[str],
+        uploaded_by: Optional[int] = None,
+    ) -> Tuple[UploadedFile, bool]:
+        """
+        保存图片。
+        返回 (文件记录, 是否为新写入)；内容已存在时返回已有记录，并刷新其最近上传时间
+        （该图片可能正被粘贴进尚未保存的草稿，保留期需重新起算）。
+        """
+        content_hash = UploadStorageService.compute_hash(content)
+        uploads_dir = get_uploads_dir()
+
+        existing = db.query(UploadedFile).filter(UploadedFile.content_hash == content_hash).first()
+        if existing:
+            # 文件被误删时按原路径补写，保证已有 URL 仍可访问
+            existing_path = uploads_dir / existing.file_path
+            if not existing_path.is_file():
+                UploadStorageService._write_blob(existing_path, content)
+            UploadStorageService._touch(db, existing)
+            return existing, False
+
+        ext = _MIME_TO_EXT.get(content_type or "") or (Path(original_filename or "").suffix.lower() or ".jpg")
+        filename = f"{content_hash}{ext}"
+        target = get_uploads_images_dir() / filename
+        if not target.is_file():
+            UploadStorageService._write_blob(target, content)
+
+        image_format, width, height = UploadStorageService._probe_image(content)
+        record = UploadedFile(
+            content_hash=content_hash,
+            file_path=f"images/{filename}",
+            file_size=len(content),
+            mime_type=content_type or "application/octet-stream",
+            image_format=image_format,
+            width=width,
+            height=height,
+            uploaded_by=uploaded_by,
+        )
+        db.add(record)
+        try:
+            db.commit()
+        except IntegrityError:
+            # 并发上传同一内容：以先写入的记录为准
+            db.rollback()
+            record = db.query(UploadedFile).filter(UploadedFile.content_hash == content_hash).first()
+            UploadStorageService._touch(db, record)
+            return record, False
+        db.refresh(record)
+        return record, True
+
+    @staticmethod
+    def _touch(db: Session, record: UploadedFile) -> None:
+        """刷新最近上传时间（使用数据库时钟，与 created_at 的默认值一致）"""
+        db.query(UploadedFile).filter(UploadedFile.id == record.id).update(
+            {UploadedFile.last_uploaded_at: func.now()}, synchronize_session=False
+        )
+        db.commit()
+        db.refresh(record)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_files_by_urls(db: Session, urls: Iterable[str]) -> dict[str, UploadedFile]:
+        """批量按 URL 查询文件记录，返回 {url: 文件记录}（非内容寻址 URL 不在结果中）"""
+        url_hashes: dict[str, str] = {}
+        for url in urls:
+            match = _CONTENT_ADDRESSED_URL.search(url or "")
+            if match:
+                url_hashes[url] = match.group(1)
+        if not url_hashes:
+            return {}
+
+        records = db.query(UploadedFile).filter(
+            UploadedFile.content_hash.in_(set(url_hashes.values()))
+        ).all()
+        by_hash = {r.content_hash: r for r in records}
+        return {url: by_hash[h] for url, h in url_hashes.items() if h in by_hash}
+
+    # ------------------------------------------------------------------
+    # 引用维护（由任务/文章服务在提交前调用，不单独提交事务）
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def sync_references(db: Session, ref_type: str, ref_id: int, *texts: Optional[str]) -> None:
+        """按文本内容同步某个对象的文件引用：新增缺失引用，删除不再出现的引用"""
+        hashes = UploadStorageService.extract_content_hashes(*texts)
+        wanted_ids: set[int] = set()
+        if hashes:
+            wanted_ids = {
+                row[0]
+                for row in db.query(UploadedFile.id).filter(UploadedFile.content_hash.in_(hashes)).all()
+            }
+
+        current_ids = {
+            row[0]
+            for row in db.query(UploadReference.file_id).filter(
+                UploadReference.ref_type == ref_type,
+                UploadReference.ref_id == ref_id,
+            ).all()
+        }
+
+        stale_ids = current_ids - wanted_ids
+        if stale_ids:
+            db.query(UploadReference).filter(
+                UploadReference.ref_type == ref_type,
+                UploadReference.ref_id == ref_id,
+                UploadReference.file_id.in_(stale_ids),
+            ).delete(synchronize_session=False)
+
+        for file_id in wanted_ids - current_ids:
+            db.add(UploadReference(file_id=file_id, ref_type=ref_type, ref_id=ref_id))
+
+        db.flush()
+
+    @staticmethod
+    def clear_references(db: Session, ref_type: str, ref_id: int) -> None:
+        """删除某个对象的全部文件引用（对象被删除时调用）"""
+        db.query(UploadReference).filter(
+            UploadReference.ref_type == ref_type,
+            UploadReference.ref_id == ref_id,
+        ).delete(synchronize_session=False)
+        db.flush()
+
+    # ------------------------------------------------------------------
+    # 垃圾回收
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def collect_garbage(
+        db: Session,
+        grace_period: timedelta = DEFAULT_GC_GRACE_PERIOD,
+    ) -> int:
+        """
+        回收无任何引用、且最近一次上传早于保留期的文件。
+        先删除记录并提交，再删除磁盘文件：提交失败时不会留下指向已删除文件的记录，
+        删除文件失败只会残留无记录的文件（可再次上传补齐），不影响已有 URL。
+        返回回收的文件数量。
+        """
+        # 截止时间取自数据库时钟：last_uploaded_at 由数据库 func.now() 生成，
+        # 其时区随数据库而定（SQLite 为 UTC，MySQL 为会话时区），不能与应用进程的时钟比较
+        cutoff = db.query(func.now()).scalar() - grace_period
+        is_orphan = (
+            UploadedFile.last_uploaded_at < cutoff,
+            ~exists().where(UploadReference.file_id == UploadedFile.id),
+        )
+        orphans = db.query(UploadedFile.id, UploadedFile.content_hash, UploadedFile.file_path).filter(
+            *is_orphan
+        ).all()
+        if not orphans:
+            return 0
+
+        removed = []
+        for file_id, content_hash, file_path in orphans:
+            # 条件删除：查询之后被引用或被重新上传的文件不回收
+            deleted = db.query(UploadedFile).filter(UploadedFile.id == file_id, *is_orphan).delete(
+                synchronize_session=False
+            )
+            if deleted:
+                removed.append((content_hash, file_path))
+        db.commit()
+
+        uploads_dir = get_uploads_dir().resolve()
+        for content_hash, file_path in removed:
+            # 删除记录后同一内容又被上传（新记录沿用同一路径）时保留文件
+            if db.query(exists().where(UploadedFile.content_hash == content_hash)).scalar():
+                continue
+            relative_paths = [file_path] + [
+                ThumbnailService.variant_relative_path(content_hash, v) for v in THUMBNAIL_VARIANTS
+            ]
+            for relative_path in relative_paths:
+                blob_path = (uploads_dir / relative_path).resolve()
+                try:
+                    if uploads_dir in blob_path.parents and blob_path.is_file():
+                        blob_path.unlink()
+                except OSError as e:
+                    logger.warning(f"删除上传文件失败: {blob_path}: {e}")
+
+        logger.info(f"上传文件垃圾回收完成，共回收 {len(removed)} 个文件")
+        return len(removed)
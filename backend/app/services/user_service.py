@@ -247,7 +247,7 @@ def delete_user(
     return True
 
 
-def create_user_by_admin(
+async def create_user_by_admin(
     db: Session,
     user_data: UserCreate,
     current_user: User
@@ -268,7 +268,7 @@ def create_user_by_admin(
         role = UserRole.DEVELOPER
     
     # 使用默认密码创建用户
-    user = create_user(
+    user = await create_user(
         db=db,
         username=user_data.username,
         email=user_data.email,
@@ -1,20 +1,236 @@
 """工作量统计服务"""
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional
 from datetime import date, datetime
 from decimal import Decimal
 
 from app.models.workload_statistic import WorkloadStatistic
 from app.models.task import Task, TaskStatus
+from app.models.task_collaborator import TaskCollaborator
 from app.core.exceptions import NotFoundError, ValidationError
 from app.schemas.workload_statistic import WorkloadStatisticFilterParams
 from sqlalchemy.orm import joinedload
 
+# 工作量累加条目：(用户ID, 项目ID, 人天)
+WorkloadEntry = Tuple[int, Optional[int], Decimal]
+
+# upsert 冲突判定列（与 uq_workload_statistic_period 一致）
+_PERIOD_KEY_COLUMNS = ["user_id", "project_id", "period_start", "period_end"]
+
 
 class WorkloadStatisticService:
     """工作量统计服务类"""
 
+    # ------------------------------------------------------------------
+    # 批量累加 / 回滚（任务确认、重新打开时一次写入主认领人与全部配合人）
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def month_period(ref: date) -> Tuple[date, date]:
+        """ref 所在自然月的统计周期"""
+        period_start = date(ref.year, ref.month, 1)
+        if ref.month == 12:
+            period_end = date(ref.year + 1, 1, 1) - date.resolution
+        else:
+            period_end = date(ref.year, ref.month + 1, 1) - date.resolution
+        return period_start, period_end
+
+    @staticmethod
+    def _merge_entries(entries: Iterable[WorkloadEntry]) -> dict[Tuple[int, Optional[int]], Decimal]:
+        """按 (用户, 项目) 合并人天，忽略非正数"""
+        merged: dict[Tuple[int, Optional[int]], Decimal] = {}
+        for user_id, project_id, man_days in entries:
+            if man_days and man_days > 0:
+                key = (user_id, project_id)
+                merged[key] = merged.get(key, Decimal("0")) + Decimal(man_days)
+        return merged
+
+    @staticmethod
+    def _upsert_statement(db: Session, rows: list[dict]):
+        """
+        按方言构建批量 upsert 语句：冲突时累加 total_man_days。
+        不支持的方言（或 SQLite < 3.24）返回 None，由调用方走查询后写入的兼容路径。
+        """
+        dialect = db.get_bind().dialect
+        increment = WorkloadStatistic.total_man_days
+        if dialect.name == "postgresql" or (
+            dialect.name == "sqlite" and (dialect.server_version_info or (0,)) >= (3, 24)
+        ):
+            if dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(WorkloadStatistic).values(rows)
+            return stmt.on_conflict_do_update(
+                index_elements=_PERIOD_KEY_COLUMNS,
+                set_={
+                    "total_man_days": increment + stmt.excluded.total_man_days,
+                    "updated_at": func.now(),
+                },
+            )
+        if dialect.name in ("mysql", "mariadb"):
+            from sqlalchemy.dialects.mysql import insert
+
+            stmt = insert(WorkloadStatistic).values(rows)
+            return stmt.on_duplicate_key_update(
+                total_man_days=increment + stmt.inserted.total_man_days,
+                updated_at=func.now(),
+            )
+        return None
+
+    @staticmethod
+    def _load_period_stats(
+        db: Session,
+        keys: Iterable[Tuple[int, Optional[int]]],
+        period_start: date,
+        period_end: date,
+    ) -> dict[Tuple[int, Optional[int]], WorkloadStatistic]:
+        """一次查询取出多个 (用户, 项目) 在同一周期的统计记录"""
+        keys = set(keys)
+        if not keys:
+            return {}
+        stats = db.query(WorkloadStatistic).filter(
+            WorkloadStatistic.user_id.in_({user_id for user_id, _ in keys}),
+            WorkloadStatistic.period_start == period_start,
+            WorkloadStatistic.period_end == period_end,
+        ).all()
+        return {
+            (stat.user_id, stat.project_id): stat
+            for stat in stats
+            if (stat.user_id, stat.project_id) in keys
+        }
+
+    @staticmethod
+    def bulk_accumulate(
+        db: Session,
+        entries: Iterable[WorkloadEntry],
+        period_start: date,
+        period_end: date,
+    ) -> None:
+        """
+        批量累加同一统计周期内多个用户的工作量（单条 upsert 语句 + 一次提交）。
+
+        项目为空的记录不受唯一约束保护（NULL 互不相等），与不支持 upsert 的方言一样
+        走「一次查询 + 批量写入」的兼容路径。
+        """
+        merged = WorkloadStatisticService._merge_entries(entries)
+        if not merged:
+            return
+
+        fallback = {key: man_days for key, man_days in merged.items() if key[1] is None}
+        rows = [
+            {
+                "user_id": user_id,
+                "project_id": project_id,
+                "total_man_days": man_days,
+                "period_start": period_start,
+                "period_end": period_end,
+            }
+            for (user_id, project_id), man_days in merged.items()
+            if project_id is not None
+        ]
+        if rows:
+            stmt = WorkloadStatisticService._upsert_statement(db, rows)
+            if stmt is not None:
+                db.execute(stmt)
+            else:
+                fallback = merged
+
+        if fallback:
+            existing = WorkloadStatisticService._load_period_stats(db, fallback.keys(), period_start, period_end)
+            for (user_id, project_id), man_days in fallback.items():
+                stat = existing.get((user_id, project_id))
+                if stat:
+                    stat.total_man_days += man_days
+                else:
+                    db.add(WorkloadStatistic(
+                        user_id=user_id,
+                        project_id=project_id,
+                        total_man_days=man_days,
+                        period_start=period_start,
+                        period_end=period_end,
+                    ))
+
+        db.commit()
+
+    @staticmethod
+    def bulk_rollback(
+        db: Session,
+        entries: Iterable[WorkloadEntry],
+        period_start: date,
+        period_end: date,
+    ) -> None:
+        """批量扣减同一统计周期内多个用户的工作量（一次查询 + 一次提交），扣减至 0 时删除记录"""
+        merged = WorkloadStatisticService._merge_entries(entries)
+        if not merged:
+            return
+
+        existing = WorkloadStatisticService._load_period_stats(db, merged.keys(), period_start, period_end)
+        if not existing:
+            return
+        for key, man_days in merged.items():
+            stat = existing.get(key)
+            if not stat:
+                continue
+            new_total = (stat.total_man_days or Decimal("0")) - man_days
+            if new_total <= 0:
+                db.delete(stat)
+            else:
+                stat.total_man_days = new_total
+        db.commit()
+
+    @staticmethod
+    def _task_confirmation_entries(db: Session, task: Task) -> List[WorkloadEntry]:
+        """任务确认计入统计的条目：主认领人实际人天 + 各配合人分配人天"""
+        entries: List[WorkloadEntry] = []
+        if task.assignee_id and task.actual_man_days:
+            entries.append((task.assignee_id, task.project_id, task.actual_man_days))
+        collaborators = db.query(TaskCollaborator.user_id, TaskCollaborator.allocated_man_days).filter(
+            TaskCollaborator.task_id == task.id
+        ).all()
+        entries.extend((user_id, task.project_id, man_days) for user_id, man_days in collaborators)
+        return entries
+
+    @staticmethod
+    def apply_task_confirmation(db: Session, task: Task) -> None:
+        """任务确认后，将主认领人与全部配合人的人天一次性汇入任务确认月份的统计"""
+        ref = task.updated_at.date() if task.updated_at else date.today()
+        period_start, period_end = WorkloadStatisticService.month_period(ref)
+        WorkloadStatisticService.bulk_accumulate(
+            db, WorkloadStatisticService._task_confirmation_entries(db, task), period_start, period_end
+        )
+
+    @staticmethod
+    def revert_task_confirmation(db: Session, task: Task) -> None:
+        """任务从已确认重新打开时，一次性回滚主认领人与全部配合人的统计"""
+        ref = task.updated_at.date() if task.updated_at else date.today()
+        period_start, period_end = WorkloadStatisticService.month_period(ref)
+        WorkloadStatisticService.bulk_rollback(
+            db, WorkloadStatisticService._task_confirmation_entries(db, task), period_start, period_end
+        )
+
+    # ------------------------------------------------------------------
+    # 单用户累加 / 回滚
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _get_period_stat(
+        db: Session,
+        user_id: int,
+        project_id: Optional[int],
+        period_start: date,
+        period_end: date,
+    ) -> Optional[WorkloadStatistic]:
+        return db.query(WorkloadStatistic).filter(
+            and_(
+                WorkloadStatistic.user_id == user_id,
+                WorkloadStatistic.project_id == project_id,
+                WorkloadStatistic.period_start == period_start,
+                WorkloadStatistic.period_end == period_end,
+            )
+        ).first()
+
     @staticmethod
     def update_statistic_on_task_confirmation(
         db: Session,
@@ -34,46 +250,17 @@ class WorkloadStatisticService:
         if not task.actual_man_days:
             raise ValidationError("任务没有实际投入人天数据")
 
-        # 如果没有指定周期，使用任务提交日期所在月份作为统计周期
+        # 如果没有指定周期，使用任务更新时间（确认时间）所在月份作为统计周期
         if not period_start or not period_end:
-            # 使用任务更新时间（确认时间）所在月份
             task_date = task.updated_at.date() if task.updated_at else date.today()
-            period_start = date(task_date.year, task_date.month, 1)
-            # 计算月份最后一天
-            if task_date.month == 12:
-                period_end = date(task_date.year + 1, 1, 1) - date.resolution
-            else:
-                period_end = date(task_date.year, task_date.month + 1, 1) - date.resolution
+            period_start, period_end = WorkloadStatisticService.month_period(task_date)
 
-        # 查找是否已有该周期和项目的统计记录
-        existing_stat = db.query(WorkloadStatistic).filter(
-            and_(
-                WorkloadStatistic.user_id == task.assignee_id,
-                WorkloadStatistic.project_id == task.project_id,
-                WorkloadStatistic.period_start == period_start,
-                WorkloadStatistic.period_end == period_end
-            )
-        ).first()
-
-        if existing_stat:
-            # 累加工作量
-            existing_stat.total_man_days += task.actual_man_days
-            db.commit()
-            db.refresh(existing_stat)
-            return existing_stat
-        else:
-            # 创建新统计记录
-            new_stat = WorkloadStatistic(
-                user_id=task.assignee_id,
-                project_id=task.project_id,
-                total_man_days=task.actual_man_days,
-                period_start=period_start,
-                period_end=period_end
-            )
-            db.add(new_stat)
-            db.commit()
-            db.refresh(new_stat)
-            return new_stat
+        WorkloadStatisticService.bulk_accumulate(
+            db, [(task.assignee_id, task.project_id, task.actual_man_days)], period_start, period_end
+        )
+        return WorkloadStatisticService._get_period_stat(
+            db, task.assignee_id, task.project_id, period_start, period_end
+        )
 
     @staticmethod
     def update_statistic_for_user(
@@ -87,42 +274,9 @@ class WorkloadStatisticService:
         为指定用户累加工作量统计（通用方法）。
         供配合人工作量汇入等场景复用。
         """
-        from datetime import date as date_type
-        today = date_type.today()
-        ref = ref_date if ref_date else today
-
-        period_start = date_type(ref.year, ref.month, 1)
-        if ref.month == 12:
-            period_end = date_type(ref.year + 1, 1, 1) - date_type.resolution
-        else:
-            period_end = date_type(ref.year, ref.month + 1, 1) - date_type.resolution
-
-        existing_stat = db.query(WorkloadStatistic).filter(
-            and_(
-                WorkloadStatistic.user_id == user_id,
-                WorkloadStatistic.project_id == project_id,
-                WorkloadStatistic.period_start == period_start,
-                WorkloadStatistic.period_end == period_end,
-            )
-        ).first()
-
-        if existing_stat:
-            existing_stat.total_man_days += man_days
-            db.commit()
-            db.refresh(existing_stat)
-            return existing_stat
-        else:
-            new_stat = WorkloadStatistic(
-                user_id=user_id,
-                project_id=project_id,
-                total_man_days=man_days,
-                period_start=period_start,
-                period_end=period_end,
-            )
-            db.add(new_stat)
-            db.commit()
-            db.refresh(new_stat)
-            return new_stat
+        period_start, period_end = WorkloadStatisticService.month_period(ref_date or date.today())
+        WorkloadStatisticService.bulk_accumulate(db, [(user_id, project_id, man_days)], period_start, period_end)
+        return WorkloadStatisticService._get_period_stat(db, user_id, project_id, period_start, period_end)
 
     @staticmethod
     def rollback_statistic_for_user(
@@ -135,37 +289,8 @@ class WorkloadStatisticService:
         """
         为指定用户回滚工作量统计（扣减 man_days）。
         """
-        from datetime import date as date_type
-        if man_days <= 0:
-            return
-
-        today = date_type.today()
-        ref = ref_date if ref_date else today
-
-        period_start = date_type(ref.year, ref.month, 1)
-        if ref.month == 12:
-            period_end = date_type(ref.year + 1, 1, 1) - date_type.resolution
-        else:
-            period_end = date_type(ref.year, ref.month + 1, 1) - date_type.resolution
-
-        existing_stat = db.query(WorkloadStatistic).filter(
-            and_(
-                WorkloadStatistic.user_id == user_id,
-                WorkloadStatistic.project_id == project_id,
-                WorkloadStatistic.period_start == period_start,
-                WorkloadStatistic.period_end == period_end,
-            )
-        ).first()
-
-        if not existing_stat:
-            return
-
-        new_total = (existing_stat.total_man_days or Decimal("0")) - man_days
-        if new_total <= 0:
-            db.delete(existing_stat)
-        else:
-            existing_stat.total_man_days = new_total
-        db.commit()
+        period_start, period_end = WorkloadStatisticService.month_period(ref_date or date.today())
+        WorkloadStatisticService.bulk_rollback(db, [(user_id, project_id, man_days)], period_start, period_end)
 
     @staticmethod
     def get_statistics(
@@ -0,0 +1,102 @@
+"""条件请求（ETag / Last-Modified）
+
+读多写少的详情/仪表盘接口先用一条轻量查询取出版本信息（版本号、更新时间、关联对象的名称等），
+计算 ETag 后与请求头比较：
+- If-None-Match 命中时直接返回 304，不再加载完整的 ORM 对象、不序列化响应
+- 未携带 If-None-Match 时按 If-Modified-Since 判断
+- 未命中时由接口正常生成响应，并附带 ETag / Last-Modified，供客户端下次校验
+
+ETag 为弱校验值（W/"..."）：只保证语义相同，不保证字节相同（响应可能被压缩）。
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# 客户端每次使用前都需重新校验（私有数据，不允许共享缓存）
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """根据版本信息计算弱 ETag（各部分按 repr 拼接后取哈希）"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def latest(*values: Optional[datetime]) -> Optional[datetime]:
+    """多个更新时间中的最大值（忽略空值）"""
+    present = [v for v in values if v is not None]
+    return max(present) if present else None
+
+
+def _to_utc(value: datetime) -> datetime:
+    # 数据库时间戳不带时区，统一按 UTC 处理（客户端只会原样回传，不参与换算）
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """格式化为 HTTP 日期（RFC 7231）"""
+    return format_datetime(_to_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 弱比较"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """请求条件是否表明客户端缓存仍有效（If-None-Match 优先于 If-Modified-Since）"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _to_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict[str, str]:
+    """ETag / Last-Modified / Cache-Control 响应头"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    处理条件请求。
+    缓存仍有效时返回 304 响应（接口应直接返回它）；否则把校验头写入 response 并返回 None。
+    """
+    headers = validator_headers(etag, last_modified)
+    if request.method in ("GET", "HEAD") and is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
@@ -0,0 +1,35 @@
+"""Markdown 文本工具"""
+import re
+from typing import Optional
+
+# 列表预览摘要的最大长度（字符）
+EXCERPT_LENGTH = 200
+
+_FENCED_CODE = re.compile(r"```.*?(```|$)", re.S)
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_LINE_PREFIX = re.compile(r"^\s{0,3}(#{1,6}\s+|>\s?|[-*+]\s+|\d+\.\s+)", re.M)
+_EMPHASIS = re.compile(r"(\*\*|__|~~|\*|`)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def make_excerpt(text: Optional[str], max_length: int = EXCERPT_LENGTH) -> Optional[str]:
+    """
+    生成纯文本摘要：去掉代码块、图片、HTML 标签与 Markdown 标记，合并空白后截断。
+    空文本返回 None。
+    """
+    if not text:
+        return None
+    plain = _FENCED_CODE.sub(" ", text)
+    plain = _IMAGE.sub(" ", plain)
+    plain = _HTML_TAG.sub(" ", plain)
+    plain = _LINK.sub(r"\1", plain)
+    plain = _LINE_PREFIX.sub("", plain)
+    plain = _EMPHASIS.sub("", plain)
+    plain = _WHITESPACE.sub(" ", plain).strip()
+    if not plain:
+        return None
+    if len(plain) > max_length:
+        plain = plain[:max_length - 1].rstrip() + "…"
+    return plain
@@ -32,3 +32,17 @@ def get_uploads_attachments_dir() -> Path:
     attachments_dir = get_uploads_dir() / 'attachments'
     attachments_dir.mkdir(parents=True, exist_ok=True)
     return attachments_dir
+
+
+def get_uploads_thumbs_dir(variant: str) -> Path:
+    """获取uploads/thumbs/<variant>目录路径（预生成缩略图）"""
+    thumbs_dir = get_uploads_dir() / 'thumbs' / variant
+    thumbs_dir.mkdir(parents=True, exist_ok=True)
+    return thumbs_dir
+
+
+def get_job_results_dir() -> Path:
+    """获取后台任务结果文件目录（不对外静态挂载，需经接口鉴权下载）"""
+    results_dir = get_backend_dir() / 'job_results'
+    results_dir.mkdir(parents=True, exist_ok=True)
+    return results_dir
@@ -0,0 +1,85 @@
+"""进程内发布/订阅
+
+订阅方（SSE 等异步连接）在事件循环中订阅主题并从队列读取事件；
+发布方可以在任意线程调用 publish（请求处理线程、后台线程池），事件通过
+call_soon_threadsafe 投递到订阅方所在的事件循环。
+
+仅在当前进程内生效：多进程部署时，连接到其他进程的客户端收不到本进程发布的事件，
+需要客户端保留低频轮询兜底。
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """单个订阅（绑定创建时所在的事件循环）"""
+
+    def __init__(self, hub: "PubSub", topic: Hashable, maxsize: int):
+        self.hub = hub
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def _offer(self, event: Any) -> None:
+        # 队列已满时丢弃最旧的事件，保证最新状态（如未读数）能送达
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """等待下一个事件，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class PubSub:
+    """进程内发布/订阅中心"""
+
+    def __init__(self):
+        self._subscriptions: dict[Hashable, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: Hashable, maxsize: int = 100) -> Subscription:
+        """订阅主题（需在事件循环中调用）"""
+        subscription = Subscription(self, topic, maxsize)
+        with self._lock:
+            self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.topic]
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        with self._lock:
+            return bool(self._subscriptions.get(topic))
+
+    def publish(self, topic: Hashable, event: Any) -> int:
+        """发布事件（线程安全），返回投递的订阅数"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(topic, ()))
+        delivered = 0
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+                delivered += 1
+            except RuntimeError:
+                # 事件循环已关闭
+                self.unsubscribe(subscription)
+        return delivered
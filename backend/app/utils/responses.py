@@ -0,0 +1,40 @@
+"""JSON 响应
+
+手工拼装的大列表/统计响应（任务集市、项目任务视图、工作负荷等）直接返回 FastJSONResponse：
+- 跳过 FastAPI 的响应校验与 jsonable_encoder 递归转换
+- orjson 原生序列化 date / datetime / Enum，Decimal 按 float 输出（与原接口返回的数字格式一致）
+- Pydantic 模型整体 model_dump 后序列化
+
+因此拼装数据时可直接放入 Decimal / date 等原始值，无需逐字段 float()、isoformat()。
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    """orjson 不能原生处理的类型"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """序列化为 JSON 字节串"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """基于 orjson 的 JSON 响应"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,50 @@
+"""上传文件静态服务"""
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+
+# 内容寻址文件名：<64位十六进制哈希>.<ext>
+_CONTENT_HASH_NAME = re.compile(r"^([0-9a-f]{64})\.[A-Za-z0-9]+$")
+
+# 非内容寻址文件（历史随机文件名、附件）的缓存时长（秒）
+_DEFAULT_MAX_AGE = 24 * 3600
+
+
+class UploadsStaticFiles(StaticFiles):
+    """
+    /uploads 静态文件服务。
+
+    - 内容寻址文件（原图与缩略图）以内容哈希作为强 ETag，并设置长期缓存 + immutable
+    - 其他文件沿用 Starlette 默认 ETag（mtime + size），缓存一天
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        match = _CONTENT_HASH_NAME.match(os.path.basename(full_path))
+        if match:
+            # 同一哈希的原图和各尺寸缩略图内容不同，ETag 需带上所在目录以区分
+            variant = os.path.basename(os.path.dirname(full_path))
+            response.headers["etag"] = f'"{match.group(1)}-{variant}"'
+            response.headers["cache-control"] = (
+                f"public, max-age={settings.UPLOADS_CACHE_MAX_AGE}, immutable"
+            )
+        else:
+            response.headers["cache-control"] = f"public, max-age={_DEFAULT_MAX_AGE}"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
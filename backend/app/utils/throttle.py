@@ -0,0 +1,196 @@
+"""滑动窗口计数（限流/防爆破）
+
+按 key 记录事件发生时间，统计最近一个窗口内的次数：
+- MemoryThrottleStore：进程内存储（默认），多进程部署时各进程独立计数
+- RedisThrottleStore：基于 Redis 有序集合，多进程/多实例共享计数（需安装 redis 包）；
+  Redis 不可用时临时退回进程内计数，不影响调用方
+
+计数只是短期状态，进程重启或 Redis 清空后从零开始。
+存储方法均为同步阻塞调用，异步代码中应放到线程中执行。
+"""
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottleStore(ABC):
+    """滑动窗口计数存储接口"""
+
+    @abstractmethod
+    def hit(self, key: str, window_seconds: float) -> int:
+        """记录一次事件，返回最近 window_seconds 秒内（含本次）的事件数"""
+
+    @abstractmethod
+    def count(self, key: str, window_seconds: float) -> int:
+        """最近 window_seconds 秒内的事件数（不记录事件）"""
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """清空 key 的全部事件"""
+
+
+class MemoryThrottleStore(ThrottleStore):
+    """进程内滑动窗口计数（线程安全）"""
+
+    # 每记录该数量的事件清理一次已过期的 key，避免只出现一次的 key 常驻内存
+    _SWEEP_EVERY = 1024
+
+    def __init__(self, max_events_per_key: int = 1000):
+        self.max_events_per_key = max_events_per_key
+        self._events: dict[str, deque] = {}
+        # key -> 最近一次使用的窗口长度（清理时据此判断是否过期）
+        self._windows: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._hits_since_sweep = 0
+
+    @staticmethod
+    def _prune(events: deque, cutoff: float) -> None:
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def _sweep(self, now: float) -> None:
+        """清理窗口内已无事件的 key（调用方需持有锁）"""
+        for key in list(self._events):
+            events = self._events[key]
+            self._prune(events, now - self._windows.get(key, 0))
+            if not events:
+                del self._events[key]
+                self._windows.pop(key, None)
+
+    def hit(self, key: str, window_seconds: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                events = self._events[key] = deque(maxlen=self.max_events_per_key)
+            self._windows[key] = window_seconds
+            self._prune(events, now - window_seconds)
+            events.append(now)
+            count = len(events)
+
+            self._hits_since_sweep += 1
+            if self._hits_since_sweep >= self._SWEEP_EVERY:
+                self._hits_since_sweep = 0
+                self._sweep(now)
+            return count
+
+    def count(self, key: str, window_seconds: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return 0
+            self._prune(events, now - window_seconds)
+            return len(events)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._events.pop(key, None)
+            self._windows.pop(key, None)
+
+
+class RedisThrottleStore(ThrottleStore):
+    """
+    Redis 滑动窗口计数：每个 key 一个有序集合，成员为事件ID，分值为事件时间。
+    连接/读写设置短超时；Redis 出错时记录警告并在 retry_after 秒内改用进程内计数，
+    避免 Redis 故障拖慢或阻断登录。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "throttle:",
+        timeout_seconds: float = 0.5,
+        retry_after_seconds: float = 30,
+    ):
+        import redis  # 可选依赖，仅在启用 Redis 计数时需要
+
+        self._error_types = (redis.RedisError,)
+        self.client = redis.Redis.from_url(
+            url,
+            socket_timeout=timeout_seconds,
+            socket_connect_timeout=timeout_seconds,
+        )
+        self.prefix = prefix
+        self.retry_after_seconds = retry_after_seconds
+        self.fallback = MemoryThrottleStore()
+        self._unavailable_until = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        self._unavailable_until = time.monotonic() + self.retry_after_seconds
+        logger.warning(
+            f"Redis 限流计数不可用，{self.retry_after_seconds:g} 秒内改用进程内计数: {error}"
+        )
+
+    def hit(self, key: str, window_seconds: float) -> int:
+        if not self._available():
+            return self.fallback.hit(key, window_seconds)
+        now = time.time()
+        redis_key = self.prefix + key
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.zremrangebyscore(redis_key, 0, now - window_seconds)
+            pipe.zadd(redis_key, {uuid.uuid4().hex: now})
+            pipe.zcard(redis_key)
+            pipe.expire(redis_key, max(1, int(window_seconds) + 1))
+            _, _, count, _ = pipe.execute()
+        except self._error_types as e:
+            self._mark_unavailable(e)
+            return self.fallback.hit(key, window_seconds)
+        return int(count)
+
+    def count(self, key: str, window_seconds: float) -> int:
+        if not self._available():
+            return self.fallback.count(key, window_seconds)
+        now = time.time()
+        redis_key = self.prefix + key
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.zremrangebyscore(redis_key, 0, now - window_seconds)
+            pipe.zcard(redis_key)
+            _, count = pipe.execute()
+        except self._error_types as e:
+            self._mark_unavailable(e)
+            return self.fallback.count(key, window_seconds)
+        return int(count)
+
+    def reset(self, key: str) -> None:
+        # 退回期间可能在进程内记录过事件，一并清理
+        self.fallback.reset(key)
+        if not self._available():
+            return
+        try:
+            self.client.delete(self.prefix + key)
+        except self._error_types as e:
+            self._mark_unavailable(e)
+
+
+def create_throttle_store(
+    backend: str,
+    redis_url: Optional[str] = None,
+    redis_timeout_seconds: float = 0.5,
+) -> ThrottleStore:
+    """
+    按配置创建计数存储。
+    backend 为 "redis" 但未配置 REDIS_URL 或未安装 redis 包时，退回进程内存储并记录警告。
+    """
+    if backend == "redis":
+        if not redis_url:
+            logger.warning("限流计数配置为 redis 但未设置 REDIS_URL，改用进程内计数")
+        else:
+            try:
+                return RedisThrottleStore(redis_url, timeout_seconds=redis_timeout_seconds)
+            except ImportError:
+                logger.warning("限流计数配置为 redis 但未安装 redis 包，改用进程内计数")
+    elif backend != "memory":
+        logger.warning(f"未知的限流计数存储类型: {backend}，改用进程内计数")
+    return MemoryThrottleStore()
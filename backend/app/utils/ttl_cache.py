@@ -0,0 +1,56 @@
+"""进程内 TTL 缓存
+
+用于读多写少、可接受短暂不一致的数据（如侧边栏统计）。
+写入方在数据变更时调用 invalidate 主动失效；多进程部署时其他进程依赖 TTL 过期。
+"""
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """线程安全的简单 TTL 缓存"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存值，不存在或已过期返回 None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存（超过容量时先清理过期项，仍超出则清空）"""
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                now = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] > now}
+                if len(self._data) >= self.max_entries:
+                    self._data.clear()
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """获取缓存值，未命中时调用 loader 加载并写入"""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """失效指定 key；不传 key 时清空全部缓存"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
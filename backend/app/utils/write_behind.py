@@ -0,0 +1,72 @@
+"""写回缓冲计数器
+
+高频计数（如浏览次数）先在内存中按 key 聚合，由后台线程按固定间隔批量写库，
+应用退出时再写一次。写库失败时增量放回缓冲区，下次重试。
+
+仅在当前进程内聚合：进程异常退出会丢失最后一个间隔内的增量，适用于可容忍少量误差的统计。
+"""
+import logging
+import threading
+from typing import Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """按 key 聚合增量的写回缓冲区"""
+
+    def __init__(self, name: str, flush_fn: Callable[[dict], None], interval_seconds: float):
+        """
+        flush_fn 接收 {key: 增量}，负责一次性写库；抛出异常时增量会放回缓冲区。
+        """
+        self.name = name
+        self.flush_fn = flush_fn
+        self.interval_seconds = interval_seconds
+        self._pending: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, key: Hashable, delta: int = 1) -> None:
+        """累加增量（首次调用时启动后台写回线程）"""
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + delta
+            if self._worker is None and not self._stop.is_set():
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+                self._worker.start()
+
+    def pending(self, key: Hashable) -> int:
+        """尚未写库的增量"""
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def flush(self) -> int:
+        """立即写库，返回写入的 key 数量"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            batch = {key: delta for key, delta in batch.items() if delta}
+            if not batch:
+                return 0
+            try:
+                self.flush_fn(batch)
+            except Exception as e:
+                logger.warning(f"{self.name} 写回失败，将在下次重试: {e}")
+                with self._lock:
+                    for key, delta in batch.items():
+                        self._pending[key] = self._pending.get(key, 0) + delta
+                return 0
+            return len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.flush()
+
+    def shutdown(self) -> None:
+        """停止后台线程并写回剩余增量（应用退出时调用）"""
+        self._stop.set()
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout=self.interval_seconds + 1)
+        self.flush()
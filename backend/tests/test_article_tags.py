@@ -0,0 +1,53 @@
+"""文章标签拆分与回填测试"""
+import importlib.util
+from pathlib import Path
+
+from app.models.article_tag import ArticleTag
+from app.models.user import User
+from app.schemas.article import ArticleCreate, ArticleUpdate
+from app.services.article_service import ArticleService
+
+
+def _load_migration():
+    path = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "008_add_article_tags.py"
+    spec = importlib.util.spec_from_file_location("migration_008", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _stored_tags(db, article_id):
+    return sorted(row.tag for row in db.query(ArticleTag).filter(ArticleTag.article_id == article_id))
+
+
+def test_parse_tags_dedups_case_insensitively():
+    assert ArticleService.parse_tags(" Vue, vue ,React,VUE,, react ") == ["Vue", "React"]
+    assert _load_migration()._parse_tags(" Vue, vue ,React,VUE,, react ") == ["Vue", "React"]
+
+
+def test_migration_backfill_merges_counts_case_insensitively():
+    migration = _load_migration()
+    counts = {}
+    for name in ["Vue", "vue", "React"]:
+        migration._count(counts, "tag", name)
+    migration._count(counts, "category", "前端")
+    assert counts == {
+        ("tag", "vue"): ("Vue", 2),
+        ("tag", "react"): ("React", 1),
+        ("category", "前端"): ("前端", 1),
+    }
+
+
+def test_article_tags_differing_only_in_case_are_stored_once(db):
+    author = User(username="author", email="author@example.com", password_hash="x")
+    db.add(author)
+    db.commit()
+
+    article = ArticleService.create_article(
+        db, ArticleCreate(title="标签", content="正文", tags="Vue, vue, React", is_published=True), author.id
+    )
+    assert _stored_tags(db, article.id) == ["React", "Vue"]
+
+    # 只改大小写：原地更新，不新增记录
+    ArticleService.update_article(db, article.id, ArticleUpdate(tags="vue, REACT"), author.id)
+    assert _stored_tags(db, article.id) == ["REACT", "vue"]
@@ -0,0 +1,84 @@
+"""
+响应压缩微基准。
+
+用 CompressionMiddleware 包装一个返回任务列表形态 JSON 的 ASGI 应用，
+分别以不压缩 / gzip / br（已安装 brotli 时）请求，输出响应体大小与单次请求耗时。
+运行：python -m pytest -q -s tests/test_compression_benchmark.py（-s 输出基准数据）
+"""
+import gzip
+import json
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware.compression import CompressionMiddleware, brotli
+
+ROUNDS = 50
+
+
+def _task_list_payload(count: int = 500) -> dict:
+    return {
+        "items": [
+            {
+                "id": i,
+                "title": f"任务 {i}：完善排期与工作量统计",
+                "status": "in_progress",
+                "priority": "P1",
+                "assignee": {"id": i % 20, "username": f"dev{i % 20}", "full_name": f"开发者{i % 20}"},
+                "estimated_man_days": "3.50",
+                "required_skills": "python,fastapi,sqlalchemy",
+                "created_at": "2026-10-19T08:00:00",
+            }
+            for i in range(count)
+        ],
+        "total": count,
+    }
+
+
+def _build_app() -> CompressionMiddleware:
+    app = FastAPI()
+    payload = _task_list_payload()
+
+    @app.get("/tasks")
+    async def list_tasks():
+        return payload
+
+    return CompressionMiddleware(app)
+
+
+async def _bench(client: httpx.AsyncClient, accept_encoding: str) -> tuple[int, float, bytes]:
+    """返回 (传输字节数, 单次请求平均耗时秒, 解码后的响应体)"""
+    headers = {"Accept-Encoding": accept_encoding}
+    response = await client.get("/tasks", headers=headers)
+    wire_size = len(response.content) if "content-encoding" not in response.headers else int(
+        response.headers["content-length"]
+    )
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await client.get("/tasks", headers=headers)
+    return wire_size, (time.perf_counter() - started) / ROUNDS, response.content
+
+
+@pytest.mark.asyncio
+async def test_compression_benchmark():
+    transport = httpx.ASGITransport(app=_build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+        results = {encoding: await _bench(client, encoding) for encoding in encodings}
+
+    raw_size, raw_time, raw_body = results["identity"]
+    print()
+    for encoding, (size, elapsed, body) in results.items():
+        # httpx 会按 Content-Encoding 自动解码，解码结果必须与未压缩响应一致
+        assert json.loads(body) == json.loads(raw_body)
+        print(
+            f"{encoding:>8}: {size:>8} 字节 ({size / raw_size:6.1%}), "
+            f"{elapsed * 1000:6.2f} ms/请求 (额外 {(elapsed - raw_time) * 1000:+.2f} ms)"
+        )
+
+    gzip_size = results["gzip"][0]
+    assert gzip_size < raw_size * 0.2
+    # 与一次性 gzip 压缩的体积相当（流式压缩不应明显变差）
+    assert gzip_size <= len(gzip.compress(raw_body, 6)) * 1.05
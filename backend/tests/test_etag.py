@@ -0,0 +1,190 @@
+"""
+条件请求（ETag / Last-Modified）测试。
+
+- app.utils.etag 的弱比较、If-Modified-Since 判断与 304 响应
+- 任务详情：If-None-Match 命中时只执行版本查询（不加载任务），任务编辑、创建者改名后 ETag 变化
+- 项目详情：只修改关联表的协办经理变更通过 bump_version 使 ETag 变化
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.security import create_access_token
+from app.models.project import Project
+from app.models.role import Role, RoleType
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.schemas.task import TaskUpdate
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+from app.utils.etag import conditional_response, http_date, is_not_modified, make_etag
+
+
+def _request(method: str = "GET", **headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("task", 1, 3, datetime(2026, 10, 1))
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("task", 1, 3, datetime(2026, 10, 1))
+    assert etag != make_etag("task", 1, 4, datetime(2026, 10, 1))
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("task", 1)
+    opaque = etag[2:]
+
+    assert is_not_modified(_request(if_none_match=etag), etag)
+    assert is_not_modified(_request(if_none_match=opaque), etag)
+    assert is_not_modified(_request(if_none_match=f'W/"other", {etag}'), etag)
+    assert is_not_modified(_request(if_none_match="*"), etag)
+    assert not is_not_modified(_request(if_none_match='W/"other"'), etag)
+    assert not is_not_modified(_request(), etag)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    etag = make_etag("task", 1)
+    modified = datetime(2026, 10, 1, 8, 30, 15, 500)
+
+    assert is_not_modified(_request(if_modified_since=http_date(modified)), etag, modified)
+    assert not is_not_modified(
+        _request(if_modified_since=http_date(modified - timedelta(seconds=1))), etag, modified
+    )
+    assert not is_not_modified(_request(if_modified_since="not a date"), etag, modified)
+    assert not is_not_modified(
+        _request(if_none_match='W/"other"', if_modified_since=http_date(modified)), etag, modified
+    )
+
+
+def test_conditional_response():
+    etag = make_etag("task", 1)
+    modified = datetime(2026, 10, 1)
+
+    not_modified = conditional_response(_request(if_none_match=etag), Response(), etag, modified)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.headers["last-modified"] == "Thu, 01 Oct 2026 00:00:00 GMT"
+
+    # 非 GET/HEAD 不返回 304，只附加校验头
+    response = Response()
+    assert conditional_response(_request("POST", if_none_match=etag), response, etag) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, no-cache"
+
+
+@contextmanager
+def _capture_selects(db):
+    statements = []
+    engine = db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def seeded(db):
+    pm_role = Role(name="项目经理", code=RoleType.PROJECT_MANAGER.value)
+    pm = User(username="pm", email="pm@example.com", password_hash="x", full_name="经理", role="project_manager")
+    other = User(username="pm2", email="pm2@example.com", password_hash="x", role="project_manager")
+    pm.roles.append(pm_role)
+    other.roles.append(pm_role)
+    db.add_all([pm, other])
+    db.flush()
+    project = Project(name="项目A", created_by=pm.id)
+    db.add(project)
+    db.flush()
+    task = Task(
+        title="任务",
+        description="描述",
+        status=TaskStatus.PUBLISHED.value,
+        creator_id=pm.id,
+        project_id=project.id,
+        estimated_man_days=Decimal("2"),
+    )
+    db.add(task)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(pm.id)})}"}
+    return {"pm": pm, "other": other, "project": project, "task": task, "headers": headers}
+
+
+def test_task_not_modified_runs_only_version_query(client, db, seeded):
+    url = f"/api/v1/tasks/{seeded['task'].id}"
+    first = client.get(url, headers=seeded["headers"])
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    with _capture_selects(db) as statements:
+        response = client.get(url, headers={**seeded["headers"], "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    # 除认证加载当前用户外，只有一条版本查询
+    task_selects = [sql for sql in statements if "FROM tasks" in sql]
+    assert len(task_selects) == 1
+    assert len(statements) == 2
+
+
+def test_task_etag_changes_on_edit(client, db, seeded):
+    url = f"/api/v1/tasks/{seeded['task'].id}"
+    etag = client.get(url, headers=seeded["headers"]).headers["etag"]
+
+    TaskService.update_task(db, seeded["task"].id, TaskUpdate(title="新标题"), seeded["pm"].id, "project_manager")
+
+    response = client.get(url, headers={**seeded["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "新标题"
+    assert response.headers["etag"] != etag
+
+
+def test_task_etag_changes_on_creator_rename(client, db, seeded):
+    url = f"/api/v1/tasks/{seeded['task'].id}"
+    etag = client.get(url, headers=seeded["headers"]).headers["etag"]
+    version = seeded["task"].version
+
+    seeded["pm"].full_name = "新名字"
+    db.commit()
+
+    # 改名不修改任务本身，版本号不变，但 ETag 包含创建者名称
+    db.refresh(seeded["task"])
+    assert seeded["task"].version == version
+    response = client.get(url, headers={**seeded["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["creator_name"] == "新名字"
+    assert response.headers["etag"] != etag
+
+
+def test_project_etag_changes_on_co_manager_change(client, db, seeded):
+    url = f"/api/v1/projects/{seeded['project'].id}"
+    etag = client.get(url, headers=seeded["headers"]).headers["etag"]
+    version = seeded["project"].version
+
+    ProjectService.set_co_managers(db, seeded["project"].id, [seeded["other"].id])
+
+    db.refresh(seeded["project"])
+    assert seeded["project"].version == version + 1
+    response = client.get(url, headers={**seeded["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert client.get(
+        url, headers={**seeded["headers"], "If-None-Match": response.headers["etag"]}
+    ).status_code == 304
@@ -0,0 +1,211 @@
+"""
+完成时间预测测试。
+
+1. 随机种子生成的认领队列：预测日期与 ScheduleService 实际写入的排期一致
+2. 查询次数固定，与任务数、人员数无关
+3. 规模基准：300 名开发人员、4,700 个任务（约九成未完成）时一次计算在 1 秒内完成
+运行：python -m pytest -q -s tests/test_forecast_service.py（-s 输出基准数据）
+"""
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, insert
+
+from app.models.holiday import Holiday
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.services.forecast_service import ForecastService
+from app.services.schedule_service import ScheduleService
+
+MAN_DAYS = ["0.5", "1", "2.5", "3", "5"]
+
+
+@contextmanager
+def _count_selects(db):
+    """统计块内执行的 SELECT 次数"""
+    counter = {"selects": 0}
+    engine = db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["selects"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _seed(db, rng: random.Random, developers: int, tasks_per_developer: int) -> list[int]:
+    """生成开发人员、节假日与各状态任务；认领的任务由 ScheduleService 排期。返回开发人员ID"""
+    pm = User(username="pm", email="pm@example.com", password_hash="x", role="project_manager")
+    db.add(pm)
+    devs = [
+        User(username=f"d{i}", email=f"d{i}@example.com", password_hash="x", role="developer")
+        for i in range(developers)
+    ]
+    db.add_all(devs)
+    db.flush()
+    project = Project(name="项目", created_by=pm.id)
+    db.add(project)
+    for day in rng.sample(range(1, 90), 10):
+        db.add(Holiday(date=date.today() + timedelta(days=day)))
+    db.flush()
+
+    base_time = datetime(2026, 1, 1)
+
+    def add_task(status: TaskStatus, assignee_id=None) -> Task:
+        task = Task(
+            title="任务",
+            status=status.value,
+            priority=rng.choice(["P0", "P1", "P2"]),
+            creator_id=pm.id,
+            assignee_id=assignee_id,
+            project_id=project.id,
+            estimated_man_days=Decimal(rng.choice(MAN_DAYS)),
+            created_at=base_time + timedelta(minutes=rng.randint(0, 600)),
+        )
+        db.add(task)
+        return task
+
+    for dev in devs:
+        for _ in range(tasks_per_developer):
+            add_task(TaskStatus.CLAIMED, dev.id)
+    for _ in range(developers):
+        add_task(TaskStatus.PUBLISHED)
+        add_task(TaskStatus.DRAFT)
+    db.commit()
+
+    for dev in devs:
+        ScheduleService.recalculate_user_schedules(db, dev.id)
+    # 部分开发人员开始队首任务（与实际流程一致：先认领排期，再开始）
+    for dev in devs:
+        if rng.random() < 0.5:
+            first = (
+                db.query(Task)
+                .join(TaskSchedule, TaskSchedule.task_id == Task.id)
+                .filter(Task.assignee_id == dev.id)
+                .order_by(TaskSchedule.start_date, Task.id)
+                .first()
+            )
+            first.status = TaskStatus.IN_PROGRESS.value
+            db.commit()
+            ScheduleService.recalculate_user_schedules(db, dev.id)
+    return [dev.id for dev in devs]
+
+
+def _seed_more(db, developers: int, tasks: int) -> None:
+    """批量插入开发人员与任务（不排期，预测按队列推算）"""
+    rng = random.Random(developers)
+    creator_id = db.query(User.id).filter(User.username == "pm").scalar()
+    project_ids = []
+    for i in range(10):
+        project = Project(name=f"批量项目{i}", created_by=creator_id)
+        db.add(project)
+        db.flush()
+        project_ids.append(project.id)
+    offset = db.query(User).count()
+    db.execute(insert(User), [
+        {
+            "username": f"bulk{offset + i}",
+            "email": f"bulk{offset + i}@example.com",
+            "password_hash": "x",
+            "role": "developer",
+        }
+        for i in range(developers)
+    ])
+    dev_ids = [row.id for row in db.query(User.id).filter(User.username.like("bulk%"))]
+    statuses = [TaskStatus.CLAIMED.value] * 6 + [TaskStatus.PUBLISHED.value] * 2 + [
+        TaskStatus.PENDING_EVAL.value, TaskStatus.DRAFT.value,
+    ]
+    base_time = datetime(2026, 1, 1)
+    rows = []
+    for i in range(tasks):
+        status = rng.choice(statuses)
+        rows.append({
+            "title": f"任务{i}",
+            "status": status,
+            "priority": rng.choice(["P0", "P1", "P2"]),
+            "creator_id": creator_id,
+            "assignee_id": rng.choice(dev_ids) if status in (
+                TaskStatus.CLAIMED.value, TaskStatus.PENDING_EVAL.value
+            ) else None,
+            "project_id": rng.choice(project_ids),
+            "estimated_man_days": Decimal(rng.choice(MAN_DAYS)),
+            "created_at": base_time + timedelta(minutes=i),
+        })
+    db.execute(insert(Task), rows)
+    db.commit()
+
+
+def test_forecast_matches_stored_schedules(db):
+    _seed(db, random.Random(11), developers=4, tasks_per_developer=6)
+    stored = {
+        s.task_id: (s.start_date, s.end_date)
+        for s in db.query(TaskSchedule).all()
+    }
+
+    result = ForecastService.compute(db)
+
+    by_id = {item["task_id"]: item for item in result["tasks"]}
+    assigned = [
+        task_id for (task_id,) in db.query(Task.id).filter(
+            Task.status.in_([TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value])
+        )
+    ]
+    assert len(assigned) >= 24
+    for task_id in assigned:
+        item = by_id[task_id]
+        assert (item["forecast_start"], item["forecast_end"]) == stored[task_id], task_id
+        assert not item["is_projected"]
+
+    # 未认领任务排在某个开发人员的现有队列之后
+    free_from = {d["user_id"]: d["free_from"] for d in result["developers"]}
+    queue_end = {}
+    for task_id in assigned:
+        item = by_id[task_id]
+        assignee_id = item["assignee_id"]
+        queue_end[assignee_id] = max(queue_end.get(assignee_id, date.min), item["forecast_end"])
+    for item in result["tasks"]:
+        if item["status"] == TaskStatus.PUBLISHED.value:
+            assert item["is_projected"]
+            assert item["forecast_start"] > queue_end[item["assignee_id"]]
+            assert item["forecast_end"] < free_from[item["assignee_id"]]
+    assert result["projects"][0]["draft_tasks"] == 4
+
+
+def test_forecast_query_count_is_fixed(db):
+    _seed(db, random.Random(3), developers=2, tasks_per_developer=1)
+    with _count_selects(db) as small:
+        ForecastService.compute(db)
+
+    _seed_more(db, developers=40, tasks=400)
+    with _count_selects(db) as large:
+        result = ForecastService.compute(db)
+
+    assert len(result["tasks"]) > 300
+    assert large["selects"] == small["selects"]
+
+
+def test_forecast_scale_benchmark(db):
+    pm = User(username="pm", email="pm@example.com", password_hash="x", role="project_manager")
+    db.add(pm)
+    db.commit()
+    _seed_more(db, developers=300, tasks=4700)
+
+    result = ForecastService.compute(db)
+
+    open_tasks = sum(p["open_tasks"] for p in result["projects"])
+    print(
+        f"\n{len(result['developers'])} 名开发人员 / {open_tasks} 个未完成任务: "
+        f"{result['elapsed_ms']:.1f} ms"
+    )
+    assert len(result["developers"]) == 300
+    assert open_tasks > 4000
+    assert all(item["forecast_end"] is not None for item in result["tasks"])
+    assert result["elapsed_ms"] < 1000
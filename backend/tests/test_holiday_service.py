@@ -0,0 +1,115 @@
+"""节假日导入测试"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.models.holiday import Holiday
+from app.models.task import Task, TaskStatus
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.services.holiday_service import HolidayService
+
+
+@pytest.fixture(autouse=True)
+def recompute_calls(monkeypatch):
+    """记录登记的重算人员，不启动后台线程"""
+    calls = []
+    monkeypatch.setattr(HolidayService, "enqueue_schedule_recompute", staticmethod(lambda ids: calls.append(set(ids))))
+    return calls
+
+
+def _next_friday(after_days: int = 14) -> date:
+    day = date.today() + timedelta(days=after_days)
+    return day + timedelta(days=(4 - day.weekday()) % 7)
+
+
+def test_parse_csv_with_chinese_headers():
+    content = "日期,描述,类型\n2027-01-01,元旦,放假\n\n2027-02-06,春节调休,上班\n".encode("utf-8-sig")
+    items = HolidayService.parse_import_file(content, "holidays.csv")
+    assert [(i.date, i.description, i.is_workday) for i in items] == [
+        (date(2027, 1, 1), "元旦", False),
+        (date(2027, 2, 6), "春节调休", True),
+    ]
+
+
+def test_parse_json_items_and_bool_field():
+    content = b'{"items": [{"date": "2027-01-01", "type": "holiday"}, {"date": "2027-02-07", "is_workday": "true"}]}'
+    items = HolidayService.parse_import_file(content)
+    assert [(i.date, i.is_workday) for i in items] == [(date(2027, 1, 1), False), (date(2027, 2, 7), True)]
+
+
+@pytest.mark.parametrize("content, message", [
+    (b"date,type\n2027-01-04,workday\n", "不是周末"),
+    (b"date,type\n2027-01-01,holiday\n2027-01-01,holiday\n", "重复"),
+    (b"date,type\n2027-01-01,vacation\n", "类型"),
+    ("description\n元旦\n".encode(), "缺少 date"),
+    (b"[1, 2]", "记录数组"),
+])
+def test_parse_rejects_invalid_files(content, message):
+    with pytest.raises(ValidationError) as exc_info:
+        HolidayService.parse_import_file(content)
+    assert message in exc_info.value.message
+
+
+def test_replace_mode_deletes_missing_records_in_imported_years(db):
+    db.add_all([
+        Holiday(date=date(2027, 1, 1), description="元旦", is_weekend=False, is_workday=False),
+        Holiday(date=date(2027, 5, 3), description="劳动节", is_weekend=False, is_workday=False),
+        Holiday(date=date(2028, 1, 3), description="次年", is_weekend=False, is_workday=False),
+    ])
+    db.commit()
+
+    items = HolidayService.parse_import_file(b"date,description\n2027-01-01,New Year\n2027-10-01,National Day\n")
+    result = HolidayService.import_holidays(db, items, replace=True)
+
+    assert (result["created"], result["updated"], result["deleted"]) == (1, 1, 1)
+    assert result["changed_dates"] == [date(2027, 5, 3), date(2027, 10, 1)]
+    assert sorted(h.date for h in db.query(Holiday)) == [date(2027, 1, 1), date(2027, 10, 1), date(2028, 1, 3)]
+
+
+def test_merge_mode_keeps_other_records(db):
+    db.add(Holiday(date=date(2027, 5, 3), description="劳动节", is_weekend=False, is_workday=False))
+    db.commit()
+    items = HolidayService.parse_import_file(b"date\n2027-10-01\n")
+    assert HolidayService.import_holidays(db, items)["deleted"] == 0
+    assert db.query(Holiday).count() == 2
+
+
+def test_make_up_workday_between_serial_tasks_affects_user(db, recompute_calls):
+    friday = _next_friday()
+    gap_user, later_user, earlier_user = [
+        User(username=name, email=f"{name}@example.com", password_hash="x") for name in ("gap", "later", "earlier")
+    ]
+    db.add_all([gap_user, later_user, earlier_user])
+    db.flush()
+
+    def schedule(user, start, end):
+        task = Task(
+            title="任务",
+            status=TaskStatus.CLAIMED.value,
+            creator_id=user.id,
+            assignee_id=user.id,
+            estimated_man_days=Decimal("1"),
+        )
+        db.add(task)
+        db.flush()
+        db.add(TaskSchedule(task_id=task.id, start_date=start, end_date=end))
+
+    # 任务 A 周五结束、任务 B 下周一开始：周六改为上班时 B 会前移
+    schedule(gap_user, friday - timedelta(days=4), friday)
+    schedule(gap_user, friday + timedelta(days=3), friday + timedelta(days=7))
+    # 第一条排期在变化日期之后开始：今天到开始日之间多出工作日，同样前移
+    schedule(later_user, friday + timedelta(days=10), friday + timedelta(days=14))
+    # 全部排期在变化日期之前结束：不受影响
+    schedule(earlier_user, friday - timedelta(days=4), friday - timedelta(days=1))
+    db.commit()
+
+    saturday = friday + timedelta(days=1)
+    assert HolidayService.find_affected_users(db, [saturday]) == {gap_user.id, later_user.id}
+
+    items = HolidayService.parse_import_file(f"date,type\n{saturday},workday\n".encode())
+    result = HolidayService.import_holidays(db, items)
+    assert result["affected_users"] == 2
+    assert recompute_calls == [{gap_user.id, later_user.id}]
@@ -0,0 +1,68 @@
+"""后台任务中断回收测试"""
+import socket
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+from app.models.job import Job, JobStatus
+from app.services.job_service import JobService, _current_owner
+
+
+def _dead_pid() -> int:
+    """一个已退出进程的进程号"""
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _add_job(db, owner, heartbeat_at, status=JobStatus.RUNNING.value) -> int:
+    job = Job(
+        job_type="export_tasks",
+        params="{}",
+        params_hash="h",
+        status=status,
+        created_by=1,
+        owner=owner,
+        heartbeat_at=heartbeat_at,
+    )
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_fail_interrupted_only_fails_dead_or_stale_jobs(db):
+    now = datetime.now()
+    host = socket.gethostname()
+    own = _add_job(db, _current_owner(), now - timedelta(hours=1))
+    live_other_host = _add_job(db, "other-host:123", now)
+    dead_same_host = _add_job(db, f"{host}:{_dead_pid()}", now, status=JobStatus.PENDING.value)
+    stale_other_host = _add_job(db, "other-host:456", now - timedelta(hours=1))
+    legacy = _add_job(db, None, None)
+    done = _add_job(db, "other-host:789", None, status=JobStatus.SUCCEEDED.value)
+
+    assert JobService.fail_interrupted(db) == 3
+
+    db.expire_all()
+    status = {job.id: job.status for job in db.query(Job).all()}
+    assert status[own] == JobStatus.RUNNING.value
+    assert status[live_other_host] == JobStatus.RUNNING.value
+    assert status[dead_same_host] == JobStatus.FAILED.value
+    assert status[stale_other_host] == JobStatus.FAILED.value
+    assert status[legacy] == JobStatus.FAILED.value
+    assert status[done] == JobStatus.SUCCEEDED.value
+
+
+def test_heartbeat_keeps_own_jobs_fresh(db, monkeypatch):
+    import app.services.job_service as job_service
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(job_service, "SessionLocal", TestingSessionLocal)
+    old = datetime.now() - timedelta(hours=1)
+    own = _add_job(db, _current_owner(), old)
+
+    JobService.heartbeat()
+
+    db.expire_all()
+    job = db.get(Job, own)
+    assert job.status == JobStatus.RUNNING.value
+    assert job.heartbeat_at > old
@@ -0,0 +1,113 @@
+"""
+JSON 响应微基准。
+
+任务集市形态的负载（Decimal、date、datetime 原始值）分别以两种方式返回：
+- 默认：按原接口逐字段 float() / isoformat() 后返回 dict（response_model=dict），由 FastAPI 校验并序列化
+- FastJSONResponse：直接放入原始值，由 orjson 序列化
+断言两者解码后内容一致，输出单次请求耗时，以及逐字段转换 + 标准库 json 与 orjson 的单次序列化耗时。
+运行：python -m pytest -q -s tests/test_json_response_benchmark.py（-s 输出基准数据）
+"""
+import json
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.responses import JSONResponse
+
+from app.utils.responses import FastJSONResponse, dumps
+
+ROUNDS = 30
+
+
+def _marketplace_tasks(count: int = 2000) -> list[dict]:
+    created = datetime(2026, 10, 1, 8, 0, 0)
+    return [
+        {
+            "id": i,
+            "title": f"任务 {i}：完善排期与工作量统计",
+            "description_excerpt": "根据节假日与并发上限重新推算排期，" * 3,
+            "status": "published",
+            "project_id": i % 30,
+            "project_name": f"项目{i % 30}",
+            "creator_id": 1,
+            "creator_name": "项目经理",
+            "estimated_man_days": Decimal("3.50") + i % 4,
+            "required_skills": "python,fastapi,sqlalchemy",
+            "deadline": date(2026, 12, 1) + timedelta(days=i % 60),
+            "created_at": created + timedelta(minutes=i),
+            "priority": ("P0", "P1", "P2")[i % 3],
+            "priority_multiplier": 1.2,
+        }
+        for i in range(count)
+    ]
+
+
+def _legacy_item(task: dict) -> dict:
+    """原接口的拼装方式：逐字段转换为 JSON 基本类型"""
+    return {
+        **task,
+        "estimated_man_days": float(task["estimated_man_days"]),
+        "deadline": task["deadline"].isoformat(),
+        "created_at": task["created_at"].isoformat(),
+    }
+
+
+def _build_app(tasks: list[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=dict)
+    async def default_response():
+        return {"tasks": [_legacy_item(task) for task in tasks], "total": len(tasks), "page": 1, "page_size": 20}
+
+    @app.get("/fast", response_model=dict)
+    async def fast_response():
+        return FastJSONResponse({"tasks": tasks, "total": len(tasks), "page": 1, "page_size": 20})
+
+    return app
+
+
+async def _bench(client: httpx.AsyncClient, path: str) -> tuple[float, bytes]:
+    """返回 (单次请求平均耗时秒, 响应体)"""
+    body = (await client.get(path)).content
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await client.get(path)
+    return (time.perf_counter() - started) / ROUNDS, body
+
+
+def _time_per_call(fn) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - started) / ROUNDS
+
+
+@pytest.mark.asyncio
+async def test_json_response_benchmark():
+    tasks = _marketplace_tasks()
+    transport = httpx.ASGITransport(app=_build_app(tasks))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        default_time, default_body = await _bench(client, "/default")
+        fast_time, fast_body = await _bench(client, "/fast")
+
+    # 输出内容与原接口一致（数字、日期格式不变）
+    assert json.loads(fast_body) == json.loads(default_body)
+
+    payload = {"tasks": tasks, "total": len(tasks)}
+    default_encode = _time_per_call(lambda: JSONResponse({
+        "tasks": [_legacy_item(task) for task in tasks], "total": len(tasks),
+    }).body)
+    fast_encode = _time_per_call(lambda: dumps(payload))
+
+    print()
+    print(f"{len(tasks)} 个任务，响应体 {len(fast_body)} 字节")
+    print(f"     请求: 默认 {default_time * 1000:7.2f} ms, FastJSONResponse {fast_time * 1000:7.2f} ms "
+          f"({default_time / fast_time:.1f}x)")
+    print(f"   序列化: json {default_encode * 1000:7.2f} ms, orjson {fast_encode * 1000:7.2f} ms "
+          f"({default_encode / fast_encode:.1f}x)")
+
+    assert fast_encode < default_encode / 2
+    assert fast_time < default_time
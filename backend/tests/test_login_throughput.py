@@ -0,0 +1,83 @@
+"""
+并发登录吞吐基准。
+
+并发发起登录请求，同时用一个定时协程测量事件循环延迟：
+bcrypt 校验在线程池中执行时，事件循环的最大停顿应远小于单次校验耗时。
+运行：python -m pytest -q -s tests/test_login_throughput.py（-s 输出吞吐数据）
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+
+CONCURRENT_LOGINS = 16
+PASSWORD = "Passw0rd!"
+
+
+def _override_get_db():
+    # 每个请求独立会话，与生产中的请求级会话一致
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """返回事件循环相对预期唤醒时间的最大延迟（秒）"""
+    max_lag = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - expected)
+    return max_lag
+
+
+@pytest.mark.asyncio
+async def test_concurrent_logins_do_not_block_event_loop(db):
+    password_hash = get_password_hash(PASSWORD)
+    db.add(User(username="bench", email="bench@example.com", password_hash=password_hash))
+    db.commit()
+
+    started = time.perf_counter()
+    verify_password(PASSWORD, password_hash)
+    single_verify = time.perf_counter() - started
+
+    app.dependency_overrides[get_db] = _override_get_db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            stop = asyncio.Event()
+            lag_task = asyncio.create_task(_measure_loop_lag(stop))
+
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post(
+                    f"{settings.API_V1_STR}/auth/login",
+                    data={"username": "bench", "password": PASSWORD},
+                )
+                for _ in range(CONCURRENT_LOGINS)
+            ))
+            elapsed = time.perf_counter() - started
+
+            stop.set()
+            max_lag = await lag_task
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_LOGINS
+    print(
+        f"\n{CONCURRENT_LOGINS} 次并发登录: 总耗时 {elapsed:.3f}s, "
+        f"吞吐 {CONCURRENT_LOGINS / elapsed:.1f} 次/秒, "
+        f"单次 bcrypt {single_verify * 1000:.0f}ms, 事件循环最大延迟 {max_lag * 1000:.1f}ms"
+    )
+    # bcrypt 若在事件循环中执行，最大延迟至少为一次校验耗时
+    assert max_lag < single_verify / 2
@@ -0,0 +1,136 @@
+"""
+开发人员匹配测试。
+
+1. 查询次数固定：1 名与多名开发人员（各自带技能、序列、排期）时 SELECT 次数相同
+2. 派发模式下排名第一的候选人，其预测开工/完工日期与实际派发 → 接受后生成的排期一致
+"""
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+import app.services.outbox_service as outbox_module
+from app.models.holiday import Holiday
+from app.models.skill import Skill
+from app.models.task import Task, TaskStatus
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.models.user_sequence import UserSequence
+from app.services.matching_service import MatchingService
+from app.services.occupancy_service import OccupancyService
+from app.services.outbox_service import OutboxService
+from app.services.schedule_service import ScheduleService
+from app.services.task_service import TaskService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    """事件投递使用测试库且由测试同步 flush；占用索引每个测试重新加载"""
+    monkeypatch.setattr(outbox_module, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(OutboxService, "start", staticmethod(lambda: None))
+    OccupancyService.invalidate()
+    yield
+    OccupancyService.invalidate()
+
+
+@contextmanager
+def _count_selects(db):
+    """统计块内执行的 SELECT 次数"""
+    counter = {"selects": 0}
+    engine = db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["selects"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _add_developers(db, rng: random.Random, creator_id: int, count: int, offset: int = 0) -> list[int]:
+    """新增开发人员：技能、序列与若干已认领并排期的任务"""
+    devs = [
+        User(username=f"d{offset + i}", email=f"d{offset + i}@example.com", password_hash="x", role="developer")
+        for i in range(count)
+    ]
+    db.add_all(devs)
+    db.flush()
+    base_time = datetime(2026, 1, 1)
+    for dev in devs:
+        for name in rng.sample(["python", "vue", "mysql", "go"], rng.randint(1, 3)):
+            db.add(Skill(user_id=dev.id, name=name, proficiency=rng.choice(["familiar", "proficient", "expert"])))
+        db.add(UserSequence(user_id=dev.id, level="开发", unit_price=Decimal(rng.choice(["800", "1000", "1200"]))))
+        for _ in range(rng.randint(1, 4)):
+            db.add(Task(
+                title="已认领",
+                status=TaskStatus.CLAIMED.value,
+                priority=rng.choice(["P0", "P1", "P2"]),
+                creator_id=creator_id,
+                assignee_id=dev.id,
+                estimated_man_days=Decimal(rng.choice(["1", "2.5", "3"])),
+                created_at=base_time + timedelta(minutes=rng.randint(0, 600)),
+            ))
+    db.commit()
+    for dev in devs:
+        ScheduleService.recalculate_user_schedules(db, dev.id)
+    return [dev.id for dev in devs]
+
+
+def _setup(db, seed: int, developers: int, priority: str = "P1") -> tuple[User, Task]:
+    rng = random.Random(seed)
+    pm = User(username="pm", email="pm@example.com", password_hash="x", role="project_manager")
+    db.add(pm)
+    for day in rng.sample(range(1, 30), 4):
+        db.add(Holiday(date=date.today() + timedelta(days=day)))
+    db.commit()
+    _add_developers(db, rng, pm.id, developers)
+    task = Task(
+        title="待派发",
+        status=TaskStatus.PUBLISHED.value,
+        priority=priority,
+        creator_id=pm.id,
+        required_skills="python,mysql",
+        estimated_man_days=Decimal("2"),
+        created_at=datetime(2026, 1, 1, 5),
+    )
+    db.add(task)
+    db.commit()
+    return pm, task
+
+
+def test_rank_developers_query_count_is_fixed(db):
+    pm, task = _setup(db, seed=1, developers=1)
+    with _count_selects(db) as single:
+        result = MatchingService.rank_developers(db, task.id, pm.id, pm.role)
+    assert result["total"] == 1
+
+    _add_developers(db, random.Random(2), pm.id, count=12, offset=1)
+    OccupancyService.invalidate()
+    with _count_selects(db) as many:
+        result = MatchingService.rank_developers(db, task.id, pm.id, pm.role)
+    assert result["total"] == 13
+
+    assert many["selects"] == single["selects"]
+
+
+@pytest.mark.parametrize("seed, priority", [(3, "P0"), (4, "P1"), (5, "P2")])
+def test_top_candidate_start_matches_real_schedule(db, seed, priority):
+    pm, task = _setup(db, seed=seed, developers=6, priority=priority)
+
+    top = MatchingService.rank_developers(db, task.id, pm.id, pm.role)["candidates"][0]
+    assert top["feasible"]
+
+    TaskService.assign_task(db, task.id, top["user_id"], pm.id, pm.role)
+    TaskService.evaluate_task(db, task.id, True, top["user_id"])
+    OutboxService.flush()
+
+    db.expire_all()
+    schedule = db.query(TaskSchedule).filter(TaskSchedule.task_id == task.id).one()
+    assert (schedule.start_date, schedule.end_date) == (top["earliest_start"], top["earliest_end"])
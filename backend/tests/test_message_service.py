@@ -0,0 +1,67 @@
+"""消息未读计数维护测试"""
+import threading
+
+from app.models.message import MessageCounter
+from app.models.user import User
+from app.services.message_service import MessageService
+from tests.conftest import TestingSessionLocal
+
+
+def _add_user(db) -> int:
+    user = User(username="reader", email="reader@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def _counter(db, user_id):
+    db.expire_all()
+    counter = db.query(MessageCounter).filter(MessageCounter.user_id == user_id).one()
+    return counter.unread_count, counter.total_count
+
+
+def test_concurrent_mark_as_read_decrements_once(db):
+    user_id = _add_user(db)
+    message_id = MessageService.create_message(db, user_id, "待读").id
+    MessageService.create_message(db, user_id, "另一条")
+
+    workers = 8
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def worker():
+        session = TestingSessionLocal()
+        try:
+            barrier.wait()
+            assert MessageService.mark_as_read(session, message_id, user_id).is_read
+        except Exception as e:  # noqa: BLE001 - 汇总到主线程断言
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert _counter(db, user_id) == (1, 2)
+
+
+def test_mark_as_read_with_stale_session_does_not_decrement_again(db):
+    user_id = _add_user(db)
+    message = MessageService.create_message(db, user_id, "待读")
+
+    other = TestingSessionLocal()
+    try:
+        MessageService.mark_as_read(other, message.id, user_id)
+    finally:
+        other.close()
+
+    # db 中的 message 仍是未读快照
+    assert MessageService.mark_as_read(db, message.id, user_id).is_read
+    assert _counter(db, user_id) == (0, 1)
+
+    MessageService.delete_message(db, message.id, user_id)
+    assert _counter(db, user_id) == (0, 0)
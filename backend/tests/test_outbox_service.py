@@ -0,0 +1,93 @@
+"""领域事件投递测试"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import app.services.outbox_service as outbox_module
+from app.core.config import settings
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus
+from app.models.task import Task, TaskStatus
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.services.outbox_service import TASK_CONFIRMED, TASK_REOPENED, OutboxService
+from app.services.task_service import TaskService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def outbox(monkeypatch):
+    """投递使用测试库；不启动后台线程，由测试调用 flush 同步投递"""
+    monkeypatch.setattr(outbox_module, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(OutboxService, "start", staticmethod(lambda: None))
+
+
+def test_backed_off_events_do_not_starve_new_events(db):
+    retry_at = datetime.now() + timedelta(hours=1)
+    for i in range(settings.OUTBOX_BATCH_SIZE):
+        db.add(OutboxEvent(
+            event_type=TASK_CONFIRMED,
+            aggregate_id=100000 + i,
+            payload="{}",
+            status=OutboxEventStatus.PENDING.value,
+            attempts=3,
+            available_at=retry_at,
+        ))
+    user = User(username="dev", email="dev@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    task = Task(
+        title="新任务",
+        status=TaskStatus.PUBLISHED.value,
+        creator_id=user.id,
+        estimated_man_days=Decimal("2"),
+    )
+    db.add(task)
+    db.commit()
+
+    TaskService.claim_task(db, task.id, user.id)
+    assert OutboxService.flush() == 1
+
+    assert db.query(TaskSchedule).filter(TaskSchedule.task_id == task.id).count() == 1
+    assert db.query(OutboxEvent).filter(
+        OutboxEvent.status == OutboxEventStatus.PENDING.value
+    ).count() == settings.OUTBOX_BATCH_SIZE
+
+
+def test_failed_event_blocks_later_events_of_same_aggregate(db, monkeypatch):
+    calls = []
+    healthy = {"value": False}
+
+    def apply_workload(session, payload):
+        if not healthy["value"]:
+            raise RuntimeError("统计库不可用")
+        calls.append("apply")
+
+    def revert_workload(session, payload):
+        calls.append("revert")
+
+    monkeypatch.setitem(outbox_module._handlers, TASK_CONFIRMED, [("workload", apply_workload)])
+    monkeypatch.setitem(outbox_module._handlers, TASK_REOPENED, [("workload", revert_workload)])
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 1)
+
+    confirmed = OutboxService.publish(db, TASK_CONFIRMED, 1, {"task_id": 1})
+    reopened = OutboxService.publish(db, TASK_REOPENED, 1, {"task_id": 1})
+    other = OutboxService.publish(db, TASK_REOPENED, 2, {"task_id": 2})
+    db.commit()
+
+    # 确认事件达到最大重试次数：重新打开事件不得在其后执行（否则会扣减从未汇入的工作量）
+    assert OutboxService.flush() == 1
+    db.expire_all()
+    assert db.get(OutboxEvent, confirmed.id).status == OutboxEventStatus.FAILED.value
+    assert db.get(OutboxEvent, reopened.id).status == OutboxEventStatus.PENDING.value
+    assert db.get(OutboxEvent, other.id).status == OutboxEventStatus.DONE.value
+    assert calls == ["revert"]
+
+    # 排除故障后重新投递：按顺序先汇入再回滚
+    healthy["value"] = True
+    assert OutboxService.retry(db, confirmed.id)
+    assert OutboxService.flush() == 2
+    db.expire_all()
+    assert db.get(OutboxEvent, confirmed.id).status == OutboxEventStatus.DONE.value
+    assert db.get(OutboxEvent, reopened.id).status == OutboxEventStatus.DONE.value
+    assert calls == ["revert", "apply", "revert"]
@@ -0,0 +1,121 @@
+"""
+高频查询的索引命中测试。
+
+执行目标服务方法并记录其发出的 SELECT，对每条语句执行 EXPLAIN QUERY PLAN，
+断言查询计划使用了迁移 010 新增的组合索引。
+"""
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.models.message import Message
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+from app.models.task_collaborator import TaskCollaborator
+from app.models.user import User
+from app.schemas.task import TaskFilterParams
+from app.services.dashboard_service import DashboardService
+from app.services.message_service import MessageService
+from app.services.schedule_service import ScheduleService
+from app.services.task_service import TaskService
+
+
+@contextmanager
+def _capture_selects(db):
+    """记录块内执行的 SELECT 语句及参数"""
+    statements = []
+    engine = db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _query_plans(db, statements) -> list[str]:
+    conn = db.connection()
+    plans = []
+    for statement, parameters in statements:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plans.append("\n".join(row[-1] for row in rows))
+    return plans
+
+
+def _assert_uses_index(db, index_name, func, *args, **kwargs):
+    with _capture_selects(db) as statements:
+        func(*args, **kwargs)
+    plans = _query_plans(db, statements)
+    assert any(index_name in plan for plan in plans), "\n\n".join(plans)
+
+
+def _seed(db):
+    user = User(username="dev", email="dev@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    project = Project(name="项目", created_by=user.id)
+    db.add(project)
+    db.flush()
+    task = Task(
+        title="任务",
+        project_id=project.id,
+        creator_id=user.id,
+        assignee_id=user.id,
+        status=TaskStatus.CLAIMED.value,
+        estimated_man_days=Decimal("1"),
+    )
+    db.add(task)
+    db.flush()
+    db.add(TaskCollaborator(
+        task_id=task.id,
+        user_id=user.id,
+        scheduled_start=date(2026, 1, 5),
+        scheduled_end=date(2026, 1, 9),
+    ))
+    db.add(Message(user_id=user.id, title="消息", type="system_notice", is_read=False))
+    db.commit()
+    return user, project
+
+
+def test_schedule_queries_use_composite_indexes(db):
+    user, _ = _seed(db)
+    _assert_uses_index(db, "ix_tasks_assignee_status", ScheduleService._get_serial_queue, db, user.id)
+    _assert_uses_index(
+        db,
+        "ix_task_collaborators_user_schedule",
+        ScheduleService.get_user_full_schedule,
+        db,
+        user.id,
+        date(2026, 1, 1),
+        date(2026, 1, 31),
+    )
+
+
+def test_dashboard_queries_use_composite_indexes(db):
+    user, _ = _seed(db)
+    _assert_uses_index(db, "ix_tasks_project_status", DashboardService.get_project_manager_dashboard, db, user.id)
+    _assert_uses_index(db, "ix_tasks_assignee_status", DashboardService.get_developer_dashboard, db, user.id)
+
+
+def test_message_list_uses_composite_index(db):
+    user, _ = _seed(db)
+    _assert_uses_index(
+        db, "ix_messages_user_read_created", MessageService.get_messages, db, user.id, is_read=False
+    )
+
+
+def test_task_list_by_status_uses_composite_index(db):
+    _seed(db)
+    _assert_uses_index(
+        db,
+        "ix_tasks_status_created_at",
+        TaskService.get_tasks,
+        db,
+        TaskFilterParams(status=TaskStatus.PUBLISHED),
+    )
@@ -0,0 +1,99 @@
+"""排期推演引擎与 ScheduleService 实际排期的一致性测试"""
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app.models.holiday import Holiday
+from app.models.task import Task, TaskStatus
+from app.models.task_collaborator import TaskCollaborator
+from app.models.user import User
+from app.services.schedule_service import ScheduleService
+
+ACTIVE_STATUSES = [TaskStatus.CLAIMED.value, TaskStatus.IN_PROGRESS.value]
+
+
+def _seed(db, rng: random.Random) -> list[int]:
+    users = []
+    for name in ["pm", "d0", "d1", "d2"]:
+        user = User(username=name, email=f"{name}@example.com", password_hash="x")
+        db.add(user)
+        users.append(user)
+    db.flush()
+    creator, devs = users[0].id, [u.id for u in users[1:]]
+
+    for day in rng.sample(range(1, 60), 8):
+        db.add(Holiday(date=date.today() + timedelta(days=day)))
+
+    base_time = datetime(2026, 1, 1)
+    tasks = []
+    for i in range(15):
+        task = Task(
+            title=f"T{i}",
+            status=TaskStatus.CLAIMED.value,
+            priority=rng.choice(["P0", "P1", "P2"]),
+            creator_id=creator,
+            assignee_id=rng.choice(devs),
+            estimated_man_days=Decimal(rng.choice(["1", "2.5", "3", "5"])),
+            created_at=base_time + timedelta(minutes=rng.randint(0, 5)),
+        )
+        db.add(task)
+        tasks.append(task)
+    db.flush()
+
+    for task in rng.sample(tasks, 4):
+        other = rng.choice([d for d in devs if d != task.assignee_id])
+        db.add(TaskCollaborator(task_id=task.id, user_id=other, allocated_man_days=Decimal("1")))
+    db.commit()
+
+    for dev in devs:
+        ScheduleService.recalculate_user_schedules(db, dev)
+    return devs
+
+
+def _apply_for_real(db, op: str, task_id: int, **kwargs) -> bool:
+    """用 ScheduleService 执行变更，返回是否成功"""
+    task = db.get(Task, task_id)
+    try:
+        if op == "pin":
+            ScheduleService.pin_task_and_reschedule(db, task_id, kwargs["is_pinned"], task.assignee_id)
+        elif op == "set_concurrent":
+            ScheduleService.set_concurrent(db, task_id, kwargs["concurrent_with"], task.assignee_id)
+        else:
+            ScheduleService.unset_concurrent(db, task_id, task.assignee_id)
+    except Exception:
+        db.rollback()
+        return False
+    return True
+
+
+def test_engine_matches_schedule_service(db):
+    rng = random.Random(7)
+    _seed(db, rng)
+
+    for _ in range(30):
+        active = [
+            row[0] for row in db.query(Task.id).filter(Task.status.in_(ACTIVE_STATUSES)).order_by(Task.id)
+        ]
+        op = rng.choice(["pin", "set_concurrent", "unset_concurrent"])
+        task_id = rng.choice(active)
+        kwargs = {}
+        if op == "pin":
+            kwargs["is_pinned"] = rng.random() < 0.7
+        elif op == "set_concurrent":
+            kwargs["concurrent_with"] = rng.choice(active)
+
+        related = [task_id] + ([kwargs["concurrent_with"]] if "concurrent_with" in kwargs else [])
+        state = ScheduleService.load_schedule_state(db, related)
+        try:
+            state.apply(op, task_id, **kwargs)
+            engine_ok = True
+        except Exception:
+            engine_ok = False
+        expected = state.snapshot()
+
+        assert _apply_for_real(db, op, task_id, **kwargs) == engine_ok, (op, task_id, kwargs)
+
+        db.expire_all()
+        actual = ScheduleService.load_schedule_state(db, related, state.loaded_assignees).snapshot()
+        if engine_ok:
+            assert actual == expected, (op, task_id, kwargs)
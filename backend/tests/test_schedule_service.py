@@ -0,0 +1,57 @@
+"""串行队列排期重建测试"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.models.task import Task, TaskStatus
+from app.models.task_schedule import TaskSchedule
+from app.models.user import User
+from app.services.schedule_service import ScheduleService
+
+QUEUE_LENGTH = 60
+
+
+def _add_task(db, user_id: int, index: int) -> Task:
+    task = Task(
+        title=f"T{index}",
+        status=TaskStatus.CLAIMED.value,
+        priority="P2",
+        creator_id=user_id,
+        assignee_id=user_id,
+        estimated_man_days=Decimal("2"),
+        created_at=datetime(2026, 1, 1) + timedelta(minutes=index),
+    )
+    db.add(task)
+    db.flush()
+    return task
+
+
+def test_rebuild_writes_only_changed_tail_schedules(db):
+    user = User(username="dev", email="dev@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    tasks = [_add_task(db, user.id, i) for i in range(QUEUE_LENGTH)]
+    db.commit()
+
+    assert ScheduleService._rebuild_serial_schedules(db, user.id) == QUEUE_LENGTH
+    db.commit()
+    assert ScheduleService._rebuild_serial_schedules(db, user.id) == 0
+
+    # 队尾任务人天变化：只改写这一条
+    tasks[-1].estimated_man_days = Decimal("5")
+    db.commit()
+    assert ScheduleService._rebuild_serial_schedules(db, user.id) == 1
+    db.commit()
+
+    # 认领一个排在队尾的新任务：只新增这一条
+    tail = _add_task(db, user.id, QUEUE_LENGTH)
+    db.commit()
+    assert ScheduleService._rebuild_serial_schedules(db, user.id) == 1
+    db.commit()
+    last = db.query(TaskSchedule).filter(TaskSchedule.task_id == tasks[-1].id).one()
+    new = db.query(TaskSchedule).filter(TaskSchedule.task_id == tail.id).one()
+    assert new.start_date > last.end_date
+
+    # 队首任务变化：其后全部顺延
+    tasks[0].estimated_man_days = Decimal("3")
+    db.commit()
+    assert ScheduleService._rebuild_serial_schedules(db, user.id) == QUEUE_LENGTH + 1
@@ -0,0 +1,158 @@
+"""任务批量操作测试"""
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+
+import app.services.outbox_service as outbox_module
+from app.core.exceptions import ConflictError, ValidationError
+from app.models.outbox_event import OutboxEvent
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services.project_output_value_service import ProjectOutputValueService
+from app.services.outbox_service import OutboxService
+from app.services.schedule_service import ScheduleService
+from app.services.task_service import TaskService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def outbox(monkeypatch):
+    """事件投递使用测试库；不启动后台线程，由测试调用 flush 同步投递"""
+    monkeypatch.setattr(outbox_module, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(OutboxService, "start", staticmethod(lambda: None))
+
+
+@pytest.fixture
+def people(db):
+    pm = User(username="pm", email="pm@example.com", password_hash="x", role="project_manager")
+    devs = [
+        User(username=f"dev{i}", email=f"dev{i}@example.com", password_hash="x", role="developer")
+        for i in range(2)
+    ]
+    db.add_all([pm] + devs)
+    db.flush()
+    projects = [Project(name=f"项目{i}", created_by=pm.id) for i in range(2)]
+    db.add_all(projects)
+    db.commit()
+    return pm, devs, projects
+
+
+def _task(db, creator, status, assignee=None, project=None) -> int:
+    task = Task(
+        title="任务",
+        status=status.value,
+        creator_id=creator.id,
+        assignee_id=assignee.id if assignee else None,
+        project_id=project.id if project else None,
+        estimated_man_days=Decimal("2"),
+    )
+    db.add(task)
+    db.commit()
+    return task.id
+
+
+def _count_calls(monkeypatch, owner, name) -> Counter:
+    calls = Counter()
+    original = getattr(owner, name)
+
+    def wrapper(db, key, *args, **kwargs):
+        calls[key] += 1
+        return original(db, key, *args, **kwargs)
+
+    monkeypatch.setattr(owner, name, staticmethod(wrapper))
+    return calls
+
+
+def test_failing_item_rolls_back_whole_batch(db, people):
+    pm, devs, _ = people
+    draft = _task(db, pm, TaskStatus.DRAFT)
+    published = _task(db, pm, TaskStatus.PUBLISHED)
+
+    with pytest.raises(ValidationError) as exc_info:
+        TaskService.bulk_operate(
+            db,
+            [
+                {"action": "publish", "task_id": draft},
+                {"action": "set_priority", "task_id": published, "priority": "P0"},
+                {"action": "publish", "task_id": published},
+            ],
+            pm.id,
+            "project_manager",
+        )
+    assert exc_info.value.message.startswith(f"第 3 项（任务 {published}）")
+
+    db.expire_all()
+    assert db.get(Task, draft).status == TaskStatus.DRAFT.value
+    assert db.get(Task, published).priority == "P2"
+    assert db.query(OutboxEvent).count() == 0
+
+
+def test_side_effects_run_once_per_user_and_project(db, people, monkeypatch):
+    pm, (dev0, dev1), (project0, project1) = people
+    returned = [
+        _task(db, pm, TaskStatus.CLAIMED, dev0, project0),
+        _task(db, pm, TaskStatus.IN_PROGRESS, dev0, project0),
+        _task(db, pm, TaskStatus.CLAIMED, dev0, project1),
+        _task(db, pm, TaskStatus.CLAIMED, dev1, project1),
+    ]
+    archived = _task(db, pm, TaskStatus.CONFIRMED, dev1, project1)
+    _task(db, pm, TaskStatus.CLAIMED, dev0, project0)  # 留在原认领人队列中的任务
+    reschedules = _count_calls(monkeypatch, ScheduleService, "recalculate_user_schedules")
+    recomputes = _count_calls(monkeypatch, ProjectOutputValueService, "update_project_output_value")
+
+    result = TaskService.bulk_operate(
+        db,
+        [{"action": "return", "task_id": task_id} for task_id in returned]
+        + [{"action": "archive", "task_id": archived}],
+        pm.id,
+        "project_manager",
+    )
+
+    assert result["rescheduled_users"] == sorted([dev0.id, dev1.id])
+    assert result["recomputed_projects"] == sorted([project0.id, project1.id])
+    # 副作用以事件登记，不在请求内执行
+    assert not reschedules and not recomputes
+    assert db.query(OutboxEvent).count() == len(returned) + 1
+
+    OutboxService.flush()
+    assert reschedules == {dev0.id: 1, dev1.id: 1}
+    assert recomputes == {project0.id: 1, project1.id: 1}
+    assert all(db.get(Task, task_id).status == TaskStatus.PUBLISHED.value for task_id in returned)
+
+
+def test_bulk_assign_conflicts_with_concurrent_claim(db, people, monkeypatch):
+    pm, (dev0, dev1), _ = people
+    draft = _task(db, pm, TaskStatus.DRAFT)
+    contested = _task(db, pm, TaskStatus.PUBLISHED)
+
+    original = TaskService._take_published_task
+
+    def claimed_by_someone_else_first(session, task, *args, **kwargs):
+        # 批量操作读取任务之后、条件更新之前，另一个请求抢先认领
+        other = TestingSessionLocal()
+        try:
+            original(other, other.get(Task, task.id), TaskStatus.CLAIMED.value, dev1.id)
+        finally:
+            other.close()
+        return original(session, task, *args, **kwargs)
+
+    monkeypatch.setattr(TaskService, "_take_published_task", staticmethod(claimed_by_someone_else_first))
+
+    with pytest.raises(ConflictError) as exc_info:
+        TaskService.bulk_operate(
+            db,
+            [
+                {"action": "publish", "task_id": draft},
+                {"action": "assign", "task_id": contested, "assignee_id": dev0.id},
+            ],
+            pm.id,
+            "project_manager",
+        )
+    assert exc_info.value.message.startswith(f"第 2 项（任务 {contested}）")
+
+    db.expire_all()
+    assert db.get(Task, draft).status == TaskStatus.DRAFT.value
+    task = db.get(Task, contested)
+    assert (task.status, task.assignee_id) == (TaskStatus.CLAIMED.value, dev1.id)
@@ -0,0 +1,60 @@
+"""任务并发认领测试"""
+import threading
+from decimal import Decimal
+
+from app.core.exceptions import ConflictError
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services.task_service import TaskService
+from tests.conftest import TestingSessionLocal
+
+CLAIMERS = 8
+
+
+def test_concurrent_claim_has_exactly_one_winner(db):
+    users = [User(username=f"dev{i}", email=f"dev{i}@example.com", password_hash="x") for i in range(CLAIMERS)]
+    db.add_all(users)
+    db.flush()
+    task = Task(
+        title="抢单",
+        status=TaskStatus.PUBLISHED.value,
+        creator_id=users[0].id,
+        estimated_man_days=Decimal("1"),
+    )
+    db.add(task)
+    db.commit()
+    task_id, user_ids = task.id, [u.id for u in users]
+
+    barrier = threading.Barrier(CLAIMERS)
+    winners, conflicts, errors = [], [], []
+
+    def claim(user_id: int) -> None:
+        session = TestingSessionLocal()
+        try:
+            # 所有线程先读到"已发布、未认领"的任务，再同时认领：失败方只能由条件更新拒绝
+            TaskService.get_task(session, task_id)
+            barrier.wait()
+            TaskService.claim_task(session, task_id, user_id)
+            winners.append(user_id)
+        except ConflictError:
+            conflicts.append(user_id)
+        except Exception as e:  # noqa: BLE001 - 汇总到主线程断言
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=claim, args=(user_id,)) for user_id in user_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(winners) == 1
+    assert sorted(winners + conflicts) == sorted(user_ids)
+
+    db.expire_all()
+    claimed = db.get(Task, task_id)
+    assert claimed.status == TaskStatus.CLAIMED.value
+    assert claimed.assignee_id == winners[0]
+    assert claimed.version == 2
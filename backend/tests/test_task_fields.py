@@ -0,0 +1,130 @@
+"""
+任务列表 fields 稀疏返回与描述摘要测试。
+
+指定 fields 时列表接口只查询并返回所需字段（大字段 description 不进入 SQL），
+非法字段返回 422；make_excerpt 生成列表预览用的纯文本摘要。
+"""
+import re
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.models.project import Project
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.utils.markdown import make_excerpt
+
+# 匹配 description 列本身，不匹配 description_excerpt
+_DESCRIPTION_COLUMN = re.compile(r"tasks\.description\b(?!_)")
+
+
+@contextmanager
+def _capture_task_selects(db):
+    """记录块内针对 tasks 表的 SELECT 语句"""
+    statements = []
+    engine = db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM tasks" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def seeded(db):
+    pm = User(username="pm", email="pm@example.com", password_hash="x", full_name="经理", role="project_manager")
+    db.add(pm)
+    db.flush()
+    project = Project(name="项目A", created_by=pm.id)
+    db.add(project)
+    db.flush()
+    description = "# 标题\n\n这是**很长**的任务描述。" * 50
+    for i in range(3):
+        db.add(Task(
+            title=f"任务{i}",
+            description=description,
+            description_excerpt=make_excerpt(description),
+            status=TaskStatus.PUBLISHED.value,
+            creator_id=pm.id,
+            project_id=project.id,
+            estimated_man_days=Decimal("2"),
+        ))
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(pm.id)})}"}
+
+
+@pytest.mark.parametrize("path, key", [
+    ("/api/v1/tasks/", "items"),
+    ("/api/v1/tasks/marketplace", "tasks"),
+])
+def test_fields_projection_skips_description_column(client, db, seeded, path, key):
+    with _capture_task_selects(db) as statements:
+        response = client.get(
+            path,
+            params={"fields": "title,project_name,description_excerpt"},
+            headers=seeded,
+        )
+
+    assert response.status_code == 200
+    items = response.json()[key]
+    assert len(items) == 3
+    for item in items:
+        assert set(item) == {"id", "title", "project_name", "description_excerpt"}
+        assert item["project_name"] == "项目A"
+        assert item["description_excerpt"].startswith("标题 这是很长的任务描述。")
+    assert statements
+    assert [sql for sql in statements if _DESCRIPTION_COLUMN.search(sql)] == []
+
+
+@pytest.mark.parametrize("path, key", [
+    ("/api/v1/tasks/", "items"),
+    ("/api/v1/tasks/marketplace", "tasks"),
+])
+def test_without_fields_returns_full_items(client, db, seeded, path, key):
+    with _capture_task_selects(db) as statements:
+        response = client.get(path, headers=seeded)
+
+    assert response.status_code == 200
+    item = response.json()[key][0]
+    assert {"id", "title", "description", "description_excerpt", "status"} <= set(item)
+    assert any(_DESCRIPTION_COLUMN.search(sql) for sql in statements)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/tasks/", "/api/v1/tasks/marketplace"])
+def test_unknown_field_is_rejected(client, seeded, path):
+    response = client.get(path, params={"fields": "title,password_hash"}, headers=seeded)
+
+    assert response.status_code == 422
+
+
+def test_make_excerpt_strips_markdown():
+    text = (
+        "## 需求说明\n\n"
+        "> 请参考[设计稿](https://example.com/design)，注意 `config` 字段。\n\n"
+        "![截图](https://example.com/a.png)\n"
+        "```python\nprint('不进入摘要')\n```\n"
+        "- **加粗** 与 *斜体* <br/>结束"
+    )
+
+    assert make_excerpt(text) == "需求说明 请参考设计稿，注意 config 字段。 加粗 与 斜体 结束"
+
+
+@pytest.mark.parametrize("text", [None, "", "   \n\n", "```\n只有代码\n```"])
+def test_make_excerpt_empty(text):
+    assert make_excerpt(text) is None
+
+
+def test_make_excerpt_truncates_with_ellipsis():
+    excerpt = make_excerpt("字" * 500, max_length=20)
+
+    assert len(excerpt) == 20
+    assert excerpt == "字" * 19 + "…"
+    assert make_excerpt("字" * 20, max_length=20) == "字" * 20
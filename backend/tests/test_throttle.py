@@ -0,0 +1,35 @@
+"""滑动窗口计数存储测试"""
+import time
+
+import pytest
+
+from app.utils.throttle import MemoryThrottleStore, RedisThrottleStore, ThrottleStore
+
+
+def test_throttle_store_is_abstract():
+    with pytest.raises(TypeError):
+        ThrottleStore()
+
+
+def test_memory_store_counts_within_window():
+    store = MemoryThrottleStore()
+    assert store.hit("k", 60) == 1
+    assert store.hit("k", 60) == 2
+    assert store.count("k", 60) == 2
+    store.reset("k")
+    assert store.count("k", 60) == 0
+
+
+def test_redis_store_falls_back_when_unreachable():
+    pytest.importorskip("redis")
+    # 端口 1 无服务：连接被拒绝，应在超时内退回进程内计数而不是抛错
+    store = RedisThrottleStore("redis://127.0.0.1:1/0", timeout_seconds=0.2)
+
+    started = time.monotonic()
+    assert store.hit("k", 60) == 1
+    assert store.hit("k", 60) == 2
+    assert store.count("k", 60) == 2
+    store.reset("k")
+    assert store.count("k", 60) == 0
+    # 标记不可用后不再逐次尝试连接
+    assert time.monotonic() - started < 1
@@ -0,0 +1,72 @@
+"""上传文件去重与垃圾回收测试"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func
+
+import app.services.upload_storage_service as storage_module
+from app.models.uploaded_file import UploadedFile
+from app.services.upload_storage_service import UploadStorageService
+
+CONTENT = b"\x89PNG\r\n\x1a\n not really a png"
+
+
+@pytest.fixture(autouse=True)
+def uploads_dir(tmp_path, monkeypatch):
+    """上传目录指向临时目录"""
+    images = tmp_path / "images"
+    images.mkdir()
+    monkeypatch.setattr(storage_module, "get_uploads_dir", lambda: tmp_path)
+    monkeypatch.setattr(storage_module, "get_uploads_images_dir", lambda: images)
+    return tmp_path
+
+
+def _age(db, record, hours: int) -> None:
+    """把文件的上传时间调到 hours 小时之前（数据库时钟）"""
+    past = db.query(func.now()).scalar() - timedelta(hours=hours)
+    db.query(UploadedFile).filter(UploadedFile.id == record.id).update(
+        {UploadedFile.created_at: past, UploadedFile.last_uploaded_at: past}, synchronize_session=False
+    )
+    db.commit()
+
+
+def test_unreferenced_old_upload_is_collected(db, uploads_dir):
+    record, created = UploadStorageService.save_image(db, CONTENT, "a.png", "image/png")
+    assert created
+    blob = uploads_dir / record.file_path
+    assert blob.is_file()
+
+    # 保留期内不回收
+    assert UploadStorageService.collect_garbage(db) == 0
+    _age(db, record, 48)
+    assert UploadStorageService.collect_garbage(db) == 1
+    assert db.query(UploadedFile).count() == 0
+    assert not blob.exists()
+
+
+def test_reupload_restarts_grace_period(db, uploads_dir):
+    record, _ = UploadStorageService.save_image(db, CONTENT, "a.png", "image/png")
+    _age(db, record, 48)
+
+    # 同一内容再次上传（如粘贴进尚未保存的草稿）：命中去重，保留期重新起算
+    again, created = UploadStorageService.save_image(db, CONTENT, "b.png", "image/png")
+    assert not created and again.id == record.id
+    assert UploadStorageService.collect_garbage(db) == 0
+    assert (uploads_dir / record.file_path).is_file()
+
+
+def test_failed_commit_keeps_files(db, uploads_dir, monkeypatch):
+    record, _ = UploadStorageService.save_image(db, CONTENT, "a.png", "image/png")
+    _age(db, record, 48)
+
+    def fail_commit():
+        raise RuntimeError("提交失败")
+
+    monkeypatch.setattr(db, "commit", fail_commit)
+    with pytest.raises(RuntimeError):
+        UploadStorageService.collect_garbage(db)
+    db.rollback()
+
+    # 记录仍在，文件也必须仍在
+    assert db.query(UploadedFile).count() == 1
+    assert (uploads_dir / record.file_path).is_file()